@@ -0,0 +1,121 @@
+"""
+Requests per second of POST /auth/validate before and after the stateless fast path.
+
+"before" is the previous route: a sync handler on the threadpool whose UserService
+dependency builds both repositories (borrowing a pooled connection) before decoding the
+token. "after" is the current async handler with the prepared key and claims cache, and
+"batch" validates --batch-size tokens per POST /auth/validate/batch call (tokens/s counts
+every token in the batch). Requests are sent in-process through httpx's ASGI transport.
+
+Once concurrency outruns FastAPI's threadpool, the before route's threads block on pool
+checkouts that the queued requests holding connections cannot release, so it fails with
+503s after --pool-timeout instead of slowing down. Only reads, so it can be pointed at
+the test database:
+
+    cd auth && PYTHONPATH=src ENV=test TEST_DATABASE_URL=... SECRET_KEY=... ALGORITHM=HS256 \\
+        python -m benchmarks.bench_validate
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+import httpx
+import jwt
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from auth.api.userController import user_controller_router
+from auth.config import settings
+from auth.models.customException import TokenDecodeError
+from auth.services.userService import UserService
+from auth.utils import create_pool
+
+legacy_router = APIRouter()
+
+@legacy_router.post("/validate")
+def legacy_validate_token(payload: dict, user_service: UserService = Depends()):
+    try:
+        user_dict = user_service.authenticate_user(payload.get("token"))
+    except TokenDecodeError as decoding_error:
+        raise HTTPException(status_code=401, detail=str(decoding_error))
+    if user_dict is None:
+        raise HTTPException(status_code=404, detail="User not found in token")
+    return user_dict
+
+def make_tokens(count: int) -> list[str]:
+    expires = datetime.now(timezone.utc) + timedelta(hours=1)
+    return [
+        jwt.encode({"sub": f"bench{i}@bench.local", "user_id": i, "kennel_id": 1, "exp": expires},
+                   os.getenv("SECRET_KEY"), algorithm=os.getenv("ALGORITHM"))
+        for i in range(count)
+    ]
+
+async def load(app: FastAPI, path: str, bodies: list[dict], requests: int, concurrency: int) -> dict:
+    samples, failures = [], 0
+    queue = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            nonlocal failures
+            for i in queue:
+                start = time.perf_counter()
+                response = await client.post(path, json=bodies[i % len(bodies)])
+                samples.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(samples, n=100)
+    return {
+        "rps": requests / elapsed,
+        "p50": quantiles[49],
+        "p95": quantiles[94],
+        "p99": quantiles[98],
+        "failures": failures,
+    }
+
+async def run(args) -> None:
+    settings.DB_POOL_MIN_SIZE = settings.DB_POOL_MAX_SIZE = args.pool_size
+    settings.DB_POOL_TIMEOUT = args.pool_timeout
+    db_pool = create_pool()
+    legacy_app, app = FastAPI(), FastAPI()
+    legacy_app.include_router(legacy_router, prefix="/auth")
+    app.include_router(user_controller_router, prefix="/auth")
+    legacy_app.state.db_pool = app.state.db_pool = db_pool
+
+    tokens = make_tokens(args.distinct_tokens)
+    single = [{"token": token} for token in tokens]
+    batches = [{"tokens": [tokens[(i + j) % len(tokens)] for j in range(args.batch_size)]} for i in range(len(tokens))]
+    batch_requests = max(args.requests // args.batch_size, 1)
+
+    print(f"{args.distinct_tokens} distinct tokens, pool size {args.pool_size}, batch size {args.batch_size}")
+    print(f"{'mode':>6} {'concurrency':>12} {'req/s':>8} {'tokens/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'failed':>7}")
+    try:
+        for concurrency in args.concurrency:
+            for mode, target, path, bodies, requests, per_request in [
+                ("before", legacy_app, "/auth/validate", single, args.requests, 1),
+                ("after", app, "/auth/validate", single, args.requests, 1),
+                ("batch", app, "/auth/validate/batch", batches, batch_requests, args.batch_size),
+            ]:
+                await load(target, path, bodies, concurrency, concurrency)  # warm up
+                r = await load(target, path, bodies, requests, concurrency)
+                print(f"{mode:>6} {concurrency:>12} {r['rps']:>8.0f} {r['rps'] * per_request:>9.0f} "
+                      f"{r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} {r['failures']:>7}")
+    finally:
+        db_pool.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--distinct-tokens", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=40, help="connections for the before route")
+    parser.add_argument("--pool-timeout", type=float, default=settings.DB_POOL_TIMEOUT)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,15 @@ from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from pydantic import ValidationError
 from jwt.exceptions import PyJWTError
 from auth.services.userService import UserService
+from auth.tokens import get_token_validator
+from auth.deps import get_refresh_token_repository
+from auth.repositories.refreshTokenRepository import RefreshTokenRepository
 
 from auth.models.user import UsersIn, Users
 from auth.models.kennel import Kennel
-from auth.models.customException import CustomValidationException, TokenDecodeError
+from auth.models.customException import CustomValidationException, TokenDecodeError, PasswordHasherBusyError
 from auth.models.customResponseModel import CustomResponseModel, SessionTokenResponse
+from auth.models.token import TokenBatchRequest, TokenValidationResult
 
 user_controller_router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="http://localhost:8001/auth/token")
@@ -20,6 +24,13 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="http://localhost:8001/auth/token"
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+def password_hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many password operations in progress, try again later",
+        headers={"Retry-After": "1"},
+    )
+
 @cbv(user_controller_router)
 class UserController:
     
@@ -60,6 +71,8 @@ class UserController:
                         field = "email",
                         message = "Invalid format for registration information"
                     )
+        except PasswordHasherBusyError:
+            raise password_hasher_busy()
         except HTTPException: 
             raise
         except Exception as e:
@@ -97,6 +110,8 @@ class UserController:
                         field = "email",
                         message = "Invalid format for registration information"
                     )
+        except PasswordHasherBusyError:
+            raise password_hasher_busy()
         except HTTPException: 
             raise
         except Exception as e:
@@ -140,29 +155,13 @@ class UserController:
             return SessionTokenResponse.model_validate(access_token)     
         except TokenDecodeError as decoding_error:
             raise HTTPException(status_code=401, detail = "Error during token registration process, token expired or invalid")         
+        except PasswordHasherBusyError:
+            raise password_hasher_busy()
         except HTTPException: 
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e)) 
     
-    @user_controller_router.post("/validate", status_code=status.HTTP_200_OK)
-    def validate_token(self, payload: dict):
-        token = payload.get("token")
-        try:
-            user_dict = self.userService.authenticate_user(token)
-            if user_dict is None:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail = "User not found in token"
-                )
-            return user_dict
-        except TokenDecodeError as decoding_error:
-            raise HTTPException(status_code=401, detail = str(decoding_error))
-        except HTTPException: 
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e)) 
-
     @user_controller_router.post("/refresh-token", response_model=SessionTokenResponse, status_code=200)
     def refresh_token(self, request: Request, token=Depends(oauth2_scheme)):
         '''
@@ -197,4 +196,48 @@ class UserController:
 
         return {"message": "Logged out successfully"}
 
-        
\ No newline at end of file
+# Token validation is a pure JWT decode: these routes live outside UserController so they
+# don't build a UserService (and borrow a database connection) for every call, and they
+# are async so cache hits never wait for a threadpool thread.
+@user_controller_router.post("/validate", status_code=status.HTTP_200_OK)
+async def validate_token(payload: dict):
+    try:
+        user_dict = get_token_validator().validate(payload.get("token"))
+    except TokenDecodeError as decoding_error:
+        raise HTTPException(status_code=401, detail = str(decoding_error))
+    if user_dict is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail = "User not found in token"
+        )
+    return user_dict
+
+@user_controller_router.post("/validate/batch", response_model=list[TokenValidationResult], status_code=status.HTTP_200_OK)
+async def validate_tokens(batch: TokenBatchRequest):
+    '''
+    Validates many tokens in one call (for gateways), results are in request order
+    '''
+    validator = get_token_validator()
+    results = []
+    for token in batch.tokens:
+        try:
+            claims = validator.validate(token)
+        except TokenDecodeError as decoding_error:
+            results.append(TokenValidationResult(valid=False, error=str(decoding_error)))
+            continue
+        if claims is None:
+            results.append(TokenValidationResult(valid=False, error="User not found in token"))
+        else:
+            results.append(TokenValidationResult(valid=True, claims=claims))
+    return results
+
+@user_controller_router.get("/refresh-tokens/stats", status_code=status.HTTP_200_OK)
+def refresh_token_stats(request: Request, refresh_tokens: RefreshTokenRepository = Depends(get_refresh_token_repository)):
+    '''
+    Size of the refresh token table and counters of this worker's expiry sweeper
+    '''
+    stats = {"table": refresh_tokens.table_stats()}
+    sweeper = getattr(request.app.state, "refresh_token_sweeper", None)
+    if sweeper is not None:
+        stats["sweeper"] = sweeper.stats()
+    return stats
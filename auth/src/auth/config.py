@@ -10,6 +10,15 @@ class Settings(BaseSettings):
     ENV: str = "dev"
     DATABASE_URL: str = ""
     TEST_DATABASE_URL: str = ""
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 5 # server-side connections held by the service at most
+    DB_POOL_TIMEOUT: float = 5.0 # seconds to wait for a free connection
+    PASSWORD_HASH_WORKERS: int = 2 # bcrypt worker processes, 0 hashes in the request thread
+    PASSWORD_HASH_QUEUE_DEPTH: int = 16 # password operations waiting for a worker before answering 503
+    TOKEN_CACHE_SIZE: int = 1024 # validated access tokens whose claims are kept until they expire
+    TOKEN_VALIDATE_BATCH_MAX: int = 1000 # tokens accepted by POST /auth/validate/batch
+    REFRESH_TOKEN_SWEEP_INTERVAL: float = 300.0 # seconds between expired refresh token sweeps, 0 disables them
+    REFRESH_TOKEN_SWEEP_BATCH_SIZE: int = 1000 # expired refresh tokens deleted per transaction
 
     model_config = ConfigDict(extra="ignore")
 
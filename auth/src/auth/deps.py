@@ -0,0 +1,23 @@
+from fastapi import Depends, HTTPException, Request, status
+from auth.repositories.userRepository import UserRepository
+from auth.repositories.kennelRepository import KennelRepository
+from auth.repositories.refreshTokenRepository import RefreshTokenRepository
+from auth.utils import PoolTimeoutError
+
+def get_db(request: Request):
+    # one pooled connection per request, shared by its repositories and returned
+    # (rolled back if left dirty) once the request is done
+    try:
+        with request.app.state.db_pool.connection() as conn:
+            yield conn
+    except PoolTimeoutError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database busy, try again later")
+
+def get_user_repository(db=Depends(get_db)) -> UserRepository:
+    return UserRepository(db)
+
+def get_kennel_repository(db=Depends(get_db)) -> KennelRepository:
+    return KennelRepository(db)
+
+def get_refresh_token_repository(db=Depends(get_db)) -> RefreshTokenRepository:
+    return RefreshTokenRepository(db)
\ No newline at end of file
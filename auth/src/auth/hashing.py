@@ -0,0 +1,87 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+from auth.config import settings
+from auth.models.customException import PasswordHasherBusyError
+
+pwd_context = CryptContext(schemes = ["bcrypt"], deprecated = "auto")
+
+# run inside the worker processes, module level so they can be pickled
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(password: str, password_hash: str) -> bool:
+    return pwd_context.verify(password, password_hash)
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so a burst of logins burns those CPUs
+    instead of the event loop and the threadpool that serves /validate.
+
+    At most `workers + queue_depth` operations are admitted at once; past that,
+    callers get PasswordHasherBusyError right away (503) instead of piling up
+    blocked threads. workers=0 hashes inline, in the calling thread.
+    """
+
+    def __init__(self, workers: int = 2, queue_depth: int = 16):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._slots = threading.BoundedSemaphore(workers + queue_depth) if workers > 0 else None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        # spawn: forking a process that already runs threads is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) if workers > 0 else None
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run(_verify, password, password_hash)
+
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHasherBusyError(f"{self.workers + self.queue_depth} password operations already in progress")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+_password_hasher: PasswordHasher | None = None
+
+def get_password_hasher() -> PasswordHasher:
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_DEPTH)
+    return _password_hasher
+
+def shutdown_password_hasher():
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.shutdown()
+        _password_hasher = None
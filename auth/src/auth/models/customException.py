@@ -14,4 +14,7 @@ class InvalidHeaderFormatException(Exception):
         super().__init__(self.message)
 
 class TokenDecodeError(Exception):
-    pass
\ No newline at end of file
+    pass
+# Raised when every password hashing worker is busy and the queue is full
+class PasswordHasherBusyError(Exception):
+    pass
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from auth.config import settings
+
+class TokenBatchRequest(BaseModel):
+    tokens: list[str] = Field(..., max_length=settings.TOKEN_VALIDATE_BATCH_MAX)
+
+class TokenValidationResult(BaseModel):
+    valid: bool
+    claims: Optional[dict] = None # same payload as POST /auth/validate
+    error: Optional[str] = None
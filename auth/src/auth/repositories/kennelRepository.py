@@ -1,9 +1,9 @@
-from auth.utils import get_connection
 from auth.models.kennel import Kennel
 
 class KennelRepository:
-    def __init__(self):
-        self.conn = get_connection()
+    def __init__(self, connection):
+        # borrowed from the pool for the current request, see auth.deps
+        self.conn = connection
 
     def get_all(self) -> list[Kennel]:
         with self.conn.cursor() as cur:
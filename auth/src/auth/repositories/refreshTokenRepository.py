@@ -0,0 +1,60 @@
+from datetime import datetime
+from psycopg2.extras import RealDictCursor
+
+class RefreshTokenRepository:
+    """
+    Hashed refresh tokens (one row per active session). Reads go through the
+    (user_id, hashed_refresh_token) primary key, see sql_scripts/6-refresh-token-indexes.sql
+    """
+
+    def __init__(self, connection):
+        # borrowed from the pool for the current request, see auth.deps
+        self.connection = connection
+
+    def create(self, user_id: int, hashed_token: str, expires_on: datetime):
+        with self.connection.cursor() as cur:
+            cur.execute("""
+                        INSERT INTO refresh_tokens (user_id, hashed_refresh_token, expires_on) VALUES (%s, %s, %s)
+                        """, (user_id, hashed_token, expires_on,))
+            self.connection.commit()
+
+    def is_valid(self, user_id: int, hashed_token: str) -> bool:
+        with self.connection.cursor() as cur:
+            cur.execute("""
+                        SELECT 1 FROM refresh_tokens
+                        WHERE user_id = %s AND hashed_refresh_token = %s AND expires_on > now()
+                        """, (user_id, hashed_token,))
+            return cur.fetchone() is not None
+
+    def delete(self, hashed_token: str):
+        with self.connection.cursor() as cur:
+            cur.execute("DELETE FROM refresh_tokens WHERE hashed_refresh_token = %s", (hashed_token,))
+            self.connection.commit()
+
+    def delete_expired(self, batch_size: int) -> int:
+        '''
+        Deletes up to batch_size expired tokens in their own transaction and returns how
+        many went. Rows locked by a concurrent sweep or request are skipped.
+        '''
+        with self.connection.cursor() as cur:
+            cur.execute("""
+                        DELETE FROM refresh_tokens WHERE ctid IN (
+                            SELECT ctid FROM refresh_tokens WHERE expires_on <= now()
+                            LIMIT %s FOR UPDATE SKIP LOCKED
+                        )
+                        """, (batch_size,))
+            deleted = cur.rowcount
+            self.connection.commit()
+            return deleted
+
+    def table_stats(self) -> dict:
+        with self.connection.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                        SELECT COUNT(*) AS rows,
+                               COUNT(*) FILTER (WHERE expires_on <= now()) AS expired,
+                               pg_total_relation_size('refresh_tokens') AS total_bytes
+                        FROM refresh_tokens
+                        """)
+            stats = dict(cur.fetchone())
+            self.connection.commit()
+            return stats
@@ -1,6 +1,5 @@
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordRequestForm
-from passlib.context import CryptContext
 import hashlib
 import jwt
 from jwt.exceptions import PyJWTError
@@ -9,21 +8,22 @@ import os
 from datetime import datetime, timedelta, timezone
 from psycopg2.extras import RealDictCursor
 from auth.repositories.IUserRepository import IUserRepository
+from auth.repositories.refreshTokenRepository import RefreshTokenRepository
 from auth.models.customResponseModel import SessionTokenResponse
 from auth.models.customException import TokenDecodeError
 from auth.models.user import Users, UsersIn
+from auth.hashing import get_password_hasher
 
-from auth.utils import get_connection
 from dotenv import load_dotenv
 
 load_dotenv()
 
-pwd_context = CryptContext(schemes = ["bcrypt"], deprecated = "auto")
-
 class UserRepository(IUserRepository):
 
-    def __init__(self):
-        self.connection = get_connection()
+    def __init__(self, connection):
+        # borrowed from the pool for the current request, see auth.deps
+        self.connection = connection
+        self.refresh_tokens = RefreshTokenRepository(connection)
     
     def create(self, user: UsersIn, password_hash, kennel_id): 
         with self.connection.cursor() as cur:
@@ -52,7 +52,7 @@ class UserRepository(IUserRepository):
 
             if usr is not None:
                 cur.execute(""" UPDATE users SET password_hash = %s WHERE username = %s""",
-                            (pwd_context.hash(user.password), user.email,))
+                            (get_password_hasher().hash(user.password), user.email,))
                 self.connection.commit()
                 return user
             else:
@@ -109,7 +109,7 @@ class UserRepository(IUserRepository):
 
     def is_password_correct(self, form_data: OAuth2PasswordRequestForm = Depends()): 
         user = self.get_user(form_data.username)
-        if user is None or not pwd_context.verify(form_data.password, user.password):
+        if user is None or not get_password_hasher().verify(form_data.password, user.password):
             return False
         return True
 
@@ -139,7 +139,7 @@ class UserRepository(IUserRepository):
         try:
             payload = jwt.decode(token.access_token, os.getenv("SECRET_KEY"), algorithms = os.getenv("ALGORITHM"))
         
-            username = payload.get("sub")
+            user_id = payload.get("user_id")
             if refresh_token is not None:
                 hashed_token = self.hash_token(refresh_token)
             # Note: look at the case where refresh token is None
@@ -147,40 +147,21 @@ class UserRepository(IUserRepository):
             refresh_token_expires = timedelta(days = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS")))
             refresh_token_expiry_date = datetime.now(timezone.utc) + refresh_token_expires
 
-            with self.connection.cursor() as cur:
-                cur.execute("""
-                            INSERT INTO refresh_tokens (user_id, hashed_refresh_token, expires_on) VALUES ((SELECT id FROM users WHERE username = %s), %s, %s)
-                            """, (username, hashed_token, refresh_token_expiry_date,))
-                self.connection.commit()
+            self.refresh_tokens.create(user_id, hashed_token, refresh_token_expiry_date)
         except PyJWTError as decoding_error:
             raise TokenDecodeError("Invalid access token") from decoding_error 
         
     def logout(self, refresh_token:str):
-        with self.connection.cursor() as cur:
-            cur.execute("""
-                        DELETE FROM refresh_tokens WHERE hashed_refresh_token = %s
-                        """, 
-                        (self.hash_token(refresh_token),))
-            self.connection.commit()
+        self.refresh_tokens.delete(self.hash_token(refresh_token))
  
     def delete_all_active_session(self, username: str): pass
 
-    def validate_refresh_token(self, username: str, refresh_token: str):
-        hashed_token = self.hash_token(refresh_token)
-
-        with self.connection.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute("""
-                        SELECT hashed_refresh_token, expires_on FROM refresh_tokens \
-                        WHERE user_id = (SELECT id FROM users WHERE username = %s) AND hashed_refresh_token = %s
-                        """, (username, hashed_token,))
-            hashed_token_db = cur.fetchone()
-            if hashed_token_db is not None:
-                if hashed_token_db["expires_on"].replace(tzinfo=timezone.utc) < datetime.now(timezone.utc):
-                    return False
-                # check that the token corresponds to what is registered in db
-                return hashed_token == hashed_token_db['hashed_refresh_token']
-            else: 
-                return False
+    def validate_refresh_token(self, user_id: int, refresh_token: str) -> bool:
+        # the user_id claim of the access token hits the primary key directly, expired
+        # rows are filtered in the query and purged by the background sweeper
+        if user_id is None:
+            return False
+        return self.refresh_tokens.is_valid(user_id, self.hash_token(refresh_token))
         
     def refresh_access_token(self, token, refresh_token):
         try:
@@ -189,7 +170,7 @@ class UserRepository(IUserRepository):
             username, user_id, kennel_id = payload.get('sub'), payload.get('user_id'), payload.get('kennel_id')
 
             # validate refresh_token
-            if not self.validate_refresh_token(username, refresh_token):
+            if not self.validate_refresh_token(user_id, refresh_token):
                 return None
             
             # generate new access_token
@@ -1,9 +1,26 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from auth.api.userController import user_controller_router
+from auth.utils import create_pool
+from auth.hashing import get_password_hasher, shutdown_password_hasher
+from auth.sweeper import create_sweeper
 import uvicorn
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db_pool = create_pool()
+    app.state.db_pool = db_pool
+    get_password_hasher()
+    sweeper = create_sweeper(db_pool)
+    app.state.refresh_token_sweeper = sweeper
+    sweeper.start()
+    yield  # app runs
+    sweeper.stop()
+    shutdown_password_hasher()
+    db_pool.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow requests from frontend dev server
 origins = [
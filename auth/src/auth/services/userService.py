@@ -4,18 +4,15 @@ from auth.models.user import Users, UsersIn
 from auth.models.customResponseModel import SessionTokenResponse
 from auth.repositories.userRepository import UserRepository
 from auth.repositories.kennelRepository import KennelRepository
-
-
-
-from passlib.context import CryptContext
+from auth.deps import get_user_repository, get_kennel_repository
+from auth.hashing import get_password_hasher
 
 import secrets
 
-pwd_context = CryptContext(schemes = ["bcrypt"], deprecated = "auto")
-
 class UserService():
 
-    def __init__(self, user_repository: UserRepository = Depends(), kennel_repository: KennelRepository = Depends()):
+    def __init__(self, user_repository: UserRepository = Depends(get_user_repository),
+                 kennel_repository: KennelRepository = Depends(get_kennel_repository)):
         self.userRepository = user_repository
         self.kennel_repo = kennel_repository
 
@@ -31,7 +28,7 @@ class UserService():
             # If not found, create it
             kennel_id = self.kennel_repo.create(user.kennel_name)
 
-        password_hash = pwd_context.hash(user.password)
+        password_hash = get_password_hasher().hash(user.password)
 
         #create user
         user_id = self.userRepository.create(user, password_hash, kennel_id)
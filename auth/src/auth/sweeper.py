@@ -0,0 +1,85 @@
+import logging
+import threading
+from datetime import datetime, timezone
+from auth.config import settings
+from auth.repositories.refreshTokenRepository import RefreshTokenRepository
+from auth.utils import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+class RefreshTokenSweeper:
+    """
+    Background thread deleting expired refresh tokens every `interval` seconds.
+
+    Each batch of `batch_size` rows is its own transaction on a connection borrowed
+    from the service pool and returned right after, so a large backlog never holds a
+    connection (or row locks) for long. Several workers may sweep concurrently: rows
+    locked by another sweep are skipped.
+    """
+
+    def __init__(self, pool: ConnectionPool, interval: float = 300.0, batch_size: int = 1000):
+        self.pool = pool
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._sweeps = 0
+        self._deleted = 0
+        self._failures = 0
+        self._last_sweep_at: datetime | None = None
+
+    def sweep(self) -> int:
+        deleted = 0
+        while not self._stop.is_set():
+            with self.pool.connection() as conn:
+                batch = RefreshTokenRepository(conn).delete_expired(self.batch_size)
+            deleted += batch
+            if batch < self.batch_size:
+                break
+        with self._lock:
+            self._sweeps += 1
+            self._deleted += deleted
+            self._last_sweep_at = datetime.now(timezone.utc)
+        return deleted
+
+    def _run(self):
+        # sweep once at startup, then every interval until stopped
+        while True:
+            try:
+                deleted = self.sweep()
+                if deleted:
+                    logger.info("deleted %s expired refresh tokens", deleted)
+            except Exception:
+                with self._lock:
+                    self._failures += 1
+                logger.exception("refresh token sweep failed")
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="refresh-token-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sweeps": self._sweeps,
+                "deleted": self._deleted,
+                "failures": self._failures,
+                "last_sweep_at": self._last_sweep_at,
+            }
+
+def create_sweeper(pool: ConnectionPool) -> RefreshTokenSweeper:
+    return RefreshTokenSweeper(
+        pool,
+        interval=settings.REFRESH_TOKEN_SWEEP_INTERVAL,
+        batch_size=settings.REFRESH_TOKEN_SWEEP_BATCH_SIZE,
+    )
@@ -0,0 +1,80 @@
+import base64
+import os
+import threading
+import time
+from collections import OrderedDict
+import jwt
+from jwt import PyJWK
+from jwt.exceptions import PyJWTError
+from auth.config import settings
+from auth.models.customException import TokenDecodeError
+
+def _prepare_key(secret_key: str, algorithm: str):
+    # a PyJWK carries its parsed key, so jwt.decode does not re-parse it on every call
+    if algorithm.startswith("HS"):
+        k = base64.urlsafe_b64encode(secret_key.encode()).rstrip(b"=").decode()
+        return PyJWK.from_dict({"kty": "oct", "k": k}, algorithm=algorithm)
+    return secret_key
+
+class TokenValidator:
+    """
+    Stateless access token validation for /validate: the key is prepared once and the
+    claims of recently seen tokens are kept in a bounded LRU until the token expires,
+    so repeated validations of the same token skip the signature check.
+    """
+
+    def __init__(self, secret_key: str, algorithm: str, cache_size: int = 1024):
+        self._key = _prepare_key(secret_key, algorithm)
+        self._algorithms = [algorithm]
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def validate(self, token: str) -> dict | None:
+        """
+        Claims forwarded to the API ({sub, user_id, kennel_id}), None when the token does
+        not identify a user. Raises TokenDecodeError for invalid or expired tokens.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(token)
+            if cached is not None:
+                claims, expires_at = cached
+                if expires_at > now:
+                    self._cache.move_to_end(token)
+                    self.hits += 1
+                    return claims
+                del self._cache[token]
+            self.misses += 1
+
+        try:
+            payload = jwt.decode(token, self._key, algorithms=self._algorithms)
+        except PyJWTError as decoding_error:
+            raise TokenDecodeError("Invalid or expired access token") from decoding_error
+
+        if payload.get("sub") is None or payload.get("kennel_id") is None:
+            return None
+        claims = {"sub": payload["sub"], "user_id": payload.get("user_id"), "kennel_id": payload["kennel_id"]}
+
+        # tokens without exp stay valid forever, they are not worth a cache slot
+        if self._cache_size > 0 and "exp" in payload:
+            with self._lock:
+                self._cache[token] = (claims, float(payload["exp"]))
+                self._cache.move_to_end(token)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return claims
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+_token_validator: TokenValidator | None = None
+
+def get_token_validator() -> TokenValidator:
+    global _token_validator
+    if _token_validator is None:
+        _token_validator = TokenValidator(os.getenv("SECRET_KEY"), os.getenv("ALGORITHM"), settings.TOKEN_CACHE_SIZE)
+    return _token_validator
@@ -1,11 +1,71 @@
+import threading
+from contextlib import contextmanager
 import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import ThreadedConnectionPool
 from auth.config import settings
 
-def get_connection():
-    db_url = (
+def _dsn() -> str:
+    return (
         settings.TEST_DATABASE_URL
         if settings.ENV == "test"
         else settings.DATABASE_URL
     )
-    return psycopg2.connect(db_url)
-    
\ No newline at end of file
+
+def get_connection():
+    return psycopg2.connect(_dsn())
+
+class PoolTimeoutError(Exception):
+    pass
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections shared by every request of the service.
+    Checkouts wait up to `timeout` seconds for a free connection instead of opening
+    new ones, so the number of server-side connections never exceeds max_size.
+    """
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 5, timeout: float = 5.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._pool = ThreadedConnectionPool(min_size, max_size, dsn)
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a request. Anything left uncommitted
+        is rolled back before the connection goes back to the pool.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeoutError(f"No database connection available after {self.timeout}s")
+        try:
+            conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        try:
+            yield conn
+        finally:
+            close = bool(conn.closed)
+            if not close and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+            try:
+                self._pool.putconn(conn, close=close)
+            finally:
+                self._slots.release()
+
+    def close(self):
+        self._pool.closeall()
+
+def create_pool() -> ConnectionPool:
+    return ConnectionPool(
+        _dsn(),
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        timeout=settings.DB_POOL_TIMEOUT,
+    )
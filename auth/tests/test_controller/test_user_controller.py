@@ -1,9 +1,16 @@
 import pytest
+import os
+import jwt
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
 from fastapi import HTTPException
 from auth.models.customResponseModel import CustomResponseModel, SessionTokenResponse
-from auth.models.customException import CustomValidationException, TokenDecodeError
+from auth.models.customException import CustomValidationException, TokenDecodeError, PasswordHasherBusyError
 from auth.models.user import Users
 from auth.models.kennel import Kennel
+from auth.config import settings
+from auth.deps import get_refresh_token_repository
+from auth.repositories.refreshTokenRepository import RefreshTokenRepository
 
 def test_get_all_kennels(client, mock_user_service):
     mock_user_service.get_all_kennels.return_value = [Kennel(name = 'test')]
@@ -146,28 +153,56 @@ def test_get_access_token_raises(client, mock_user_service, error, code, detail)
     assert response.status_code == code
     assert detail in response.json()["detail"]
 
-@pytest.mark.parametrize('return_value,code',
-                         [({'sub': 'john@example.com', 'kennel_id':1}, 200),
-                         (None, 404)]
+@pytest.mark.parametrize('route,method,data', [
+    ("/token", "get_access_token", {'username': 'john@example.com', 'password': 'securepassword'}),
+    ("/register", "register", {'email': 'john@example.com', 'password': 'securepassword', 'kennel_name': 'Wolfpack'}),
+    ("/reset-password", "reset_password", {'email': 'john@example.com', 'old_password': 'old', 'new_password': 'new'}),
+])
+def test_password_hasher_busy(client, mock_user_service, route, method, data):
+    getattr(mock_user_service, method).side_effect = PasswordHasherBusyError()
+    response = client.post(route, data=data)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+def make_token(claims: dict, expires_in: timedelta = timedelta(minutes=5)) -> str:
+    claims = {**claims, "exp": datetime.now(timezone.utc) + expires_in}
+    return jwt.encode(claims, os.getenv("SECRET_KEY"), algorithm=os.getenv("ALGORITHM"))
+
+@pytest.mark.parametrize('claims,code',
+                         [({'sub': 'john@example.com', 'user_id': 3, 'kennel_id':1}, 200),
+                         ({'sub': 'john@example.com'}, 404)]
                          )
-def test_validate_token(client, mock_user_service, return_value, code):
-    mock_user_service.authenticate_user.return_value = return_value
-    response = client.post("/validate", json={"token": "jwt_token"})
+def test_validate_token(client, mock_user_service, claims, code):
+    response = client.post("/validate", json={"token": make_token(claims)})
     assert response.status_code == code
     if code == 200:
-        assert response.json().get('sub') == 'john@example.com'
-        assert response.json().get('kennel_id') == 1
+        assert response.json() == {'sub': 'john@example.com', 'user_id': 3, 'kennel_id': 1}
+    # validation never goes through the service (and its database connection)
+    assert mock_user_service.method_calls == []
 
-@pytest.mark.parametrize('error,code,detail',[
-    (TokenDecodeError("Invalid or expired access token"), 401, "Invalid or expired access token"),
-    (Exception("some internal server issue"), 500, "some internal server issue")
+@pytest.mark.parametrize('token',[
+    "jwt_token",
+    make_token({'sub': 'john@example.com', 'kennel_id': 1}, expires_in=timedelta(minutes=-1)),
+    None,
 ])
-def test_validate_token_raises(client, mock_user_service, error, code, detail):
-    mock_user_service.authenticate_user.side_effect = error
-    response = client.post("/validate", json={"token": "jwt_token"})
-    print(response.json()["detail"])
-    assert response.status_code == code
-    assert detail in response.json()["detail"]
+def test_validate_token_raises(client, token):
+    response = client.post("/validate", json={"token": token})
+    assert response.status_code == 401
+    assert "Invalid or expired access token" in response.json()["detail"]
+
+def test_validate_token_batch(client):
+    valid = make_token({'sub': 'john@example.com', 'user_id': 3, 'kennel_id': 1})
+    response = client.post("/validate/batch", json={"tokens": [valid, "jwt_token", make_token({'sub': 'john@example.com'}), valid]})
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["valid"] for r in results] == [True, False, False, True]
+    assert results[0]["claims"] == results[3]["claims"] == {'sub': 'john@example.com', 'user_id': 3, 'kennel_id': 1}
+    assert results[1]["error"] == "Invalid or expired access token"
+    assert results[2]["error"] == "User not found in token"
+
+def test_validate_token_batch_too_large(client):
+    response = client.post("/validate/batch", json={"tokens": ["jwt_token"] * (settings.TOKEN_VALIDATE_BATCH_MAX + 1)})
+    assert response.status_code == 422
 
 def test_refresh_token(client, mock_user_service):
     client.cookies.set("refresh_token", 'my_refresh_token')
@@ -208,4 +243,19 @@ def test_logout(client, mock_user_service):
 def test_lougout_no_cookies(client, mock_user_service):
     response = client.post("/logout")
     assert response.status_code ==200
-    assert response.json()["message"] == 'Logged out successfully'
\ No newline at end of file
+    assert response.json()["message"] == 'Logged out successfully'
+
+def test_refresh_token_stats(client, test_app):
+    refresh_tokens = MagicMock(spec=RefreshTokenRepository)
+    refresh_tokens.table_stats.return_value = {"rows": 3, "expired": 1, "total_bytes": 16384}
+    test_app.dependency_overrides[get_refresh_token_repository] = lambda: refresh_tokens
+    sweeper = MagicMock()
+    sweeper.stats.return_value = {"sweeps": 2, "deleted": 5, "failures": 0, "last_sweep_at": None}
+    test_app.state.refresh_token_sweeper = sweeper
+
+    response = client.get("/refresh-tokens/stats")
+    assert response.status_code == 200
+    assert response.json() == {
+        "table": {"rows": 3, "expired": 1, "total_bytes": 16384},
+        "sweeper": {"sweeps": 2, "deleted": 5, "failures": 0, "last_sweep_at": None},
+    }
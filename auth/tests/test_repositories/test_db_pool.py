@@ -0,0 +1,65 @@
+import pytest
+import os
+import time
+import jwt
+from datetime import datetime, timedelta, timezone
+from psycopg2 import extensions
+from fastapi.testclient import TestClient
+from auth.server import app
+from auth.config import settings
+from auth.utils import ConnectionPool, PoolTimeoutError, _dsn
+
+def server_connections(conn) -> int:
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM pg_stat_activity WHERE datname = current_database()")
+        count = cur.fetchone()[0]
+    conn.commit()
+    return count
+
+@pytest.fixture
+def small_pool():
+    pool = ConnectionPool(_dsn(), min_size=1, max_size=1, timeout=0.2)
+    yield pool
+    pool.close()
+
+def test_checkout_waits_then_times_out(small_pool):
+    with small_pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with small_pool.connection():
+                pass
+
+    with small_pool.connection() as conn:
+        assert not conn.closed
+
+def test_uncommitted_transaction_is_rolled_back(small_pool):
+    with small_pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        assert conn.get_transaction_status() == extensions.TRANSACTION_STATUS_INTRANS
+
+    assert conn.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE
+
+def test_validate_does_not_leak_connections(test_db_conn):
+    token = jwt.encode(
+        {"sub": "john@domain.com", "user_id": 1, "kennel_id": 1, "exp": datetime.now(timezone.utc) + timedelta(minutes=5)},
+        os.getenv("SECRET_KEY"), algorithm=os.getenv("ALGORITHM"),
+    )
+    before = server_connections(test_db_conn)
+
+    # entering the client runs the lifespan, which opens the pool
+    with TestClient(app) as client:
+        for _ in range(100):
+            response = client.post("/auth/validate", json={"token": token})
+            assert response.status_code == 200
+            # /validate no longer touches the database, the kennel list still borrows a connection
+            assert client.get("/auth/kennels").status_code == 200
+        during = server_connections(test_db_conn)
+
+    assert during - before <= settings.DB_POOL_MAX_SIZE
+
+    # backends exit asynchronously once the pool closes its connections
+    for _ in range(50):
+        if server_connections(test_db_conn) <= before:
+            break
+        time.sleep(0.05)
+    assert server_connections(test_db_conn) <= before
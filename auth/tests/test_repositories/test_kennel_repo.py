@@ -3,8 +3,8 @@ from auth.models.kennel import Kennel
 from auth.repositories.kennelRepository import KennelRepository
 
 @pytest.fixture
-def kennel_repo():
-    return KennelRepository()
+def kennel_repo(test_db_conn):
+    return KennelRepository(test_db_conn)
 
 def test_get_all(kennel_repo):
     kennel_list = kennel_repo.get_all()
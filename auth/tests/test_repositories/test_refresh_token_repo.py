@@ -0,0 +1,91 @@
+import pytest
+import secrets
+from datetime import datetime, timedelta, timezone
+from auth.repositories.refreshTokenRepository import RefreshTokenRepository
+from auth.sweeper import RefreshTokenSweeper
+from auth.utils import ConnectionPool, _dsn
+
+@pytest.fixture()
+def refresh_token_repo(test_db_conn):
+    return RefreshTokenRepository(test_db_conn)
+
+@pytest.fixture(autouse=True)
+def cleanup_refresh_tokens(test_db_conn):
+    yield
+    with test_db_conn.cursor() as cur:
+        cur.execute("DELETE FROM refresh_tokens")
+    test_db_conn.commit()
+
+def insert_tokens(test_db_conn, expires_in: list[timedelta]) -> list[str]:
+    # spread over both test users, the session limit trigger keeps 3 per user
+    hashes = [secrets.token_hex(32) for _ in expires_in]
+    now = datetime.now(timezone.utc)
+    with test_db_conn.cursor() as cur:
+        cur.executemany(
+            "INSERT INTO refresh_tokens (user_id, hashed_refresh_token, expires_on) VALUES (%s, %s, %s)",
+            [(i % 2 + 1, hashed, now + delta) for i, (hashed, delta) in enumerate(zip(hashes, expires_in))],
+        )
+    test_db_conn.commit()
+    return hashes
+
+def test_create_and_validate(refresh_token_repo):
+    refresh_token_repo.create(1, "hashed", datetime.now(timezone.utc) + timedelta(days=1))
+    assert refresh_token_repo.is_valid(1, "hashed")
+    assert not refresh_token_repo.is_valid(2, "hashed")
+
+    refresh_token_repo.delete("hashed")
+    assert not refresh_token_repo.is_valid(1, "hashed")
+
+def test_session_limit_keeps_latest_three(refresh_token_repo):
+    now = datetime.now(timezone.utc)
+    for days in [3, 1, 4, 2]:
+        refresh_token_repo.create(1, f"session{days}", now + timedelta(days=days))
+
+    with refresh_token_repo.connection.cursor() as cur:
+        cur.execute("SELECT hashed_refresh_token FROM refresh_tokens WHERE user_id = 1 ORDER BY expires_on")
+        assert [row[0] for row in cur.fetchall()] == ["session2", "session3", "session4"]
+
+def test_delete_expired_in_batches(test_db_conn, refresh_token_repo):
+    expired, live = timedelta(days=-1), timedelta(days=1)
+    insert_tokens(test_db_conn, [expired, expired, expired, live])
+
+    assert refresh_token_repo.delete_expired(2) == 2
+    assert refresh_token_repo.delete_expired(2) == 1
+    assert refresh_token_repo.delete_expired(2) == 0
+
+    stats = refresh_token_repo.table_stats()
+    assert stats["rows"] == 1
+    assert stats["expired"] == 0
+    assert stats["total_bytes"] > 0
+
+def test_sweeper_deletes_every_expired_token(test_db_conn, refresh_token_repo):
+    expired, live = timedelta(minutes=-5), timedelta(days=1)
+    insert_tokens(test_db_conn, [expired, expired, expired, live, live])
+
+    pool = ConnectionPool(_dsn(), min_size=1, max_size=1)
+    try:
+        sweeper = RefreshTokenSweeper(pool, interval=60, batch_size=2)
+        assert sweeper.sweep() == 3
+        assert sweeper.sweep() == 0
+    finally:
+        pool.close()
+
+    assert refresh_token_repo.table_stats()["rows"] == 2
+    stats = sweeper.stats()
+    assert stats["sweeps"] == 2
+    assert stats["deleted"] == 3
+    assert stats["last_sweep_at"] is not None
+
+def test_sweeper_thread_stops(test_db_conn):
+    insert_tokens(test_db_conn, [timedelta(days=-1)])
+
+    pool = ConnectionPool(_dsn(), min_size=1, max_size=1)
+    try:
+        sweeper = RefreshTokenSweeper(pool, interval=60, batch_size=10)
+        sweeper.start()
+        # the first sweep runs right away, stop() must not wait for the next one
+        sweeper.stop()
+    finally:
+        pool.close()
+
+    assert sweeper.stats()["sweeps"] == 1
@@ -16,8 +16,8 @@ from auth.models.customException import TokenDecodeError
 pwd_context = CryptContext(schemes = ["bcrypt"], deprecated = "auto")
 
 @pytest.fixture()
-def user_repo():
-    return UserRepository()
+def user_repo(test_db_conn):
+    return UserRepository(test_db_conn)
 
 @pytest.fixture()
 def test_user():
@@ -205,7 +205,7 @@ def test_authenticate_user_expired_token(user_repo):
 def test_register_token_in_session(user_repo):
     user = 'john@domain.com'
     token = user_repo.create_access_token(
-        data={'sub': 'john@domain.com', 'kennel_id': 1, 'user_id':2},
+        data={'sub': 'john@domain.com', 'kennel_id': 1, 'user_id':1},
         expires_delta=timedelta(minutes=60)
     )
     refresh_token = user_repo.generate_refresh_token()
@@ -240,13 +240,13 @@ def test_logout(user_repo, insert_valid_refresh_token):
     
 
 def test_validate_refresh_token(user_repo, insert_valid_refresh_token):
-    valid_token = user_repo.validate_refresh_token('john@domain.com', insert_valid_refresh_token)
+    valid_token = user_repo.validate_refresh_token(1, insert_valid_refresh_token)
     assert valid_token == True
 
 
 def test_validate_refresh_token_wrong_token(user_repo, insert_valid_refresh_token):
     # pass in the wrong refresh token
-    valid_token = user_repo.validate_refresh_token('john@domain.com', 'wrong_fake_refresh_token')
+    valid_token = user_repo.validate_refresh_token(1, 'wrong_fake_refresh_token')
     assert valid_token == False
 
 def test_validate_refresh_token_expired(user_repo, insert_valid_refresh_token):
@@ -257,11 +257,16 @@ def test_validate_refresh_token_expired(user_repo, insert_valid_refresh_token):
                     (datetime.now(timezone.utc) - timedelta(days = 1), hashed,)
                     )
     
-    valid_token = user_repo.validate_refresh_token('john@domain.com', insert_valid_refresh_token)
+    valid_token = user_repo.validate_refresh_token(1, insert_valid_refresh_token)
     assert valid_token == False
 
+def test_validate_refresh_token_other_user(user_repo, insert_valid_refresh_token):
+    # the token belongs to user 1, the user_id claim is the lookup key
+    assert user_repo.validate_refresh_token(2, insert_valid_refresh_token) == False
+    assert user_repo.validate_refresh_token(None, insert_valid_refresh_token) == False
+
 def test_refresh_access_token(user_repo, insert_valid_refresh_token):
-    data = {'sub': 'john@domain.com', 'kennel_id': 1}
+    data = {'sub': 'john@domain.com', 'kennel_id': 1, 'user_id': 1}
     token = user_repo.create_access_token(data, timedelta(minutes=60))
     assert token is not None
     new_access_token = user_repo.refresh_access_token(token.access_token, insert_valid_refresh_token)
@@ -271,14 +276,14 @@ def test_refresh_access_token(user_repo, insert_valid_refresh_token):
     assert payload.get('kennel_id') == 1
 
 def test_refresh_token_invalid(user_repo, insert_valid_refresh_token):
-    data = {'sub': 'john@domain.com', 'kennel_id': 1}
+    data = {'sub': 'john@domain.com', 'kennel_id': 1, 'user_id': 1}
     token = user_repo.create_access_token(data, timedelta(minutes=60))
     assert token is not None
     new_access_token = user_repo.refresh_access_token(token.access_token, 'bad_token')
     assert new_access_token is None
 
 def test_refresh_token_with_expired_jwt(user_repo, insert_valid_refresh_token):
-    data = {'sub': 'john@domain.com', 'kennel_id': 1, 'user_id':2}
+    data = {'sub': 'john@domain.com', 'kennel_id': 1, 'user_id':1}
     expires_delta = timedelta(minutes = 10)
     expire = datetime.now(timezone.utc) - expires_delta
     data.update({'exp': expire})
@@ -288,7 +293,7 @@ def test_refresh_token_with_expired_jwt(user_repo, insert_valid_refresh_token):
     payload = jwt.decode(new_access_token.access_token, os.getenv("SECRET_KEY"), algorithms = os.getenv("ALGORITHM"))
     assert payload.get('sub') == 'john@domain.com'
     assert payload.get('kennel_id') == 1
-    assert payload.get('user_id') == 2
+    assert payload.get('user_id') == 1
 
 
 def test_decode_token_raises_token_decode_error_in_refresh_access_token(user_repo):
@@ -0,0 +1,36 @@
+import pytest
+import threading
+import time
+from auth.hashing import PasswordHasher
+from auth.models.customException import PasswordHasherBusyError
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, queue_depth=0)
+    yield hasher
+    hasher.shutdown()
+
+def test_hash_and_verify_in_worker_process(hasher):
+    password_hash = hasher.hash("securepassword")
+    assert password_hash.startswith("$2b$")
+    assert hasher.verify("securepassword", password_hash)
+    assert not hasher.verify("wrongpassword", password_hash)
+    assert hasher.stats()["in_flight"] == 0
+
+def test_inline_hasher():
+    hasher = PasswordHasher(workers=0)
+    assert hasher.verify("securepassword", hasher.hash("securepassword"))
+
+def test_rejects_when_workers_and_queue_are_full(hasher):
+    # occupy the only slot with a slow job
+    busy = threading.Thread(target=hasher._run, args=(time.sleep, 1.0))
+    busy.start()
+    while hasher.stats()["in_flight"] == 0:
+        time.sleep(0.01)
+
+    with pytest.raises(PasswordHasherBusyError):
+        hasher.verify("securepassword", "$2b$12$invalidinvalidinvalidinvalidinvalidinvalidinvalidinva")
+    assert hasher.stats()["rejected"] == 1
+
+    busy.join()
+    assert hasher.stats()["in_flight"] == 0
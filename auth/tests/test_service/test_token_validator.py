@@ -0,0 +1,47 @@
+import pytest
+import jwt
+from datetime import datetime, timedelta, timezone
+from auth.tokens import TokenValidator
+from auth.models.customException import TokenDecodeError
+
+SECRET = "testsecret_testsecret_testsecret_00"
+
+def make_token(claims: dict, expires_in: timedelta = timedelta(minutes=5), secret: str = SECRET) -> str:
+    return jwt.encode({**claims, "exp": datetime.now(timezone.utc) + expires_in}, secret, algorithm="HS256")
+
+@pytest.fixture
+def validator():
+    return TokenValidator(SECRET, "HS256", cache_size=2)
+
+def test_claims_are_cached_until_expiry(validator):
+    token = make_token({"sub": "john@example.com", "user_id": 3, "kennel_id": 1})
+    assert validator.validate(token) == {"sub": "john@example.com", "user_id": 3, "kennel_id": 1}
+    assert validator.validate(token) == {"sub": "john@example.com", "user_id": 3, "kennel_id": 1}
+    assert validator.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+def test_expired_cached_claims_are_not_served(validator):
+    token = make_token({"sub": "john@example.com", "kennel_id": 1}, expires_in=timedelta(seconds=-1))
+    # leeway-free decode rejects it, and nothing stale is in the cache to return instead
+    with pytest.raises(TokenDecodeError):
+        validator.validate(token)
+    assert validator.stats()["size"] == 0
+
+def test_cache_is_bounded(validator):
+    tokens = [make_token({"sub": f"user{i}@example.com", "kennel_id": 1}) for i in range(3)]
+    for token in tokens:
+        validator.validate(token)
+    assert validator.stats()["size"] == 2
+    validator.validate(tokens[0])
+    assert validator.stats()["hits"] == 0
+
+@pytest.mark.parametrize("token", [
+    make_token({"sub": "john@example.com", "kennel_id": 1}, secret="another_secret_another_secret_0000"),
+    "not a jwt",
+    None,
+])
+def test_invalid_tokens(validator, token):
+    with pytest.raises(TokenDecodeError):
+        validator.validate(token)
+
+def test_token_without_user(validator):
+    assert validator.validate(make_token({"sub": "john@example.com"})) is None
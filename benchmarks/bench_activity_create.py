@@ -0,0 +1,101 @@
+"""
+Latency of activity_repository.create versus the number of laps in the workout.
+
+Compares the previous implementation (one INSERT for the activity, then one per dog,
+per lap and for the weather) with ACTIVITY_INSERT_QUERY (the whole activity written
+in a single statement through data-modifying CTEs). Everything is written inside a
+transaction that is rolled back at the end, so this can be pointed at the test database:
+
+    ENV=test TEST_DATABASE_URL=... python -m benchmarks.bench_activity_create
+
+Use --latency-ms to add an artificial client/server round-trip delay, the gap between
+the two grows with it since the legacy path pays one round-trip per child row.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from psycopg2.extras import RealDictCursor
+from src.utils.db import get_connection
+from src.repositories.activity_repository import ACTIVITY_INSERT_QUERY, activity_insert_params
+from src.models.activity import ActivityCreate, ActivityDogsCreate, ActivityLaps
+from src.models.weather import Weather
+from benchmarks.bench_activity_listing import seed_kennel, time_call
+
+def legacy_create(cur, activity: ActivityCreate, delay: float) -> int:
+    def execute(query, values):
+        time.sleep(delay)
+        cur.execute(query, values)
+
+    execute("""
+        INSERT INTO activities (runner_id, sport_id, timestamp, location_id, workout, speed, distance, kennel_id)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, (SELECT kennel_id FROM runners WHERE id = %s))
+        RETURNING id
+        """, (activity.runner_id, activity.sport_id, activity.timestamp, activity.location_id,
+              activity.workout, activity.speed, activity.distance, activity.runner_id))
+    activity_id = cur.fetchone()["id"]
+    for dog in activity.dogs:
+        execute("INSERT INTO activity_dogs (activity_id, dog_id, rating) VALUES (%s, %s, %s)",
+                (activity_id, dog.dog_id, dog.rating))
+    for lap in activity.laps:
+        execute("""
+            INSERT INTO workout_laps (activity_id, lap_number, lap_time, lap_distance, speed)
+            VALUES (%s, %s, %s, %s, %s)
+            """, (activity_id, lap.lap_number, lap.lap_time_delta, lap.lap_distance, lap.speed))
+    if activity.weather is not None:
+        execute("INSERT INTO weather_entries (activity_id, temperature, humidity, condition) VALUES (%s, %s, %s, %s)",
+                (activity_id, activity.weather.temperature, activity.weather.humidity, activity.weather.condition))
+    return activity_id
+
+def batched_create(cur, activity: ActivityCreate, delay: float) -> int:
+    time.sleep(delay)
+    cur.execute(ACTIVITY_INSERT_QUERY, activity_insert_params(activity))
+    return cur.fetchone()["id"]
+
+def build_activity(cur, kennel_id: int, laps: int) -> ActivityCreate:
+    cur.execute("SELECT id FROM runners WHERE kennel_id = %s LIMIT 1", (kennel_id,))
+    runner_id = cur.fetchone()["id"]
+    cur.execute("SELECT id FROM activity_locations WHERE kennel_id = %s LIMIT 1", (kennel_id,))
+    location_id = cur.fetchone()["id"]
+    cur.execute("SELECT id FROM dogs WHERE kennel_id = %s", (kennel_id,))
+    dog_ids = [row["id"] for row in cur.fetchall()]
+    cur.execute("SELECT id FROM sports ORDER BY id LIMIT 1")
+    sport_id = cur.fetchone()["id"]
+
+    return ActivityCreate(
+        timestamp=datetime.now(timezone.utc),
+        runner_id=runner_id,
+        sport_id=sport_id,
+        location_id=location_id,
+        distance=float(laps),
+        workout=True,
+        speed=20.0,
+        dogs=[ActivityDogsCreate(dog_id=dog_id, rating=8) for dog_id in dog_ids],
+        laps=[ActivityLaps(lap_number=n + 1, lap_distance=1.0, lap_time_delta=timedelta(minutes=3)) for n in range(laps)],
+        weather=Weather(temperature=10.0, humidity=0.5, condition="Sunny"),
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--laps", type=int, nargs="+", default=[1, 5, 10, 20, 50])
+    parser.add_argument("--dogs", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    delay = args.latency_ms / 1000
+
+    conn = get_connection()
+    print(f"{'laps':>5} {'legacy':>10} {'batched':>10} {'speedup':>8}  (median ms, {args.dogs} dogs)")
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            kennel_id = seed_kennel(cur, activities=0, laps=0, comments=0, dogs=args.dogs)
+            for laps in args.laps:
+                activity = build_activity(cur, kennel_id, laps)
+                legacy = time_call(lambda: legacy_create(cur, activity, delay), args.repeat)
+                batched = time_call(lambda: batched_create(cur, activity, delay), args.repeat)
+                print(f"{laps:>5} {legacy:>10.2f} {batched:>10.2f} {legacy / batched:>7.1f}x")
+    finally:
+        conn.rollback()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Latency of the activity listing query versus laps per activity and comments per activity.
+
+Compares the previous single-statement query (every child table joined before GROUP BY)
+with activity_repository.get_all (page of ids first, then LATERAL hydration).
+Seed data is written inside a transaction that is rolled back at the end, so this
+can be pointed at the test database:
+
+    ENV=test TEST_DATABASE_URL=... python -m benchmarks.bench_activity_listing
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from psycopg2.extras import RealDictCursor, execute_values
+from src.utils.db import get_connection
+from src.repositories.activity_repository import activity_repository
+from src.models.common import ActivityQueryFilters
+
+LEGACY_LIST_QUERY = """
+    SELECT
+        a.*,
+        r.name AS runner_name, r.id AS runner_id,
+        s.name AS sport_name, k.name AS kennel_name, s.type AS sport_type, k.id as kennel_id,
+        w.temperature, w.humidity, w.condition,
+        l.name AS location,
+        COUNT(ac.id) as comment_count,
+        json_agg(DISTINCT jsonb_build_object(
+            'id', d.id, 'name', d.name, 'breed', d.breed,
+            'date_of_birth', d.date_of_birth, 'rating', ad.rating
+        )) FILTER (WHERE d.id IS NOT NULL) AS dogs,
+        json_agg(DISTINCT jsonb_build_object(
+            'lap_number', wl.lap_number, 'speed', wl.speed,
+            'lap_time', wl.lap_time, 'lap_distance', wl.lap_distance
+        )) FILTER (WHERE wl.id IS NOT NULL) AS laps
+    FROM activities a
+    JOIN runners r ON a.runner_id = r.id
+    JOIN sports s ON a.sport_id = s.id
+    JOIN kennels k ON r.kennel_id = k.id
+    LEFT JOIN activity_dogs ad ON a.id = ad.activity_id
+    LEFT JOIN dogs d ON ad.dog_id = d.id
+    LEFT JOIN workout_laps wl ON wl.activity_id = a.id
+    LEFT JOIN weather_entries w ON w.activity_id = a.id
+    LEFT JOIN activity_comments ac ON ac.activity_id = a.id
+    LEFT JOIN activity_locations l ON a.location_id = l.id
+    WHERE r.kennel_id = %s
+    GROUP BY
+        a.id, a.runner_id, a.sport_id, a.timestamp, a.location_id,
+        a.workout, a.speed, a.distance,
+        r.name, r.id, s.name, s.type, k.name, k.id,
+        w.temperature, w.humidity, w.condition, l.name
+    ORDER BY a.timestamp DESC
+    LIMIT %s OFFSET %s;
+"""
+
+def seed_kennel(cur, activities: int, laps: int, comments: int, dogs: int = 3) -> int:
+    stamp = datetime.now(timezone.utc).strftime("%H%M%S%f")
+    cur.execute("INSERT INTO kennels (name) VALUES (%s) RETURNING id", (f"bench-{stamp}-{laps}-{comments}",))
+    kennel_id = cur.fetchone()["id"]
+    cur.execute("INSERT INTO runners (name, kennel_id) VALUES ('bench runner', %s) RETURNING id", (kennel_id,))
+    runner_id = cur.fetchone()["id"]
+    cur.execute("INSERT INTO users (username, password_hash, kennel_id) VALUES (%s, 'x', %s) RETURNING id",
+                (f"bench-{kennel_id}@bench.local", kennel_id))
+    user_id = cur.fetchone()["id"]
+    cur.execute("INSERT INTO activity_locations (name, kennel_id) VALUES ('bench loop', %s) RETURNING id", (kennel_id,))
+    location_id = cur.fetchone()["id"]
+    cur.execute("SELECT id FROM sports ORDER BY id LIMIT 1")
+    sport_id = cur.fetchone()["id"]
+
+    dog_ids = []
+    for i in range(dogs):
+        cur.execute("INSERT INTO dogs (name, date_of_birth, breed, kennel_id) VALUES (%s, '2020-01-01', 'Husky', %s) RETURNING id",
+                    (f"dog {i}", kennel_id))
+        dog_ids.append(cur.fetchone()["id"])
+
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    rows = execute_values(cur, """
+        INSERT INTO activities (runner_id, kennel_id, sport_id, timestamp, location_id, workout, speed, distance)
+        VALUES %s RETURNING id
+        """,
+        [(runner_id, kennel_id, sport_id, start + timedelta(hours=12 * i), location_id, laps > 0, 15.0, 5.0) for i in range(activities)],
+        fetch=True, page_size=1000)
+    activity_ids = [row["id"] for row in rows]
+
+    execute_values(cur, "INSERT INTO activity_dogs (activity_id, dog_id, rating) VALUES %s",
+                   [(a, d, 7) for a in activity_ids for d in dog_ids], page_size=5000)
+    execute_values(cur, "INSERT INTO weather_entries (activity_id, temperature, humidity, condition) VALUES %s",
+                   [(a, 10.0, 0.5, "Sunny") for a in activity_ids], page_size=5000)
+    if laps:
+        execute_values(cur, "INSERT INTO workout_laps (activity_id, lap_number, lap_time, lap_distance, speed) VALUES %s",
+                       [(a, n + 1, timedelta(minutes=3), 1.0, 20.0) for a in activity_ids for n in range(laps)],
+                       page_size=5000)
+    if comments:
+        execute_values(cur, "INSERT INTO activity_comments (activity_id, user_id, comment) VALUES %s",
+                       [(a, user_id, "nice run") for a in activity_ids for _ in range(comments)], page_size=5000)
+    return kennel_id
+
+def time_call(fn, repeat: int) -> float:
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activities", type=int, default=500)
+    parser.add_argument("--laps", type=int, nargs="+", default=[0, 5, 20, 50])
+    parser.add_argument("--comments", type=int, nargs="+", default=[0, 5, 20])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    repo = activity_repository(conn)
+    filters = ActivityQueryFilters()
+    deep_offset = max(args.activities - args.limit, 0)
+
+    print(f"{'laps':>5} {'comments':>9} {'legacy p1':>10} {'legacy deep':>12} {'two-phase p1':>13} {'two-phase deep':>15}  (median ms)")
+    try:
+        for laps in args.laps:
+            for comments in args.comments:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    kennel_id = seed_kennel(cur, args.activities, laps, comments)
+                    cur.execute("ANALYZE")
+
+                    def legacy(offset):
+                        cur.execute(LEGACY_LIST_QUERY, (kennel_id, args.limit, offset))
+                        cur.fetchall()
+
+                    results = [
+                        time_call(lambda: legacy(0), args.repeat),
+                        time_call(lambda: legacy(deep_offset), args.repeat),
+                        time_call(lambda: repo.get_all(kennel_id, filters, args.limit, 0), args.repeat),
+                        time_call(lambda: repo.get_all(kennel_id, filters, args.limit, deep_offset), args.repeat),
+                    ]
+                print(f"{laps:>5} {comments:>9} {results[0]:>10.2f} {results[1]:>12.2f} {results[2]:>13.2f} {results[3]:>15.2f}")
+    finally:
+        conn.rollback()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Throughput and latency of the activity listing served by one worker, sync versus async.
+
+"sync" is the previous setup: a `def` route on FastAPI's threadpool borrowing a psycopg2
+connection from ConnectionPool. "async" is the current one: an `async def` route awaiting
+async_activity_repository on the psycopg 3 pool. Both pools get --pool-size connections
+and requests are sent in-process through httpx's ASGI transport, --concurrency at a time.
+
+--latency-ms adds a pg_sleep to every request to stand in for a slower query or a remote
+database: the sync route holds a thread for that long, the async one only a coroutine.
+Only reads, so it can be pointed at the test database:
+
+    ENV=test TEST_DATABASE_URL=... python -m benchmarks.bench_async_api
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import anyio.to_thread
+import httpx
+from fastapi import FastAPI, HTTPException
+from src.config import settings
+from src.models.common import ActivityQueryFilters
+from src.repositories.activity_repository import activity_repository
+from src.repositories.async_activity_repository import async_activity_repository
+from src.utils.async_db_pool import AsyncConnectionPool, PoolTimeout, create_async_pool
+from src.utils.db_pool import ConnectionPool, PoolTimeoutError, create_pool
+
+def sync_app(pool: ConnectionPool, kennel_id: int, latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/activities")
+    def list_activities():
+        try:
+            with pool.connection() as conn:
+                if latency:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT pg_sleep(%s)", (latency,))
+                activities, total = activity_repository(conn).get_all_with_count(kennel_id, ActivityQueryFilters(), 10, 0)
+        except PoolTimeoutError:
+            raise HTTPException(status_code=503, detail="Database busy, try again later")
+        return {"data": activities, "total_count": total}
+
+    return app
+
+def async_app(pool: AsyncConnectionPool, kennel_id: int, latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/activities")
+    async def list_activities():
+        try:
+            async with pool.connection() as conn:
+                if latency:
+                    await conn.execute("SELECT pg_sleep(%s)", (latency,))
+                activities, total = await async_activity_repository(conn).get_all_with_count(kennel_id, ActivityQueryFilters(), 10, 0)
+        except PoolTimeout:
+            raise HTTPException(status_code=503, detail="Database busy, try again later")
+        return {"data": activities, "total_count": total}
+
+    return app
+
+async def load(app: FastAPI, requests: int, concurrency: int) -> dict:
+    samples, failures = [], 0
+    queue = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            nonlocal failures
+            for _ in queue:
+                start = time.perf_counter()
+                response = await client.get("/activities")
+                samples.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(samples, n=100)
+    return {
+        "rps": requests / elapsed,
+        "p50": quantiles[49],
+        "p95": quantiles[94],
+        "p99": quantiles[98],
+        "failures": failures,
+    }
+
+async def run(args) -> None:
+    settings.DB_POOL_MIN_SIZE = settings.DB_POOL_MAX_SIZE = settings.DB_ASYNC_POOL_MAX_SIZE = args.pool_size
+    settings.DB_POOL_TIMEOUT = args.pool_timeout
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+    latency = args.latency_ms / 1000
+
+    sync_pool = create_pool()
+    async_pool = create_async_pool()
+    await async_pool.open(wait=True)
+    apps = {
+        "sync": sync_app(sync_pool, args.kennel_id, latency),
+        "async": async_app(async_pool, args.kennel_id, latency),
+    }
+
+    print(f"pool size {args.pool_size}, threadpool {args.threads}, added latency {args.latency_ms} ms")
+    print(f"{'mode':>6} {'concurrency':>12} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'failed':>7}")
+    try:
+        for concurrency in args.concurrency:
+            for mode, app in apps.items():
+                await load(app, concurrency, concurrency)  # warm up
+                r = await load(app, args.requests, concurrency)
+                print(f"{mode:>6} {concurrency:>12} {r['rps']:>8.0f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} {r['failures']:>7}")
+    finally:
+        await async_pool.close()
+        sync_pool.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kennel-id", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--pool-size", type=int, default=20)
+    parser.add_argument("--pool-timeout", type=float, default=30.0)
+    parser.add_argument("--threads", type=int, default=40, help="FastAPI threadpool size (anyio's default is 40)")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
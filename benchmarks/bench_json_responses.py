@@ -0,0 +1,123 @@
+"""
+Cost of answering the list routes: models returned to FastAPI, validated again against
+the route's response_model and encoded by JSONResponse, versus models encoded once by
+ModelJSONResponse, versus (dogs, runners, locations) the JSON array built by Postgres
+and sent as is with RawJSONResponse.
+
+Each variant is timed from the repository call (or from the models, for the ones that
+have to be computed in Python anyway) to the response body, median of --repeat runs.
+The bodies are checked to hold the same JSON. Runs against a synthetic kennel written
+inside a transaction that is rolled back at the end:
+
+    ENV=test TEST_DATABASE_URL=... python -m benchmarks.bench_json_responses
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from itertools import islice
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from psycopg2.extras import RealDictCursor
+from src.models.common import ActivityQueryFilters, WeightQueryFilter
+from src.models.dog import Dog
+from src.models.dog_weight import DogWeightEntry
+from src.models.location import Location
+from src.models.runner import Runner
+from src.repositories.activity_repository import activity_repository
+from src.repositories.dog_repository import dog_repository
+from src.repositories.location_repository import location_repository
+from src.repositories.runner_repository import runner_repository
+from src.repositories.weight_repository import weight_repository
+from src.utils.db import get_connection
+from src.utils.json_response import ModelJSONResponse, RawJSONResponse
+from .synthetic_data import seed_synthetic_kennel
+
+_loop = asyncio.new_event_loop()
+
+def response_model(annotation):
+    """What FastAPI does with a route's return value: validate, dump, then JSONResponse."""
+    field = create_model_field("Response", annotation, mode="serialization")  # built once per route
+    return lambda content: JSONResponse(_loop.run_until_complete(serialize_response(field=field, response_content=content))).body
+
+def timed(build, repeat: int) -> tuple[float, bytes]:
+    """Median ms of build() and the last body."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = build()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    # seed 1 has a dog born on February 29th, whose age Dog.calculate_dog_age can't compute
+    parser.add_argument("--seed", type=int, default=2)
+    parser.add_argument("--dogs", type=int, default=60)
+    parser.add_argument("--runners", type=int, default=20)
+    parser.add_argument("--locations", type=int, default=200)
+    parser.add_argument("--years", type=float, default=6)
+    parser.add_argument("--activities", type=int, default=1000, help="activities in the listed page")
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            kennel = seed_synthetic_kennel(cur, seed=args.seed, dogs=args.dogs, runners=args.runners, locations=args.locations, years=args.years)
+        kennel_id = kennel.kennel_id
+        dogs, runners = dog_repository(conn), runner_repository(conn)
+        locations, weights = location_repository(conn), weight_repository(conn)
+        activities = list(islice(activity_repository(conn).iter_all(kennel_id, ActivityQueryFilters()), args.activities))
+        page = {"total_count": None, "limit": len(activities), "offset": 0, "next": None, "previous": None, "data": activities}
+
+        dog_list, runner_list = response_model(list[Dog]), response_model(list[Runner])
+        location_list, weight_list = response_model(list[Location]), response_model(list[DogWeightEntry])
+        activity_page = response_model(dict)
+        routes = {
+            "/dogs": {
+                "response_model": lambda: dog_list(dogs.get_all(kennel_id)),
+                "ModelJSONResponse": lambda: ModelJSONResponse(dogs.get_all(kennel_id)).body,
+                "Postgres JSON": lambda: RawJSONResponse(dogs.get_all_json(kennel_id)).body,
+            },
+            "/runners": {
+                "response_model": lambda: runner_list(runners.get_all(kennel_id)),
+                "ModelJSONResponse": lambda: ModelJSONResponse(runners.get_all(kennel_id)).body,
+                "Postgres JSON": lambda: RawJSONResponse(runners.get_all_json(kennel_id)).body,
+            },
+            "/locations": {
+                "response_model": lambda: location_list(locations.get_all(kennel_id)),
+                "ModelJSONResponse": lambda: ModelJSONResponse(locations.get_all(kennel_id)).body,
+                "Postgres JSON": lambda: RawJSONResponse(locations.get_all_json(kennel_id)).body,
+            },
+            "/dogs/weights": {
+                "response_model": lambda: weight_list(weights.get_all(kennel_id, WeightQueryFilter())),
+                "ModelJSONResponse": lambda: ModelJSONResponse(weights.get_all(kennel_id, WeightQueryFilter())).body,
+            },
+            # the page is built in Python either way (pace, laps), only the encoding differs
+            "/activities": {
+                "response_model": lambda: activity_page(page),
+                "ModelJSONResponse": lambda: ModelJSONResponse(page).body,
+            },
+        }
+
+        print(f"kennel {kennel_id}: {args.dogs} dogs, {args.runners} runners, {args.locations} locations, "
+              f"{kennel.counts['weights']} weight entries, {len(activities)} activities listed")
+        print(f"{'route':<16} {'response':<20} {'ms':>8} {'KiB':>8}")
+        for route, variants in routes.items():
+            bodies = {}
+            for label, build in variants.items():
+                median, body = timed(build, args.repeat)
+                bodies[label] = body
+                print(f"{route:<16} {label:<20} {median:>8.2f} {len(body) / 1024:>8.1f}")
+            expected = json.loads(bodies["response_model"])
+            for label, body in bodies.items():
+                assert json.loads(body) == expected, f"{route}: {label} sends different JSON"
+    finally:
+        conn.rollback()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
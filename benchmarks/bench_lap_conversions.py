@@ -0,0 +1,142 @@
+"""
+Lap speed and pace conversions one value at a time (the scalar calculation_helpers, as
+ActivityLaps.derive_fields runs them) versus the numpy batch variants, on --laps laps:
+
+  conversions   time strings to speeds and paces, nothing else
+  hydration     stored laps (seconds, distance, optional speed) to ActivityLaps models,
+                scalar derivation per lap versus parse_activities_from_records
+  import        ActivityCreate validation of upload records, validators deriving every
+                lap versus derive_import_fields first
+
+Runs in memory on seeded random laps, no database needed; results are checked to match:
+
+    python -m benchmarks.bench_lap_conversions --laps 100000
+"""
+import argparse
+import copy
+import gc
+import random
+import statistics
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+import src.utils.calculation_helpers as ch
+from src.models.activity import ActivityCreate, ActivityLaps
+from src.parsers.activity_import_parser import derive_import_fields
+from src.parsers.activity_parser import parse_activities_from_records
+from src.parsers.construct import construct
+
+LAPS_PER_ACTIVITY = 5
+
+def timed(function, repeat: int, setup=lambda: ()):
+    """Median ms of function(*setup()) (setup untimed, garbage collector paused) and its last result."""
+    samples = []
+    for _ in range(repeat):
+        arguments = setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = function(*arguments)
+            samples.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+    return statistics.median(samples), result
+
+def lap_time(seconds: int) -> str:
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes:02}:{seconds:02}"
+
+def generate(laps: int, seed: int):
+    """(times, distances, stored records, upload records) of `laps` laps."""
+    rng = random.Random(seed)
+    seconds = [rng.randint(150, 420) for _ in range(laps)]
+    distances = [rng.choice([0.4, 0.5, 1.0, 1.2]) for _ in range(laps)]
+    times = [lap_time(s) for s in seconds]
+
+    Record = namedtuple("Record", [
+        "id", "timestamp", "sport_id", "location_id", "workout", "speed", "distance", "runner_name", "runner_id",
+        "sport_name", "sport_type", "kennel_name", "kennel_id", "temperature", "humidity", "condition",
+        "location", "comment_count", "dogs", "laps",
+    ])
+    dogs = [{"id": 1, "name": "Balto", "breed": "Husky", "date_of_birth": "2021-05-14", "rating": 9}]
+    stored, uploads = [], []
+    for activity, first in enumerate(range(0, laps, LAPS_PER_ACTIVITY)):
+        numbers = range(first, min(first + LAPS_PER_ACTIVITY, laps))
+        stored.append(Record(
+            activity, datetime(2025, 4, 1, tzinfo=timezone.utc), 1, 1, True, 18.5, 5.0, "Alice", 1,
+            "Canicross", "dryland", "kennel", 1, None, None, None, "Forest Loop", 0, dogs,
+            # about one lap in three was stored with its speed
+            [{"lap_number": i - first + 1, "lap_distance": distances[i], "lap_time": float(seconds[i]),
+              "speed": round(rng.uniform(10, 25), 2) if rng.random() < 0.3 else None} for i in numbers],
+        ))
+        uploads.append({
+            "timestamp": "2025-04-01T09:30:00Z", "runner_id": 1, "sport_id": 1, "location_id": 1, "distance": 5.0,
+            "workout": True, "speed": "18.5", "dogs": [{"dog_id": 1, "rating": 9}],
+            "laps": [{"lap_number": i - first + 1, "lap_distance": str(distances[i]), "lap_time": times[i]} for i in numbers],
+        })
+    return times, distances, stored, uploads
+
+def scalar_conversions(times, distances):
+    speeds = [ch.calculate_speed_from_time_distance(d, t) for d, t in zip(distances, times)]
+    return speeds, [ch.calculate_pace_from_speed(s) for s in speeds]
+
+def batch_conversions(times, distances):
+    speeds = ch.calculate_speeds_from_time_distance(distances, ch.convert_str_times_to_seconds(times))
+    return speeds.tolist(), ch.calculate_paces_from_speeds(speeds).tolist()
+
+def scalar_laps(records):
+    """The laps of the records derived one at a time, as ActivityLaps.derive_fields does."""
+    laps = []
+    for record in records:
+        for lap in record.laps:
+            delta = timedelta(seconds=lap["lap_time"])
+            minutes, seconds = divmod(int(delta.total_seconds()), 60)
+            time_str = f"{minutes:02}:{seconds:02}"
+            speed = lap["speed"] if lap["speed"] is not None else ch.calculate_speed_from_time_distance(lap["lap_distance"], time_str)
+            laps.append(construct(
+                ActivityLaps, lap_number=lap["lap_number"], lap_distance=float(lap["lap_distance"]), lap_time=time_str,
+                lap_time_delta=delta, speed=speed, pace=ch.calculate_pace_from_speed(speed),
+            ))
+    return laps
+
+def batch_laps(records):
+    return [lap for activity in parse_activities_from_records(records) for lap in activity.laps]
+
+def validate(uploads):
+    return [ActivityCreate(**record) for record in uploads]
+
+def derive_and_validate(uploads):
+    derive_import_fields(uploads)
+    return validate(uploads)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--laps", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    times, distances, stored, uploads = generate(args.laps, args.seed)
+    print(f"{args.laps} laps, {len(stored)} activities")
+    print(f"{'path':<14} {'scalar':>10} {'batch':>10} {'speedup':>8}  (median ms)")
+
+    scalar, (speeds, paces) = timed(lambda: scalar_conversions(times, distances), args.repeat)
+    batch, (batch_speeds, batch_paces) = timed(lambda: batch_conversions(times, distances), args.repeat)
+    assert (speeds, paces) == (batch_speeds, batch_paces), "conversions differ"
+    print(f"{'conversions':<14} {scalar:>10.1f} {batch:>10.1f} {scalar / batch:>7.1f}x")
+
+    scalar, laps = timed(lambda: scalar_laps(stored), args.repeat)
+    batch, batch_laps_ = timed(lambda: batch_laps(stored), args.repeat)
+    assert laps == batch_laps_, "hydrated laps differ"
+    print(f"{'hydration':<14} {scalar:>10.1f} {batch:>10.1f} {scalar / batch:>7.1f}x")
+
+    # derive_import_fields fills the records in, each run gets a fresh copy
+    fresh = lambda: (copy.deepcopy(uploads),)
+    scalar, activities = timed(validate, args.repeat, setup=fresh)
+    batch, batch_activities = timed(derive_and_validate, args.repeat, setup=fresh)
+    assert activities == batch_activities, "imported activities differ"
+    print(f"{'import':<14} {scalar:>10.1f} {batch:>10.1f} {scalar / batch:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Load test of every route in src/api, served in-process by src.main.app (lifespan, pools,
+middleware and all) through httpx's ASGI transport.
+
+A synthetic kennel (benchmarks.synthetic_data, same seed = same data) is written and
+committed first, then deleted at the end unless --keep; --kennel-id points the reads at an
+existing kennel instead (write routes are skipped then). Authentication is replaced by a
+dependency override acting as the kennel's first user, and the analytics response cache
+is off unless --cache, so every request reaches the database.
+
+For each --concurrency level every route gets --requests requests, --concurrency at a
+time. Write routes run in create / update / delete order on the rows they created.
+Reported per route: throughput, p50/p95/p99 latency and database queries per request
+(from the db_queries_per_request histogram, so streamed bodies count in full).
+
+--save writes the results as JSON; --compare reads such a file and exits with status 1
+when a route's p95 grew by more than --tolerance or it runs more queries than before:
+
+    ENV=test TEST_DATABASE_URL=... python -m benchmarks.bench_load --save baseline.json
+    ENV=test TEST_DATABASE_URL=... python -m benchmarks.bench_load --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, NamedTuple, Optional
+import anyio.to_thread
+import httpx
+from fastapi import Request
+from psycopg2.extras import RealDictCursor
+from benchmarks.synthetic_data import DEFAULT_END, SyntheticKennel, delete_kennel, seed_synthetic_kennel
+from src.config import settings
+from src.deps import verify_jwt
+from src.main import app, lifespan
+from src.utils.db import get_connection
+from src.utils.metrics import db_queries_per_request
+from src.utils.response_cache import set_response_cache
+
+class Route(NamedTuple):
+    name: str  # shown in the report
+    method: str
+    path: str  # route template, as labelled in the metrics
+    # request number -> (url, httpx keyword arguments), None once there is nothing left to send
+    request: Callable[[int], Optional[tuple[str, dict]]]
+    # called with each successful response, to remember the rows a write route created
+    created: Optional[Callable[[httpx.Response], None]] = None
+    write: bool = False
+
+def existing_kennel(kennel_id: int) -> SyntheticKennel:
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            ids = {}
+            for table, query in (
+                ("dogs", "SELECT id FROM dogs WHERE kennel_id = %s ORDER BY id"),
+                ("runners", "SELECT id FROM runners WHERE kennel_id = %s ORDER BY id"),
+                ("users", "SELECT id FROM users WHERE kennel_id = %s AND is_active ORDER BY id"),
+                ("locations", "SELECT id FROM activity_locations WHERE kennel_id = %s ORDER BY id"),
+                ("activities", "SELECT id FROM activities WHERE kennel_id = %s ORDER BY id"),
+            ):
+                cur.execute(query, (kennel_id,))
+                ids[table] = [row["id"] for row in cur.fetchall()]
+    finally:
+        conn.close()
+    if not ids["dogs"] or not ids["activities"]:
+        sys.exit(f"kennel {kennel_id} needs dogs and activities to be benchmarked")
+    return SyntheticKennel(kennel_id, ids["dogs"], ids["runners"], ids["users"], ids["locations"], ids["activities"], {})
+
+def build_routes(kennel: SyntheticKennel, end: date, seed: int, writes: bool) -> list[Route]:
+    rng = random.Random(seed)
+    activity_ids, dog_ids = kennel.activity_ids, kennel.dog_ids
+    first_day = end - timedelta(days=365)
+
+    def day() -> date:
+        return first_day + timedelta(days=rng.randrange(365))
+
+    def period() -> dict:
+        start = day()
+        return {"start_date": start.isoformat(), "end_date": (start + timedelta(days=90)).isoformat()}
+
+    def get(name: str, path: str, params: Callable[[], dict] = dict, url: Optional[Callable[[], str]] = None) -> Route:
+        return Route(name, "GET", path, lambda i: ((url or (lambda: path))(), {"params": params()}))
+
+    routes = [
+        get("GET /activities", "/activities", lambda: {"limit": 20}),
+        get("GET /activities deep offset", "/activities", lambda: {"limit": 20, "offset": max(len(activity_ids) - 20, 0)}),
+        get("GET /activities cursor", "/activities", lambda: {"limit": 20, "cursor": "", "include_total": "false"}),
+        get("GET /activities filtered", "/activities", lambda: {"limit": 20, "dog_id": rng.choice(dog_ids), **period()}),
+        get("GET /activities/export", "/activities/export", period),
+        get("GET /activities/{activity_id}", "/activities/{activity_id}",
+            url=lambda: f"/activities/{rng.choice(activity_ids)}"),
+        get("GET /activities/{activity_id}/comments", "/activities/{activity_id}/comments",
+            url=lambda: f"/activities/{rng.choice(activity_ids)}/comments"),
+        get("GET /dogs", "/dogs"),
+        get("GET /runners", "/runners"),
+        get("GET /dogs/weights", "/dogs/weights", period),
+        get("GET /dogs/weights/latest", "/dogs/weights/latest"),
+        get("GET /locations", "/locations"),
+        get("GET /locations/manage", "/locations/manage"),
+        get("GET /sports", "/sports"),
+        get("GET /sports/{sport_name}", "/sports/{sport_name}", url=lambda: "/sports/Canicross"),
+        get("GET /analytics/weekly-stats", "/analytics/weekly-stats", lambda: {"ts": day().isoformat()}),
+        get("GET /analytics/dog-calendar", "/analytics/dog-calendar",
+            lambda: (lambda d: {"year": d.year, "month": d.month})(day())),
+        get("GET /analytics/summary", "/analytics/summary", period),
+        get("GET /analytics/sport-distribution", "/analytics/activities/sport-distribution", period),
+        get("GET /analytics/weekly-distance", "/analytics/activities/weekly-distance", period),
+        get("GET /analytics/heatmap", "/analytics/activities/locations/heatmap", period),
+        get("GET /analytics/dashboard", "/analytics/dashboard", lambda: {**period(), "ts": day().isoformat()}),
+        get("GET /analytics/cache/stats", "/analytics/cache/stats"),
+        get("GET /metrics", "/metrics"),
+    ]
+    if not writes:
+        return routes
+
+    # urls of the rows created by the POST routes, updated then popped by the PUT / DELETE ones
+    created = {"activities": [], "weights": [], "comments": [], "locations": []}
+
+    def create(key: str, path: str, request: Callable[[int], tuple[str, dict]], url: Callable[[httpx.Response], list[str]]) -> Route:
+        return Route(f"POST {path}", "POST", path, request, lambda response: created[key].extend(url(response)), write=True)
+
+    def update(key: str, path: str, body: Callable[[int], dict], method: str = "PUT") -> Route:
+        def request(i):
+            urls = created[key]
+            return (urls[i % len(urls)], {"json": body(i)}) if urls else None
+        return Route(f"{method} {path}", method, path, request, write=True)
+
+    def delete(key: str, path: str) -> Route:
+        def request(i):
+            urls = created[key]
+            return (urls.pop(), {}) if urls else None
+        return Route(f"DELETE {path}", "DELETE", path, request, write=True)
+
+    def activity() -> dict:
+        return {
+            "timestamp": f"{day().isoformat()}T07:30:00+00:00",
+            "runner_id": rng.choice(kennel.runner_ids),
+            "sport_id": 1,
+            "location_id": rng.choice(kennel.location_ids),
+            "distance": round(rng.uniform(3, 12), 2),
+            "speed": round(rng.uniform(11, 16), 2),
+            "dogs": [{"dog_id": dog_id, "rating": 8} for dog_id in rng.sample(dog_ids, min(2, len(dog_ids)))],
+            "weather": {"temperature": 8.0, "humidity": 0.6, "condition": "Cloudy"},
+        }
+
+    def comment(i: int) -> tuple[str, dict]:
+        activity_id = activity_ids[i % len(activity_ids)]
+        return f"/activities/{activity_id}/comments", {"json": {"activity_id": activity_id, "comment": "bench"}}
+
+    stamp = time.time_ns()
+    return routes + [
+        create("activities", "/activities", lambda i: ("/activities", {"json": activity()}),
+               lambda response: [f"/activities/{response.json()['id']}"]),
+        create("activities", "/activities/bulk",
+               lambda i: ("/activities/bulk", {
+                   "content": "\n".join(json.dumps(activity()) for _ in range(20)),
+                   "headers": {"Content-Type": "application/x-ndjson"},
+               }),
+               lambda response: [f"/activities/{id}" for id in response.json()["ids"]]),
+        update("activities", "/activities/{activity_id}", lambda i: {"distance": round(rng.uniform(3, 12), 2)}),
+        delete("activities", "/activities/{activity_id}"),
+        create("weights", "/dogs/{dog_id}/weights",
+               lambda i: (f"/dogs/{rng.choice(dog_ids)}/weights", {"json": {"weight": 25.0, "date": day().isoformat()}}),
+               lambda response: [f"/dogs/weights/{response.json()}"]),
+        update("weights", "/dogs/weights/{weight_id}", lambda i: {"weight": round(rng.uniform(18, 32), 1)}),
+        delete("weights", "/dogs/weights/{weight_id}"),
+        create("comments", "/activities/{activity_id}/comments", comment,
+               lambda response: [f"{response.request.url.path}/{response.json()}"]),
+        update("comments", "/activities/{activity_id}/comments/{comment_id}", lambda i: {"activity_id": 0, "comment": "edited"}),
+        delete("comments", "/activities/{activity_id}/comments/{comment_id}"),
+        create("locations", "/locations",
+               lambda i: ("/locations", {"json": {"name": f"bench {stamp} {i}", "latitude": 46.0, "longitude": -72.0}}),
+               lambda response: [f"/locations/{response.json()['id']}"]),
+        update("locations", "/locations/{location_id}", lambda i: {"latitude": 46.1, "longitude": -72.1}, method="PATCH"),
+        delete("locations", "/locations/{location_id}"),
+        Route("PUT /dogs/{dog_id}", "PUT", "/dogs/{dog_id}",
+              lambda i: (f"/dogs/{dog_ids[i % len(dog_ids)]}", {"json": {"color": "#2a9d8f"}}), write=True),
+        Route("POST /dogs", "POST", "/dogs",
+              lambda i: ("/dogs", {"json": {"name": f"bench {stamp} {i}", "breed": "Husky", "date_of_birth": "2020-01-01"}}),
+              write=True),
+        Route("POST /runners", "POST", "/runners", lambda i: ("/runners", {"json": {"name": f"bench {stamp} {i}"}}), write=True),
+    ]
+
+async def load(client: httpx.AsyncClient, route: Route, requests: int, concurrency: int) -> Optional[dict]:
+    samples, failures = [], 0
+    queue = iter(range(requests))
+    before = db_queries_per_request.count(route.method, route.path), db_queries_per_request.total(route.method, route.path)
+
+    async def worker():
+        nonlocal failures
+        for i in queue:
+            request = route.request(i)
+            if request is None:
+                return
+            url, kwargs = request
+            start = time.perf_counter()
+            response = await client.request(route.method, url, **kwargs)
+            samples.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                failures += 1
+            elif route.created is not None:
+                route.created(response)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    if not samples:
+        return None
+
+    count = db_queries_per_request.count(route.method, route.path) - before[0]
+    quantiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else [samples[0]] * 99
+    return {
+        "requests": len(samples),
+        "rps": len(samples) / elapsed,
+        "p50": quantiles[49],
+        "p95": quantiles[94],
+        "p99": quantiles[98],
+        "queries": (db_queries_per_request.total(route.method, route.path) - before[1]) / count if count else 0.0,
+        "failures": failures,
+    }
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    found = []
+    for level, routes in results.items():
+        for name, r in routes.items():
+            base = baseline.get(level, {}).get(name)
+            if base is None:
+                continue
+            # sub-millisecond p95s are mostly noise, compare against at least 1 ms
+            if r["p95"] > max(base["p95"], 1.0) * (1 + tolerance):
+                found.append(f"{name} @{level}: p95 {base['p95']:.1f} -> {r['p95']:.1f} ms")
+            if r["queries"] > base["queries"] + 0.5:
+                found.append(f"{name} @{level}: {base['queries']:.1f} -> {r['queries']:.1f} queries per request")
+            if r["failures"] > base["failures"]:
+                found.append(f"{name} @{level}: {base['failures']} -> {r['failures']} failed requests")
+    return found
+
+async def run(args, kennel: SyntheticKennel, end: date, writes: bool) -> dict:
+    user_id = kennel.user_ids[0] if kennel.user_ids else None
+
+    async def as_kennel_user(request: Request):
+        request.state.kennel_id = kennel.kennel_id
+        request.state.user_id = user_id
+        return {"kennel_id": kennel.kennel_id, "user_id": user_id}
+
+    app.dependency_overrides[verify_jwt] = as_kennel_user
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+    routes = [route for route in build_routes(kennel, end, args.seed, writes)
+              if not args.routes or any(pattern in route.name for pattern in args.routes)]
+    results = {}
+
+    print(f"kennel {kennel.kennel_id}: {len(kennel.activity_ids)} activities, {len(kennel.dog_ids)} dogs, "
+          f"{len(routes)} routes, {args.requests} requests per route")
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for route in routes:
+                if not route.write:
+                    await load(client, route, 1, 1)  # warm up
+            for concurrency in args.concurrency:
+                print(f"\nconcurrency {concurrency}")
+                print(f"{'route':<56} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'failed':>7}")
+                level = results[str(concurrency)] = {}
+                for route in routes:
+                    r = await load(client, route, args.requests, concurrency)
+                    if r is None:
+                        print(f"{route.name:<56} {'skipped, nothing to ' + route.method.lower():>52}")
+                        continue
+                    level[route.name] = r
+                    print(f"{route.name:<56} {r['rps']:>8.0f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} "
+                          f"{r['queries']:>8.1f} {r['failures']:>7}")
+    app.dependency_overrides.pop(verify_jwt, None)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--dogs", type=int, default=12)
+    parser.add_argument("--runners", type=int, default=4)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--sessions-per-week", type=float, default=10)
+    parser.add_argument("--kennel-id", type=int, help="benchmark an existing kennel (reads only) instead of a synthetic one")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic kennel afterwards")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--routes", nargs="+", help="only run routes whose name contains one of these")
+    parser.add_argument("--cache", action="store_true", help="keep the analytics response cache on")
+    parser.add_argument("--pool-size", type=int, help="sync and async pool size (settings by default)")
+    parser.add_argument("--threads", type=int, default=40, help="FastAPI threadpool size (anyio's default is 40)")
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to check the results against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p95 growth over the baseline")
+    args = parser.parse_args()
+
+    if args.pool_size:
+        settings.DB_POOL_MAX_SIZE = settings.DB_ASYNC_POOL_MAX_SIZE = args.pool_size
+    if not args.cache:
+        settings.ANALYTICS_CACHE_SIZE = 0
+        set_response_cache(None)
+
+    if args.kennel_id is not None:
+        kennel, end, writes = existing_kennel(args.kennel_id), date.today(), False
+    else:
+        conn = get_connection()
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            kennel = seed_synthetic_kennel(cur, f"synthetic-{args.seed}-{time.time_ns()}", args.seed, args.dogs,
+                                           args.runners, years=args.years, sessions_per_week=args.sessions_per_week)
+        conn.commit()
+        end, writes = DEFAULT_END, True
+
+    try:
+        results = asyncio.run(run(args, kennel, end, writes))
+    finally:
+        if args.kennel_id is None:
+            if args.keep:
+                print(f"\nkept kennel {kennel.kennel_id}")
+            else:
+                with conn.cursor() as cur:
+                    delete_kennel(cur, kennel.kennel_id)
+                conn.commit()
+            conn.close()
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            found = regressions(results, json.load(file), args.tolerance)
+        print("\n" + ("\n".join(["regressions:"] + found) if found else "no regression against the baseline"))
+        if found:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Planning time and latency of the activity listing and analytics queries, run as plain
+statements versus prepared statements under each plan_cache_mode (auto, generic, custom).
+
+Planning and execution times come from EXPLAIN (ANALYZE, SUMMARY): a cached generic plan
+reports (almost) no planning, a custom plan is planned again on every EXECUTE. Latency
+is the client-side median of the query and its fetch. Runs against a synthetic kennel
+written inside a transaction that is rolled back at the end:
+
+    ENV=test TEST_DATABASE_URL=... python -m benchmarks.bench_prepared_statements
+"""
+import argparse
+import statistics
+import time
+from datetime import date, datetime, timedelta, timezone
+from psycopg2.extras import RealDictCursor
+from src.models.common import ActivityQueryFilters, Filter
+from src.repositories.activity_repository import activity_count_query, activity_page_query
+from src.repositories.analytics_repository import analytics_repository
+from src.utils.db import get_connection
+from src.utils.prepared_statements import PLAN_CACHE_MODES, StatementCache, execute_prepared, positional, prepared_statement, set_statement_cache
+from .synthetic_data import DEFAULT_END, seed_synthetic_kennel
+
+MODES = [None, *PLAN_CACHE_MODES]  # None: the statement as is, not prepared
+
+def queries(kennel, end: date) -> dict[str, tuple[str, list]]:
+    """(query, values) of the hot read paths, named like the timing metrics."""
+    recent = ActivityQueryFilters(start_date=end - timedelta(days=90), end_date=end)
+    one_dog = ActivityQueryFilters(dog_id=kennel.dog_ids[0], start_date=end - timedelta(days=365))
+    window = Filter(start_date=end - timedelta(days=90), end_date=end)
+    analytics = analytics_repository(None)
+    anchor = datetime.combine(end, datetime.min.time(), timezone.utc)
+    page = lambda filters: activity_page_query(kennel.kennel_id, filters, 20, 0, None, True)[:2]
+    return {
+        "activities page": page(ActivityQueryFilters()),
+        "activities page, 90 days": page(recent),
+        "activities page, one dog": page(one_dog),
+        "activities count, one dog": activity_count_query(kennel.kennel_id, one_dog),
+        "analytics summary": analytics._summary_query(window, kennel.kennel_id),
+        "analytics weekly mileage": analytics._weekly_mileage_query(window, kennel.kennel_id),
+        "analytics weekly stats": analytics._weekly_stats_query(kennel.kennel_id, anchor),
+        "analytics heat map": analytics._heat_map_query(window, kennel.kennel_id),
+        "analytics dashboard": analytics._dashboard_query(window, kennel.kennel_id, anchor),
+    }
+
+def explain_times(cur, query: str, values, mode) -> tuple[float, float]:
+    """(planning, execution) ms of one run, EXECUTE of the prepared statement for a mode."""
+    query, values = positional(query, values)
+    if mode is not None:
+        execute_prepared(cur, query, values, plan=mode)  # prepares the statement if needed
+        cur.fetchall()
+        settings, query = prepared_statement(query, mode).execute.split("; ", 1)
+        cur.execute(f"{settings}; EXPLAIN (ANALYZE, SUMMARY, FORMAT JSON) {query}", values)
+    else:
+        cur.execute(f"EXPLAIN (ANALYZE, SUMMARY, FORMAT JSON) {query}", values)
+    [result] = cur.fetchone()["QUERY PLAN"]
+    return result["Planning Time"], result["Execution Time"]
+
+def measure(cur, query: str, values, mode, repeat: int) -> tuple[float, float, float]:
+    """Median (latency, planning, execution) ms, after warming up (auto switches plans after five runs)."""
+    def run():
+        if mode is None:
+            cur.execute(query, values)
+        else:
+            execute_prepared(cur, query, values, plan=mode)
+        cur.fetchall()
+
+    for _ in range(6):
+        run()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1000)
+    planning, execution = zip(*(explain_times(cur, query, values, mode) for _ in range(repeat)))
+    return statistics.median(latencies), statistics.median(planning), statistics.median(execution)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dogs", type=int, default=12)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--sessions-per-week", type=float, default=10)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    set_statement_cache(StatementCache(64))
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            kennel = seed_synthetic_kennel(cur, dogs=args.dogs, years=args.years, sessions_per_week=args.sessions_per_week)
+            print(f"kennel {kennel.kennel_id}: {kennel.counts['activities']} activities, {args.dogs} dogs")
+            print(f"{'query':<28} {'mode':<8} {'latency':>8} {'planning':>9} {'execution':>10}  (median ms)")
+            for name, (query, values) in queries(kennel, DEFAULT_END).items():
+                for mode in MODES:
+                    latency, planning, execution = measure(cur, query, values, mode, args.repeat)
+                    print(f"{name:<28} {mode or 'plain':<8} {latency:>8.2f} {planning:>9.3f} {execution:>10.2f}")
+    finally:
+        set_statement_cache(None)
+        conn.rollback()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
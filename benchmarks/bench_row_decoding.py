@@ -0,0 +1,110 @@
+"""
+Cost of turning database rows into models: dict rows (RealDictCursor) parsed with
+validation versus named tuple rows (NamedTupleCursor) constructed without validation.
+
+Decodes the same rows of a synthetic kennel both ways, the activity hydration query
+(nested dogs, laps, weather) and the weight log, and reports the median wall and CPU
+time of the fetch (row objects, json included) and of the parsing, plus the memory
+allocated for the rows and models (tracemalloc peak). The cyclic garbage collector
+is paused while timing: with 10k rows of models alive its passes take as long as the
+decoding and blur the comparison. Rows are written inside a transaction that is
+rolled back at the end:
+
+    ENV=test TEST_DATABASE_URL=... python -m benchmarks.bench_row_decoding --rows 10000
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from psycopg2.extras import NamedTupleCursor, RealDictCursor
+from src.parsers.activity_parser import parse_activity_from_record, parse_activity_from_row
+from src.parsers.weight_parser import parse_weight_from_record, parse_weight_from_row
+from src.repositories.activity_repository import ACTIVITY_HYDRATION_QUERY
+from src.utils.db import get_connection
+from .synthetic_data import seed_synthetic_kennel
+
+WEIGHT_QUERY = """
+    SELECT w.id, w.date, w.weight, d.id AS dog_id, d.name, d.date_of_birth, d.breed, k.name AS kennel_name
+    FROM weight_entries w
+    JOIN dogs d ON d.id = w.dog_id
+    JOIN kennels k ON d.kennel_id = k.id
+    WHERE d.kennel_id = %s
+    LIMIT %s
+"""
+
+def decoders(kennel_id: int, rows: int) -> dict:
+    activities = ACTIVITY_HYDRATION_QUERY.format(
+        page_query=f"SELECT id FROM activities WHERE kennel_id = {kennel_id:d} ORDER BY timestamp DESC LIMIT {rows:d}",
+        page_columns="",
+        order="DESC",
+    )
+    return {
+        "activities": (activities, None, parse_activity_from_row, parse_activity_from_record),
+        "weights": (WEIGHT_QUERY, (kennel_id, rows), parse_weight_from_row, parse_weight_from_record),
+    }
+
+def decode(conn, query, params, cursor_factory, parse):
+    """(fetch wall, fetch cpu, parse wall, parse cpu) seconds and the models."""
+    gc.collect()
+    gc.disable()
+    try:
+        with conn.cursor(cursor_factory=cursor_factory) as cur:
+            cur.execute(query, params)
+            wall, cpu = time.perf_counter(), time.process_time()
+            rows = cur.fetchall()
+            fetched = time.perf_counter() - wall, time.process_time() - cpu
+        wall, cpu = time.perf_counter(), time.process_time()
+        models = [parse(row) for row in rows]
+        return (*fetched, time.perf_counter() - wall, time.process_time() - cpu), models
+    finally:
+        gc.enable()
+
+def allocated(conn, query, params, cursor_factory, parse) -> int:
+    """Peak bytes allocated while fetching and parsing (rows and models alive together)."""
+    with conn.cursor(cursor_factory=cursor_factory) as cur:
+        cur.execute(query, params)
+        tracemalloc.start()
+        try:
+            models = [parse(row) for row in cur.fetchall()]
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # ~7 sessions kept a week (rest days, injuries), some margin over --rows
+            kennel = seed_synthetic_kennel(cur, dogs=20, years=args.rows / 350 + 0.2, sessions_per_week=10)
+
+        print(f"{'rows':<12} {'decoding':<22} {'fetch':>8} {'parse':>8} {'cpu':>8} {'peak MiB':>9}  (median ms)")
+        for name, (query, params, parse_row, parse_record) in decoders(kennel.kennel_id, args.rows).items():
+            variants = {
+                "dict + validation": (RealDictCursor, parse_row),
+                "named tuple + construct": (NamedTupleCursor, parse_record),
+            }
+            results = {}
+            for label, (cursor_factory, parse) in variants.items():
+                samples = []
+                for _ in range(args.repeat):
+                    sample, models = decode(conn, query, params, cursor_factory, parse)
+                    samples.append(sample)
+                fetch, fetch_cpu, parsing, parse_cpu = (statistics.median(column) * 1000 for column in zip(*samples))
+                peak = allocated(conn, query, params, cursor_factory, parse) / 2**20
+                results[label] = models
+                print(f"{name + ' ' + str(len(models)):<12} {label:<22} {fetch:>8.1f} {parsing:>8.1f} "
+                      f"{fetch_cpu + parse_cpu:>8.1f} {peak:>9.1f}")
+            validated, constructed = results.values()
+            assert validated == constructed, f"{name}: constructed models differ from the validated ones"
+    finally:
+        conn.rollback()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
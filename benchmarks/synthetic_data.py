@@ -0,0 +1,253 @@
+"""
+Deterministic synthetic kennel: N dogs, M runners and years of activities with dogs,
+laps, weather and comments, plus the dogs' weight log, for benchmarking at a realistic
+scale (sql_scripts/test_init_entries.sql only has a handful of rows).
+
+Rows are drawn from random.Random(seed) against a fixed end date, so the same seed and
+shape always produce the same kennel (ids aside). dog_weekly_rollup is filled for the
+new dogs as the repositories would. Without --commit the kennel is rolled back, which
+only reports what would be written:
+
+    ENV=test TEST_DATABASE_URL=... python -m benchmarks.synthetic_data --dogs 12 --years 3 --commit
+    ENV=test TEST_DATABASE_URL=... python -m benchmarks.synthetic_data --delete 42
+"""
+import argparse
+import math
+import random
+import time
+from datetime import date, datetime, time as day_time, timedelta, timezone
+from typing import NamedTuple, Optional
+from psycopg2.extras import RealDictCursor, execute_values
+from src.utils.db import get_connection
+from src.repositories.activity_repository import DOG_WEEKLY_ROLLUP_ADD
+
+DEFAULT_END = date(2025, 6, 29)
+
+DOG_NAMES = [
+    "Milou", "Idefix", "Balto", "Togo", "Nanook", "Kodiak", "Luna", "Nova", "Yukon", "Sitka",
+    "Juneau", "Aurora", "Tundra", "Koda", "Mika", "Storm", "Blizzard", "Maya", "Orca", "Sky",
+]
+BREEDS = ["Alaskan Husky", "Siberian Husky", "Greyster", "Eurohound", "Pointer", "Malamute"]
+COLORS = ["#f4a261", "#2a9d8f", "#e76f51", "#264653", "#e9c46a", "#8ab17d", "#6d597a", "#b56576"]
+RUNNER_NAMES = ["Tintin", "Haddock", "Tournesol", "Castafiore", "Dupond", "Dupont", "Nestor", "Seraphin"]
+TRAILS = ["Forest loop", "Lake trail", "Ridge run", "River path", "Pine hill", "Quarry", "Old rail", "Meadow"]
+CONDITIONS = ["Sunny", "Cloudy", "Overcast", "Light rain", "Rain", "Fog", "Snow", "Windy"]
+COMMENTS = [
+    "Great pace today", "Pulled hard on the hills", "A bit distracted by deer",
+    "Perfect conditions", "Too warm, cut it short", "New personal best!", "Easy recovery run",
+]
+
+# base speeds (km/h) by sport type and display mode
+BASE_SPEEDS = {("dryland", "pace"): 13.0, ("dryland", "speed"): 22.0, ("on-snow", "speed"): 17.0}
+
+class SyntheticKennel(NamedTuple):
+    kennel_id: int
+    dog_ids: list[int]
+    runner_ids: list[int]
+    user_ids: list[int]
+    location_ids: list[int]
+    activity_ids: list[int]
+    counts: dict[str, int]
+
+def _names(pool: list[str], count: int) -> list[str]:
+    # unique within the kennel: "Milou", ..., "Milou 2", ...
+    return [pool[i % len(pool)] + (f" {i // len(pool) + 1}" if i >= len(pool) else "") for i in range(count)]
+
+def _season(day: date) -> float:
+    # 0 in mid-January, 1 in mid-July
+    return (1 - math.cos(2 * math.pi * (day.timetuple().tm_yday - 15) / 365)) / 2
+
+def generate_rows(seed: int, dogs: int, runners: int, locations: int, years: float,
+                  sessions_per_week: float, sports: list[dict], end: date = DEFAULT_END) -> dict:
+    """
+    Plain rows of a synthetic kennel. Dogs, runners, users (one per runner, to comment),
+    locations and sports are referenced by their index in these lists; activity children
+    by the index of their activity.
+    """
+    rng = random.Random(seed)
+    start = end - timedelta(weeks=round(years * 52))
+    rows = {key: [] for key in ("dogs", "runners", "locations", "activities", "activity_dogs",
+                                "laps", "weather", "comments", "weights")}
+
+    for name in _names(DOG_NAMES, dogs):
+        born = start - timedelta(days=rng.randint(0, 8 * 365)) + timedelta(days=rng.randint(0, 2 * 365))
+        rows["dogs"].append((name, born, rng.choice(BREEDS), rng.choice(COLORS)))
+    rows["runners"] = [(name,) for name in _names(RUNNER_NAMES, runners)]
+    center = (rng.uniform(45.0, 47.0), rng.uniform(-74.0, -71.0))
+    for name in _names(TRAILS, locations):
+        rows["locations"].append((name, round(center[0] + rng.gauss(0, 0.05), 5), round(center[1] + rng.gauss(0, 0.05), 5)))
+    # a few favourite trails get most of the sessions
+    location_weights = [1 / (i + 1) for i in range(locations)]
+
+    for week in range((end - start).days // 7):
+        week_start = start + timedelta(weeks=week)
+        # dryland season: fewer sessions in the summer heat
+        expected = sessions_per_week * (1 - 0.6 * _season(week_start))
+        for _ in range(max(0, round(rng.gauss(expected, expected / 3)))):
+            day = week_start + timedelta(days=rng.randrange(7))
+            timestamp = datetime.combine(day, day_time(rng.choice([6, 7, 8, 17, 18, 19]), rng.randrange(60)), timezone.utc)
+            eligible = [i for i, dog in enumerate(rows["dogs"]) if dog[1] <= day - timedelta(days=365)]
+            snow = day.month in (12, 1, 2, 3)
+            sport_choices = [i for i, sport in enumerate(sports) if snow or sport["type"] != "on-snow"]
+            if not eligible or not sport_choices:
+                continue
+            sport = sports[rng.choice(sport_choices)]
+            base = BASE_SPEEDS.get((sport["type"], sport["display_mode"]), 15.0)
+            speed = round(base * rng.uniform(0.8, 1.15), 2)
+            distance = round(rng.uniform(3, 12) * (2.5 if sport["type"] == "on-snow" else 1), 2)
+            workout = rng.random() < 0.2
+
+            activity = len(rows["activities"])
+            rows["activities"].append((
+                rng.randrange(runners), sports.index(sport), timestamp,
+                rng.choices(range(locations), location_weights)[0], workout,
+                None if rng.random() < 0.05 else speed, distance,
+            ))
+            for dog in rng.sample(eligible, rng.randint(1, min(4, len(eligible)))):
+                rows["activity_dogs"].append((activity, dog, None if rng.random() < 0.1 else rng.randint(4, 10)))
+            if workout:
+                for lap in range(rng.randint(4, 10)):
+                    lap_distance = rng.choice([0.4, 0.5, 0.8, 1.0])
+                    lap_speed = round(speed * rng.uniform(1.05, 1.3), 2)
+                    rows["laps"].append((activity, lap + 1, timedelta(seconds=round(lap_distance / lap_speed * 3600)), lap_distance, lap_speed))
+            if rng.random() < 0.85:
+                temperature = round(-6 + 26 * _season(day) + rng.gauss(0, 4), 1)
+                rows["weather"].append((activity, temperature, round(rng.uniform(0.3, 0.98), 2),
+                                        rng.choice(CONDITIONS[:6] if temperature > 2 else CONDITIONS)))
+            for _ in range(rng.choice([0, 0, 0, 1, 1, 2, 3])):
+                rows["comments"].append((activity, rng.randrange(runners), rng.choice(COMMENTS),
+                                         timestamp + timedelta(minutes=rng.randint(30, 3000))))
+
+    # every two weeks from the first birthday (or the start), a slow random walk
+    for dog, (_, born, _, _) in enumerate(rows["dogs"]):
+        weight = rng.uniform(18, 32)
+        day = max(start, born + timedelta(days=365))
+        while day <= end:
+            weight = min(max(weight + rng.gauss(0, 0.3), 15), 38)
+            rows["weights"].append((dog, day, round(weight, 1)))
+            day += timedelta(days=14)
+
+    return rows
+
+def _insert(cur, query: str, values: list[tuple], returning: bool = False) -> list[int]:
+    if not values:
+        return []
+    # VALUES rows come back from RETURNING in the order they were sent
+    rows = execute_values(cur, query, values, page_size=1000, fetch=returning)
+    return [row["id"] for row in rows] if returning else []
+
+def insert_kennel(cur, name: str, rows: dict, sports: list[dict]) -> SyntheticKennel:
+    """Writes generated rows as a new kennel, `cur` must be a RealDictCursor."""
+    cur.execute("INSERT INTO kennels (name) VALUES (%s) RETURNING id", (name,))
+    kennel_id = cur.fetchone()["id"]
+
+    dog_ids = _insert(cur, "INSERT INTO dogs (name, date_of_birth, breed, color, kennel_id) VALUES %s RETURNING id",
+                      [(*dog, kennel_id) for dog in rows["dogs"]], returning=True)
+    runner_ids = _insert(cur, "INSERT INTO runners (name, kennel_id) VALUES %s RETURNING id",
+                         [(*runner, kennel_id) for runner in rows["runners"]], returning=True)
+    user_ids = _insert(cur, "INSERT INTO users (username, password_hash, kennel_id) VALUES %s RETURNING id",
+                       [(f"runner{i}.kennel{kennel_id}@synthetic.local", "x", kennel_id) for i in range(len(runner_ids))],
+                       returning=True)
+    location_ids = _insert(cur, "INSERT INTO activity_locations (name, latitude, longitude, kennel_id) VALUES %s RETURNING id",
+                           [(*location, kennel_id) for location in rows["locations"]], returning=True)
+    activity_ids = _insert(cur, """
+        INSERT INTO activities (runner_id, sport_id, timestamp, location_id, workout, speed, distance, kennel_id)
+        VALUES %s RETURNING id
+        """,
+        [(runner_ids[runner], sports[sport]["id"], timestamp, location_ids[location], workout, speed, distance, kennel_id)
+         for runner, sport, timestamp, location, workout, speed, distance in rows["activities"]],
+        returning=True)
+
+    _insert(cur, "INSERT INTO activity_dogs (activity_id, dog_id, rating) VALUES %s",
+            [(activity_ids[a], dog_ids[d], rating) for a, d, rating in rows["activity_dogs"]])
+    _insert(cur, "INSERT INTO workout_laps (activity_id, lap_number, lap_time, lap_distance, speed) VALUES %s",
+            [(activity_ids[a], *lap) for a, *lap in rows["laps"]])
+    _insert(cur, "INSERT INTO weather_entries (activity_id, temperature, humidity, condition) VALUES %s",
+            [(activity_ids[a], *weather) for a, *weather in rows["weather"]])
+    _insert(cur, "INSERT INTO activity_comments (activity_id, user_id, comment, created_at) VALUES %s",
+            [(activity_ids[a], user_ids[u], comment, created_at) for a, u, comment, created_at in rows["comments"]])
+    _insert(cur, "INSERT INTO weight_entries (dog_id, date, weight) VALUES %s",
+            [(dog_ids[d], day, weight) for d, day, weight in rows["weights"]])
+    cur.execute(DOG_WEEKLY_ROLLUP_ADD.format(
+        source="activities a JOIN activity_dogs ad ON ad.activity_id = a.id WHERE a.kennel_id = %(kennel_id)s"
+    ), {"kennel_id": kennel_id})
+
+    counts = {key: len(values) for key, values in rows.items()}
+    return SyntheticKennel(kennel_id, dog_ids, runner_ids, user_ids, location_ids, activity_ids, counts)
+
+def seed_synthetic_kennel(cur, name: Optional[str] = None, seed: int = 1, dogs: int = 12, runners: int = 4,
+                          locations: int = 8, years: float = 3, sessions_per_week: float = 10,
+                          end: date = DEFAULT_END) -> SyntheticKennel:
+    """Generates and inserts a kennel (named after the seed by default), then ANALYZEs."""
+    cur.execute("SELECT id, type, display_mode FROM sports ORDER BY id")
+    sports = cur.fetchall()
+    rows = generate_rows(seed, dogs, runners, locations, years, sessions_per_week, sports, end)
+    kennel = insert_kennel(cur, name or f"synthetic-{seed}", rows, sports)
+    cur.execute("ANALYZE")
+    return kennel
+
+def delete_kennel(cur, kennel_id: int) -> None:
+    """Removes a kennel and everything referencing it, children first."""
+    cur.execute("""
+        CREATE TEMP TABLE doomed_activities ON COMMIT DROP AS
+        SELECT id FROM activities
+        WHERE kennel_id = %(kennel_id)s OR runner_id IN (SELECT id FROM runners WHERE kennel_id = %(kennel_id)s);
+
+        DELETE FROM activity_comments
+        WHERE activity_id IN (SELECT id FROM doomed_activities)
+        OR user_id IN (SELECT id FROM users WHERE kennel_id = %(kennel_id)s);
+        DELETE FROM weather_entries WHERE activity_id IN (SELECT id FROM doomed_activities);
+        DELETE FROM workout_laps WHERE activity_id IN (SELECT id FROM doomed_activities);
+        DELETE FROM activity_dogs
+        WHERE activity_id IN (SELECT id FROM doomed_activities)
+        OR dog_id IN (SELECT id FROM dogs WHERE kennel_id = %(kennel_id)s);
+        DELETE FROM activities WHERE id IN (SELECT id FROM doomed_activities);
+        DELETE FROM weight_entries WHERE dog_id IN (SELECT id FROM dogs WHERE kennel_id = %(kennel_id)s);
+        DELETE FROM images
+        WHERE dog_id IN (SELECT id FROM dogs WHERE kennel_id = %(kennel_id)s)
+        OR runner_id IN (SELECT id FROM runners WHERE kennel_id = %(kennel_id)s);
+        DELETE FROM refresh_tokens WHERE user_id IN (SELECT id FROM users WHERE kennel_id = %(kennel_id)s);
+        DELETE FROM users WHERE kennel_id = %(kennel_id)s;
+        DELETE FROM dogs WHERE kennel_id = %(kennel_id)s;
+        DELETE FROM runners WHERE kennel_id = %(kennel_id)s;
+        DELETE FROM activity_locations WHERE kennel_id = %(kennel_id)s;
+        DELETE FROM kennels WHERE id = %(kennel_id)s;
+    """, {"kennel_id": kennel_id})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--name", help="kennel name (default synthetic-<seed>)")
+    parser.add_argument("--dogs", type=int, default=12)
+    parser.add_argument("--runners", type=int, default=4)
+    parser.add_argument("--locations", type=int, default=8)
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--sessions-per-week", type=float, default=10)
+    parser.add_argument("--end", type=date.fromisoformat, default=DEFAULT_END, help="last day of generated data")
+    parser.add_argument("--commit", action="store_true", help="keep the kennel (rolled back otherwise)")
+    parser.add_argument("--delete", type=int, metavar="KENNEL_ID", help="delete a kennel and its data instead")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            if args.delete is not None:
+                delete_kennel(cur, args.delete)
+                conn.commit()
+                print(f"deleted kennel {args.delete}")
+                return
+            start = time.perf_counter()
+            kennel = seed_synthetic_kennel(cur, args.name, args.seed, args.dogs, args.runners, args.locations,
+                                           args.years, args.sessions_per_week, args.end)
+            elapsed = time.perf_counter() - start
+        print(f"kennel {kennel.kennel_id} in {elapsed:.1f}s: " + ", ".join(f"{n} {key}" for key, n in kennel.counts.items()))
+        if args.commit:
+            conn.commit()
+        else:
+            conn.rollback()
+            print("rolled back (pass --commit to keep it)")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
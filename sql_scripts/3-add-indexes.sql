@@ -0,0 +1,30 @@
+-- Indexes for foreign keys and the filter columns used by the repositories.
+-- weather_entries(activity_id) is already covered by weather_activity_unique (migration 1)
+-- and activity_locations(kennel_id) by ux_locations_kennel_name_ci.
+
+-- tenant lookups: kennel -> dogs / runners
+CREATE INDEX IF NOT EXISTS ix_dogs_kennel_id ON dogs (kennel_id);
+CREATE INDEX IF NOT EXISTS ix_runners_kennel_id ON runners (kennel_id);
+
+-- activity listing (runner -> activities ordered by time), keyset cursor on (timestamp, id)
+CREATE INDEX IF NOT EXISTS ix_activities_runner_id_timestamp ON activities (runner_id, timestamp DESC, id DESC);
+-- analytics time windows (DATE_TRUNC('week') bounds, start_date/end_date filters)
+CREATE INDEX IF NOT EXISTS ix_activities_timestamp_id ON activities (timestamp DESC, id DESC);
+-- location filter, heat map and location usage counts
+CREATE INDEX IF NOT EXISTS ix_activities_location_id ON activities (location_id);
+
+-- activity hydration (activity -> dogs) and analytics / dog filter (dog -> activities)
+CREATE INDEX IF NOT EXISTS ix_activity_dogs_activity_id ON activity_dogs (activity_id);
+CREATE INDEX IF NOT EXISTS ix_activity_dogs_dog_id_activity_id ON activity_dogs (dog_id, activity_id);
+
+-- laps are read per activity in lap order and updated by (activity_id, lap_number)
+CREATE INDEX IF NOT EXISTS ix_workout_laps_activity_id_lap_number ON workout_laps (activity_id, lap_number);
+
+CREATE INDEX IF NOT EXISTS ix_activity_comments_activity_id ON activity_comments (activity_id);
+
+-- weight history per dog filtered and ordered by date
+CREATE INDEX IF NOT EXISTS ix_weight_entries_dog_id_date ON weight_entries (dog_id, date DESC);
+
+-- latest profile picture per dog / runner
+CREATE INDEX IF NOT EXISTS ix_images_dog_id_created_at ON images (dog_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS ix_images_runner_id_created_at ON images (runner_id, created_at DESC);
@@ -0,0 +1,24 @@
+-- Denormalize the owning kennel onto activities so tenant-scoped listing and analytics
+-- filter and order on a single index instead of reaching the kennel through runners.
+-- The column is written by activity_repository (create, and update when runner_id changes).
+ALTER TABLE activities ADD COLUMN IF NOT EXISTS "kennel_id" INT;
+
+-- ADD CONSTRAINT has no IF NOT EXISTS, keep the script safe to re-run
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'activities_fkey_kennelid_id') THEN
+        ALTER TABLE activities
+            ADD CONSTRAINT "activities_fkey_kennelid_id" FOREIGN KEY ("kennel_id") REFERENCES "kennels"("id");
+    END IF;
+END
+$$;
+
+-- backfill existing rows from their runner
+UPDATE activities a
+SET kennel_id = r.kennel_id
+FROM runners r
+WHERE a.runner_id = r.id
+  AND a.kennel_id IS DISTINCT FROM r.kennel_id;
+
+-- tenant-scoped listing ordered by (timestamp, id) and analytics time windows
+CREATE INDEX IF NOT EXISTS ix_activities_kennel_id_timestamp ON activities (kennel_id, timestamp DESC, id DESC);
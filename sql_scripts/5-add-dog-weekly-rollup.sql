@@ -0,0 +1,44 @@
+-- Per dog, per ISO week (Monday, session time zone) training totals used by analytics.
+-- Maintained by activity_repository: every write recomputes the (dog, week) keys it touched.
+-- Distances are NUMERIC so sums over many weeks stay exact and independent of row order.
+-- "timed_*" columns only count sessions with a recorded speed (needed for durations).
+CREATE TABLE IF NOT EXISTS "dog_weekly_rollup" (
+    "dog_id" INT NOT NULL,
+    "week_start" DATE NOT NULL,
+    "distance_km" NUMERIC NOT NULL DEFAULT 0,
+    "sessions" INT NOT NULL DEFAULT 0,
+    "rating_sum" INT NOT NULL DEFAULT 0,
+    "rated_sessions" INT NOT NULL DEFAULT 0,
+    "timed_distance_km" NUMERIC NOT NULL DEFAULT 0,
+    "duration_hours" FLOAT NOT NULL DEFAULT 0,
+    "timed_sessions" INT NOT NULL DEFAULT 0,
+    "timed_rating_sum" INT NOT NULL DEFAULT 0,
+    "first_timed_at" TIMESTAMPTZ,
+    "last_timed_at" TIMESTAMPTZ,
+    CONSTRAINT "dog_weekly_rollup_pkey" PRIMARY KEY ("dog_id", "week_start"),
+    CONSTRAINT "dogweeklyrollup_fkey_dogid_id" FOREIGN KEY ("dog_id") REFERENCES "dogs"("id") ON DELETE CASCADE
+);
+
+-- backfill from existing activities
+INSERT INTO dog_weekly_rollup (
+    dog_id, week_start, distance_km, sessions, rating_sum, rated_sessions,
+    timed_distance_km, duration_hours, timed_sessions, timed_rating_sum, first_timed_at, last_timed_at
+)
+SELECT
+    ad.dog_id,
+    date_trunc('week', a.timestamp)::date,
+    COALESCE(SUM(NULLIF(a.distance, 'NaN'::float8)::numeric), 0),
+    COUNT(*),
+    COALESCE(SUM(ad.rating), 0),
+    COUNT(ad.rating),
+    COALESCE(SUM(NULLIF(a.distance, 'NaN'::float8)::numeric) FILTER (WHERE a.speed > 0), 0),
+    COALESCE(SUM(NULLIF(a.distance, 'NaN'::float8) / NULLIF(NULLIF(a.speed, 'NaN'::float8), 0)) FILTER (WHERE a.speed > 0), 0),
+    COUNT(*) FILTER (WHERE a.speed > 0),
+    COALESCE(SUM(ad.rating) FILTER (WHERE a.speed > 0), 0),
+    MIN(a.timestamp) FILTER (WHERE a.speed > 0),
+    MAX(a.timestamp) FILTER (WHERE a.speed > 0)
+FROM activities a
+JOIN activity_dogs ad ON ad.activity_id = a.id
+WHERE ad.dog_id IS NOT NULL AND a.timestamp IS NOT NULL
+GROUP BY ad.dog_id, date_trunc('week', a.timestamp)
+ON CONFLICT (dog_id, week_start) DO NOTHING;
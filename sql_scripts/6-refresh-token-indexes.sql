@@ -0,0 +1,26 @@
+-- Refresh token lookups and expiry sweeping (auth service).
+-- Validation reads by (user_id, hashed_refresh_token), already the primary key.
+
+-- logout deletes by hash alone, which the primary key can't serve
+CREATE INDEX IF NOT EXISTS ix_refresh_tokens_hashed_refresh_token ON refresh_tokens (hashed_refresh_token);
+-- a user's sessions ordered by expiry, for the session limit trigger below
+CREATE INDEX IF NOT EXISTS ix_refresh_tokens_user_id_expires_on ON refresh_tokens (user_id, expires_on);
+-- the background sweeper deletes expired rows in batches
+CREATE INDEX IF NOT EXISTS ix_refresh_tokens_expires_on ON refresh_tokens (expires_on);
+
+-- Keep at most 3 sessions per user: one indexed DELETE of everything but the 2 latest
+-- expiring sessions, instead of a COUNT(*) followed by an ordered delete
+CREATE OR REPLACE FUNCTION enforce_token_limit()
+RETURNS TRIGGER AS $$
+BEGIN
+  DELETE FROM refresh_tokens
+  WHERE ctid IN (
+    SELECT ctid
+    FROM refresh_tokens
+    WHERE user_id = NEW.user_id
+    ORDER BY expires_on DESC
+    OFFSET 2
+  );
+RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
@@ -1,50 +1,142 @@
+import importlib.util
+from itertools import chain
 from fastapi import Depends, APIRouter, Request, HTTPException, Body
 from fastapi.requests import Request
+from fastapi.responses import StreamingResponse
 from fastapi_utils.cbv import cbv
 from src.repositories.activity_repository import activity_repository
-from src.models.activity import Activity, ActivityCreate, ActivityUpdate
-from src.deps import get_activity_repo
-from src.utils.pagination import paginate_results
+from src.repositories.async_activity_repository import async_activity_repository
+from src.models.activity import Activity, ActivityCreate, ActivityUpdate, ActivityImportError, ActivityImportResult, ActivityExportFormat
+from src.parsers.activity_import_parser import aiter_lines, iter_activity_import, ImportTooLargeError, NDJSON_CONTENT_TYPES, CSV_CONTENT_TYPES
+from src.parsers.activity_export_parser import iter_activity_export, EXPORT_MEDIA_TYPES
+from src.config import settings
+from src.deps import get_async_activity_repo, get_db_pool
+from src.utils.db_pool import PoolTimeoutError
+from src.utils.pagination import paginate_results, Cursor
+from src.utils.json_response import ModelJSONResponse
 from src.models.common import PaginationParams, ActivityQueryFilters
 
 router = APIRouter()
 
+# Outside ActivityController so the export doesn't check out an async pool connection it
+# never uses. Registered before the class, whose routes cbv appends afterwards, so
+# /activities/export is matched before /activities/{activity_id}.
+@router.get("/activities/export", status_code=200)
+def export_activities(request: Request, format: ActivityExportFormat = ActivityExportFormat.ndjson,
+                      filters: ActivityQueryFilters = Depends(), db_pool = Depends(get_db_pool)):
+    if format == ActivityExportFormat.parquet and importlib.util.find_spec("pyarrow") is None:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow, install the 'parquet' extra")
+    kennel_id = request.state.kennel_id
+
+    # the body is streamed after the route returns, so the export holds a pooled
+    # connection of its own until the generator is done
+    def activities():
+        with db_pool.connection() as conn:
+            yield from activity_repository(conn).iter_all(kennel_id, filters, settings.ACTIVITY_EXPORT_BATCH_SIZE)
+
+    # run the query before answering so a busy pool or a failing query still gets a status code
+    stream = activities()
+    try:
+        first = [next(stream)]
+    except StopIteration:
+        first = []
+    except PoolTimeoutError:
+        raise HTTPException(status_code=503, detail="Database busy, try again later")
+
+    return StreamingResponse(
+        iter_activity_export(chain(first, stream), format, settings.ACTIVITY_EXPORT_BATCH_SIZE),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="activities.{format.value}"'},
+    )
+
 @cbv(router)
 class ActivityController:
-    def __init__(self, activity_repo: activity_repository = Depends(get_activity_repo)):
+    def __init__(self, activity_repo: async_activity_repository = Depends(get_async_activity_repo)):
         self.repo = activity_repo
 
     @router.get("/activities", response_model=dict, status_code=200)
-    def list_activities(self, request: Request, pagination: PaginationParams = Depends(), filters: ActivityQueryFilters = Depends()):
+    async def list_activities(self, request: Request, pagination: PaginationParams = Depends(), filters: ActivityQueryFilters = Depends()):
         kennel_id = request.state.kennel_id
-        activities = self.repo.get_all(kennel_id, filters, pagination.limit, pagination.offset)
-        entry_count = self.repo.get_total_count(kennel_id, filters)
 
-        return paginate_results(activities, entry_count, request, pagination.limit, pagination.offset)
+        cursor, offset = None, pagination.offset
+        if pagination.cursor is not None:
+            try:
+                cursor = Cursor.decode(pagination.cursor) if pagination.cursor else None
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            offset = None
+
+        # without a total, fetch one extra row to know if there is another page
+        limit = pagination.limit
+        if offset is None or not pagination.include_total:
+            limit += 1
+
+        activities, entry_count = await self.repo.get_all_with_count(
+            kennel_id, filters, limit, offset or 0, cursor=cursor, include_total=pagination.include_total
+        )
+
+        return ModelJSONResponse(paginate_results(activities, entry_count, request, pagination.limit, offset, cursor))
     
     @router.get("/activities/{activity_id}", response_model=dict, status_code=200)
-    def get_activity_by_id(self, request: Request, activity_id:int):
-        activity = self.repo.get_by_id(activity_id)
-        return activity
+    async def get_activity_by_id(self, request: Request, activity_id:int):
+        activity = await self.repo.get_by_id(activity_id)
+        return ModelJSONResponse(activity)
     
     @router.post("/activities", status_code=201)
-    def create_activity(self, activity_entry: ActivityCreate):
-        activity_id = self.repo.create(activity_entry)
+    async def create_activity(self, activity_entry: ActivityCreate):
+        activity_id = await self.repo.create(activity_entry)
         if activity_id is None: 
             raise HTTPException(status_code=400, detail ='Bad request, activity could not be created')
         return {"id": activity_id}
     
+    @router.post("/activities/bulk", response_model=ActivityImportResult, status_code=200)
+    async def bulk_import_activities(self, request: Request):
+        """
+        Imports many activities from an NDJSON (one ActivityCreate per line) or CSV body.
+        Rows are validated as the body streams in, invalid rows are reported and skipped.
+        """
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type not in NDJSON_CONTENT_TYPES | CSV_CONTENT_TYPES:
+            raise HTTPException(status_code=415, detail="Bulk import expects application/x-ndjson or text/csv")
+
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > settings.ACTIVITY_IMPORT_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Bulk import is limited to {settings.ACTIVITY_IMPORT_MAX_BYTES} bytes")
+
+        # invalid rows count against the limit too, their errors are kept until the response
+        lines = aiter_lines(request.stream(), settings.ACTIVITY_IMPORT_MAX_LINE_BYTES, settings.ACTIVITY_IMPORT_MAX_BYTES)
+        valid, errors = [], []
+        try:
+            async for row, activity, error in iter_activity_import(lines, content_type):
+                if len(valid) + len(errors) >= settings.ACTIVITY_IMPORT_MAX_ROWS:
+                    raise HTTPException(status_code=413, detail=f"Bulk import is limited to {settings.ACTIVITY_IMPORT_MAX_ROWS} rows")
+                if error is not None:
+                    errors.append(ActivityImportError(row=row, error=error))
+                else:
+                    valid.append((row, activity))
+        except ImportTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+
+        result = await self.repo.bulk_create(request.state.kennel_id, valid)
+        if result is None:
+            raise HTTPException(status_code=400, detail="Bad request, activities could not be imported")
+        created, rejected = result
+
+        errors.extend(ActivityImportError(row=row, error=error) for row, error in rejected)
+        errors.sort(key=lambda e: e.row)
+        return ActivityImportResult(created=len(created), ids=[id for _, id in created], errors=errors)
+
     @router.put("/activities/{activity_id}", status_code=200)
-    def update_activity(self, request: Request, activity_id: int, activity_update: ActivityUpdate):
+    async def update_activity(self, request: Request, activity_id: int, activity_update: ActivityUpdate):
         updated_fields = activity_update.model_dump(exclude_none=True)
         print(not updated_fields)
         if not updated_fields:
             raise HTTPException(status_code=400, detail="No data to update")
 
-        self.repo.update(activity_id, updated_fields)
+        await self.repo.update(activity_id, updated_fields)
         return {"success": True}
 
     @router.delete("/activities/{activity_id}", status_code=200)
-    def delete_activity(self, activity_id: int):
-        self.repo.delete(activity_id)
+    async def delete_activity(self, activity_id: int):
+        await self.repo.delete(activity_id)
         return {"success": True}
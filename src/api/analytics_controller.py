@@ -1,22 +1,35 @@
 from fastapi import Depends, APIRouter, Request, HTTPException, Body, Query
 from fastapi.requests import Request
 from fastapi_utils.cbv import cbv
-from typing import List
-from src.repositories.analytics_repository import analytics_repository
-from src.models.analytics import WeeklyStats, WeeklyDogDistance, DogCalendarDay, AnalyticSummary, LocationHeatPoint, SportCount
+from typing import List, Optional
+from src.repositories.async_analytics_repository import async_analytics_repository
+from src.models.analytics import WeeklyStats, WeeklyDogDistance, DogCalendarDay, AnalyticSummary, LocationHeatPoint, SportCount, AnalyticsDashboard
 from src.models import Filter
-from src.deps import get_analytics_repo
+from src.deps import get_async_analytics_repo, get_analytics_cache
+from src.utils.response_cache import ResponseCacheBackend, cache_key
 from src.utils.calculation_helpers import get_month_range
+from src.utils.json_response import ModelJSONResponse
 from datetime import datetime, date
 router = APIRouter()
 
+# Outside AnalyticsController so reading the counters doesn't check out an async pool
+# connection it never uses
+@router.get("/cache/stats")
+def cache_stats(cache: ResponseCacheBackend = Depends(get_analytics_cache)):
+    """
+    Hit/miss counters of the analytics response cache (this worker only).
+    """
+    return cache.stats()
+
 @cbv(router)
 class AnalyticsController:
-    def __init__(self, analytics_repo: analytics_repository = Depends(get_analytics_repo)):
+    def __init__(self, analytics_repo: async_analytics_repository = Depends(get_async_analytics_repo),
+                 cache: ResponseCacheBackend = Depends(get_analytics_cache)):
         self.repo = analytics_repo
+        self.cache = cache
 
     @router.get("/weekly-stats", response_model=List[WeeklyStats])
-    def weekly_stats_route(
+    async def weekly_stats_route(
         self, request: Request,
         ts: datetime
     ):
@@ -25,11 +38,14 @@ class AnalyticsController:
         Return the latest weekly stats per dog, including distance, average rating, and trends.
         """
         kennel_id = request.state.kennel_id
-        return self.repo.get_weekly_stats(kennel_id, ts)
+        return ModelJSONResponse(await self.cache.aget_or_compute(
+            cache_key(kennel_id, "weekly-stats", ts=ts),
+            lambda: self.repo.get_weekly_stats(kennel_id, ts),
+        ))
 
     #does this need the kennel id?
     @router.get("/dog-calendar", response_model=List[DogCalendarDay])
-    def dog_calendar_route(
+    async def dog_calendar_route(
         self,
         request: Request,
         year: int = Query(..., ge=2000),
@@ -40,41 +56,73 @@ class AnalyticsController:
         """
         kennel_id = request.state.kennel_id
         start_date, end_date = get_month_range(year, month)
-        return self.repo.get_dog_running_per_day(start_date, end_date, kennel_id)
+        return ModelJSONResponse(await self.cache.aget_or_compute(
+            cache_key(kennel_id, "dog-calendar", year=year, month=month),
+            lambda: self.repo.get_dog_running_per_day(start_date, end_date, kennel_id),
+        ))
     
     @router.get("/summary", response_model=AnalyticSummary)
-    def summary_all_dogs(
+    async def summary_all_dogs(
         self,
         request: Request,
         filters: Filter = Depends()
     ):  
         kennel_id = request.state.kennel_id
-        return self.repo.get_analytic_summary_per_dog(filters, kennel_id)
+        return ModelJSONResponse(await self.cache.aget_or_compute(
+            cache_key(kennel_id, "summary", filters),
+            lambda: self.repo.get_analytic_summary_per_dog(filters, kennel_id),
+        ))
 
     @router.get("/activities/sport-distribution", response_model=list[SportCount])
-    def sport_distribution(
+    async def sport_distribution(
         self,
         request: Request,
         filters: Filter = Depends()
     ):
         kennel_id = request.state.kennel_id
-        return self.repo.get_sport_counts(filters, kennel_id)
+        return ModelJSONResponse(await self.cache.aget_or_compute(
+            cache_key(kennel_id, "sport-distribution", filters),
+            lambda: self.repo.get_sport_counts(filters, kennel_id),
+        ))
     
     @router.get("/activities/weekly-distance", response_model=list[WeeklyDogDistance])
-    def get_weekly_distance(
+    async def get_weekly_distance(
         self,
         request: Request,
         filters: Filter = Depends()
     ):
         kennel_id = request.state.kennel_id
-        return self.repo.get_weekly_mileage(filters, kennel_id)
+        return ModelJSONResponse(await self.cache.aget_or_compute(
+            cache_key(kennel_id, "weekly-distance", filters),
+            lambda: self.repo.get_weekly_mileage(filters, kennel_id),
+        ))
     
     @router.get("/activities/locations/heatmap", response_model = list[LocationHeatPoint])
-    def actitivities_heat_map(
+    async def actitivities_heat_map(
         self,
         request: Request,
         filters: Filter = Depends()
     ):
         kennel_id = request.state.kennel_id
-        return self.repo.get_activity_heat_map(filters, kennel_id)
-    
+        return ModelJSONResponse(await self.cache.aget_or_compute(
+            cache_key(kennel_id, "heatmap", filters),
+            lambda: self.repo.get_activity_heat_map(filters, kennel_id),
+        ))
+
+    @router.get("/dashboard", response_model=AnalyticsDashboard)
+    async def dashboard(
+        self,
+        request: Request,
+        filters: Filter = Depends(),
+        ts: Optional[datetime] = None
+    ):
+        """
+        Everything the dashboard shows (summary, weekly stats of the week containing ts,
+        sport distribution, weekly distance, heat map) read from one snapshot in one query.
+        """
+        kennel_id = request.state.kennel_id
+        anchor_ts = ts or datetime.combine(date.today(), datetime.min.time())
+        return ModelJSONResponse(await self.cache.aget_or_compute(
+            cache_key(kennel_id, "dashboard", filters, ts=anchor_ts),
+            lambda: self.repo.get_dashboard(filters, kennel_id, anchor_ts),
+        ))
@@ -2,6 +2,7 @@ from fastapi import Depends, APIRouter, Request, HTTPException
 from fastapi_utils.cbv import cbv
 from src.repositories.dog_repository import dog_repository
 from src.models.dog import Dog, DogUpdate
+from src.utils.json_response import RawJSONResponse
 from src.deps import (
     get_dog_repo
 )
@@ -16,7 +17,7 @@ class DogController:
     @router.get("/dogs", response_model=list[Dog])
     def list_dogs(self, request: Request):
         kennel_id = request.state.kennel_id
-        return self.repo.get_all(kennel_id)
+        return RawJSONResponse(self.repo.get_all_json(kennel_id))
 
     @router.post("/dogs")
     def create_dog(self, dog: Dog):
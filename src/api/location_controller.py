@@ -8,6 +8,7 @@ from src.deps import (
 )
 from psycopg2.errors import ForeignKeyViolation
 from src.repositories.location_repository import DuplicateLocationError
+from src.utils.json_response import RawJSONResponse
 
 router = APIRouter()
 
@@ -19,7 +20,7 @@ class LocationController:
     @router.get("/locations", response_model=list[Location])
     def list_location(self, request: Request, search: Optional[str] = None):
         kennel_id = request.state.kennel_id
-        return self.repo.get_all(kennel_id, search)
+        return RawJSONResponse(self.repo.get_all_json(kennel_id, search))
     
     @router.get("/locations/manage", response_model=list[LocationWithUsage])
     def list_location_with_usage(self, request: Request, search: Optional[str] = None):
@@ -2,6 +2,7 @@ from fastapi_utils.cbv import cbv
 from fastapi import APIRouter
 from src.repositories.runner_repository import runner_repository
 from src.models.runner import Runner
+from src.utils.json_response import RawJSONResponse
 from fastapi import Depends, Request
 from src.deps import (
     get_runner_repo
@@ -17,7 +18,7 @@ class RunnerController:
     @router.get("/runners", response_model=list[Runner])
     def list_runners(self, request: Request):
         kennel_id = request.state.kennel_id
-        return self.repo.get_all(kennel_id)
+        return RawJSONResponse(self.repo.get_all_json(kennel_id))
 
     @router.post("/runners")
     def create_runner(self, runner: Runner):
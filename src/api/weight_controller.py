@@ -6,6 +6,7 @@ from src.deps import (
     get_weight_repo
 )
 from src.models.common import WeightQueryFilter
+from src.utils.json_response import ModelJSONResponse
 
 router = APIRouter()
 
@@ -17,7 +18,7 @@ class WeightController:
     @router.get("/dogs/weights", response_model=list[DogWeightEntry])
     def list_dog_weight(self, request: Request, filters: WeightQueryFilter = Depends()):
         kennel_id= request.state.kennel_id
-        return self.repo.get_all(kennel_id, filters)
+        return ModelJSONResponse(self.repo.get_all(kennel_id, filters))
     
     @router.get("/dogs/weights/latest", response_model=list[DogWeightLatest])
     def get_latest_weights(self, request: Request):
@@ -13,6 +13,28 @@ class Settings(BaseSettings):
     AUTH_SERVICE_URL: str = "http://fastapi-auth:8001/auth"
     ALGORITHM: str = ""
     SECRET_KEY: str = ""
+    JWT_LOCAL_VERIFY: bool = True # decode tokens in-process with SECRET_KEY/ALGORITHM
+    JWT_REMOTE_FALLBACK: bool = False # ask the auth service when local decoding fails
+    JWT_CACHE_SIZE: int = 1024 # number of validated tokens kept until they expire
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_TIMEOUT: float = 5.0 # seconds to wait for a free connection
+    DB_POOL_HEALTH_CHECK_INTERVAL: float = 30.0 # ping connections idle for longer than this
+    DB_ASYNC_POOL_MAX_SIZE: int = 20 # connections shared by the async routes of one worker
+    ACTIVITY_IMPORT_MAX_ROWS: int = 10000 # rows accepted by POST /activities/bulk, invalid ones included
+    ACTIVITY_IMPORT_MAX_BYTES: int = 50_000_000 # body size accepted by POST /activities/bulk
+    ACTIVITY_IMPORT_MAX_LINE_BYTES: int = 1_000_000 # longest line accepted by POST /activities/bulk
+    ACTIVITY_EXPORT_BATCH_SIZE: int = 1000 # rows per server-side cursor fetch / parquet row group
+    ANALYTICS_CACHE_SIZE: int = 1024 # cached /analytics responses per worker, 0 disables the cache
+    ANALYTICS_CACHE_TTL: float = 300.0 # seconds a cached /analytics response is served
+    SERVER_TIMING_ENABLED: bool = True # add a Server-Timing header (total/db time, query count) to responses
+    PREPARED_STATEMENT_CACHE_SIZE: int = 64 # server-side prepared statements kept per connection for the hot queries, 0 disables them
+    SLOW_QUERY_THRESHOLD_MS: float = 500.0 # statements slower than this go to the slow query log, 0 disables it
+    SLOW_QUERY_LOG_PATH: str = "logs/slow_queries.log" # JSON lines, rotated at SLOW_QUERY_LOG_MAX_BYTES
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10_000_000
+    SLOW_QUERY_LOG_BACKUPS: int = 5 # rotated files kept
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1 # share of slow statements re-run under EXPLAIN (ANALYZE, BUFFERS)
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 10000 # statement_timeout of the EXPLAIN ANALYZE runs
     model_config = SettingsConfigDict(extra="ignore")
         
 settings = Settings()
\ No newline at end of file
@@ -10,14 +10,38 @@ from src.repositories import (
     sport_repository,
     comment_repository,
     analytics_repository,
-    location_repository
+    location_repository,
+    async_activity_repository,
+    async_analytics_repository,
 )
 from .config import settings
+from .utils.db_pool import PoolTimeoutError
+from .utils.async_db_pool import PoolTimeout
+from .utils.response_cache import ResponseCacheBackend, get_response_cache
+from .utils.token_verifier import TokenVerifier, InvalidTokenError
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="http://localhost:8001/auth/token")
 
 def get_db(request: Request):
-    return request.app.state.db
+    # one pooled connection per request, returned (and rolled back if left dirty) once the request is done
+    try:
+        with request.app.state.db_pool.connection() as conn:
+            yield conn
+    except PoolTimeoutError:
+        raise HTTPException(status_code=503, detail="Database busy, try again later")
+
+async def get_async_db(request: Request):
+    # async routes borrow from the psycopg 3 pool; the transaction is committed when the
+    # request succeeds and rolled back if it raised
+    try:
+        async with request.app.state.async_db_pool.connection() as conn:
+            yield conn
+    except PoolTimeout:
+        raise HTTPException(status_code=503, detail="Database busy, try again later")
+
+def get_db_pool(request: Request):
+    # for responses that outlive the request scope (streaming), which borrow their own connection
+    return request.app.state.db_pool
 
 def get_dog_repo(db=Depends(get_db)):
     return dog_repository(db)
@@ -31,6 +55,9 @@ def get_weight_repo(db=Depends(get_db)):
 def get_activity_repo(db=Depends(get_db)):
     return activity_repository(db)
 
+def get_async_activity_repo(db=Depends(get_async_db)):
+    return async_activity_repository(db)
+
 def get_sport_repo(db=Depends(get_db)):
     return sport_repository(db)
 
@@ -40,20 +67,64 @@ def get_comment_repo(db=Depends(get_db)):
 def get_analytics_repo(db=Depends(get_db)):
     return analytics_repository(db)
 
+def get_async_analytics_repo(db=Depends(get_async_db)):
+    return async_analytics_repository(db)
+
 def get_location_repo(db=Depends(get_db)):
     return location_repository(db)
 
+def get_analytics_cache() -> ResponseCacheBackend:
+    # shared with the repositories, which invalidate a kennel's entries on writes
+    return get_response_cache()
+
+_token_verifier: TokenVerifier | None = None
+_auth_client: httpx.AsyncClient | None = None
+
+def get_token_verifier() -> TokenVerifier | None:
+    global _token_verifier
+    if _token_verifier is None and settings.SECRET_KEY and settings.ALGORITHM:
+        _token_verifier = TokenVerifier(settings.SECRET_KEY, settings.ALGORITHM, settings.JWT_CACHE_SIZE)
+    return _token_verifier
+
+def get_auth_client() -> httpx.AsyncClient:
+    # reuse one client so remote validation keeps its TCP/TLS connections alive
+    global _auth_client
+    if _auth_client is None or _auth_client.is_closed:
+        _auth_client = httpx.AsyncClient(base_url=settings.AUTH_SERVICE_URL)
+    return _auth_client
+
+async def close_auth_client():
+    global _auth_client
+    if _auth_client is not None:
+        await _auth_client.aclose()
+        _auth_client = None
+
+async def validate_token_remote(token: str) -> dict:
+    try:
+        res = await get_auth_client().post("/validate", json={"token": token})
+        res.raise_for_status()
+        return res.json()
+    except httpx.HTTPStatusError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    except httpx.RequestError:
+        raise HTTPException(status_code=503, detail="Authentication service unavailable")
+
 async def verify_jwt(request: Request, token: str = Depends(oauth2_scheme)):
     if not token:
         raise HTTPException(status_code=401, detail="Missing token")
 
-    try:
-        async with httpx.AsyncClient() as client:
-            res = await client.post(f"{settings.AUTH_SERVICE_URL}/validate", json={"token": token})
-            res.raise_for_status()
-            payload = res.json()
-            request.state.kennel_id = payload["kennel_id"]
-            request.state.user_id = payload["user_id"]
-            return res.json()
-    except httpx.HTTPStatusError:
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+    payload = None
+    verifier = get_token_verifier() if settings.JWT_LOCAL_VERIFY else None
+    if verifier is not None:
+        try:
+            payload = verifier.verify(token)
+        except InvalidTokenError:
+            if not settings.JWT_REMOTE_FALLBACK:
+                raise HTTPException(status_code=401, detail="Invalid token")
+
+    if payload is None:
+        payload = await validate_token_remote(token)
+
+    request.state.kennel_id = payload["kennel_id"]
+    request.state.user_id = payload["user_id"]
+    return payload
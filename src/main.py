@@ -1,7 +1,8 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .utils.db import get_connection
+from .utils.db_pool import create_pool
+from .utils.async_db_pool import create_async_pool
 from src.api.dog_controller import router as dog_router
 from src.api.runner_controller import router as runner_router
 from src.api.activity_controller import router as activity_router
@@ -10,14 +11,27 @@ from src.api.sport_controller import router as sport_router
 from src.api.comment_controller import router as comment_router
 from src.api.analytics_controller import router as analytics_router
 from src.api.location_controller import router as location_router
-from src.deps import verify_jwt
+from src.api.metrics_controller import router as metrics_router
+from src.deps import verify_jwt, close_auth_client
+from src.config import settings
+from src.utils.timing_middleware import TimingMiddleware
+from src.utils.slow_query_log import close_slow_query_log
+from src.utils.metrics import observe_pool
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    db_conn = get_connection()
-    app.state.db = db_conn
+    db_pool = create_pool()
+    app.state.db_pool = db_pool
+    observe_pool(db_pool)
+    async_db_pool = create_async_pool()
+    await async_db_pool.open()
+    app.state.async_db_pool = async_db_pool
     yield  # app runs
-    db_conn.close()
+    await async_db_pool.close()
+    observe_pool(None)
+    db_pool.close()
+    await close_auth_client()
+    close_slow_query_log()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -36,6 +50,8 @@ app.add_middleware(
     allow_methods=["*"],             # allow all HTTP methods
     allow_headers=["*"],             # allow all headers
 )
+# outermost, so the recorded latency covers the whole stack
+app.add_middleware(TimingMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
 
 
 app.include_router(dog_router, tags=["Dogs"], dependencies=[Depends(verify_jwt)])
@@ -46,3 +62,4 @@ app.include_router(weight_router, tags=["Weights"], dependencies=[Depends(verify
 app.include_router(location_router, tags=["Locations"], dependencies=[Depends(verify_jwt)])
 app.include_router(comment_router, tags = ["Comments"], dependencies=[Depends(verify_jwt)])
 app.include_router(analytics_router, tags = ["Analytics"], prefix="/analytics", dependencies=[Depends(verify_jwt)])
+app.include_router(metrics_router, tags = ["Metrics"])
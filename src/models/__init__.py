@@ -1,7 +1,7 @@
 from .kennel import Kennel
 from .dog import Dog
 from .runner import Runner
-from .activity import Activity, ActivityLaps, ActivityDogs, ActivityCreate, ActivityDogsCreate, ActivityUpdate
+from .activity import Activity, ActivityLaps, ActivityDogs, ActivityCreate, ActivityDogsCreate, ActivityUpdate, ActivityImportError, ActivityImportResult, ActivityExportFormat
 from .sport import Sport, SportType
 from .dog_weight import DogWeightEntry, DogWeightUpdate, DogWeightIn, DogWeightLatest
 from .weather import Weather
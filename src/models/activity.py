@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime, timedelta
 from typing import Optional, List
+from enum import Enum
 from .runner import Runner
 from .sport import Sport
 from .dog import Dog
@@ -45,10 +46,10 @@ class Activity(BaseModel):
     
 class ActivityLaps(BaseModel):
     lap_number: int
-    lap_distance: float
+    lap_distance: float = Field(..., gt=0)
     lap_time: Optional[str] = None
     lap_time_delta: Optional[timedelta] = None
-    speed: Optional[float] = Field(None, description="Speed in km per hours")
+    speed: Optional[float] = Field(None, description="Speed in km per hours", gt=0)
     pace: Optional[str] = Field(None, description="Pace in min per km")
 
     @model_validator(mode='after')
@@ -67,6 +68,10 @@ class ActivityLaps(BaseModel):
             values.lap_time_delta = ch.convert_str_time_to_timedelta(lap_time)
             lap_time_delta = values.lap_time_delta
 
+        # speeds and paces are derived by dividing by it
+        if lap_time_delta is not None and lap_time_delta.total_seconds() <= 0:
+            raise ValueError("Lap time must be greater than 0")
+
         # Derive lap_time if missing
         if lap_time is None and lap_time_delta is not None:
             total_seconds = int(lap_time_delta.total_seconds())
@@ -154,4 +159,26 @@ class ActivityDogs(BaseModel):
 class ActivityDogsCreate(BaseModel):
     id: Optional[int] = None
     dog_id: int
-    rating: Optional[int] = Field(None, description="Training rating out of 10", ge=0, le=10)
\ No newline at end of file
+    rating: Optional[int] = Field(None, description="Training rating out of 10", ge=0, le=10)
+
+class ActivityImportError(BaseModel):
+    row: int = Field(..., description="line number in the uploaded file")
+    error: str
+
+class ActivityImportResult(BaseModel):
+    created: int = Field(0, description="number of activities inserted")
+    ids: List[int] = Field(default_factory=list, description="ids of the inserted activities, in upload order")
+    errors: List[ActivityImportError] = Field(default_factory=list, description="rows that were skipped")
+
+class ActivityExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+    parquet = "parquet"
+
+
+# ActivityDogs and ActivityDogsCreate are defined after the models listing them: complete
+# those now rather than on their first validation, activities read from the database are
+# constructed without one (see parsers.construct) and could not be serialized before
+Activity.model_rebuild()
+ActivityCreate.model_rebuild()
+ActivityUpdate.model_rebuild()
@@ -2,4 +2,5 @@ from .summary import AnalyticSummary, AnalyticSummaryDog
 from .weekly_stats import WeeklyStats, Trend, WeeklyDogDistance
 from .dog_calendar_day import DogCalendarDay
 from .maps import LocationHeatPoint
-from .sports import MostPracticedSport, SportCount
\ No newline at end of file
+from .sports import MostPracticedSport, SportCount
+from .dashboard import AnalyticsDashboard
\ No newline at end of file
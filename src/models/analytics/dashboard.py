@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List
+from .summary import AnalyticSummary
+from .weekly_stats import WeeklyStats, WeeklyDogDistance
+from .sports import SportCount
+from .maps import LocationHeatPoint
+
+class AnalyticsDashboard(BaseModel):
+    summary: AnalyticSummary
+    weekly_stats: List[WeeklyStats]
+    sport_distribution: List[SportCount]
+    weekly_distance: List[WeeklyDogDistance]
+    heatmap: List[LocationHeatPoint]
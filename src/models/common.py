@@ -6,6 +6,8 @@ from datetime import date
 class PaginationParams(BaseModel):
     limit: int = Field(10, gt=0, le=20)
     offset: int = Field(0, ge=0)
+    cursor: Optional[str] = Field(None, description="Opaque keyset cursor, switches listing to cursor mode (empty value for the first page)")
+    include_total: bool = Field(True, description="Set to false to skip counting matching entries (infinite scroll)")
 
 class Filter(BaseModel):
     start_date: Optional[date] = Query( default = None)
@@ -0,0 +1,148 @@
+import csv
+import io
+from typing import Iterable, Iterator
+from src.models.activity import Activity, ActivityExportFormat
+
+EXPORT_MEDIA_TYPES = {
+    ActivityExportFormat.ndjson: "application/x-ndjson",
+    ActivityExportFormat.csv: "text/csv",
+    ActivityExportFormat.parquet: "application/vnd.apache.parquet",
+}
+
+# the import columns first so an exported CSV can be posted back to /activities/bulk
+EXPORT_CSV_COLUMNS = [
+    "id", "timestamp", "runner_id", "sport_id", "location_id", "distance", "workout",
+    "speed", "pace", "dogs", "laps", "temperature", "humidity", "condition",
+    "runner_name", "sport_name", "location", "comment_count",
+]
+
+def activity_to_record(activity: Activity) -> dict:
+    weather = activity.weather
+    return {
+        "id": activity.id,
+        "timestamp": activity.timestamp,
+        "runner_id": activity.runner.id,
+        "runner_name": activity.runner.name,
+        "sport_id": activity.sport.id,
+        "sport_name": activity.sport.name,
+        "location_id": activity.location.id,
+        "location": activity.location.name,
+        "distance": activity.distance,
+        "workout": activity.workout,
+        "speed": activity.speed,
+        "pace": activity.pace,
+        "dogs": [{"dog_id": d.dog.id, "name": d.dog.name, "rating": d.rating} for d in activity.dogs],
+        "laps": [
+            {"lap_number": lap.lap_number, "lap_distance": lap.lap_distance, "lap_time": lap.lap_time_delta, "speed": lap.speed}
+            for lap in activity.laps or []
+        ],
+        "temperature": weather.temperature if weather else None,
+        "humidity": weather.humidity if weather else None,
+        "condition": weather.condition if weather else None,
+        "comment_count": activity.comment_count,
+    }
+
+def activity_to_csv_row(activity: Activity) -> list:
+    record = activity_to_record(activity)
+    record["timestamp"] = activity.timestamp.isoformat()
+    record["workout"] = "true" if activity.workout else "false"
+    # same packing as the bulk import: "dog_id:rating;..." and "distance@mm:ss;..."
+    record["dogs"] = ";".join(f"{d['dog_id']}:{'' if d['rating'] is None else d['rating']}" for d in record["dogs"])
+    record["laps"] = ";".join(f"{lap.lap_distance}@{lap.lap_time}" for lap in activity.laps or [])
+    return ["" if record[column] is None else record[column] for column in EXPORT_CSV_COLUMNS]
+
+def iter_ndjson(activities: Iterable[Activity]) -> Iterator[bytes]:
+    for activity in activities:
+        yield activity.model_dump_json().encode() + b"\n"
+
+def iter_csv(activities: Iterable[Activity]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    for activity in activities:
+        writer.writerow(activity_to_csv_row(activity))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+class _ParquetSink:
+    """Write-only file object that hands back what was written so far, tell() keeps counting."""
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def parquet_schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("id", pa.int64()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("runner_id", pa.int64()),
+        ("runner_name", pa.string()),
+        ("sport_id", pa.int64()),
+        ("sport_name", pa.string()),
+        ("location_id", pa.int64()),
+        ("location", pa.string()),
+        ("distance", pa.float64()),
+        ("workout", pa.bool_()),
+        ("speed", pa.float64()),
+        ("pace", pa.string()),
+        ("dogs", pa.list_(pa.struct([("dog_id", pa.int64()), ("name", pa.string()), ("rating", pa.int64())]))),
+        ("laps", pa.list_(pa.struct([
+            ("lap_number", pa.int64()), ("lap_distance", pa.float64()), ("lap_time", pa.duration("us")), ("speed", pa.float64()),
+        ]))),
+        ("temperature", pa.float64()),
+        ("humidity", pa.float64()),
+        ("condition", pa.string()),
+        ("comment_count", pa.int64()),
+    ])
+
+def iter_parquet(activities: Iterable[Activity], row_group_size: int = 1000) -> Iterator[bytes]:
+    """One row group per row_group_size activities, only one group is held in memory."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    batch = []
+    for activity in activities:
+        batch.append(activity_to_record(activity))
+        if len(batch) >= row_group_size:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            batch.clear()
+            yield sink.drain()
+    if batch:
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+def iter_activity_export(activities: Iterable[Activity], format: ActivityExportFormat, batch_size: int = 1000) -> Iterator[bytes]:
+    if format == ActivityExportFormat.csv:
+        return iter_csv(activities)
+    if format == ActivityExportFormat.parquet:
+        return iter_parquet(activities, batch_size)
+    return iter_ndjson(activities)
@@ -0,0 +1,195 @@
+import csv
+import json
+import math
+from datetime import timedelta
+from typing import AsyncIterator, Optional
+from src.models.activity import ActivityCreate
+import src.utils.calculation_helpers as ch
+
+from pydantic import ValidationError
+
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonlines"}
+CSV_CONTENT_TYPES = {"text/csv"}
+
+# CSV has one activity per line, nested lists are packed in a single cell:
+#   dogs: "dog_id:rating;dog_id:rating"            e.g. "1:9;2:8"
+#   laps: "lap_distance@lap_time;..." in lap order e.g. "1@02:51;1@02:59"
+# temperature / humidity / condition columns form the weather entry when one of them is set.
+CSV_COLUMNS = [
+    "timestamp", "runner_id", "sport_id", "location_id", "distance", "workout",
+    "speed", "pace", "dogs", "laps", "temperature", "humidity", "condition",
+]
+
+# rows whose derived speeds and paces are computed together before validation
+IMPORT_BATCH_SIZE = 500
+
+def parse_ndjson_record(line: str) -> dict:
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("each line must be a JSON object")
+    return record
+
+def parse_csv_record(row: dict) -> dict:
+    record = {key: value for key, value in row.items() if key in CSV_COLUMNS and value not in (None, "")}
+
+    if "workout" in record:
+        record["workout"] = record["workout"].strip().lower() in ("true", "1", "yes")
+
+    dogs = record.pop("dogs", "")
+    record["dogs"] = []
+    for entry in filter(None, (e.strip() for e in dogs.split(";"))):
+        dog_id, _, rating = entry.partition(":")
+        record["dogs"].append({"dog_id": dog_id, "rating": rating or None})
+
+    laps = record.pop("laps", "")
+    record["laps"] = []
+    for number, entry in enumerate(filter(None, (e.strip() for e in laps.split(";"))), start=1):
+        lap_distance, _, lap_time = entry.partition("@")
+        record["laps"].append({"lap_number": number, "lap_distance": lap_distance, "lap_time": lap_time or None})
+
+    weather = {key: record.pop(key) for key in ("temperature", "humidity", "condition") if key in record}
+    if weather:
+        record["weather"] = weather
+    return record
+
+def derive_import_fields(records: list[dict]) -> None:
+    """
+    Fills in, for many import records at once, what ActivityLaps and ActivityCreate
+    validation would derive one value at a time (calculation_helpers batch functions):
+    a lap's duration, speed and pace from its time and distance, an activity's pace
+    from its speed or its speed from its pace. Only values the validators would compute
+    the same way are set, missing or malformed ones are left for validation to report.
+    """
+    laps = [
+        lap
+        for record in records if isinstance(record.get("laps"), list)
+        for lap in record["laps"]
+        if isinstance(lap, dict) and isinstance(lap.get("lap_time"), str)
+        and all(lap.get(key) is None for key in ("lap_time_delta", "speed", "pace"))
+    ]
+    seconds = ch.convert_str_times_to_seconds(lap["lap_time"] for lap in laps)
+    speeds = ch.calculate_speeds_from_time_distance(ch.to_float_array(lap.get("lap_distance") for lap in laps), seconds)
+    paces = ch.calculate_paces_from_speeds(speeds)
+    for lap, lap_seconds, speed, pace in zip(laps, seconds.tolist(), speeds.tolist(), paces.tolist()):
+        if math.isfinite(speed) and pace is not None:
+            lap.update(lap_time_delta=timedelta(seconds=lap_seconds), speed=speed, pace=pace)
+
+    with_speed = [record for record in records if record.get("speed") is not None and record.get("pace") is None]
+    speeds = ch.to_float_array(record["speed"] for record in with_speed)
+    for record, speed, pace in zip(with_speed, speeds.tolist(), ch.calculate_paces_from_speeds(speeds).tolist()):
+        if math.isfinite(speed) and pace is not None:
+            record["pace"] = pace
+
+    with_pace = [record for record in records if record.get("speed") is None and isinstance(record.get("pace"), str)]
+    speeds = ch.calculate_speeds_from_paces(ch.convert_str_times_to_seconds(record["pace"] for record in with_pace))
+    for record, speed in zip(with_pace, speeds.tolist()):
+        if math.isfinite(speed):
+            record["speed"] = speed
+
+def parse_activity_import_record(record: dict) -> ActivityCreate:
+    return ActivityCreate(**record)
+
+def validate_import_batch(batch: list[tuple[int, Optional[dict], Optional[str]]]):
+    """(row, activity, error) of (row, record, error) pairs, in order, derived fields computed together."""
+    derive_import_fields([record for _, record, _ in batch if record is not None])
+    for row_number, record, error in batch:
+        if record is None:
+            yield row_number, None, error
+            continue
+        try:
+            yield row_number, parse_activity_import_record(record), None
+        except (ValueError, ValidationError) as e:
+            yield row_number, None, format_import_error(e)
+
+def format_import_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'activity'}: {err['msg']}" for err in error.errors()
+        )
+    return str(error)
+
+async def iter_activity_import(lines: AsyncIterator[str], content_type: str, batch_size: int = IMPORT_BATCH_SIZE) -> AsyncIterator[tuple[int, Optional[ActivityCreate], Optional[str]]]:
+    """
+    Validates an NDJSON or CSV import, `batch_size` lines at a time.
+    Yields (row, activity, None) for valid rows and (row, None, error) otherwise,
+    row being the 1-based line number in the upload (the CSV header is line 1).
+    """
+    header = None
+    batch = []
+    async for row_number, line in _aiter_rows(lines, content_type):
+        try:
+            if line is None:
+                raise ValueError("unterminated quoted field")
+            if content_type in CSV_CONTENT_TYPES:
+                values = next(csv.reader([line]))
+                if header is None:
+                    header = [column.strip() for column in values]
+                    continue
+                record = parse_csv_record(dict(zip(header, values)))
+            else:
+                record = parse_ndjson_record(line)
+            batch.append((row_number, record, None))
+        except (ValueError, ValidationError) as e:
+            batch.append((row_number, None, format_import_error(e)))
+        if len(batch) >= batch_size:
+            for result in validate_import_batch(batch):
+                yield result
+            batch = []
+    for result in validate_import_batch(batch):
+        yield result
+
+async def _aiter_rows(lines: AsyncIterator[str], content_type: str) -> AsyncIterator[tuple[int, Optional[str]]]:
+    """
+    (row, text) of the non-blank rows of an import, row being the line the row starts on.
+    A quoted CSV field can hold newlines, so a CSV row goes on while its quotes are
+    unbalanced; one still open at the end of the body is yielded with text None.
+    """
+    csv_rows = content_type in CSV_CONTENT_TYPES
+    parts, start, quotes = [], 0, 0
+    row_number = 0
+    async for line in lines:
+        row_number += 1
+        if not parts:
+            if not line.strip():
+                continue
+            start = row_number
+        parts.append(line)
+        if csv_rows:
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+        yield start, "\n".join(parts)
+        parts, quotes = [], 0
+    if parts:
+        yield start, None
+
+class ImportTooLargeError(Exception):
+    pass
+
+async def aiter_lines(chunks: AsyncIterator[bytes], max_line_bytes: Optional[int] = None, max_body_bytes: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    Splits a streamed request body into decoded lines without reading it whole. Only the
+    chunk just received is split, the unterminated line before it is kept as pieces, so
+    the work stays linear however long the lines are. Raises ImportTooLargeError on a
+    line longer than `max_line_bytes` or a body longer than `max_body_bytes`.
+    """
+    pending, pending_size, body_size = [], 0, 0
+    async for chunk in chunks:
+        body_size += len(chunk)
+        if max_body_bytes is not None and body_size > max_body_bytes:
+            raise ImportTooLargeError(f"Bulk import is limited to {max_body_bytes} bytes")
+        *lines, tail = chunk.split(b"\n")
+        if lines and pending:
+            lines[0] = b"".join(pending) + lines[0]
+            pending, pending_size = [], 0
+        for line in lines:
+            if max_line_bytes is not None and len(line) > max_line_bytes:
+                raise ImportTooLargeError(f"Bulk import lines are limited to {max_line_bytes} bytes")
+            yield line.decode("utf-8-sig").rstrip("\r")
+        if tail:
+            pending.append(tail)
+            pending_size += len(tail)
+            if max_line_bytes is not None and pending_size > max_line_bytes:
+                raise ImportTooLargeError(f"Bulk import lines are limited to {max_line_bytes} bytes")
+    if pending:
+        yield b"".join(pending).decode("utf-8-sig").rstrip("\r")
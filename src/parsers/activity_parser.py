@@ -6,7 +6,11 @@ from src.models.sport import Sport, SportType
 from src.models.weather import Weather
 from src.models.location import Location
 from .dog_parser import parse_dog_from_row
+from .construct import construct
+import src.utils.calculation_helpers as ch
 
+import numpy as np
+from datetime import date, timedelta
 from pydantic import ValidationError
 
 def parse_activity_from_row(row: dict) -> Dog:
@@ -40,7 +44,7 @@ def parse_activity_from_row(row: dict) -> Dog:
     return Activity(
         id=row['id'],
         timestamp=row['timestamp'],
-        sport=Sport(name = row['sport_name'], type=SportType(row['sport_type'])),
+        sport=Sport(id = row.get('sport_id'), name = row['sport_name'], type=SportType(row['sport_type'])),
         runner=Runner(name=row['runner_name'], id = row["runner_id"]),
         weather = weather,
         location = Location(id = row['location_id'], name = row['location']),
@@ -50,4 +54,96 @@ def parse_activity_from_row(row: dict) -> Dog:
         laps = laps,
         dogs = dogs,
         comment_count=row['comment_count']
-    )
\ No newline at end of file
+    )
+
+def _optional(values) -> list:
+    # NaN (missing) as None
+    return [None if value != value else value for value in values.tolist()]
+
+def parse_activities_from_records(records) -> list[Activity]:
+    """
+    parse_activity_from_row for rows of ACTIVITY_HYDRATION_QUERY read as named tuples.
+    The values were validated when they were written, so the models are constructed
+    without validation (see construct), only the derived fields are computed: lap time
+    strings, lap speeds missing from the row and the paces, for all the laps and
+    activities of the rows at once (calculation_helpers batch functions). A workout
+    stored without laps is returned as is rather than rejected.
+    """
+    laps = [lap for record in records for lap in record.laps or ()]
+    # lap times come as seconds, truncated like the 'MM:SS' string speeds are derived from
+    lap_seconds = np.trunc(ch.to_float_array(lap['lap_time'] for lap in laps))
+    lap_distances = ch.to_float_array(lap['lap_distance'] for lap in laps)
+    lap_speeds = ch.to_float_array(lap['speed'] for lap in laps)
+    lap_speeds = np.where(np.isnan(lap_speeds), ch.calculate_speeds_from_time_distance(lap_distances, lap_seconds), lap_speeds)
+    lap_values = iter(zip(
+        [None if seconds != seconds else timedelta(seconds=seconds) for seconds in lap_seconds.tolist()],
+        ch.format_lap_times(lap_seconds),
+        lap_distances.tolist(),
+        _optional(lap_speeds),
+        ch.calculate_paces_from_speeds(lap_speeds).tolist(),
+    ))
+
+    speeds = [float(record.speed or 0) for record in records]
+    paces = ch.calculate_paces_from_speeds(speeds).tolist()
+
+    activities = []
+    for record, speed, pace in zip(records, speeds, paces):
+        activity_laps = []
+        for lap in record.laps or ():
+            lap_time_delta, lap_time, lap_distance, lap_speed, lap_pace = next(lap_values)
+            activity_laps.append(construct(
+                ActivityLaps,
+                lap_number=lap['lap_number'],
+                lap_distance=lap_distance,
+                lap_time=lap_time,
+                lap_time_delta=lap_time_delta,
+                speed=lap_speed,
+                pace=lap_pace
+            ))
+        activities.append(_activity_from_record(record, speed, pace, activity_laps))
+    return activities
+
+def parse_activity_from_record(record) -> Activity:
+    """parse_activities_from_records for a single row."""
+    return parse_activities_from_records([record])[0]
+
+def _activity_from_record(record, speed: float, pace, laps: list) -> Activity:
+    kennel = construct(Kennel, id=record.kennel_id, name=record.kennel_name)
+    dogs = [
+        construct(
+            ActivityDogs,
+            dog=construct(
+                Dog,
+                id=dog['id'],
+                name=dog['name'],
+                breed=dog['breed'],
+                color=dog.get('color') or "#ffffff",
+                date_of_birth=date.fromisoformat(dog['date_of_birth']),
+                kennel=kennel,
+                image_url=dog.get('image_url') or ""
+            ),
+            rating=dog['rating']
+        )
+        for dog in record.dogs
+    ]
+
+    weather = None
+    if record.temperature is not None or record.humidity is not None:
+        weather = construct(Weather, temperature=record.temperature, humidity=record.humidity, condition=record.condition)
+
+    return construct(
+        Activity,
+        id=record.id,
+        timestamp=record.timestamp,
+        sport=construct(Sport, id=record.sport_id, name=record.sport_name, type=SportType(record.sport_type)),
+        runner=construct(Runner, name=record.runner_name, id=record.runner_id),
+        weather=weather,
+        location=construct(Location, id=record.location_id, name=record.location),
+        distance=record.distance,
+        speed=speed,
+        pace=pace,
+        workout=record.workout,
+        laps=laps,
+        dogs=dogs,
+        comment_count=record.comment_count
+    )
@@ -2,8 +2,11 @@ from pydantic import ValidationError
 from collections import defaultdict
 from src.models.analytics import WeeklyStats, DogCalendarDay, AnalyticSummaryDog, AnalyticSummary
 from datetime import date
+from .construct import construct
 
 def parse_weekly_stats(rows: list[dict]) -> list[WeeklyStats]:
+    # validated: rows come from the database or from the dashboard's json (dates as
+    # text), and the model validator derives the trends; there are two per dog at most
     latest_by_dog = {}
 
     for row in rows:
@@ -19,7 +22,7 @@ def parse_dog_calendar(rows: list[dict]) -> list[DogCalendarDay]:
         grouped[row["date"]].add(row["dog_id"])
 
     return [
-        DogCalendarDay(date=dt, dog_ids=sorted(dog_ids))
+        construct(DogCalendarDay, date=dt, dog_ids=sorted(dog_ids))
         for dt, dog_ids in sorted(grouped.items())
     ]
 
@@ -41,13 +44,15 @@ def parse_summary_from_rows(rows: list[dict], weeks: float) -> AnalyticSummary:
     avg_frequency_global = total_sessions / weeks
     avg_rating_global = (rating_sum_total / total_sessions) if total_sessions else 0.0
 
-    return AnalyticSummary(
-        total_distance_km=total_distance,
-        total_duration_hours=total_duration,
-        avg_frequency_per_week=avg_frequency_global,
-        avg_rating=avg_rating_global,
+    # every value is computed here from typed rows, nothing left to validate
+    return construct(
+        AnalyticSummary,
+        total_distance_km=float(total_distance),
+        total_duration_hours=float(total_duration),
+        avg_frequency_per_week=float(avg_frequency_global),
+        avg_rating=float(avg_rating_global),
         per_dog=per_dog,
-        time_since_last_training= time_since_last_training
+        time_since_last_training= float(time_since_last_training)
     )   
 
 def parse_dog_summary_from_row(r: dict, weeks: float) -> AnalyticSummaryDog:
@@ -55,14 +60,15 @@ def parse_dog_summary_from_row(r: dict, weeks: float) -> AnalyticSummaryDog:
     avg_rating = (r['rating_sum']/ r['session_count']) if r['session_count'] else 0.0
     time_since_last_training = (date.today() - r['max_date'].date()).days
 
-    return AnalyticSummaryDog(
+    return construct(
+        AnalyticSummaryDog,
         dog_id=r['dog_id'],
         name=r['name'],
-        total_distance_km=r['total_distance_km'],
-        total_duration_hours=r['total_duration_hours'],
-        avg_frequency_per_week=avg_freq,
-        avg_rating=avg_rating,
-        time_since_last_training=time_since_last_training
+        total_distance_km=float(r['total_distance_km']),
+        total_duration_hours=float(r['total_duration_hours']),
+        avg_frequency_per_week=float(avg_freq),
+        avg_rating=float(avg_rating),
+        time_since_last_training=float(time_since_last_training)
     )
 
     
\ No newline at end of file
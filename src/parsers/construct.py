@@ -0,0 +1,33 @@
+import functools
+from typing import TypeVar
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+# BaseModel's slots, set directly as object.__setattr__ would (BaseModel.__setattr__ validates)
+_set_fields_set = BaseModel.__dict__["__pydantic_fields_set__"].__set__
+_set_extra = BaseModel.__dict__["__pydantic_extra__"].__set__
+_set_private = BaseModel.__dict__["__pydantic_private__"].__set__
+
+@functools.cache
+def _defaults(model: type[BaseModel]) -> dict:
+    # every field in declaration order (the order they are dumped in), None when it
+    # has no plain default
+    return {
+        name: None if field.default_factory is not None or field.is_required() else field.default
+        for name, field in model.model_fields.items()
+    }
+
+def construct(model: type[M], **values) -> M:
+    """
+    Model instance from trusted values (database rows), like model.model_construct(**values)
+    but without its per-field loop (aliases, defaults, fields_set), which in pydantic 2
+    costs about as much as validating. Nothing is checked or converted and no validator
+    runs. Fields not given take their plain default: pass the default_factory ones.
+    """
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", {**_defaults(model), **values})
+    _set_fields_set(instance, set(values))
+    _set_extra(instance, None)
+    _set_private(instance, None)
+    return instance
@@ -1,5 +1,6 @@
 from src.models.dog import Dog
 from src.models.kennel import Kennel
+from .construct import construct
 
 def parse_dog_from_row(row: dict) -> Dog:
     return Dog(
@@ -10,4 +11,17 @@ def parse_dog_from_row(row: dict) -> Dog:
         date_of_birth=row['date_of_birth'],
         kennel=Kennel(id = row['kennel_id'], name=row['kennel_name']),
         image_url=row.get('image_url') or ""
-    )
\ No newline at end of file
+    )
+
+def parse_dog_from_record(record) -> Dog:
+    """parse_dog_from_row for a database row read as a named tuple, built without validation."""
+    return construct(
+        Dog,
+        id = record.id,
+        name = record.name,
+        breed=record.breed,
+        color=record.color or "#ffffff",
+        date_of_birth=record.date_of_birth,
+        kennel=construct(Kennel, id = record.kennel_id, name=record.kennel_name),
+        image_url=record.image_url or ""
+    )
@@ -1,5 +1,6 @@
 from src.models.runner import Runner
 from src.models.kennel import Kennel
+from .construct import construct
 
 def parse_runner_from_row(row: dict) -> Runner:
     return Runner(
@@ -8,4 +9,15 @@ def parse_runner_from_row(row: dict) -> Runner:
         kennel=Kennel(id = row['kennel_id'],
                       name=row['kennel_name']),
         image_url=row.get('image_url') or ""
-    )
\ No newline at end of file
+    )
+
+def parse_runner_from_record(record) -> Runner:
+    """parse_runner_from_row for a database row read as a named tuple, built without validation."""
+    return construct(
+        Runner,
+        id = record.id,
+        name = record.name,
+        kennel=construct(Kennel, id = record.kennel_id,
+                         name=record.kennel_name),
+        image_url=record.image_url or ""
+    )
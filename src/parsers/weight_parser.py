@@ -1,5 +1,6 @@
 from src.models.dog import Dog
 from src.models.kennel import Kennel
+from .construct import construct
 from src.models.dog_weight import DogWeightEntry
 
 def parse_weight_from_row(row: dict) -> DogWeightEntry:
@@ -14,4 +15,26 @@ def parse_weight_from_row(row: dict) -> DogWeightEntry:
             kennel=Kennel(name=row['kennel_name'])
         ),
         weight=row['weight']
-    )
\ No newline at end of file
+    )
+
+def parse_weight_from_record(record) -> DogWeightEntry:
+    """
+    parse_weight_from_row for a database row read as a named tuple, built without
+    validation. The dog's age at the entry is computed like the model validator does.
+    """
+    dog = construct(
+        Dog,
+        id = record.dog_id,
+        name = record.name,
+        breed=record.breed,
+        date_of_birth=record.date_of_birth,
+        kennel=construct(Kennel, name=record.kennel_name)
+    )
+    return construct(
+        DogWeightEntry,
+        id = record.id,
+        date = record.date,
+        dog = dog,
+        weight=record.weight,
+        age=dog.calculate_dog_age(as_of_date=record.date)
+    )
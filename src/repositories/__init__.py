@@ -5,4 +5,6 @@ from .weight_repository import weight_repository
 from .sport_repository import sport_repository
 from .comment_repository import comment_repository
 from .analytics_repository import analytics_repository
-from .location_repository import location_repository
\ No newline at end of file
+from .location_repository import location_repository
+from .async_activity_repository import async_activity_repository
+from .async_analytics_repository import async_analytics_repository
@@ -1,12 +1,633 @@
 from src.models.runner import Runner
 from src.models.activity import Activity, ActivityLaps, ActivityCreate, ActivityDogsCreate
 from src.models.weather import Weather
-from src.parsers.activity_parser import parse_activity_from_row
+from src.parsers.activity_parser import parse_activities_from_records, parse_activity_from_record
 from .abstract_repository import abstract_repository
-from typing import List, Optional
-from psycopg2.extras import RealDictCursor
-from src.utils.pagination import paginate_results
-from src.utils.db import build_conditions
+from typing import Iterator, List, Optional
+from psycopg2.extras import NamedTupleCursor
+import csv
+import io
+from src.utils.pagination import Cursor
+from src.utils.db import build_conditions, build_normalized_conditions
+from src.utils.db_operations import COMMIT, ROLLBACK, Copy, Operation, Statement, run_operation
+from src.utils.response_cache import invalidate_kennels
+
+# Hydrates a page of activity ids selected by the `page` CTE. Dogs, laps and comment
+# counts are aggregated per activity in their own LATERAL subqueries so the joins
+# never multiply into each other (dogs x laps x comments) before grouping. Column names
+# are unique so rows can be read as named tuples (parse_activity_from_record).
+ACTIVITY_HYDRATION_QUERY = """
+    WITH page AS (
+        {page_query}
+    )
+    SELECT
+        a.id, a.timestamp, a.sport_id, a.location_id, a.workout, a.speed, a.distance,
+        r.name AS runner_name,
+        r.id AS runner_id,
+        s.name AS sport_name,
+        s.type AS sport_type,
+        k.name AS kennel_name,
+        k.id as kennel_id,
+        w.temperature, w.humidity, w.condition,
+        l.name AS location,
+        cc.comment_count,
+        COALESCE(ag.dogs, '[]'::json) AS dogs,
+        lg.laps{page_columns}
+    FROM page p
+    JOIN activities a ON a.id = p.id
+    JOIN runners r ON a.runner_id = r.id
+    JOIN sports s ON a.sport_id = s.id
+    JOIN kennels k ON a.kennel_id = k.id
+    LEFT JOIN weather_entries w ON w.activity_id = a.id
+    LEFT JOIN activity_locations l ON a.location_id = l.id
+    -- Aggregate dogs
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_object(
+            'id', d.id,
+            'name', d.name,
+            'breed', d.breed,
+            'date_of_birth', d.date_of_birth,
+            'rating', ad.rating
+        ) ORDER BY d.id) AS dogs
+        FROM activity_dogs ad
+        JOIN dogs d ON ad.dog_id = d.id
+        WHERE ad.activity_id = a.id
+    ) ag ON TRUE
+    -- Aggregate laps (only present for workouts)
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_object(
+            'lap_number', wl.lap_number,
+            'speed', wl.speed,
+            'lap_time', EXTRACT(EPOCH FROM wl.lap_time), -- seconds, parsed in batch
+            'lap_distance', wl.lap_distance
+        ) ORDER BY wl.lap_number) AS laps
+        FROM workout_laps wl
+        WHERE wl.activity_id = a.id
+    ) lg ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT COUNT(*) AS comment_count
+        FROM activity_comments ac
+        WHERE ac.activity_id = a.id
+    ) cc ON TRUE
+    ORDER BY a.timestamp {order}, a.id {order};
+"""
+
+# dog_weekly_rollup keeps per (dog, week) totals for analytics. The aggregates read
+# rows aliased `a` (timestamp, distance, speed) and `ad` (dog_id, rating); the timed_*
+# columns only count sessions with a recorded speed, the ones durations can be derived from.
+DOG_WEEKLY_ROLLUP_COLUMNS = """
+    dog_id, week_start, distance_km, sessions, rating_sum, rated_sessions,
+    timed_distance_km, duration_hours, timed_sessions, timed_rating_sum, first_timed_at, last_timed_at
+"""
+
+DOG_WEEKLY_ROLLUP_AGGREGATES = """
+    ad.dog_id,
+    date_trunc('week', a.timestamp)::date AS week_start,
+    COALESCE(SUM(NULLIF(a.distance, 'NaN'::float8)::numeric), 0) AS distance_km,
+    COUNT(*) AS sessions,
+    COALESCE(SUM(ad.rating), 0) AS rating_sum,
+    COUNT(ad.rating) AS rated_sessions,
+    COALESCE(SUM(NULLIF(a.distance, 'NaN'::float8)::numeric) FILTER (WHERE a.speed > 0), 0) AS timed_distance_km,
+    COALESCE(SUM(NULLIF(a.distance, 'NaN'::float8)/NULLIF(NULLIF(a.speed, 'NaN'::float8), 0)) FILTER (WHERE a.speed > 0), 0) AS duration_hours,
+    COUNT(*) FILTER (WHERE a.speed > 0) AS timed_sessions,
+    COALESCE(SUM(ad.rating) FILTER (WHERE a.speed > 0), 0) AS timed_rating_sum,
+    MIN(a.timestamp) FILTER (WHERE a.speed > 0) AS first_timed_at,
+    MAX(a.timestamp) FILTER (WHERE a.speed > 0) AS last_timed_at
+"""
+
+# New activities are folded into the existing weeks (create / bulk import)
+DOG_WEEKLY_ROLLUP_ADD = f"""
+    INSERT INTO dog_weekly_rollup AS r ({DOG_WEEKLY_ROLLUP_COLUMNS})
+    SELECT {DOG_WEEKLY_ROLLUP_AGGREGATES}
+    FROM {{source}}
+    GROUP BY ad.dog_id, date_trunc('week', a.timestamp)
+    ON CONFLICT (dog_id, week_start) DO UPDATE SET
+        distance_km = r.distance_km + EXCLUDED.distance_km,
+        sessions = r.sessions + EXCLUDED.sessions,
+        rating_sum = r.rating_sum + EXCLUDED.rating_sum,
+        rated_sessions = r.rated_sessions + EXCLUDED.rated_sessions,
+        timed_distance_km = r.timed_distance_km + EXCLUDED.timed_distance_km,
+        duration_hours = r.duration_hours + EXCLUDED.duration_hours,
+        timed_sessions = r.timed_sessions + EXCLUDED.timed_sessions,
+        timed_rating_sum = r.timed_rating_sum + EXCLUDED.timed_rating_sum,
+        first_timed_at = LEAST(r.first_timed_at, EXCLUDED.first_timed_at),
+        last_timed_at = GREATEST(r.last_timed_at, EXCLUDED.last_timed_at)
+"""
+
+# (dog, week) keys an activity currently contributes to, read before an update or delete,
+# with the kennels whose cached analytics it shows up in
+DOG_WEEKLY_ROLLUP_KEYS_QUERY = """
+    SELECT ad.dog_id, date_trunc('week', a.timestamp)::date AS week_start, d.kennel_id, a.kennel_id AS activity_kennel_id
+    FROM activities a
+    JOIN activity_dogs ad ON ad.activity_id = a.id
+    JOIN dogs d ON d.id = ad.dog_id
+    WHERE a.id = %s;
+"""
+
+# Updates and deletes can move or remove sessions (and the first/last timestamps cannot
+# be subtracted), so the touched keys are recomputed from activities; a key left without
+# sessions loses its row.
+DOG_WEEKLY_ROLLUP_REFRESH_QUERY = f"""
+    WITH keys AS (
+        SELECT DISTINCT dog_id, week_start
+        FROM unnest(%(dog_ids)s::int[], %(week_starts)s::date[]) AS k(dog_id, week_start)
+    ),
+    fresh AS (
+        SELECT {DOG_WEEKLY_ROLLUP_AGGREGATES}
+        FROM keys k
+        JOIN activity_dogs ad ON ad.dog_id = k.dog_id
+        JOIN activities a ON a.id = ad.activity_id
+            AND a.timestamp >= k.week_start AND a.timestamp < k.week_start + 7
+        GROUP BY ad.dog_id, date_trunc('week', a.timestamp)
+    ),
+    upserted AS (
+        INSERT INTO dog_weekly_rollup ({DOG_WEEKLY_ROLLUP_COLUMNS})
+        SELECT * FROM fresh
+        ON CONFLICT (dog_id, week_start) DO UPDATE SET
+            distance_km = EXCLUDED.distance_km,
+            sessions = EXCLUDED.sessions,
+            rating_sum = EXCLUDED.rating_sum,
+            rated_sessions = EXCLUDED.rated_sessions,
+            timed_distance_km = EXCLUDED.timed_distance_km,
+            duration_hours = EXCLUDED.duration_hours,
+            timed_sessions = EXCLUDED.timed_sessions,
+            timed_rating_sum = EXCLUDED.timed_rating_sum,
+            first_timed_at = EXCLUDED.first_timed_at,
+            last_timed_at = EXCLUDED.last_timed_at
+    )
+    DELETE FROM dog_weekly_rollup r
+    USING keys k
+    WHERE r.dog_id = k.dog_id AND r.week_start = k.week_start
+    AND NOT EXISTS (SELECT 1 FROM fresh f WHERE f.dog_id = k.dog_id AND f.week_start = k.week_start);
+"""
+
+def _rollup_keys(activity_id: int) -> Operation:
+    return (yield Statement(DOG_WEEKLY_ROLLUP_KEYS_QUERY, (activity_id,), fetch="all"))
+
+def _refresh_rollup(keys: list[dict]) -> Operation:
+    if keys:
+        yield Statement(DOG_WEEKLY_ROLLUP_REFRESH_QUERY, {
+            "dog_ids": [key["dog_id"] for key in keys],
+            "week_starts": [key["week_start"] for key in keys],
+        })
+
+def _kennels_of(keys: list[dict]) -> set:
+    return {key["kennel_id"] for key in keys} | {key["activity_kennel_id"] for key in keys}
+
+# Writes a whole activity in one round-trip. Dogs and laps arrive as parallel arrays
+# and are expanded with unnest; every child CTE reads the id returned by new_activity.
+# Data-modifying CTEs always run to completion, even though only new_activity is selected.
+ACTIVITY_INSERT_QUERY = """
+    WITH new_activity AS (
+        INSERT INTO activities (
+            runner_id, sport_id, timestamp, location_id, workout, speed, distance, kennel_id
+        ) VALUES (
+            %(runner_id)s, %(sport_id)s, %(timestamp)s, %(location_id)s, %(workout)s, %(speed)s, %(distance)s,
+            (SELECT kennel_id FROM runners WHERE id = %(runner_id)s)
+        )
+        RETURNING id, timestamp, distance, speed
+    ),
+    new_dogs AS (
+        INSERT INTO activity_dogs (activity_id, dog_id, rating)
+        SELECT na.id, d.dog_id, d.rating
+        FROM new_activity na
+        CROSS JOIN unnest(%(dog_ids)s::int[], %(ratings)s::int[]) AS d(dog_id, rating)
+    ),
+    new_laps AS (
+        INSERT INTO workout_laps (activity_id, lap_number, lap_time, lap_distance, speed)
+        SELECT na.id, l.lap_number, l.lap_time, l.lap_distance, l.speed
+        FROM new_activity na
+        CROSS JOIN unnest(
+            %(lap_numbers)s::int[], %(lap_times)s::interval[], %(lap_distances)s::float8[], %(lap_speeds)s::float8[]
+        ) AS l(lap_number, lap_time, lap_distance, speed)
+    ),
+    new_weather AS (
+        INSERT INTO weather_entries (activity_id, temperature, humidity, condition)
+        SELECT na.id, %(temperature)s, %(humidity)s, %(condition)s
+        FROM new_activity na
+        WHERE %(has_weather)s
+    ),
+    new_rollup AS ({rollup}
+    )
+    SELECT id, ARRAY(
+        SELECT kennel_id FROM dogs WHERE id = ANY(%(dog_ids)s::int[])
+        UNION
+        SELECT kennel_id FROM runners WHERE id = %(runner_id)s
+    ) AS kennel_ids
+    FROM new_activity;
+""".format(rollup=DOG_WEEKLY_ROLLUP_ADD.format(
+    source="new_activity a CROSS JOIN unnest(%(dog_ids)s::int[], %(ratings)s::int[]) AS ad(dog_id, rating)"
+))
+
+# Bulk import: rows are COPYed into session-local staging tables keyed by the upload row,
+# checked against the kennel in one pass, then merged into the real tables.
+ACTIVITY_IMPORT_STAGING_QUERY = """
+    CREATE TEMP TABLE activity_import (
+        row_no INT PRIMARY KEY, id INT, runner_id INT, sport_id INT, timestamp TIMESTAMPTZ,
+        location_id INT, workout BOOLEAN, speed FLOAT, distance FLOAT
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE activity_dogs_import (row_no INT, dog_id INT, rating INT) ON COMMIT DROP;
+    CREATE TEMP TABLE workout_laps_import (
+        row_no INT, lap_number INT, lap_time INTERVAL, lap_distance FLOAT, speed FLOAT
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE weather_import (row_no INT, temperature FLOAT, humidity FLOAT, condition TEXT) ON COMMIT DROP;
+"""
+
+ACTIVITY_IMPORT_VALIDATION_QUERY = """
+    SELECT i.row_no,
+        CASE
+            WHEN r.id IS NULL THEN 'runner_id ' || i.runner_id || ' does not belong to this kennel'
+            WHEN s.id IS NULL THEN 'sport_id ' || i.sport_id || ' does not exist'
+            WHEN l.id IS NULL THEN 'location_id ' || i.location_id || ' does not belong to this kennel'
+            ELSE 'dog_id ' || md.dog_id || ' does not belong to this kennel'
+        END AS error
+    FROM activity_import i
+    LEFT JOIN runners r ON r.id = i.runner_id AND r.kennel_id = %(kennel_id)s
+    LEFT JOIN sports s ON s.id = i.sport_id
+    LEFT JOIN activity_locations l ON l.id = i.location_id AND l.kennel_id = %(kennel_id)s
+    LEFT JOIN LATERAL (
+        SELECT di.dog_id
+        FROM activity_dogs_import di
+        LEFT JOIN dogs d ON d.id = di.dog_id AND d.kennel_id = %(kennel_id)s
+        WHERE di.row_no = i.row_no AND d.id IS NULL
+        LIMIT 1
+    ) md ON TRUE
+    WHERE r.id IS NULL OR s.id IS NULL OR l.id IS NULL OR md.dog_id IS NOT NULL
+    ORDER BY i.row_no;
+"""
+
+# ids are drawn from the activities sequence up front so children can be joined on row_no
+ACTIVITY_IMPORT_MERGE_QUERY = """
+    UPDATE activity_import i
+    SET id = n.id
+    FROM (
+        SELECT row_no, nextval(pg_get_serial_sequence('activities', 'id')) AS id
+        FROM (SELECT row_no FROM activity_import ORDER BY row_no) ordered
+    ) n
+    WHERE n.row_no = i.row_no;
+
+    INSERT INTO activities (id, runner_id, sport_id, timestamp, location_id, workout, speed, distance, kennel_id)
+    SELECT id, runner_id, sport_id, timestamp, location_id, workout, speed, distance, %(kennel_id)s
+    FROM activity_import;
+
+    INSERT INTO activity_dogs (activity_id, dog_id, rating)
+    SELECT i.id, di.dog_id, di.rating
+    FROM activity_dogs_import di
+    JOIN activity_import i USING (row_no);
+
+    INSERT INTO workout_laps (activity_id, lap_number, lap_time, lap_distance, speed)
+    SELECT i.id, wl.lap_number, wl.lap_time, wl.lap_distance, wl.speed
+    FROM workout_laps_import wl
+    JOIN activity_import i USING (row_no);
+
+    INSERT INTO weather_entries (activity_id, temperature, humidity, condition)
+    SELECT i.id, w.temperature, w.humidity, w.condition
+    FROM weather_import w
+    JOIN activity_import i USING (row_no);
+{rollup};
+    SELECT row_no, id FROM activity_import ORDER BY row_no;
+""".format(rollup=DOG_WEEKLY_ROLLUP_ADD.format(
+    source="activity_import a JOIN activity_dogs_import ad USING (row_no)"
+))
+
+ACTIVITY_IMPORT_REJECT_QUERY = "DELETE FROM activity_import WHERE row_no = ANY(%s)"
+
+def csv_copy_buffer(rows) -> io.StringIO:
+    """Rows as an in-memory CSV for COPY ... WITH (FORMAT csv), None becomes NULL."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+    buffer.seek(0)
+    return buffer
+
+def copy_statement(table: str, columns: list[str]) -> str:
+    return f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+def activity_import_copies(activities: list[tuple[int, ActivityCreate]]) -> list[tuple[str, list[str], Iterator[tuple]]]:
+    """(staging table, columns, rows) to COPY for a bulk import, rows keyed by upload row."""
+    return [
+        ("activity_import",
+         ["row_no", "runner_id", "sport_id", "timestamp", "location_id", "workout", "speed", "distance"],
+         ((row, a.runner_id, a.sport_id, a.timestamp.isoformat(), a.location_id, a.workout, a.speed, a.distance)
+          for row, a in activities)),
+        ("activity_dogs_import", ["row_no", "dog_id", "rating"],
+         ((row, dog.dog_id, dog.rating) for row, a in activities for dog in a.dogs)),
+        ("workout_laps_import", ["row_no", "lap_number", "lap_time", "lap_distance", "speed"],
+         ((row, lap.lap_number,
+           f"{lap.lap_time_delta.total_seconds()} seconds" if lap.lap_time_delta is not None else None,
+           lap.lap_distance, lap.speed)
+          for row, a in activities for lap in (a.laps or []))),
+        ("weather_import", ["row_no", "temperature", "humidity", "condition"],
+         ((row, a.weather.temperature, a.weather.humidity, a.weather.condition)
+          for row, a in activities if a.weather is not None)),
+    ]
+
+def activity_insert_params(activity: ActivityCreate) -> dict:
+    """Flattens an ActivityCreate into the named parameters of ACTIVITY_INSERT_QUERY."""
+    weather = activity.weather
+    laps = activity.laps or []
+    return {
+        "runner_id": activity.runner_id,
+        "sport_id": activity.sport_id,
+        "timestamp": activity.timestamp,
+        "location_id": activity.location_id,
+        "workout": activity.workout,
+        "speed": activity.speed,
+        "distance": activity.distance,
+        #this assumes dogs have their id set, they should from the frontend
+        "dog_ids": [dog.dog_id for dog in activity.dogs],
+        "ratings": [dog.rating for dog in activity.dogs],
+        "lap_numbers": [lap.lap_number for lap in laps],
+        "lap_times": [lap.lap_time_delta for lap in laps],
+        "lap_distances": [lap.lap_distance for lap in laps],
+        "lap_speeds": [lap.speed for lap in laps],
+        "has_weather": weather is not None,
+        "temperature": weather.temperature if weather else None,
+        "humidity": weather.humidity if weather else None,
+        "condition": weather.condition if weather else None,
+    }
+
+def activity_page_query(kennel_id: int, filters, limit: int, offset: int, cursor: Optional[Cursor], include_total: bool) -> tuple[str, list, str]:
+    """
+    One page of hydrated activities (newest first unless paging backwards), returns
+    (query, values, order). The filters are normalized so that the query text only
+    varies with the cursor direction and include_total: a handful of prepared statements.
+    """
+    filter_clause, filter_values = build_normalized_conditions(filters)
+    where_clause, page_values = filter_clause, [kennel_id, *filter_values]
+
+    # keyset pagination: seek past the cursor instead of skipping rows with OFFSET
+    order = "DESC"
+    if cursor is not None:
+        comparison = ">" if cursor.direction == "previous" else "<"
+        order = "ASC" if cursor.direction == "previous" else "DESC"
+        where_clause += f" AND (a.timestamp, a.id) {comparison} (%s, %s)"
+        page_values.extend([cursor.timestamp, cursor.id])
+        offset = 0
+    page_values.extend([limit, offset])
+
+    # uncorrelated scalar subquery: evaluated once per statement, and unlike
+    # COUNT(*) OVER () it is not restricted by the cursor condition
+    total_column, total_values = "", []
+    if include_total:
+        total_column = f""",
+                    (SELECT COUNT(*) FROM activities a
+                     WHERE a.kennel_id = %s AND {filter_clause}) AS total_count"""
+        total_values = [kennel_id, *filter_values]
+
+    # phase 1 is a range scan on (kennel_id, timestamp, id), phase 2 hydrates the page
+    page_query = f"""
+                SELECT a.id{total_column}
+                FROM activities a
+                WHERE a.kennel_id = %s AND {where_clause}
+                ORDER BY a.timestamp {order}, a.id {order}
+                LIMIT %s OFFSET %s
+            """
+
+    query = ACTIVITY_HYDRATION_QUERY.format(
+        page_query=page_query,
+        page_columns=", p.total_count" if include_total else "",
+        order=order
+    )
+    return query, total_values + page_values, order
+
+def parse_activity_page(rows: list, order: str) -> tuple[List[Activity], Optional[int]]:
+    """Activities of a page read as named tuples, and the total when the page selected it."""
+    activities = parse_activities_from_records(rows)
+    total = getattr(rows[-1], "total_count", None) if rows else None
+
+    # always hand back newest first
+    if order == "ASC":
+        activities.reverse()
+    return activities, total
+
+def activity_count_query(kennel_id: int, filters) -> tuple[str, list]:
+    where_clause, values = build_normalized_conditions(filters)
+    # the dog filter is an EXISTS subquery, so there is one row per activity here
+    query = f"""
+    SELECT COUNT(*) FROM activities a
+    WHERE a.kennel_id = %s AND {where_clause};
+    """
+    return query, [kennel_id, *values]
+
+# plan_cache_mode of the page and count statements (see prepared_statements): a generic
+# plan skips planning but can be a poor fit for a selective filter (one dog), auto
+# only switches to it once it does not look costlier than the custom plans
+ACTIVITY_PAGE_PLAN = "auto"
+
+ACTIVITY_BY_ID_QUERY = ACTIVITY_HYDRATION_QUERY.format(
+    page_query="SELECT id FROM activities WHERE id = %s",
+    page_columns="",
+    order="DESC"
+)
+
+# children first, they reference the activity
+ACTIVITY_DELETE_QUERIES = [
+    # If the activity was a workout, delete all associated laps
+    "DELETE FROM workout_laps WHERE activity_id = %s;",
+    # Delete activity from dog activity table first
+    "DELETE FROM activity_dogs WHERE activity_id = %s;",
+    # Delete weather entry
+    "DELETE FROM weather_entries WHERE activity_id = %s;",
+    # Finally delete the main activity
+    "DELETE FROM activities WHERE id = %s;",
+]
+
+def activity_update_statements(activity_id: int, fields: dict) -> list[tuple[str, list]]:
+    """
+    The statements applying an ActivityUpdate dump, in order: base columns, laps (updated
+    in place), weather (explicit null deletes it, otherwise upsert) and dogs (replaced).
+    """
+    fields = dict(fields)
+    laps = fields.pop("laps", None)
+    # keep a copy of weather
+    _weather_sentinel = object()
+    weather_value = fields.pop("weather", _weather_sentinel)
+
+    dogs = fields.pop("dogs", None)
+    fields.pop("pace", None) # pace is not directly saved in the db
+
+    statements = []
+    if fields:
+        values = list(fields.values())
+        set_clause = ", ".join([f"{key} = %s" for key in fields])
+
+        # kennel_id is denormalized from the runner, keep it in sync when the runner changes
+        if "runner_id" in fields:
+            set_clause += ", kennel_id = (SELECT kennel_id FROM runners WHERE id = %s)"
+            values.append(fields["runner_id"])
+
+        values.append(activity_id)
+        statements.append((f"""
+            UPDATE activities
+            SET {set_clause}
+            WHERE id = %s
+        """, values))
+
+    # Workout laps update
+    for lap in laps or []:
+        lap = ActivityLaps(**lap)
+        statements.append(("""
+            UPDATE workout_laps 
+            SET lap_time = %s,
+                lap_distance = %s,
+                speed = %s
+            WHERE activity_id = %s AND lap_number = %s
+        """, [lap.lap_time_delta, lap.lap_distance, lap.speed, activity_id, lap.lap_number]))
+
+    # Weather update
+    if weather_value is not _weather_sentinel:
+        if weather_value is None:
+            # explicit "weather: null" → delete existing weather row
+            statements.append(("DELETE FROM weather_entries WHERE activity_id = %s", [activity_id]))
+        else:
+            # weather object → upsert
+            weather = Weather(**weather_value)
+            statements.append(("""
+                INSERT INTO weather_entries (activity_id, temperature, humidity, condition)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (activity_id)
+                DO UPDATE SET
+                    temperature = EXCLUDED.temperature,
+                    humidity = EXCLUDED.humidity,
+                    condition = EXCLUDED.condition
+            """, [activity_id, weather.temperature, weather.humidity, weather.condition]))
+
+    # Dogs update — e.g., clear and re-insert
+    if dogs:
+        statements.append(("DELETE FROM activity_dogs WHERE activity_id = %s", [activity_id]))
+        for dog in dogs:
+            dog = ActivityDogsCreate(**dog)
+            statements.append(("""
+                INSERT INTO activity_dogs (activity_id, dog_id, rating)
+                VALUES (%s, %s, %s)
+            """, [activity_id, dog.dog_id, dog.rating]))
+    return statements
+
+# The repository operations, shared by activity_repository and async_activity_repository
+# (see db_operations): each one yields its statements and gets their results back.
+
+def select_page(kennel_id: int, filters, limit: int, offset: int, cursor: Optional[Cursor], include_total: bool) -> Operation:
+    query, values, order = activity_page_query(kennel_id, filters, limit, offset, cursor, include_total)
+    rows = yield Statement(query, values, fetch="all", plan=ACTIVITY_PAGE_PLAN, named_tuples=True)
+    return parse_activity_page(rows, order)
+
+def select_all(kennel_id: int, filters, limit: int, offset: int, cursor: Optional[Cursor]) -> Operation:
+    try:
+        activities, _ = yield from select_page(kennel_id, filters, limit, offset, cursor, include_total=False)
+        return activities
+    except Exception as e:
+        print(f"Select failed: {e}")
+        yield ROLLBACK
+        return None
+
+def select_all_with_count(kennel_id: int, filters, limit: int, offset: int, cursor: Optional[Cursor], include_total: bool) -> Operation:
+    """
+    Same as select_all but also returns the number of activities matching the filters
+    (ignoring pagination), computed in the same statement. The total is None when
+    include_total is False.
+    """
+    try:
+        activities, total = yield from select_page(kennel_id, filters, limit, offset, cursor, include_total)
+        # an empty page past the end carries no count column, only then ask separately
+        if include_total and total is None:
+            total = 0 if offset == 0 and cursor is None else (yield from count_activities(kennel_id, filters))
+        return activities, total
+    except Exception as e:
+        print(f"Select failed: {e}")
+        yield ROLLBACK
+        return None, None
+
+def select_by_id(activity_id: int) -> Operation:
+    row = yield Statement(ACTIVITY_BY_ID_QUERY, (activity_id,), fetch="one", plan="generic", named_tuples=True)
+    return parse_activity_from_record(row)
+
+def count_activities(kennel_id: int, filters) -> Operation:
+    query, values = activity_count_query(kennel_id, filters)
+    try:
+        row = yield Statement(query, values, fetch="one", plan=ACTIVITY_PAGE_PLAN)
+        return row["count"]
+    except Exception as e:
+        print(f"Select failed: {e}")
+        yield ROLLBACK
+        return None
+
+def insert_activity(activity: ActivityCreate) -> Operation:
+    params = activity_insert_params(activity)
+    try:
+        row = yield Statement(ACTIVITY_INSERT_QUERY, params, fetch="one")
+        yield COMMIT
+        invalidate_kennels(row['kennel_ids'])
+        return row['id']
+    except Exception as e:
+        print(e)
+        yield ROLLBACK
+        return None
+
+def import_activities(kennel_id: int, activities: list[tuple[int, ActivityCreate]]) -> Operation:
+    """
+    Inserts already validated activities for one kennel, each tagged with its upload row.
+    Rows referencing a runner, location or dog outside the kennel (or an unknown sport)
+    are skipped and reported. Returns ([(row, activity_id)], [(row, error)]).
+    """
+    if not activities:
+        return [], []
+    try:
+        yield Statement(ACTIVITY_IMPORT_STAGING_QUERY)
+        for table, columns, rows in activity_import_copies(activities):
+            yield Copy(copy_statement(table, columns), csv_copy_buffer(rows))
+
+        rejected = yield Statement(ACTIVITY_IMPORT_VALIDATION_QUERY, {"kennel_id": kennel_id}, fetch="all")
+        errors = [(r["row_no"], r["error"]) for r in rejected]
+        if errors:
+            yield Statement(ACTIVITY_IMPORT_REJECT_QUERY, ([row for row, _ in errors],))
+
+        merged = yield Statement(ACTIVITY_IMPORT_MERGE_QUERY, {"kennel_id": kennel_id}, fetch="all")
+        created = [(r["row_no"], r["id"]) for r in merged]
+        yield COMMIT
+        if created:
+            invalidate_kennels([kennel_id])
+        return created, errors
+    except Exception as e:
+        print(f"[bulk import error]: {e}")
+        yield ROLLBACK
+        return None
+
+def delete_activity(activity_id: int) -> Operation:
+    try:
+        rollup_keys = yield from _rollup_keys(activity_id)
+        for query in ACTIVITY_DELETE_QUERIES:
+            yield Statement(query, (activity_id,))
+
+        yield from _refresh_rollup(rollup_keys)
+        yield COMMIT
+        invalidate_kennels(_kennels_of(rollup_keys))
+        return True
+    except Exception as e:
+        print(f"[delete activity error]: {e}")
+        yield ROLLBACK
+        return False
+
+def update_activity(activity_id: int, fields: dict) -> Operation:
+    statements = activity_update_statements(activity_id, fields)
+    try:
+        rollup_keys = yield from _rollup_keys(activity_id)
+        rowcount = 0
+        for query, values in statements:
+            rowcount = yield Statement(query, values, fetch="rowcount")
+        updated = bool(statements) and rowcount > 0
+
+        # the weeks the activity left and the ones it now belongs to
+        rollup_keys += yield from _rollup_keys(activity_id)
+        yield from _refresh_rollup(rollup_keys)
+        yield COMMIT
+        invalidate_kennels(_kennels_of(rollup_keys))
+        return updated
+    except Exception as e:
+        print(f"[update activity error]: {e}")
+        yield ROLLBACK
+        return False
 
 class activity_repository(abstract_repository):
 
@@ -16,297 +637,45 @@ class activity_repository(abstract_repository):
     def get_by_name(self, name):
         return super().get_by_name(name)
     
-    def get_all(self, kennel_id: int, filters, limit: int = 10, offset: int = 0) -> List[Runner]:
+    def get_all(self, kennel_id: int, filters, limit: int = 10, offset: int = 0, cursor: Optional[Cursor] = None) -> List[Activity]:
+        return run_operation(self._connection, select_all(kennel_id, filters, limit, offset, cursor))
 
+    def get_all_with_count(self, kennel_id: int, filters, limit: int = 10, offset: int = 0,
+                           cursor: Optional[Cursor] = None, include_total: bool = True) -> tuple[List[Activity], Optional[int]]:
+        return run_operation(self._connection, select_all_with_count(kennel_id, filters, limit, offset, cursor, include_total))
+
+    def iter_all(self, kennel_id: int, filters, itersize: int = 1000) -> Iterator[Activity]:
+        """
+        Streams every activity matching the filters, newest first, through a named
+        (server-side) cursor: only `itersize` rows are held client-side at a time.
+        Must run inside a transaction, the cursor is gone once it ends.
+        """
         where_clause, values = build_conditions(filters)
+        query = ACTIVITY_HYDRATION_QUERY.format(
+            page_query=f"SELECT a.id FROM activities a WHERE a.kennel_id = %s AND {where_clause}",
+            page_columns="",
+            order="DESC"
+        )
+        with self._connection.cursor(name="activity_export", cursor_factory= NamedTupleCursor) as cur:
+            cur.execute(query, [kennel_id, *values])
+            # a batch of rows at a time, their laps and paces are derived together
+            while rows := cur.fetchmany(itersize):
+                yield from parse_activities_from_records(rows)
 
-        try:
-            with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
-                query = f""" 
-                        SELECT 
-                            a.*, 
-                            r.name AS runner_name,
-                            r.id AS runner_id,
-                            s.name AS sport_name,
-                            k.name AS kennel_name,
-                            s.type AS sport_type,
-                            k.id as kennel_id,
-                            w.temperature, w.humidity, w.condition,
-                            l.name AS location,
-                            COUNT(ac.id) as comment_count,
-                            -- Aggregate dogs
-                            json_agg(DISTINCT jsonb_build_object(
-                                'id', d.id,
-                                'name', d.name,
-                                'breed', d.breed,
-                                'date_of_birth', d.date_of_birth,
-                                'rating', ad.rating
-                            )) FILTER (WHERE d.id IS NOT NULL) AS dogs,
-
-                            -- Aggregate laps (only if workout is true)
-                            json_agg(DISTINCT jsonb_build_object(
-                                'lap_number', wl.lap_number,
-                                'speed', wl.speed,
-                                'lap_time', wl.lap_time,
-                                'lap_distance', wl.lap_distance
-                            )) FILTER (WHERE wl.id IS NOT NULL) AS laps
-                        FROM activities a
-                        JOIN runners r ON a.runner_id = r.id
-                        JOIN sports s ON a.sport_id = s.id
-                        JOIN kennels k ON r.kennel_id = k.id
-                        LEFT JOIN activity_dogs ad ON a.id = ad.activity_id
-                        LEFT JOIN dogs d ON ad.dog_id = d.id
-                        LEFT JOIN workout_laps wl ON wl.activity_id = a.id
-                        LEFT JOIN weather_entries w ON w.activity_id = a.id
-                        LEFT JOIN activity_comments ac ON ac.activity_id = a.id
-                        LEFT JOIN activity_locations l ON a.location_id = l.id
-                        WHERE r.kennel_id = %s AND {where_clause}
-                        GROUP BY 
-                        a.id, a.runner_id, a.sport_id, a.timestamp, a.location_id,
-                        a.workout, a.speed, a.distance,
-                        r.name, r.id, s.name, s.type, k.name, k.id,
-                        w.temperature, w.humidity, w.condition,
-                        l.name
-                        ORDER BY a.timestamp DESC
-                        LIMIT %s OFFSET %s;
-                    """
-            
-                values.insert(0, kennel_id)
-                values.extend([limit,offset])
-
-                cur.execute(query, values)
-                activities = []
-                for row in cur.fetchall():
-                    activity = parse_activity_from_row(row)
-                    activities.append(activity)
-
-            return activities
-        except Exception as e:
-            print(f"Select failed: {e}")
-            self._connection.rollback()
-            return None
-    
     def get_by_id(self, activity_id: int) -> Optional[Activity]:
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
-            query = """
-                        SELECT 
-                            a.*, 
-                            r.name AS runner_name,
-                            r.id AS runner_id,
-                            s.name AS sport_name,
-                            s.type AS sport_type,
-                            k.name AS kennel_name,
-                            k.id as kennel_id,
-                            w.temperature, w.humidity, w.condition,
-                            l.name AS location,
-                            COUNT(DISTINCT ac.id) as comment_count,
-                            -- Aggregate dogs
-                            json_agg(DISTINCT jsonb_build_object(
-                                'id', d.id,
-                                'name', d.name,
-                                'breed', d.breed,
-                                'date_of_birth', d.date_of_birth,
-                                'rating', ad.rating
-                            )) FILTER (WHERE d.id IS NOT NULL) AS dogs,
-
-                            -- Aggregate laps (only if workout is true)
-                            json_agg(DISTINCT jsonb_build_object(
-                                'lap_number', wl.lap_number,
-                                'speed', wl.speed,
-                                'lap_time', wl.lap_time,
-                                'lap_distance', wl.lap_distance
-                            )) FILTER (WHERE wl.id IS NOT NULL) AS laps
-                        FROM activities a
-                        JOIN runners r ON a.runner_id = r.id
-                        JOIN sports s ON a.sport_id = s.id
-                        JOIN kennels k ON r.kennel_id = k.id
-                        LEFT JOIN activity_dogs ad ON a.id = ad.activity_id
-                        LEFT JOIN dogs d ON ad.dog_id = d.id
-                        LEFT JOIN workout_laps wl ON wl.activity_id = a.id
-                        LEFT JOIN weather_entries w ON w.activity_id = a.id
-                        LEFT JOIN activity_comments ac ON ac.activity_id = a.id
-                        LEFT JOIN activity_locations l ON a.location_id = l.id
-                        WHERE a.id = %s
-                        GROUP BY 
-                        a.id, a.runner_id, a.sport_id, a.timestamp, a.location_id,
-                        a.workout, a.speed, a.distance,
-                        r.name, r.id, s.name, s.type, k.name, k.id, w.temperature, w.humidity, w.condition, l.name
-                    """
-            cur.execute(query, (activity_id,))
-            row = cur.fetchone()
-        return parse_activity_from_row(row)
+        return run_operation(self._connection, select_by_id(activity_id))
     
     def get_total_count(self, kennel_id, filters):
-        where_clause, values = build_conditions(filters)
-        try:
-            with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
-                #must count dictinct because of the join on activity dogs
-                query = f"""
-                SELECT COUNT(DISTINCT a.id) FROM activities a
-                JOIN runners r ON a.runner_id = r.id
-                LEFT JOIN activity_dogs ad ON a.id = ad.activity_id
-                LEFT JOIN activity_locations l ON a.location_id = l.id
-                WHERE r.kennel_id = %s AND {where_clause};
-                """
-                values.insert(0, kennel_id)
-
-                cur.execute(query, values)
-                count = cur.fetchone()["count"]
-            return count
-        except Exception as e:
-            print(f"Select failed: {e}")
-            self._connection.rollback()
-            return None
+        return run_operation(self._connection, count_activities(kennel_id, filters))
         
     def create(self, activity: ActivityCreate) -> int:
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
-            try:
-                query = """
-                    INSERT INTO activities (
-                        runner_id, sport_id, timestamp, location_id, workout, speed, distance
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                    """
-                cur.execute(query, (
-                    activity.runner_id,
-                    activity.sport_id,
-                    activity.timestamp,
-                    activity.location_id,
-                    activity.workout,
-                    activity.speed,
-                    activity.distance,
-                    )
-                )
-                activity_id = cur.fetchone()['id']
-
-                for dog in activity.dogs:
-                    cur.execute("""
-                        INSERT INTO activity_dogs (activity_id, dog_id, rating)
-                        VALUES (%s, %s, %s)
-                    """, (activity_id, dog.dog_id, dog.rating)) #this assumes dogs have their id set, they should from the frontend
-
-                if len(activity.laps) > 0:
-                    for lap in activity.laps:
-                        cur.execute("""
-                            INSERT INTO workout_laps (activity_id, lap_number, lap_time, lap_distance, speed)
-                            VALUES (%s, %s, %s, %s, %s)
-                        """, (activity_id, lap.lap_number, lap.lap_time_delta, lap.lap_distance, lap.speed,))
-
-                if activity.weather is not None:
-                    cur.execute("""
-                        INSERT INTO weather_entries (activity_id, temperature, humidity, condition)
-                        VALUES (%s, %s, %s, %s)
-                    """, (activity_id, activity.weather.temperature, activity.weather.humidity, activity.weather.condition,))
-            
-            except Exception as e:
-                print(e)
-                self._connection.rollback()
-                return None
-            finally:
-                self._connection.commit()
-                return activity_id
-        
+        return run_operation(self._connection, insert_activity(activity))
+
+    def bulk_create(self, kennel_id: int, activities: list[tuple[int, ActivityCreate]]) -> Optional[tuple[list[tuple[int, int]], list[tuple[int, str]]]]:
+        return run_operation(self._connection, import_activities(kennel_id, activities))
 
     def delete(self, activity_id: int):
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
-            try:
-                # If the activity was a workout, delete all associated laps
-                cur.execute("""DELETE FROM workout_laps WHERE activity_id = %s;""", (activity_id,))
-
-                # Delete activity from dog activity table first
-                cur.execute("""DELETE FROM activity_dogs WHERE activity_id = %s;""", (activity_id,))
-
-                # Delete weather entry
-                cur.execute("""DELETE FROM weather_entries WHERE activity_id = %s;""", (activity_id,)) 
-
-                # Finally delete the main activity
-                cur.execute("""DELETE FROM activities WHERE id = %s; """,
-                            (activity_id,))
-                self._connection.commit()
-                return True
-            except Exception as e:
-                print(f"[delete activity error]: {e}")
-                self._connection.rollback()
-                return False
+        return run_operation(self._connection, delete_activity(activity_id))
 
     def update(self, activity_id: int, fields: dict):
-
-        laps = fields.pop("laps", None)
-        # keep a copy of weather
-        _weather_sentinel = object()
-        weather_value = fields.pop("weather", _weather_sentinel)
-
-        dogs = fields.pop("dogs", None)
-        pace = fields.pop("pace", None) # pace is not directly saved in the db
-
-        keys = list(fields.keys())
-        values = list(fields.values())
-
-        set_clause = ", ".join([f"{key} = %s" for key in keys])
-
-        query = f"""
-            UPDATE activities
-            SET {set_clause}
-            WHERE id = %s
-        """
-        
-        values.append(activity_id)
-
-        try:
-            with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
-                if keys:
-                    cur.execute(query, values)
-
-                # Workout laps update
-                if laps:
-                    for lap in laps:
-                        lap=ActivityLaps(**lap)
-                        cur.execute("""
-                            UPDATE workout_laps 
-                            SET lap_time = %s,
-                                lap_distance = %s,
-                                speed = %s
-                            WHERE activity_id = %s AND lap_number = %s
-                        """, (lap.lap_time_delta, lap.lap_distance, lap.speed, activity_id, lap.lap_number))
-
-                # Weather update
-                if weather_value is not _weather_sentinel:
-                    if weather_value is None:
-                        # explicit "weather: null" → delete existing weather row
-                        cur.execute(
-                            "DELETE FROM weather_entries WHERE activity_id = %s",
-                            (activity_id,),
-                        )
-                    else:
-                        # weather object → upsert
-                        weather = Weather(**weather_value)
-                        cur.execute(
-                            """
-                            INSERT INTO weather_entries (activity_id, temperature, humidity, condition)
-                            VALUES (%s, %s, %s, %s)
-                            ON CONFLICT (activity_id)
-                            DO UPDATE SET
-                                temperature = EXCLUDED.temperature,
-                                humidity = EXCLUDED.humidity,
-                                condition = EXCLUDED.condition
-                            """,
-                            (activity_id, weather.temperature, weather.humidity, weather.condition),
-                        )
-                # Dogs update — e.g., clear and re-insert
-                if dogs:
-                    
-                    cur.execute("DELETE FROM activity_dogs WHERE activity_id = %s", (activity_id,))
-                    for dog in dogs:
-                        dog = ActivityDogsCreate(**dog)
-                        cur.execute("""
-                            INSERT INTO activity_dogs (activity_id, dog_id, rating)
-                            VALUES (%s, %s, %s)
-                        """, (activity_id, dog.dog_id, dog.rating))
-                self._connection.commit()
-                return cur.rowcount > 0
-            
-        except Exception as e:
-            print(f"[update activity error]: {e}")
-            self._connection.rollback()
-            return False
-        
\ No newline at end of file
+        return run_operation(self._connection, update_activity(activity_id, fields))
@@ -1,260 +1,332 @@
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 from psycopg2.extras import RealDictCursor
-from src.models.analytics import WeeklyStats, AnalyticSummary, DogCalendarDay, LocationHeatPoint, SportCount, WeeklyDogDistance
+from src.models.analytics import WeeklyStats, AnalyticSummary, DogCalendarDay, LocationHeatPoint, SportCount, WeeklyDogDistance, AnalyticsDashboard
 from src.models import Filter
 from src.parsers.analytic_parser import parse_weekly_stats, parse_dog_calendar, parse_summary_from_rows
 from src.utils.db import build_time_window_clause
 from src.utils.calculation_helpers import get_number_weeks
+from src.utils.prepared_statements import execute_prepared, positional
+from src.repositories.activity_repository import DOG_WEEKLY_ROLLUP_AGGREGATES
 from datetime import datetime
 
+# Per (dog, week) totals of a kennel inside [start_date, end_date]. Weeks fully covered by
+# the window are read from dog_weekly_rollup; the partial weeks at the edges (at most two)
+# are aggregated from the activities themselves, so results match a scan of the raw rows.
+# A missing start/end date leaves that side of the window open.
+DOG_WEEKLY_WINDOW_CTE = f"""
+    bounds AS (
+        SELECT
+            lo, hi,
+            date_trunc('week', lo + INTERVAL '6 days') AS full_from, -- first Monday on or after lo
+            date_trunc('week', hi) AS full_to                        -- weeks starting before this end before hi
+        FROM (
+            SELECT
+                COALESCE(%(start_date)s::date, '-infinity'::date)::timestamptz AS lo,
+                COALESCE(%(end_date)s::date + 1, 'infinity'::date)::timestamptz AS hi
+        ) window_bounds
+    ),
+    dog_weeks AS (
+        SELECT r.*
+        FROM dog_weekly_rollup r
+        JOIN dogs d ON d.id = r.dog_id
+        CROSS JOIN bounds b
+        WHERE d.kennel_id = %(kennel_id)s
+        AND r.week_start >= b.full_from
+        AND r.week_start < b.full_to
+        UNION ALL
+        SELECT {DOG_WEEKLY_ROLLUP_AGGREGATES}
+        FROM activities a
+        JOIN activity_dogs ad ON ad.activity_id = a.id
+        JOIN dogs d ON d.id = ad.dog_id
+        CROSS JOIN bounds b
+        WHERE d.kennel_id = %(kennel_id)s
+        AND (
+            (a.timestamp >= b.lo AND a.timestamp < LEAST(b.full_from, b.hi))
+            OR (a.timestamp >= GREATEST(b.full_to, b.full_from, b.lo) AND a.timestamp < b.hi)
+        )
+        GROUP BY ad.dog_id, date_trunc('week', a.timestamp)
+    )
+"""
+
+def window_params(filters: Filter, kennel_id: int) -> dict:
+    return {"start_date": filters.start_date, "end_date": filters.end_date, "kennel_id": kennel_id}
+
+# plan_cache_mode of the analytics statements (see prepared_statements)
+ANALYTICS_PLAN = "auto"
+
 class analytics_repository():
 
     def __init__(self, connection):
         self._connection = connection
 
+    def _fetch_all(self, query: str, params) -> list[dict]:
+        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+            execute_prepared(cur, query, params, plan=ANALYTICS_PLAN)
+            return cur.fetchall()
+
     def get_weekly_stats(self, kennel_id: int, anchor_ts: datetime) -> list[WeeklyStats]:
+        return parse_weekly_stats(self._fetch_all(*self._weekly_stats_query(kennel_id, anchor_ts)))
+
+    def _weekly_stats_query(self, kennel_id: int, anchor_ts: datetime):
 
         # Need two weeks, so:
         # for exclusive upper bound
 
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
-            query = """
-                    WITH bounds AS (
-                    -- anchor_ts can be any timestamp within the "current" week you want to include
-                    SELECT
-                        DATE_TRUNC('week', %(anchor_ts)s)                 AS this_week_start,  -- Monday 00:00
-                        DATE_TRUNC('week', %(anchor_ts)s) - INTERVAL '1 week' AS prev_week_start,
-                        DATE_TRUNC('week', %(anchor_ts)s) + INTERVAL '1 week' AS next_week_start  -- exclusive upper bound
-                    ),
-                    weeks AS (
-                    -- generate exactly the two week starts you want to report on
-                    SELECT prev_week_start AS week_start FROM bounds
-                    UNION ALL
-                    SELECT this_week_start FROM bounds
-                    ),
-                    dogs_weeks AS (
-                    SELECT d.id AS dog_id, w.week_start
-                    FROM dogs d
-                    CROSS JOIN weeks w
-                    WHERE d.kennel_id = %(kennel_id)s
-                    ),
-                    weekly_mileage AS (
-                    SELECT
-                        ad.dog_id,
-                        DATE_TRUNC('week', a.timestamp) AS week_start,
-                        SUM(a.distance) AS total_distance_km,
-                        AVG(ad.rating) AS average_rating
-                    FROM activity_dogs ad
-                    JOIN activities a ON ad.activity_id = a.id
-                    JOIN bounds b ON a.timestamp >= b.prev_week_start     -- half-open interval
-                                AND a.timestamp <  b.next_week_start     -- covers prev week + current week fully
-                    GROUP BY ad.dog_id, week_start
-                    )
-                    SELECT
-                    dw.dog_id,
-                    dw.week_start,
-                    COALESCE(wm.total_distance_km, 0) AS total_distance_km,
-                    COALESCE(
-                        LAG(total_distance_km) OVER (PARTITION BY dw.dog_id ORDER BY dw.week_start),
-                        0
-                    ) AS previous_week_distance_km,
-                    wm.average_rating AS average_rating,
-                    LAG(average_rating) OVER (PARTITION BY dw.dog_id ORDER BY dw.week_start)
-                        AS previous_week_average_rating
-                    FROM dogs_weeks dw
-                    LEFT JOIN weekly_mileage wm
-                    ON wm.dog_id = dw.dog_id
-                    AND wm.week_start = dw.week_start
-                    ORDER BY dw.dog_id, dw.week_start DESC;
-                  
-                    """
-            params = {
-                "anchor_ts": anchor_ts,
-                "kennel_id": kennel_id
-            }
-            cur.execute(query, params)
-            rows = cur.fetchall()
-
-        return parse_weekly_stats(rows)
+        query = """
+                WITH bounds AS (
+                -- anchor_ts can be any timestamp within the "current" week you want to include
+                SELECT DATE_TRUNC('week', %(anchor_ts)s::timestamp)::date AS this_week_start  -- Monday
+                ),
+                weeks AS (
+                -- generate exactly the two week starts you want to report on
+                SELECT this_week_start - 7 AS week_start FROM bounds
+                UNION ALL
+                SELECT this_week_start FROM bounds
+                ),
+                dogs_weeks AS (
+                SELECT d.id AS dog_id, w.week_start
+                FROM dogs d
+                CROSS JOIN weeks w
+                WHERE d.kennel_id = %(kennel_id)s
+                ),
+                weekly_mileage AS (
+                -- both weeks are complete, the rollup has them as is
+                SELECT
+                    r.dog_id,
+                    r.week_start,
+                    r.distance_km::float8 AS total_distance_km,
+                    r.rating_sum::numeric / NULLIF(r.rated_sessions, 0) AS average_rating
+                FROM dog_weekly_rollup r
+                JOIN dogs_weeks dw USING (dog_id, week_start)
+                )
+                SELECT
+                dw.dog_id,
+                dw.week_start,
+                COALESCE(wm.total_distance_km, 0) AS total_distance_km,
+                COALESCE(
+                    LAG(total_distance_km) OVER (PARTITION BY dw.dog_id ORDER BY dw.week_start),
+                    0
+                ) AS previous_week_distance_km,
+                wm.average_rating AS average_rating,
+                LAG(average_rating) OVER (PARTITION BY dw.dog_id ORDER BY dw.week_start)
+                    AS previous_week_average_rating
+                FROM dogs_weeks dw
+                LEFT JOIN weekly_mileage wm
+                ON wm.dog_id = dw.dog_id
+                AND wm.week_start = dw.week_start
+                ORDER BY dw.dog_id, dw.week_start DESC
+              
+                """
+        params = {
+            "anchor_ts": anchor_ts,
+            "kennel_id": kennel_id
+        }
+        return query, params
     
     def get_weekly_mileage(self, filters: Filter, kennel_id: int):
-        where_clause, values = build_time_window_clause(filters, "a", "timestamp")
+        rows = self._fetch_all(*self._weekly_mileage_query(filters, kennel_id))
+        return [WeeklyDogDistance(**row) for row in rows]
 
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
-            query = f"""
-                    SELECT
-                        d.id AS dog_id,
-                        d.name AS dog_name,
-                        date_trunc('week', a.timestamp)::date AS week_start, -- Monday according to ISO 
-                        COALESCE(SUM(NULLIF(a.distance, 'NaN'::float8)),0) AS weekly_distance_km
-                    FROM activities a
-                    JOIN activity_dogs ad ON ad.activity_id = a.id
-                    JOIN dogs d           ON d.id = ad.dog_id
-                    WHERE
-                        d.kennel_id = %s
-                    AND {where_clause}
-                    GROUP BY
-                        d.id,
-                        d.name,
-                        date_trunc('week', a.timestamp)
-                    ORDER BY
-                        week_start,
-                        dog_name;
-            """
-            values.insert(0, kennel_id)
-            cur.execute(query, values)
-            rows = cur.fetchall()
-            
-            return [WeeklyDogDistance(**row) for row in rows]
+    def _weekly_mileage_query(self, filters: Filter, kennel_id: int):
+        query = f"""
+                WITH {DOG_WEEKLY_WINDOW_CTE}
+                SELECT
+                    d.id AS dog_id,
+                    d.name AS dog_name,
+                    dw.week_start, -- Monday according to ISO
+                    SUM(dw.distance_km)::float8 AS weekly_distance_km
+                FROM dog_weeks dw
+                JOIN dogs d ON d.id = dw.dog_id
+                GROUP BY
+                    d.id,
+                    d.name,
+                    dw.week_start
+                ORDER BY
+                    week_start,
+                    dog_name
+        """
+        return query, window_params(filters, kennel_id)
         
     def get_dog_running_per_day(self, start_date, end_date, kennel_id) -> list[DogCalendarDay]:
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
-            query = """
-                    SELECT
-                        a.timestamp::date AS date,
-                        ad.dog_id
-                    FROM activities a
-                    JOIN activity_dogs ad ON ad.activity_id = a.id
-                    JOIN dogs d on ad.dog_id = d.id
-                    WHERE d.kennel_id = %(kennel_id)s
-                    AND a.timestamp >= %(start_date)s
-                    AND a.timestamp < %(end_date)s
-                    """
-            # In this query the controller calcluates end day and automatically picks the following day 
-            # to include the last day of the month
-            params = {
-                    "kennel_id": kennel_id,
-                    "start_date": start_date,
-                    "end_date": end_date,
-                }
-            cur.execute(query, params)
-
-            rows = cur.fetchall()
+        return parse_dog_calendar(self._fetch_all(*self._dog_calendar_query(start_date, end_date, kennel_id)))
 
-        return parse_dog_calendar(rows)
+    def _dog_calendar_query(self, start_date, end_date, kennel_id):
+        query = """
+                SELECT
+                    a.timestamp::date AS date,
+                    ad.dog_id
+                FROM activities a
+                JOIN activity_dogs ad ON ad.activity_id = a.id
+                JOIN dogs d on ad.dog_id = d.id
+                WHERE d.kennel_id = %(kennel_id)s
+                AND a.timestamp >= %(start_date)s
+                AND a.timestamp < %(end_date)s
+                """
+        # In this query the controller calcluates end day and automatically picks the following day 
+        # to include the last day of the month
+        params = {
+                "kennel_id": kennel_id,
+                "start_date": start_date,
+                "end_date": end_date,
+            }
+        return query, params
     
     def get_analytic_summary_per_dog(self, filters: Filter, kennel_id: int) -> AnalyticSummary:
+        rows = self._fetch_all(*self._summary_query(filters, kennel_id))
+        return self._summary_from_rows(rows, filters)
 
-        where_clause, values = build_time_window_clause(filters, "a", "timestamp")
-
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
-            query = f"""
-                    SELECT
-                        ad.dog_id          AS dog_id,
-                        d.name        AS name,
-                        COALESCE(SUM(NULLIF(a.distance, 'NaN'::float8)),0)                AS total_distance_km,
-                        COALESCE(SUM(NULLIF(a.distance, 'NaN'::float8)/NULLIF(NULLIF(a.speed, 'NaN'::float8), 0)),0) AS total_duration_hours,
-                        COUNT(*)                          AS session_count,
-                        COALESCE(SUM(ad.rating), 0)        AS rating_sum,
-                        MIN(a.timestamp) AS min_date, -- Needed for freq calc in case user does not specify time range
-                        MAX(a.timestamp) AS max_date
-                        FROM activities a
-                        LEFT JOIN activity_dogs ad ON ad.activity_id = a.id
-                        JOIN dogs d ON d.id = ad.dog_id
-                        JOIN kennels k ON d.kennel_id = k.id
-                        WHERE kennel_id = %s
-                        AND a.speed IS NOT NULL 
-                        AND a.speed > 0
-                        AND {where_clause}
-                        GROUP BY ad.dog_id, d.name;
-                    """
-            values.insert(0, kennel_id)
-            cur.execute(query, values)
-            rows = cur.fetchall()
+    def _summary_query(self, filters: Filter, kennel_id: int):
+        # only sessions with a recorded speed count here (timed_* columns of the rollup)
+        query = f"""
+                WITH {DOG_WEEKLY_WINDOW_CTE}
+                SELECT
+                    dw.dog_id          AS dog_id,
+                    d.name        AS name,
+                    SUM(dw.timed_distance_km)::float8 AS total_distance_km, -- numeric: exact, independent of row order
+                    SUM(dw.duration_hours) AS total_duration_hours,
+                    SUM(dw.timed_sessions)::int     AS session_count,
+                    SUM(dw.timed_rating_sum)::int   AS rating_sum,
+                    MIN(dw.first_timed_at) AS min_date, -- Needed for freq calc in case user does not specify time range
+                    MAX(dw.last_timed_at) AS max_date
+                    FROM dog_weeks dw
+                    JOIN dogs d ON d.id = dw.dog_id
+                    GROUP BY dw.dog_id, d.name
+                    HAVING SUM(dw.timed_sessions) > 0
+                    ORDER BY dw.dog_id
+                """
+        return query, window_params(filters, kennel_id)
 
-            
-            if len(rows) == 0 or rows is None:
-                    return AnalyticSummary(
-                        total_distance_km=0,
-                        total_duration_hours=0,
-                        avg_rating=0,
-                        avg_frequency_per_week=0,
-                        per_dog = []
-                    )
-            
-            if filters.start_date and filters.end_date:
-                min_d, max_d = filters.start_date, filters.end_date
-            else:
-                min_d = min(r['min_date'] for r in rows if r['min_date'])
-                max_d = max(r['max_date'] for r in rows if r['max_date'])
+    def _summary_from_rows(self, rows: list[dict], filters: Filter) -> AnalyticSummary:
+        if len(rows) == 0 or rows is None:
+                return AnalyticSummary(
+                    total_distance_km=0,
+                    total_duration_hours=0,
+                    avg_rating=0,
+                    avg_frequency_per_week=0,
+                    per_dog = []
+                )
+        
+        if filters.start_date and filters.end_date:
+            min_d, max_d = filters.start_date, filters.end_date
+        else:
+            min_d = min(r['min_date'] for r in rows if r['min_date'])
+            max_d = max(r['max_date'] for r in rows if r['max_date'])
 
-            weeks = get_number_weeks(min_d,max_d)
+        weeks = get_number_weeks(min_d,max_d)
 
-            return parse_summary_from_rows(rows, weeks)
+        return parse_summary_from_rows(rows, weeks)
 
 
     def get_activity_heat_map(self, filters: Filter, kennel_id: int) -> list[LocationHeatPoint]:
+        rows = self._fetch_all(*self._heat_map_query(filters, kennel_id))
+        if rows is None or len(rows)==0:
+            return []
+        return [LocationHeatPoint(**row) for row in rows]
 
-        where_clause, values = build_time_window_clause(filters, "a", "timestamp")
+    def _heat_map_query(self, filters: Filter, kennel_id: int):
 
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+        where_clause, values = build_time_window_clause(filters, "a", "timestamp")
 
-            query = f"""
-                SELECT 
-                    COUNT(*) AS day_count,
-                    al.name      AS location_name,
-                    al.latitude,
-                    al.longitude
-                FROM (
-                    -- one row per (location, day)
-                    SELECT DISTINCT
-                        a.location_id,
-                        a.timestamp::date AS activity_date
-                    FROM activities a
-                    JOIN activity_dogs ad ON ad.activity_id = a.id
-                    JOIN dogs d ON d.id = ad.dog_id
-                    WHERE d.kennel_id = %s
-                    AND {where_clause}
-                ) AS days
-                JOIN activity_locations al
-                    ON al.id = days.location_id
-                -- filter out any location that does not have gps coords
-                WHERE
-                    al.latitude IS NOT NULL
-                    AND al.longitude IS NOT NULL
-                    AND al.latitude BETWEEN -90 AND 90
-                    AND al.longitude BETWEEN -180 AND 180
-                GROUP BY
-                    days.location_id,
-                    al.name,
-                    al.latitude,
-                    al.longitude
-                ORDER BY
-                    day_count DESC;
-                """
-            
-            values.insert(0, kennel_id)
-            cur.execute(query, values)
-            rows = cur.fetchall()
+        query = f"""
+            SELECT 
+                COUNT(*) AS day_count,
+                al.name      AS location_name,
+                al.latitude,
+                al.longitude
+            FROM (
+                -- one row per (location, day)
+                SELECT DISTINCT
+                    a.location_id,
+                    a.timestamp::date AS activity_date
+                FROM activities a
+                JOIN activity_dogs ad ON ad.activity_id = a.id
+                JOIN dogs d ON d.id = ad.dog_id
+                WHERE d.kennel_id = %s
+                AND {where_clause}
+            ) AS days
+            JOIN activity_locations al
+                ON al.id = days.location_id
+            -- filter out any location that does not have gps coords
+            WHERE
+                al.latitude IS NOT NULL
+                AND al.longitude IS NOT NULL
+                AND al.latitude BETWEEN -90 AND 90
+                AND al.longitude BETWEEN -180 AND 180
+            GROUP BY
+                days.location_id,
+                al.name,
+                al.latitude,
+                al.longitude
+            ORDER BY
+                day_count DESC
+            """
 
-            if rows is None or len(rows)==0:
-                return []
-        
-            return [LocationHeatPoint(**row) for row in rows]
+        values.insert(0, kennel_id)
+        return query, values
         
     def get_sport_counts(self, filters: Filter, kennel_id: int):
+        rows = self._fetch_all(*self._sport_counts_query(filters, kennel_id))
+        return [SportCount(**row) for row in rows]
+
+    def _sport_counts_query(self, filters: Filter, kennel_id: int):
         
         where_clause, values = build_time_window_clause(filters, "a", "timestamp")
 
+        query = f"""
+                SELECT 
+                    COUNT(*) as activity_count,
+                    s.name as sport_name,
+                    s.type as sport_type
+                FROM activities a
+                JOIN sports s on a.sport_id = s.id
+                JOIN activity_dogs ad ON ad.activity_id = a.id
+                JOIN dogs d ON d.id = ad.dog_id
+                WHERE d.kennel_id = %s
+                AND {where_clause}
+                GROUP BY a.sport_id, s.name, s.type
+                """
+
+        values.insert(0, kennel_id)
+        return query, values
+
+    def get_dashboard(self, filters: Filter, kennel_id: int, anchor_ts: datetime) -> AnalyticsDashboard:
+        """
+        Summary, weekly stats, sport distribution, weekly distance and heat map in one statement:
+        every query becomes a json_agg subquery of a single SELECT, so they all read the same
+        snapshot and the dashboard costs one round-trip.
+        """
         with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+            execute_prepared(cur, *self._dashboard_query(filters, kennel_id, anchor_ts), plan=ANALYTICS_PLAN)
+            row = cur.fetchone()
+        return self._dashboard_from_row(row, filters)
+
+    def _dashboard_query(self, filters: Filter, kennel_id: int, anchor_ts: datetime) -> tuple[str, list]:
+        parts = {
+            "summary": self._summary_query(filters, kennel_id),
+            "weekly_stats": self._weekly_stats_query(kennel_id, anchor_ts),
+            "sport_distribution": self._sport_counts_query(filters, kennel_id),
+            "weekly_distance": self._weekly_mileage_query(filters, kennel_id),
+            "heatmap": self._heat_map_query(filters, kennel_id),
+        }
+        # each part keeps its own parameter style, they are all made positional
+        columns, values = [], []
+        for name, (query, params) in parts.items():
+            query, params = positional(query, params)
+            columns.append(f"(SELECT COALESCE(json_agg(q), '[]'::json) FROM ({query}) q) AS {name}")
+            values.extend(params)
+        return "SELECT " + ",\n".join(columns), values
 
-            query = f"""
-                    SELECT 
-                        COUNT(*) as activity_count,
-                        s.name as sport_name,
-                        s.type as sport_type
-                    FROM activities a
-                    JOIN sports s on a.sport_id = s.id
-                    JOIN activity_dogs ad ON ad.activity_id = a.id
-                    JOIN dogs d ON d.id = ad.dog_id
-                    WHERE kennel_id = %s
-                    AND {where_clause}
-                    GROUP BY a.sport_id, s.name, s.type
-                    """
-            
-            values.insert(0, kennel_id)
-            cur.execute(query, values)
-            rows = cur.fetchall()
+    def _dashboard_from_row(self, row: dict, filters: Filter) -> AnalyticsDashboard:
+        # json has no timestamp type
+        for dog in row["summary"]:
+            dog["min_date"] = datetime.fromisoformat(dog["min_date"])
+            dog["max_date"] = datetime.fromisoformat(dog["max_date"])
 
-        return [SportCount(**row) for row in rows]
\ No newline at end of file
+        return AnalyticsDashboard(
+            summary=self._summary_from_rows(row["summary"], filters),
+            weekly_stats=parse_weekly_stats(row["weekly_stats"]),
+            sport_distribution=[SportCount(**r) for r in row["sport_distribution"]],
+            weekly_distance=[WeeklyDogDistance(**r) for r in row["weekly_distance"]],
+            heatmap=[LocationHeatPoint(**r) for r in row["heatmap"]],
+        )
@@ -0,0 +1,53 @@
+from src.models.activity import Activity, ActivityCreate
+from .abstract_repository import abstract_repository
+from .activity_repository import (
+    count_activities,
+    delete_activity,
+    import_activities,
+    insert_activity,
+    select_all,
+    select_all_with_count,
+    select_by_id,
+    update_activity,
+)
+from typing import List, Optional
+from src.utils.db_operations import arun_operation
+from src.utils.pagination import Cursor
+
+class async_activity_repository(abstract_repository):
+    """
+    activity_repository on a psycopg 3 AsyncConnection (see create_async_pool). Same
+    operations, SQL and results, but waiting on the database yields the event loop instead
+    of holding one of the threadpool's threads, so a worker can keep many requests in flight.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def get_by_name(self, name):
+        return super().get_by_name(name)
+
+    async def get_all(self, kennel_id: int, filters, limit: int = 10, offset: int = 0, cursor: Optional[Cursor] = None) -> List[Activity]:
+        return await arun_operation(self._connection, select_all(kennel_id, filters, limit, offset, cursor))
+
+    async def get_all_with_count(self, kennel_id: int, filters, limit: int = 10, offset: int = 0,
+                                 cursor: Optional[Cursor] = None, include_total: bool = True) -> tuple[List[Activity], Optional[int]]:
+        return await arun_operation(self._connection, select_all_with_count(kennel_id, filters, limit, offset, cursor, include_total))
+
+    async def get_by_id(self, activity_id: int) -> Optional[Activity]:
+        return await arun_operation(self._connection, select_by_id(activity_id))
+
+    async def get_total_count(self, kennel_id, filters):
+        return await arun_operation(self._connection, count_activities(kennel_id, filters))
+
+    async def create(self, activity: ActivityCreate) -> int:
+        return await arun_operation(self._connection, insert_activity(activity))
+
+    async def bulk_create(self, kennel_id: int, activities: list[tuple[int, ActivityCreate]]) -> Optional[tuple[list[tuple[int, int]], list[tuple[int, str]]]]:
+        return await arun_operation(self._connection, import_activities(kennel_id, activities))
+
+    async def delete(self, activity_id: int):
+        return await arun_operation(self._connection, delete_activity(activity_id))
+
+    async def update(self, activity_id: int, fields: dict):
+        return await arun_operation(self._connection, update_activity(activity_id, fields))
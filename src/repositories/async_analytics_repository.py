@@ -0,0 +1,46 @@
+from datetime import datetime
+from psycopg.rows import dict_row
+from src.models.analytics import WeeklyStats, AnalyticSummary, DogCalendarDay, LocationHeatPoint, SportCount, WeeklyDogDistance, AnalyticsDashboard
+from src.models import Filter
+from src.parsers.analytic_parser import parse_weekly_stats, parse_dog_calendar
+from src.utils.prepared_statements import aexecute_prepared
+from .analytics_repository import ANALYTICS_PLAN, analytics_repository
+
+class async_analytics_repository(analytics_repository):
+    """
+    analytics_repository on a psycopg 3 AsyncConnection: the queries and row parsing are
+    inherited, only the round-trips are awaited.
+    """
+
+    async def _fetch_all(self, query: str, params) -> list[dict]:
+        async with self._connection.cursor(row_factory=dict_row) as cur:
+            await aexecute_prepared(cur, query, params, plan=ANALYTICS_PLAN)
+            return await cur.fetchall()
+
+    async def get_weekly_stats(self, kennel_id: int, anchor_ts: datetime) -> list[WeeklyStats]:
+        return parse_weekly_stats(await self._fetch_all(*self._weekly_stats_query(kennel_id, anchor_ts)))
+
+    async def get_weekly_mileage(self, filters: Filter, kennel_id: int):
+        rows = await self._fetch_all(*self._weekly_mileage_query(filters, kennel_id))
+        return [WeeklyDogDistance(**row) for row in rows]
+
+    async def get_dog_running_per_day(self, start_date, end_date, kennel_id) -> list[DogCalendarDay]:
+        return parse_dog_calendar(await self._fetch_all(*self._dog_calendar_query(start_date, end_date, kennel_id)))
+
+    async def get_analytic_summary_per_dog(self, filters: Filter, kennel_id: int) -> AnalyticSummary:
+        rows = await self._fetch_all(*self._summary_query(filters, kennel_id))
+        return self._summary_from_rows(rows, filters)
+
+    async def get_activity_heat_map(self, filters: Filter, kennel_id: int) -> list[LocationHeatPoint]:
+        rows = await self._fetch_all(*self._heat_map_query(filters, kennel_id))
+        return [LocationHeatPoint(**row) for row in rows]
+
+    async def get_sport_counts(self, filters: Filter, kennel_id: int):
+        rows = await self._fetch_all(*self._sport_counts_query(filters, kennel_id))
+        return [SportCount(**row) for row in rows]
+
+    async def get_dashboard(self, filters: Filter, kennel_id: int, anchor_ts: datetime) -> AnalyticsDashboard:
+        async with self._connection.cursor(row_factory=dict_row) as cur:
+            await aexecute_prepared(cur, *self._dashboard_query(filters, kennel_id, anchor_ts), plan=ANALYTICS_PLAN)
+            row = await cur.fetchone()
+        return self._dashboard_from_row(row, filters)
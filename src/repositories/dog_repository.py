@@ -1,9 +1,10 @@
 from src.models.dog import Dog
 from src.models.kennel import Kennel
-from src.parsers.dog_parser import parse_dog_from_row
+from src.parsers.dog_parser import parse_dog_from_record
 from .abstract_repository import abstract_repository
 from typing import List, Optional
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import NamedTupleCursor, RealDictCursor
+from src.utils.db import json_array_query
 
 class dog_repository(abstract_repository):
 
@@ -12,7 +13,7 @@ class dog_repository(abstract_repository):
 
     # dog names are unique per kennel in the database but this method could return multiple dogs
     def get_by_name(self, dog_name: str) -> List[Dog]:
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+        with self._connection.cursor(cursor_factory= NamedTupleCursor) as cur:
             query = """ SELECT 
                             dogs.id,
                             dogs.name,
@@ -38,13 +39,13 @@ class dog_repository(abstract_repository):
             cur.execute(query, (dog_name,))
             dogs = []
             for row in cur.fetchall():
-                dog = parse_dog_from_row(row)
+                dog = parse_dog_from_record(row)
                 dogs.append(dog)
             return dogs
   
     # This method can only return a single entry
     def get_by_id(self, id: int) -> Optional[Dog]:
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+        with self._connection.cursor(cursor_factory= NamedTupleCursor) as cur:
             query = """ SELECT 
                             dogs.id,
                             dogs.name,
@@ -70,18 +71,12 @@ class dog_repository(abstract_repository):
             cur.execute(query, (id,))
             row = cur.fetchone()
 
-        return parse_dog_from_row(row)
+        return parse_dog_from_record(row)
 
 
     def get_all(self, kennel_id: int) -> List[Dog]:
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+        with self._connection.cursor(cursor_factory= NamedTupleCursor) as cur:
             query = """ 
-                        WITH latest_images AS (
-                            SELECT *,
-                                    ROW_NUMBER() OVER (PARTITION BY dog_id ORDER BY created_at DESC) AS rn
-                            FROM images
-                            WHERE dog_id IS NOT NULL
-                        )
                         SELECT 
                             dogs.id,
                             dogs.name,
@@ -97,18 +92,54 @@ class dog_repository(abstract_repository):
                             kennels k
                         ON
                             dogs.kennel_id = k.id
-                        LEFT JOIN latest_images
-                            ON latest_images.dog_id = dogs.id AND latest_images.rn = 1
+                        LEFT JOIN LATERAL (
+                            SELECT image_path
+                            FROM images
+                            WHERE images.dog_id = dogs.id
+                            ORDER BY created_at DESC
+                            LIMIT 1
+                        ) latest_images ON TRUE
                         WHERE 
                             kennel_id = %s;
                         """
             cur.execute(query, (kennel_id,))
             dogs = []
             for row in cur.fetchall():
-                dog = parse_dog_from_row(row)
+                dog = parse_dog_from_record(row)
                 dogs.append(dog)
             return dogs
 
+    def get_all_json(self, kennel_id: int) -> bytes:
+        """get_all as the JSON array of the Dog models, built by Postgres."""
+        with self._connection.cursor() as cur:
+            query = """
+                        SELECT
+                            dogs.id,
+                            dogs.name,
+                            breed,
+                            date_of_birth,
+                            COALESCE(NULLIF(color, ''), '#ffffff') AS color,
+                            json_build_object('id', k.id, 'name', k.name) AS kennel,
+                            COALESCE(latest_images.image_path, '') AS image_url
+                        FROM
+                            dogs
+                        JOIN
+                            kennels k
+                        ON
+                            dogs.kennel_id = k.id
+                        LEFT JOIN LATERAL (
+                            SELECT image_path
+                            FROM images
+                            WHERE images.dog_id = dogs.id
+                            ORDER BY created_at DESC
+                            LIMIT 1
+                        ) latest_images ON TRUE
+                        WHERE
+                            kennel_id = %s
+                        """
+            cur.execute(json_array_query(query), (kennel_id,))
+            return bytes(cur.fetchone()[0])
+
     def create(self, dog: Dog, kennel_id: int) -> Dog:
         with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
             try:
@@ -3,7 +3,9 @@ from src.models.location import Location, LocationWithUsage
 from .abstract_repository import abstract_repository
 from typing import List, Optional
 from psycopg2.extras import RealDictCursor
+from src.utils.db import json_array_query
 from psycopg2.errors import UniqueViolation, ForeignKeyViolation
+from src.utils.response_cache import invalidate_kennels
 
 class DuplicateLocationError(Exception):
     pass
@@ -56,6 +58,30 @@ class location_repository(abstract_repository):
             rows = cur.fetchall()
             
             return [Location(**row) for row in rows]
+
+    def get_all_json(self, kennel_id: int, search: Optional[str] = None) -> bytes:
+        """get_all as the JSON array of the Location models, built by Postgres."""
+        with self._connection.cursor() as cur:
+            query = """
+                       SELECT
+                            id,
+                            name,
+                            NULLIF(latitude, 'NaN'::float8) AS latitude,
+                            NULLIF(longitude, 'NaN'::float8) AS longitude
+                        FROM
+                            activity_locations
+                        WHERE
+                            kennel_id = %s
+                    """
+
+            params = [kennel_id]
+
+            if search:
+                query += " AND name ILIKE %s"
+                params.append(f"%{search}%")
+
+            cur.execute(json_array_query(query, order_by="r.name ASC"), params)
+            return bytes(cur.fetchone()[0])
     
     def get_all_with_usage(self, kennel_id: int, search: Optional[str] = None) -> List[Location]:
         with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
@@ -71,7 +97,7 @@ class location_repository(abstract_repository):
                         LEFT JOIN activities a
                             ON a.location_id = al.id
                         WHERE
-                            kennel_id = %s
+                            al.kennel_id = %s
                     """
             
             params = [kennel_id]
@@ -109,6 +135,7 @@ class location_repository(abstract_repository):
                 cur.execute(query, (location_name.lower(), kennel_id, latitude, longitude))
                 row=cur.fetchone()
                 self._connection.commit()
+                invalidate_kennels([kennel_id])
                 new_loc = Location(**row)
                 return new_loc
             except UniqueViolation:
@@ -124,6 +151,8 @@ class location_repository(abstract_repository):
                 query = """DELETE FROM activity_locations WHERE id = %s and kennel_id = %s;"""
                 cur.execute(query, (id,kennel_id,))
                 self._connection.commit()
+                if cur.rowcount > 0:
+                    invalidate_kennels([kennel_id])
                 return cur.rowcount > 0
             except ForeignKeyViolation:
                 self._connection.rollback()
@@ -146,10 +175,13 @@ class location_repository(abstract_repository):
                 query = f""" 
                             UPDATE activity_locations
                             SET {set_clause}
-                            WHERE id = %s;
+                            WHERE id = %s
+                            RETURNING kennel_id;
                         """
                 cur.execute(query, values)
+                kennels = [row['kennel_id'] for row in cur.fetchall()]
                 self._connection.commit()
+                invalidate_kennels(kennels)
                 return cur.rowcount > 0
             except Exception as e:
                 print(f"Could not update entry {id}: {e}")
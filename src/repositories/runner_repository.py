@@ -1,8 +1,9 @@
 from src.models.runner import Runner
-from src.parsers.runner_parser import parse_runner_from_row
+from src.parsers.runner_parser import parse_runner_from_record
 from .abstract_repository import abstract_repository
 from typing import List, Optional
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import NamedTupleCursor, RealDictCursor
+from src.utils.db import json_array_query
 
 class runner_repository(abstract_repository):
 
@@ -10,7 +11,7 @@ class runner_repository(abstract_repository):
         self._connection = connection
 
     def get_by_name(self, runner_name: str) -> Optional[Runner]:
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+        with self._connection.cursor(cursor_factory= NamedTupleCursor) as cur:
             query = """ SELECT 
                             runners.id,
                             runners.name,
@@ -33,19 +34,13 @@ class runner_repository(abstract_repository):
             cur.execute(query, (runner_name,))
             row = cur.fetchone()
         if row:
-            runner = parse_runner_from_row(row)
+            runner = parse_runner_from_record(row)
             return runner
         return None
 
     def get_all(self, kennel_id: int) -> List[Runner]:
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+        with self._connection.cursor(cursor_factory= NamedTupleCursor) as cur:
             query = """ 
-                        WITH latest_images AS (
-                            SELECT *,
-                                    ROW_NUMBER() OVER (PARTITION BY runner_id ORDER BY created_at DESC) AS rn
-                            FROM images
-                            WHERE runner_id IS NOT NULL
-                        )
                         SELECT 
                             runners.id,
                             runners.name,
@@ -58,21 +53,54 @@ class runner_repository(abstract_repository):
                             kennels k
                         ON
                             runners.kennel_id = k.id
-                        LEFT JOIN latest_images
-                            ON latest_images.runner_id = runners.id AND latest_images.rn = 1
+                        LEFT JOIN LATERAL (
+                            SELECT image_path
+                            FROM images
+                            WHERE images.runner_id = runners.id
+                            ORDER BY created_at DESC
+                            LIMIT 1
+                        ) latest_images ON TRUE
                         WHERE 
                             kennel_id = %s
                         """
             cur.execute(query, (kennel_id,))
             runners = []
             for row in cur.fetchall():
-                runner = parse_runner_from_row(row)
+                runner = parse_runner_from_record(row)
                 runners.append(runner)
 
             return runners
+
+    def get_all_json(self, kennel_id: int) -> bytes:
+        """get_all as the JSON array of the Runner models, built by Postgres."""
+        with self._connection.cursor() as cur:
+            query = """
+                        SELECT
+                            runners.id,
+                            runners.name,
+                            json_build_object('id', k.id, 'name', k.name) AS kennel,
+                            COALESCE(latest_images.image_path, '') AS image_url
+                        FROM
+                            runners
+                        JOIN
+                            kennels k
+                        ON
+                            runners.kennel_id = k.id
+                        LEFT JOIN LATERAL (
+                            SELECT image_path
+                            FROM images
+                            WHERE images.runner_id = runners.id
+                            ORDER BY created_at DESC
+                            LIMIT 1
+                        ) latest_images ON TRUE
+                        WHERE
+                            kennel_id = %s
+                        """
+            cur.execute(json_array_query(query), (kennel_id,))
+            return bytes(cur.fetchone()[0])
             
     def get_by_id(self, id: int) -> Optional[Runner]:
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+        with self._connection.cursor(cursor_factory= NamedTupleCursor) as cur:
             query = """ SELECT 
                             runners.id,
                             runners.name,
@@ -95,7 +123,7 @@ class runner_repository(abstract_repository):
             cur.execute(query, (id,))
             row = cur.fetchone()
 
-        return parse_runner_from_row(row)
+        return parse_runner_from_record(row)
     
     def create(self, runner: Runner, kennel_id) -> Runner:
         with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
@@ -2,9 +2,11 @@ from src.models import Dog, Kennel, DogWeightEntry, WeightQueryFilter, DogWeight
 from datetime import date
 from typing import List
 from src.repositories.abstract_repository import abstract_repository
-from psycopg2.extras import RealDictCursor
-from src.parsers.weight_parser import parse_weight_from_row
-from src.utils.db import build_conditions
+from psycopg2.extras import NamedTupleCursor, RealDictCursor
+from src.parsers.weight_parser import parse_weight_from_record
+from src.utils.db import build_conditions, build_normalized_conditions
+from src.utils.prepared_statements import execute_prepared
+from src.utils.response_cache import invalidate_kennels
 
 class weight_repository(abstract_repository):
 
@@ -12,7 +14,7 @@ class weight_repository(abstract_repository):
         self._connection = connection
 
     def get_by_id(self, id: int) -> DogWeightEntry:
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+        with self._connection.cursor(cursor_factory= NamedTupleCursor) as cur:
             query = """
                     SELECT 
                         w.id, w.date, w.weight,
@@ -29,13 +31,14 @@ class weight_repository(abstract_repository):
                 """
             cur.execute(query, (id,))
             row = cur.fetchone()
-            return parse_weight_from_row(row)
+            return parse_weight_from_record(row)
 
     def get_all(self, kennel_id: int, filters: WeightQueryFilter) -> List[DogWeightEntry]:
 
-        where_clause, values = build_conditions(filters)
+        # one prepared statement whichever filters are set
+        where_clause, values = build_normalized_conditions(filters)
         
-        with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
+        with self._connection.cursor(cursor_factory= NamedTupleCursor) as cur:
             query = f"""
                     SELECT 
                         w.id, w.date, w.weight,
@@ -52,12 +55,12 @@ class weight_repository(abstract_repository):
                     ORDER BY date DESC
                 """
             values.insert(0, kennel_id)
-            cur.execute(query, values)
+            execute_prepared(cur, query, values)
             rows = cur.fetchall()
             weight_entries = []
             for row in rows:
                 weight_entries.append(
-                    parse_weight_from_row(row)
+                    parse_weight_from_record(row)
                 )
         return weight_entries
     
@@ -81,7 +84,7 @@ class weight_repository(abstract_repository):
                     FROM RankedEntries
                     WHERE rn = 1
                 """
-            cur.execute(query, (kennel_id,))
+            execute_prepared(cur, query, (kennel_id,), plan="generic")
             rows = cur.fetchall()
             return [DogWeightLatest(**row) for row in rows]
 
@@ -117,10 +120,13 @@ class weight_repository(abstract_repository):
     def create(self, weigth_entry: DogWeightIn, dog_id: int) -> int:
         with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
             try:
-                cur.execute("""INSERT INTO weight_entries (dog_id, date, weight) VALUES (%s, %s, %s) RETURNING id;""",
+                cur.execute("""INSERT INTO weight_entries (dog_id, date, weight) VALUES (%s, %s, %s)
+                               RETURNING id, (SELECT kennel_id FROM dogs WHERE dogs.id = weight_entries.dog_id) AS kennel_id;""",
                             (dog_id, weigth_entry.date, weigth_entry.weight) )
-                entry_id = cur.fetchone()['id']
+                row = cur.fetchone()
+                entry_id = row['id']
                 self._connection.commit()
+                invalidate_kennels([row['kennel_id']])
             except Exception as e:
                 print(e)
                 self._connection.rollback()
@@ -130,9 +136,12 @@ class weight_repository(abstract_repository):
     def delete(self, weight_id: int):
         with self._connection.cursor(cursor_factory= RealDictCursor) as cur:
             try:
-                cur.execute("""DELETE FROM weight_entries WHERE id = %s; """,
+                cur.execute("""DELETE FROM weight_entries WHERE id = %s
+                               RETURNING (SELECT kennel_id FROM dogs WHERE dogs.id = weight_entries.dog_id) AS kennel_id; """,
                             (weight_id,))
+                kennels = [row['kennel_id'] for row in cur.fetchall()]
                 self._connection.commit()
+                invalidate_kennels(kennels)
                 return cur.rowcount > 0
             except Exception as e:
                 self._connection.rollback()
@@ -149,12 +158,15 @@ class weight_repository(abstract_repository):
 
                 query = f"""UPDATE weight_entries 
                                 SET {set_clause}
-                                WHERE id = %s"""
+                                WHERE id = %s
+                                RETURNING (SELECT kennel_id FROM dogs WHERE dogs.id = weight_entries.dog_id) AS kennel_id"""
                 
                 #add entry id
                 values.append(id)
                 cur.execute(query, values)
+                kennels = [row['kennel_id'] for row in cur.fetchall()]
                 self._connection.commit()
+                invalidate_kennels(kennels)
                 return cur.rowcount > 0
             except Exception as e:
                 print(f"Could not update entry {id}: {e}")
@@ -0,0 +1,56 @@
+import time
+from weakref import WeakKeyDictionary
+from psycopg import AsyncConnection
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+from ..config import settings
+from .query_timing import TimedAsyncClientCursor
+
+__all__ = ["AsyncConnectionPool", "PoolTimeout", "create_async_pool"]
+
+class _IdleHealthCheck:
+    """
+    Pings a connection on checkout only if it sat idle for longer than `interval`,
+    like ConnectionPool does, instead of paying a round-trip on every request.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._last_used: WeakKeyDictionary[AsyncConnection, float] = WeakKeyDictionary()
+
+    async def check(self, conn: AsyncConnection):
+        last_used = self._last_used.get(conn)
+        if last_used is None or time.monotonic() - last_used >= self.interval:
+            # raising makes the pool discard the connection and hand out another one
+            await AsyncConnectionPool.check_connection(conn)
+
+    async def returned(self, conn: AsyncConnection):
+        self._last_used[conn] = time.monotonic()
+
+def create_async_pool() -> AsyncConnectionPool:
+    """
+    psycopg 3 pool for the async routes. It is created closed: open it from the
+    application's lifespan (`await pool.open()`), where an event loop is running.
+
+    Connections use client-side binding (AsyncClientCursor) so the SQL shared with the
+    psycopg2 repositories behaves the same: multi-statement queries, mogrify() and
+    parameters interpolated as literals rather than typed server-side parameters, and
+    their statements are timed like the psycopg2 ones (TimedAsyncClientCursor). The
+    client encoding is pinned to UTF-8 since psycopg 3 returns bytes, not str, for text
+    columns of a SQL_ASCII database.
+    """
+    db_url = (
+        settings.TEST_DATABASE_URL
+        if settings.ENV == "test"
+        else settings.DATABASE_URL
+    )
+    health = _IdleHealthCheck(settings.DB_POOL_HEALTH_CHECK_INTERVAL)
+    return AsyncConnectionPool(
+        db_url,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_ASYNC_POOL_MAX_SIZE,
+        timeout=settings.DB_POOL_TIMEOUT,
+        kwargs={"cursor_factory": TimedAsyncClientCursor, "client_encoding": "utf8"},
+        check=health.check,
+        reset=health.returned,
+        open=False,
+    )
@@ -76,6 +76,79 @@ def calculate_speed_from_time_distance(distance: float, time: str):
 
     return distance / total_seconds * c.SEC_IN_HOUR
 
+# Batch variants of the conversions above for many laps or activities at once: same
+# results as the scalar functions (same float operations), computed on numpy arrays.
+# Missing or unusable values are NaN in the float arrays and None in the string ones.
+
+# "MM:SS" of every pace below an hour, indexed by its number of seconds
+_PACE_STRINGS = np.array([f"{minutes:02}:{seconds:02}" for minutes in range(60) for seconds in range(60)], dtype=object)
+
+def _time_str_to_seconds(time_str) -> float:
+    if not isinstance(time_str, str):
+        return np.nan
+    parts = time_str.split(":")
+    if len(parts) not in (2, 3):
+        return np.nan
+    try:
+        values = [int(part) for part in parts]
+    except ValueError:
+        return np.nan
+    hours, minutes, seconds = values if len(values) == 3 else [0, *values]
+    return hours * 3600 + minutes * 60 + seconds
+
+def convert_str_times_to_seconds(time_strs) -> np.ndarray:
+    """
+    convert_str_time_to_timedelta(...).total_seconds() of many 'MM:SS' or 'H:MM:SS'
+    strings, NaN for the ones it would reject.
+    """
+    return np.fromiter((_time_str_to_seconds(time_str) for time_str in time_strs), dtype=np.float64)
+
+def to_float_array(values) -> np.ndarray:
+    """Floats of many values (numbers or numeric strings), NaN for None and the rest."""
+    def to_float(value):
+        try:
+            return np.nan if value is None or isinstance(value, bool) else float(value)
+        except (TypeError, ValueError):
+            return np.nan
+    return np.fromiter((to_float(value) for value in values), dtype=np.float64)
+
+def calculate_speeds_from_time_distance(distances, seconds) -> np.ndarray:
+    """calculate_speed_from_time_distance of many laps, times given in seconds."""
+    distances, seconds = np.asarray(distances, dtype=np.float64), np.asarray(seconds, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speeds = distances / seconds * c.SEC_IN_HOUR
+    return np.where(seconds > 0, speeds, np.nan)
+
+def calculate_speeds_from_paces(pace_seconds) -> np.ndarray:
+    """calculate_speed_from_pace of many paces given in seconds per km, NaN when not positive."""
+    pace_seconds = np.asarray(pace_seconds, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speeds = np.round(c.SEC_IN_HOUR / pace_seconds, 2)
+    return np.where(pace_seconds > 0, speeds, np.nan)
+
+def calculate_paces_from_speeds(speeds) -> np.ndarray:
+    """
+    calculate_pace_from_speed of many speeds (km/h): an object array of 'MM:SS' strings,
+    None where the speed is not positive. Like the scalar version the hours of a pace
+    over an hour are dropped.
+    """
+    speeds = np.asarray(speeds, dtype=np.float64)
+    valid = speeds > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        time_in_sec = np.where(valid, c.SEC_IN_HOUR / np.where(valid, speeds, 1.0), 0.0)
+    minutes = (time_in_sec // c.MIN_TO_SEC).astype(np.int64) % 60
+    seconds = (time_in_sec % c.MIN_TO_SEC).astype(np.int64)
+    paces = _PACE_STRINGS[minutes * 60 + seconds]
+    paces[~valid] = None
+    return paces
+
+def format_lap_times(seconds) -> list:
+    """Lap times 'MM:SS' (minutes not capped) of many durations in seconds, None for NaN."""
+    seconds = np.asarray(seconds, dtype=np.float64)
+    valid = ~np.isnan(seconds)
+    minutes, rest = np.divmod(np.where(valid, seconds, 0).astype(np.int64), 60)
+    return [f"{m:02}:{s:02}" if ok else None for m, s, ok in zip(minutes.tolist(), rest.tolist(), valid.tolist())]
+
 
 def get_month_range(year: int, month: int) -> tuple[date, date]:
     start = date(year, month, 1)
@@ -42,13 +42,14 @@ def build_conditions(filters: WeightQueryFilter | ActivityQueryFilters):
             conditions.append("a.workout = %s")
             values.append(filters.workout)
         
+        # EXISTS keeps one row per activity, an activity can have several dogs
         if filters.dog_id:
-            conditions.append("ad.dog_id = %s")
+            conditions.append("EXISTS (SELECT 1 FROM activity_dogs ad WHERE ad.activity_id = a.id AND ad.dog_id = %s)")
             values.append(filters.dog_id)
 
         # case insensitive and partial match
         if filters.location_id:
-            conditions.append("l.id = %s")
+            conditions.append("a.location_id = %s")
             values.append(filters.location_id) 
 
         if filters.start_date:
@@ -63,18 +64,71 @@ def build_conditions(filters: WeightQueryFilter | ActivityQueryFilters):
 
     return where_clause, values
 
+# (field, column, cast) of the filters in build_conditions order, dog_id goes through activity_dogs
+_WEIGHT_FILTERS = [("dog_id", "w.dog_id", "int")]
+_ACTIVITY_FILTERS = [
+    ("sport_id", "a.sport_id", "int"),
+    ("runner_id", "a.runner_id", "int"),
+    ("workout", "a.workout", "boolean"),
+    ("dog_id", None, "int"),
+    ("location_id", "a.location_id", "int"),
+]
+
+def build_normalized_conditions(filters: WeightQueryFilter | ActivityQueryFilters):
+    """
+    Same filtering as build_conditions, but every filter is always part of the clause
+    and an unset one is passed as NULL, which disables it. The SQL text then no longer
+    depends on which filters are set, so one prepared statement serves all of them
+    (custom plans fold the NULL checks away, generic plans test them once per row).
+    """
+    if isinstance(filters, ActivityQueryFilters):
+        table_filters, date_column = _ACTIVITY_FILTERS, "a.timestamp"
+    else:
+        table_filters, date_column = _WEIGHT_FILTERS, "w.date"
+
+    conditions = []
+    values = []
+    for field, column, cast in table_filters:
+        value = getattr(filters, field)
+        # build_conditions skips falsy ids, workout=False is a filter
+        value = value if field == "workout" or value else None
+        if column is None:
+            conditions.append(f"(%s::{cast} IS NULL OR EXISTS (SELECT 1 FROM activity_dogs ad WHERE ad.activity_id = a.id AND ad.dog_id = %s))")
+        else:
+            conditions.append(f"(%s::{cast} IS NULL OR {column} = %s)")
+        values.extend([value, value])
+
+    conditions.append(f"{date_column} >= COALESCE(%s::date, '-infinity'::date)")
+    conditions.append(f"{date_column} <= COALESCE(%s::date, 'infinity'::date)")
+    values.extend([filters.start_date, filters.end_date])
+
+    return " AND ".join(conditions), values
+
 def build_time_window_clause(filters: Filter, table_key: str, table_column: str):
     conditions = []
     values = []
 
     if filters.start_date:
-            conditions.append(f"{table_key}.{table_column} >= %s")
+            conditions.append(f"{table_key}.{table_column} >= %s::date")
             values.append(filters.start_date)
 
     # Make sure the last day is inclusive by using strict inequality and bump day by 1.
     if filters.end_date:
-        conditions.append(f"{table_key}.{table_column} < %s + INTERVAL '1 day'")
+        conditions.append(f"{table_key}.{table_column} < %s::date + INTERVAL '1 day'")
         values.append(filters.end_date)
 
     where_clause = " AND ".join(conditions) if conditions else "TRUE"
     return where_clause, values
+
+def json_array_query(query: str, order_by: str = None) -> str:
+    """
+    Wraps a query so Postgres returns all its rows as one JSON array, UTF-8 encoded
+    (bytea, read as bytes): one object per row, keyed by the column names in select
+    order. Nothing is decoded or encoded in Python, the value can be sent as the
+    response body. `order_by` sorts the array by columns of the query (`r.name`).
+    """
+    order = f" ORDER BY {order_by}" if order_by else ""
+    return f"""
+        SELECT convert_to('[' || COALESCE(string_agg(row_to_json(r)::text, ','{order}), '') || ']', 'UTF8') AS body
+        FROM ({query}) r
+    """
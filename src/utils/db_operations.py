@@ -0,0 +1,99 @@
+import io
+from typing import Any, Generator, NamedTuple, Optional
+from psycopg.rows import dict_row, namedtuple_row
+from psycopg2.extras import NamedTupleCursor, RealDictCursor
+from .prepared_statements import aexecute_prepared, execute_prepared
+
+# A repository operation is written once as a generator yielding the steps below and
+# receiving each one's result, then run on a psycopg2 connection (run_operation) or a
+# psycopg 3 async one (arun_operation). A step that fails is raised inside the generator,
+# where the operation can roll back and report it like any other exception.
+
+class Statement(NamedTuple):
+    query: str
+    params: Any = None
+    fetch: Optional[str] = None  # "one", "all" or "rowcount" of the last result, None for nothing
+    plan: Optional[str] = None  # run through a prepared statement with this plan mode
+    named_tuples: bool = False  # rows as named tuples, dicts otherwise
+
+class Copy(NamedTuple):
+    statement: str  # COPY ... FROM STDIN
+    data: io.StringIO
+
+COMMIT = "commit"
+ROLLBACK = "rollback"
+
+Operation = Generator[Statement | Copy | str, Any, Any]
+
+def run_operation(connection, operation: Operation):
+    """Runs an operation on a psycopg2 connection and returns its result."""
+    result, error = None, None
+    while True:
+        try:
+            step = operation.throw(error) if error is not None else operation.send(result)
+        except StopIteration as stop:
+            return stop.value
+        result, error = None, None
+        try:
+            result = _run_step(connection, step)
+        except Exception as e:
+            error = e
+
+async def arun_operation(connection, operation: Operation):
+    """run_operation on a psycopg 3 AsyncConnection."""
+    result, error = None, None
+    while True:
+        try:
+            step = operation.throw(error) if error is not None else operation.send(result)
+        except StopIteration as stop:
+            return stop.value
+        result, error = None, None
+        try:
+            result = await _arun_step(connection, step)
+        except Exception as e:
+            error = e
+
+def _run_step(connection, step):
+    if step == COMMIT:
+        return connection.commit()
+    if step == ROLLBACK:
+        return connection.rollback()
+    if isinstance(step, Copy):
+        with connection.cursor() as cur:
+            return cur.copy_expert(step.statement, step.data)
+    with connection.cursor(cursor_factory=NamedTupleCursor if step.named_tuples else RealDictCursor) as cur:
+        if step.plan is not None:
+            execute_prepared(cur, step.query, step.params, plan=step.plan)
+        else:
+            cur.execute(step.query, step.params)
+        return _fetch(cur, step.fetch)
+
+async def _arun_step(connection, step):
+    if step == COMMIT:
+        return await connection.commit()
+    if step == ROLLBACK:
+        return await connection.rollback()
+    if isinstance(step, Copy):
+        async with connection.cursor() as cur:
+            async with cur.copy(step.statement) as copy:
+                return await copy.write(step.data.getvalue())
+    async with connection.cursor(row_factory=namedtuple_row if step.named_tuples else dict_row) as cur:
+        if step.plan is not None:
+            await aexecute_prepared(cur, step.query, step.params, plan=step.plan)
+        else:
+            await cur.execute(step.query, step.params)
+        # psycopg 3 keeps the result of every statement of the query, psycopg2 the last one
+        while cur.nextset():
+            pass
+        if step.fetch == "one":
+            return await cur.fetchone()
+        if step.fetch == "all":
+            return await cur.fetchall()
+        return cur.rowcount if step.fetch == "rowcount" else None
+
+def _fetch(cur, fetch: Optional[str]):
+    if fetch == "one":
+        return cur.fetchone()
+    if fetch == "all":
+        return cur.fetchall()
+    return cur.rowcount if fetch == "rowcount" else None
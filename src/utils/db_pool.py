@@ -0,0 +1,201 @@
+import threading
+import time
+from contextlib import contextmanager
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import ThreadedConnectionPool
+from ..config import settings
+from .query_timing import InstrumentedConnection
+
+class PoolTimeoutError(Exception):
+    pass
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+
+    Sync routes run on the FastAPI threadpool, so every request borrows its own
+    connection instead of sharing a single one. Checkouts block for at most
+    `timeout` seconds when all connections are in use.
+    """
+
+    def __init__(self, dsn: str, min_size: int = 1, max_size: int = 10,
+                 timeout: float = 5.0, health_check_interval: float = 30.0,
+                 connection_factory: type | None = None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._pool = ThreadedConnectionPool(min_size, max_size, dsn, connection_factory=connection_factory)
+        # bounds concurrent checkouts so the underlying pool never raises "exhausted"
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._last_used: dict[int, float] = {}
+        # ids of the connections kept by the underlying pool between checkouts
+        self._idle: set[int] = set()
+        self._in_use = 0
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_time = 0.0
+
+        # the connections opened with the pool go through a checkout so they are counted idle
+        for conn in [self._pool.getconn() for _ in range(min_size)]:
+            self._put(conn)
+
+    def getconn(self) -> extensions.connection:
+        start = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+        acquired = self._slots.acquire(timeout=self.timeout)
+        with self._lock:
+            self._waiting -= 1
+            if not acquired:
+                self._timeouts += 1
+        if not acquired:
+            raise PoolTimeoutError(f"No database connection available after {self.timeout}s")
+
+        try:
+            conn = self._checkout_healthy()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_time += time.monotonic() - start
+        return conn
+
+    def putconn(self, conn: extensions.connection):
+        close = bool(conn.closed)
+        if not close and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            # never hand a half-finished or aborted transaction to the next request
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                close = True
+
+        with self._lock:
+            self._in_use -= 1
+            if close:
+                self._discarded += 1
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+
+        try:
+            self._put(conn, close=close)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection for the duration of a request. Anything left
+        uncommitted when the block exits is rolled back before the connection
+        goes back to the pool.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": idle,
+                "size": self._in_use + idle,
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "avg_wait_ms": (self._wait_time / self._checkouts * 1000) if self._checkouts else 0.0,
+            }
+
+    def close(self):
+        self._pool.closeall()
+        with self._lock:
+            self._idle.clear()
+
+    @property
+    def closed(self) -> bool:
+        return self._pool.closed
+
+    def _get(self) -> extensions.connection:
+        conn = self._pool.getconn()
+        with self._lock:
+            self._idle.discard(id(conn))
+        return conn
+
+    def _put(self, conn: extensions.connection, close: bool = False):
+        # counted idle before it is back in the underlying pool, where another thread
+        # can take it; the pool closes the ones it doesn't keep (over min_size)
+        if not close:
+            with self._lock:
+                self._idle.add(id(conn))
+        try:
+            self._pool.putconn(conn, close=close)
+        finally:
+            if conn.closed:
+                with self._lock:
+                    self._idle.discard(id(conn))
+
+    def _checkout_healthy(self) -> extensions.connection:
+        conn = self._get()
+        if self._is_healthy(conn):
+            return conn
+
+        # stale connection (server restart, idle timeout...), replace it with a fresh one
+        with self._lock:
+            self._discarded += 1
+            self._last_used.pop(id(conn), None)
+        self._put(conn, close=True)
+        return self._get()
+
+    def _is_healthy(self, conn: extensions.connection) -> bool:
+        if conn.closed:
+            return False
+
+        last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return True
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+
+def create_pool() -> ConnectionPool:
+    db_url = (
+        settings.TEST_DATABASE_URL
+        if settings.ENV == "test"
+        else settings.DATABASE_URL
+    )
+    return ConnectionPool(
+        db_url,
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        timeout=settings.DB_POOL_TIMEOUT,
+        health_check_interval=settings.DB_POOL_HEALTH_CHECK_INTERVAL,
+        # every query is timed and counted for /metrics and the Server-Timing header
+        connection_factory=InstrumentedConnection,
+    )
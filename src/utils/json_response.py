@@ -0,0 +1,26 @@
+from typing import Any
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+# serializes each value with its own type's serializer (models, lists and dicts of them)
+_ANY = TypeAdapter(Any)
+
+class ModelJSONResponse(Response):
+    """
+    JSON response for values that are models already (or lists and dicts holding them),
+    encoded once by pydantic-core, straight to bytes. A route returning a Response skips
+    FastAPI's response_model handling, which validates the models again and builds plain
+    Python objects before encoding them: keep response_model on the route for the
+    OpenAPI schema. The body is the same as the one FastAPI would send.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return _ANY.dump_json(content)
+
+class RawJSONResponse(Response):
+    """
+    Response whose content is JSON encoded elsewhere, sent as is (bytes built by
+    Postgres, see db.json_array_query).
+    """
+    media_type = "application/json"
@@ -0,0 +1,242 @@
+import bisect
+import sys
+import threading
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Counter:
+    """Monotonic total per label set (Prometheus counter)."""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_number(value)}")
+        return lines
+
+class Gauge:
+    """
+    Current value per label set (Prometheus gauge), either set or read at each render
+    from a function returning {labels: value}.
+    """
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+        self._function: Optional[Callable[[], dict[tuple, float]]] = None
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def set_function(self, function: Optional[Callable[[], dict[tuple, float]]]):
+        with self._lock:
+            self._function = function
+
+    def value(self, *labels) -> float:
+        return self._read().get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self._read().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_number(value)}")
+        return lines
+
+    def _read(self) -> dict[tuple, float]:
+        with self._lock:
+            function, values = self._function, dict(self._values)
+        return function() if function is not None else values
+
+class Histogram:
+    """Cumulative buckets, sum and count per label set (Prometheus histogram)."""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # per label set: [count per bucket (+Inf last), sum]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            series = self._values.get(labels)
+            return sum(series[0]) if series else 0
+
+    def total(self, *labels) -> float:
+        with self._lock:
+            series = self._values.get(labels)
+            return series[1] if series else 0.0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_number(bound)
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, f'le="{le}"')} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_number(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """
+    In-process metrics of one worker, rendered in the Prometheus text format by
+    GET /metrics. Each worker process keeps its own values: scrape every worker (or
+    run a single one per container) to see all of them.
+    """
+
+    def __init__(self):
+        self._metrics: list[Counter | Gauge | Histogram] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to serve a request, by route template.",
+    labels=("method", "route", "status"),
+))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds", "Time spent executing a query, by the repository method issuing it.",
+    labels=("query",),
+))
+db_query_rows = registry.register(Counter(
+    "db_query_rows_total", "Rows returned or affected by queries, by the repository method issuing them.",
+    labels=("query",),
+))
+db_queries_per_request = registry.register(Histogram(
+    "db_queries_per_request", "Queries executed while serving a request, by route template.",
+    labels=("method", "route"), buckets=QUERY_COUNT_BUCKETS,
+))
+
+db_pool_connections = registry.register(Gauge(
+    "db_pool_connections", "Connections of the sync database pool, checked out (in_use) or idle.",
+    labels=("state",),
+))
+db_pool_waiting = registry.register(Gauge(
+    "db_pool_waiting", "Checkouts of the sync database pool waiting for a free connection.",
+))
+db_pool_checkout_timeouts = registry.register(Gauge(
+    "db_pool_checkout_timeouts", "Checkouts of the sync database pool that gave up after DB_POOL_TIMEOUT seconds, since it was opened.",
+))
+
+def observe_pool(pool):
+    """The db_pool gauges read pool.stats() at each render from now on, until called with None."""
+    if pool is None:
+        for gauge in (db_pool_connections, db_pool_waiting, db_pool_checkout_timeouts):
+            gauge.set_function(None)
+        return
+    db_pool_connections.set_function(lambda: {(state,): pool.stats()[state] for state in ("in_use", "idle")})
+    db_pool_waiting.set_function(lambda: {(): pool.stats()["waiting"]})
+    db_pool_checkout_timeouts.set_function(lambda: {(): pool.stats()["timeouts"]})
+
+class RequestTimings:
+    """Query totals of the request being served, reported in its Server-Timing header."""
+
+    __slots__ = ("queries", "rows", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f"total;dur={total_seconds * 1000:.1f}, "
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries, {self.rows} rows"'
+        )
+
+# set by TimingMiddleware for the duration of a request; threadpool routes and
+# dependencies run in a copy of the context, so they record into the same object
+current_request: ContextVar[Optional[RequestTimings]] = ContextVar("current_request", default=None)
+
+REPOSITORY_PACKAGE = "src.repositories."
+INSTRUMENTATION_MODULES = ("src.utils.metrics", "src.utils.query_timing")
+
+def query_name() -> str:
+    """
+    Names the query being executed after the repository method issuing it
+    (`analytics_repository.get_dashboard`), which keeps the label set small and stable.
+    Private helpers (`_fetch_all`) are skipped in favour of the public method calling them.
+    Queries issued outside the repositories (pool health checks) are named after their
+    first caller in src, "other" if there is none.
+    """
+    frame = sys._getframe(1)
+    fallback = caller = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(REPOSITORY_PACKAGE):
+            owner = frame.f_locals.get("self")
+            owner_name = type(owner).__name__ if owner is not None else module.rsplit(".", 1)[-1]
+            name = f"{owner_name}.{frame.f_code.co_name}"
+            if not frame.f_code.co_name.startswith("_"):
+                return name
+            fallback = fallback or name
+        elif caller is None and module.startswith("src.") and module not in INSTRUMENTATION_MODULES:
+            caller = f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or caller or "other"
+
+def record_query(name: str, seconds: float, rows: int):
+    rows = max(rows, 0)
+    db_query_duration.observe(seconds, name)
+    db_query_rows.inc(name, amount=rows)
+    timings = current_request.get()
+    if timings is not None:
+        timings.queries += 1
+        timings.rows += rows
+        timings.db_seconds += seconds
@@ -1,20 +1,104 @@
+import base64
+import json
+from datetime import datetime
+from typing import NamedTuple, Optional
 from fastapi import Request
 from urllib.parse import urlencode
 
-def paginate_results(items: list, total: int, request: Request, limit: int, offset: int):
+class Cursor(NamedTuple):
+    """
+    Keyset position in a list ordered by (timestamp DESC, id DESC).
+    direction "next" selects rows older than the position, "previous" rows newer than it.
+    """
+    timestamp: datetime
+    id: int
+    direction: str = "next"
+
+    def encode(self) -> str:
+        raw = json.dumps({"ts": self.timestamp.isoformat(), "id": self.id, "d": self.direction})
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(raw, dict):
+                raise ValueError("cursor must be a JSON object")
+            direction = raw.get("d", "next")
+            if direction not in ("next", "previous"):
+                raise ValueError(f"Unknown cursor direction: {direction}")
+            return cls(datetime.fromisoformat(raw["ts"]), int(raw["id"]), direction)
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {value}") from e
+
+def paginate_results(items: list, total: Optional[int], request: Request, limit: int, offset: Optional[int], cursor: Optional[Cursor] = None):
+    """
+    Build the paginated payload. With an integer offset, links use limit/offset.
+    With offset=None the list was fetched in cursor mode: `items` holds up to
+    limit + 1 rows (the extra one only tells whether more rows exist in the
+    fetch direction) and links carry opaque `cursor` values instead.
+    When total is None (count skipped) offset mode also expects limit + 1 items.
+    """
     base_url = str(request.url).split("?")[0]
     query_params = dict(request.query_params)
 
+    if offset is None:
+        return _paginate_by_cursor(items, total, base_url, query_params, limit, cursor)
+
     def build_url(new_offset: int):
         query_params["limit"] = limit
         query_params["offset"] = new_offset
         return f"{base_url}?{urlencode(query_params)}"
 
+    if total is None:
+        has_next = items is not None and len(items) > limit
+        items = items[:limit] if items is not None else items
+    else:
+        has_next = offset + limit < total
+
     return {
         "total_count": total,
         "limit": limit,
         "offset": offset,
-        "next": build_url(offset + limit) if offset + limit < total else None,
+        "next": build_url(offset + limit) if has_next else None,
         "previous": build_url(max(offset - limit, 0)) if offset > 0 else None,
         "data": items,
     }
+
+def _paginate_by_cursor(items: list, total: int, base_url: str, query_params: dict, limit: int, cursor: Optional[Cursor]):
+    query_params.pop("offset", None)
+    items = items or []
+    has_more = len(items) > limit
+    backwards = cursor is not None and cursor.direction == "previous"
+
+    # items are always newest first, the extra row sits on the side we were moving towards
+    if has_more:
+        items = items[1:] if backwards else items[:limit]
+
+    def build_url(new_cursor: Cursor):
+        query_params["limit"] = limit
+        query_params["cursor"] = new_cursor.encode()
+        return f"{base_url}?{urlencode(query_params)}"
+
+    has_next = has_more if not backwards else True
+    has_previous = has_more if backwards else cursor is not None
+
+    next_url = previous_url = None
+    if items:
+        if has_next:
+            next_url = build_url(Cursor(_field(items[-1], "timestamp"), _field(items[-1], "id"), "next"))
+        if has_previous:
+            previous_url = build_url(Cursor(_field(items[0], "timestamp"), _field(items[0], "id"), "previous"))
+
+    return {
+        "total_count": total,
+        "limit": limit,
+        "offset": None,
+        "next": next_url,
+        "previous": previous_url,
+        "data": items,
+    }
+
+def _field(item, name: str):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
@@ -0,0 +1,196 @@
+import functools
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterator, NamedTuple, Optional
+from weakref import WeakKeyDictionary
+from ..config import settings
+
+# plan_cache_mode of an execution: Postgres' own choice (custom plans for the first five
+# executions, then the generic one unless it looks costlier, the connection's setting
+# being left as it is), always the generic plan (no planning at all once it is cached),
+# or a plan made for each set of values
+PLAN_CACHE_MODES = {"auto": "auto", "generic": "force_generic_plan", "custom": "force_custom_plan"}
+
+_PLACEHOLDERS = re.compile(r"%\((\w+)\)s|%s|%%")
+_EXECUTE = re.compile(r"^(?:SET LOCAL plan_cache_mode = \w+; )?EXECUTE (\w+)")
+
+def positional(query: str, params) -> tuple[str, list]:
+    """
+    Rewrites a query using %(name)s placeholders with plain %s ones, the values repeated
+    in order of appearance. Positional queries are returned as they are.
+    """
+    if not isinstance(params, dict):
+        return query, list(params or ())
+    values = []
+
+    def replace(match: re.Match) -> str:
+        if match.group(1) is None:
+            return match.group(0)
+        values.append(params[match.group(1)])
+        return "%s"
+
+    return _PLACEHOLDERS.sub(replace, query), values
+
+class PreparedStatement(NamedTuple):
+    name: str
+    query: str  # the positional query the statement was prepared from
+    prepare: str
+    execute: str  # takes the query's values as parameters
+    reset: Optional[str]  # run after a successful execute, if any
+
+_statements: OrderedDict[str, str] = OrderedDict()
+_statements_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=1024)
+def prepared_statement(query: str, plan: str = "auto") -> PreparedStatement:
+    """
+    Server-side statement for a positional query (%s placeholders). The name is derived
+    from the query text, so every connection and worker uses the same one, whatever the
+    plan mode. Parameter types are inferred by Postgres from where they are used: cast
+    placeholders whose context is ambiguous (`%s::date IS NULL`).
+    """
+    name = "stmt_" + hashlib.blake2b(query.encode(), digest_size=8).hexdigest()
+    count = 0
+
+    def number(match: re.Match) -> str:
+        nonlocal count
+        if match.group(0) == "%%":
+            return "%"
+        count += 1
+        return f"${count}"
+
+    body = _PLACEHOLDERS.sub(number, query).strip().rstrip(";")
+    arguments = f"({', '.join(['%s'] * count)})" if count else ""
+    with _statements_lock:
+        _statements[name] = query
+        if len(_statements) > 1024:
+            _statements.popitem(last=False)
+    execute = f"EXECUTE {name}{arguments}"
+    if PLAN_CACHE_MODES[plan] == "auto":
+        return PreparedStatement(name, query, f"PREPARE {name} AS {body}", execute, None)
+    # SET LOCAL would last until the end of the request's transaction, forcing the mode on
+    # every statement after this one: it is set back to the connection's default (nothing
+    # in the app sets it per session) once the execution is done
+    return PreparedStatement(
+        name,
+        query,
+        f"PREPARE {name} AS {body}",
+        f"SET LOCAL plan_cache_mode = {PLAN_CACHE_MODES[plan]}; {execute}",
+        "SET LOCAL plan_cache_mode = DEFAULT",
+    )
+
+def source_query(query, params):
+    """
+    The query an `EXECUTE` of a prepared statement runs and its values, so it can be
+    logged and explained elsewhere. Any other statement is returned unchanged.
+    """
+    text = query.decode() if isinstance(query, bytes) else str(query)
+    match = _EXECUTE.match(text)
+    if match is None:
+        return query, params
+    with _statements_lock:
+        source = _statements.get(match.group(1))
+    return (source, params) if source is not None else (query, params)
+
+class StatementCache:
+    """
+    Names of the statements prepared on each connection, least recently used first.
+    A connection holds at most `max_statements` of them: preparing one more deallocates
+    the oldest, so a long-lived connection can't accumulate one per query variant.
+    Prepared statements belong to the server session: behind a pooler that hands out
+    server connections per transaction, disable them (PREPARED_STATEMENT_CACHE_SIZE=0).
+    """
+
+    def __init__(self, max_statements: int = 64):
+        self.max_statements = max_statements
+        self._prepared: WeakKeyDictionary = WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.prepares = 0
+        self.deallocations = 0
+
+    def setup(self, connection, statement: PreparedStatement) -> Iterator[str]:
+        """
+        Statements to run on `connection` before `statement.execute`. Each one is only
+        recorded once the caller resumes the iterator, that is after it succeeded (PREPARE
+        and DEALLOCATE are not transactional, a later rollback does not undo them).
+        """
+        with self._lock:
+            prepared = self._prepared.setdefault(connection, OrderedDict())
+            if statement.name in prepared:
+                prepared.move_to_end(statement.name)
+                return
+            evicted = list(prepared)[:max(len(prepared) - self.max_statements + 1, 0)]
+        for name in evicted:
+            yield f"DEALLOCATE {name}"
+            with self._lock:
+                prepared.pop(name, None)
+                self.deallocations += 1
+        yield statement.prepare
+        with self._lock:
+            prepared[statement.name] = None
+            self.prepares += 1
+
+    def prepared(self, connection) -> list[str]:
+        with self._lock:
+            return list(self._prepared.get(connection, ()))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "connections": len(self._prepared),
+                "prepared": sum(len(names) for names in self._prepared.values()),
+                "prepares": self.prepares,
+                "deallocations": self.deallocations,
+            }
+
+_statement_cache: Optional[StatementCache] = None
+_statement_cache_lock = threading.Lock()
+
+def get_statement_cache() -> StatementCache:
+    global _statement_cache
+    with _statement_cache_lock:
+        if _statement_cache is None:
+            _statement_cache = StatementCache(settings.PREPARED_STATEMENT_CACHE_SIZE)
+        return _statement_cache
+
+def set_statement_cache(cache: Optional[StatementCache]):
+    global _statement_cache
+    with _statement_cache_lock:
+        _statement_cache = cache
+
+def execute_prepared(cur, query: str, params=None, plan: str = "auto"):
+    """
+    cur.execute(query, params) through a statement prepared on the cursor's connection,
+    so Postgres skips parsing (and with plan="generic" planning) after the first call.
+    Runs the query as is when PREPARED_STATEMENT_CACHE_SIZE is 0.
+    """
+    cache = get_statement_cache()
+    if cache.max_statements <= 0:
+        return cur.execute(query, params)
+    query, values = positional(query, params)
+    statement = prepared_statement(query, plan)
+    for setup in cache.setup(cur.connection, statement):
+        cur.execute(setup)
+    result = cur.execute(statement.execute, values or None)
+    if statement.reset is not None:
+        # on a cursor of its own, `cur` keeps the rows of the execution
+        with cur.connection.cursor() as reset:
+            reset.execute(statement.reset)
+    return result
+
+async def aexecute_prepared(cur, query: str, params=None, plan: str = "auto"):
+    """execute_prepared for psycopg 3 async cursors."""
+    cache = get_statement_cache()
+    if cache.max_statements <= 0:
+        return await cur.execute(query, params)
+    query, values = positional(query, params)
+    statement = prepared_statement(query, plan)
+    for setup in cache.setup(cur.connection, statement):
+        await cur.execute(setup)
+    result = await cur.execute(statement.execute, values or None)
+    if statement.reset is not None:
+        async with cur.connection.cursor() as reset:
+            await reset.execute(statement.reset)
+    return result
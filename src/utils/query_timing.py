@@ -0,0 +1,80 @@
+import functools
+import time
+from psycopg import AsyncClientCursor
+from psycopg2 import extensions
+from .metrics import query_name, record_query
+from .slow_query_log import log_if_slow
+
+def _finish(name: str, start: float, rows: int, query, params, explain: bool = True):
+    seconds = time.perf_counter() - start
+    record_query(name, seconds, rows)
+    log_if_slow(name, query, params, seconds, rows, explain)
+
+class _TimedCursorMixin:
+    """
+    Times every statement run through a psycopg2 cursor and records its duration and
+    row count (see metrics.record_query), statements over SLOW_QUERY_THRESHOLD_MS also go
+    to the slow query log. Mixed into whichever cursor_factory the repository asked for,
+    so RealDictCursor rows and named cursors behave as before.
+    """
+
+    def execute(self, query, vars=None):
+        name, start = query_name(), time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            _finish(name, start, self.rowcount, query, vars)
+
+    def executemany(self, query, vars_list):
+        name, start = query_name(), time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            # vars_list may be a consumed iterator: logged without parameters or plan
+            _finish(name, start, self.rowcount, query, None, explain=False)
+
+    def copy_expert(self, sql, file, size=8192):
+        name, start = query_name(), time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            _finish(name, start, self.rowcount, sql, None, explain=False)
+
+@functools.cache
+def timed_cursor_class(cursor_class: type) -> type:
+    return type(f"Timed{cursor_class.__name__}", (_TimedCursorMixin, cursor_class), {})
+
+class InstrumentedConnection(extensions.connection):
+    """
+    psycopg2 connection (pass it as connection_factory) whose cursors are all timed,
+    whatever cursor_factory the caller picks.
+    """
+
+    def cursor(self, *args, **kwargs):
+        cursor_class = kwargs.get("cursor_factory") or self.cursor_factory or extensions.cursor
+        kwargs["cursor_factory"] = timed_cursor_class(cursor_class)
+        return super().cursor(*args, **kwargs)
+
+class TimedAsyncClientCursor(AsyncClientCursor):
+    """
+    AsyncClientCursor recording its statements like the psycopg2 cursors above. Like
+    psycopg2, a call running several statements is left on the last one's result (the
+    rows of `SET ...; EXECUTE ...`, see prepared_statements).
+    """
+
+    async def execute(self, query, params=None, **kwargs):
+        name, start = query_name(), time.perf_counter()
+        try:
+            await super().execute(query, params, **kwargs)
+            while self.nextset():
+                pass
+            return self
+        finally:
+            _finish(name, start, self.rowcount, query, params)
+
+    async def executemany(self, query, params_seq, **kwargs):
+        name, start = query_name(), time.perf_counter()
+        try:
+            return await super().executemany(query, params_seq, **kwargs)
+        finally:
+            _finish(name, start, self.rowcount, query, None, explain=False)
@@ -0,0 +1,190 @@
+import abc
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Iterable, NamedTuple, Optional
+from pydantic import BaseModel
+from ..config import settings
+
+class CacheKey(NamedTuple):
+    kennel_id: int
+    route: str
+    params: tuple
+
+def normalize_params(params: BaseModel | dict | None = None, **extra) -> tuple:
+    """
+    Turns a Filter (or plain query values) into a hashable, order independent key part.
+    Unset values are dropped so Filter() and Filter(start_date=None) share an entry.
+    """
+    values = params.model_dump() if isinstance(params, BaseModel) else dict(params or {})
+    values.update(extra)
+    return tuple(sorted(
+        (name, value.isoformat() if isinstance(value, (date, datetime)) else value)
+        for name, value in values.items() if value is not None
+    ))
+
+def cache_key(kennel_id: int, route: str, params: BaseModel | dict | None = None, **extra) -> CacheKey:
+    return CacheKey(kennel_id, route, normalize_params(params, **extra))
+
+class ResponseCacheBackend(abc.ABC):
+    """
+    Storage for computed responses, scoped per kennel so a write can drop everything a
+    kennel sees at once. Subclass it to share the cache between workers (e.g. redis) and
+    install it with set_response_cache().
+    """
+
+    @abc.abstractmethod
+    def get(self, key: CacheKey) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(self, key: CacheKey, value: Any, version: Optional[int] = None):
+        """Store value, unless the kennel was invalidated since `version` was read."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def version(self, kennel_id: int) -> int:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def invalidate(self, kennel_id: int):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+    def get_or_compute(self, key: CacheKey, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+        # read before computing: a write landing while we query makes this result stale
+        version = self.version(key.kennel_id)
+        value = compute()
+        if value is not None:
+            self.set(key, value, version)
+        return value
+
+    async def aget_or_compute(self, key: CacheKey, compute: Callable[[], Awaitable[Any]]) -> Any:
+        # get_or_compute for async repositories, compute() returns a coroutine
+        value = self.get(key)
+        if value is not None:
+            return value
+        version = self.version(key.kennel_id)
+        value = await compute()
+        if value is not None:
+            self.set(key, value, version)
+        return value
+
+class ResponseCache(ResponseCacheBackend):
+    """
+    In-process LRU of responses that also expire after `ttl` seconds. Each worker has its
+    own copy, so writes handled by another worker are only picked up once entries expire.
+    max_entries=0 disables caching (every lookup is a miss).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[CacheKey, tuple[Any, float]] = OrderedDict()
+        self._keys_by_kennel: dict[int, set[CacheKey]] = {}
+        self._versions: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                value, expires_at = cached
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def set(self, key: CacheKey, value: Any, version: Optional[int] = None):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if version is not None and version != self._versions.get(key.kennel_id, 0):
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._keys_by_kennel.setdefault(key.kennel_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def version(self, kennel_id: int) -> int:
+        with self._lock:
+            return self._versions.get(kennel_id, 0)
+
+    def invalidate(self, kennel_id: int):
+        with self._lock:
+            self._versions[kennel_id] = self._versions.get(kennel_id, 0) + 1
+            for key in self._keys_by_kennel.pop(kennel_id, ()):
+                self._entries.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_kennel.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: CacheKey):
+        self._entries.pop(key, None)
+        keys = self._keys_by_kennel.get(key.kennel_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_kennel[key.kennel_id]
+
+_response_cache: Optional[ResponseCacheBackend] = None
+
+def get_response_cache() -> ResponseCacheBackend:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(settings.ANALYTICS_CACHE_SIZE, settings.ANALYTICS_CACHE_TTL)
+    return _response_cache
+
+def set_response_cache(cache: Optional[ResponseCacheBackend]):
+    # None goes back to the default in-process cache on next use
+    global _response_cache
+    _response_cache = cache
+
+def invalidate_kennels(kennel_ids: Iterable[Optional[int]]):
+    """Called by repositories once a write touching these kennels is committed."""
+    cache = get_response_cache()
+    for kennel_id in set(kennel_ids):
+        if kennel_id is not None:
+            cache.invalidate(kennel_id)
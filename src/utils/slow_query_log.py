@@ -0,0 +1,206 @@
+import json
+import logging
+import queue
+import random
+import re
+import threading
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Optional
+import psycopg2
+from ..config import settings
+from .db import get_connection
+from .prepared_statements import source_query
+
+logger = logging.getLogger(__name__)
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE)\b", re.I)
+_EXPLAINABLE = ("SELECT", "WITH", "VALUES", "TABLE", "INSERT", "UPDATE", "DELETE", "MERGE")
+
+def _text(query) -> str:
+    return query.decode() if isinstance(query, bytes) else str(query)
+
+def normalize_sql(query) -> str:
+    """
+    One-line form of a statement with its literals replaced by `?`, so the same query
+    logged with different (mogrified) values reads the same.
+    """
+    sql = _COMMENTS.sub(" ", _text(query))
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+def _type_name(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+def params_shape(params: Any) -> Any:
+    """Parameter types (and sequence lengths), never their values."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {name: _type_name(value) for name, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_type_name(value) for value in params]
+    return _type_name(params)
+
+def explain_mode(query) -> Optional[str]:
+    """
+    "analyze" for read-only statements, which can safely be executed again under
+    EXPLAIN ANALYZE, "plan" for writes (estimated plan only), None when the statement
+    can't be explained (COPY, several statements in one call...).
+    """
+    sql = _STRINGS.sub("''", _COMMENTS.sub(" ", _text(query))).strip().rstrip(";")
+    if not sql or ";" in sql or sql.split(None, 1)[0].upper() not in _EXPLAINABLE:
+        return None
+    return "plan" if _WRITES.search(sql) else "analyze"
+
+class SlowQueryLog:
+    """
+    Writes statements slower than `threshold_ms` to a rotating JSON lines file: query
+    name, duration, rows, normalized SQL and parameter shape. A `sample_rate` share of
+    them is also run again under EXPLAIN (ANALYZE, BUFFERS) (plain EXPLAIN for writes)
+    on a dedicated connection, in a transaction that is rolled back.
+
+    Requests only enqueue entries: explaining and writing happen on a background thread,
+    and entries are dropped (and counted) when its queue is full.
+    """
+
+    def __init__(self, path: str, threshold_ms: float, sample_rate: float = 0.1,
+                 max_bytes: int = 10_000_000, backup_count: int = 5,
+                 explain_timeout_ms: int = 10_000, queue_size: int = 100,
+                 connect: Callable[[], Any] = get_connection):
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self.explain_timeout_ms = explain_timeout_ms
+        self._connect = connect
+        self._connection = None
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._logged = 0
+        self._explained = 0
+        self._dropped = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._thread = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+        self._thread.start()
+
+    def submit(self, name: str, query, params, seconds: float, rows: int, explain: bool = True):
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "query": name,
+            "duration_ms": round(seconds * 1000, 3),
+            "rows": rows,
+            "sql": normalize_sql(query),
+            "params": params_shape(params),
+        }
+        explain = explain and random.random() < self.sample_rate
+        try:
+            self._queue.put_nowait((entry, query, params, explain))
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+
+    def flush(self):
+        """Blocks until every submitted entry is written."""
+        self._queue.join()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"logged": self._logged, "explained": self._explained, "dropped": self._dropped}
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._handler.close()
+        if self._connection is not None:
+            self._connection.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                entry, query, params, explain = item
+                if explain:
+                    entry.update(self._explain(query, params))
+                self._handler.emit(logging.makeLogRecord({"msg": json.dumps(entry, default=str)}))
+                with self._lock:
+                    self._logged += 1
+                    self._explained += "plan" in entry
+            except Exception:
+                logger.exception("could not write slow query entry")
+            finally:
+                self._queue.task_done()
+
+    def _explain(self, query, params) -> dict:
+        mode = explain_mode(query)
+        if mode is None:
+            return {"explain_error": "statement can't be explained"}
+        options = "ANALYZE, BUFFERS" if mode == "analyze" else "COSTS"
+        try:
+            if self._connection is None or self._connection.closed:
+                self._connection = self._connect()
+            with self._connection.cursor() as cur:
+                # bounds the cost of re-running a query that was slow in the first place
+                cur.execute("SET LOCAL statement_timeout = %s", (self.explain_timeout_ms,))
+                cur.execute(f"EXPLAIN ({options}) {_text(query)}", params)
+                plan = "\n".join(row[0] for row in cur.fetchall())
+            return {"plan": plan, "plan_analyzed": mode == "analyze"}
+        except psycopg2.Error as error:
+            return {"explain_error": str(error).strip()}
+        finally:
+            if self._connection is not None and not self._connection.closed:
+                self._connection.rollback()
+
+_slow_query_log: Optional[SlowQueryLog] = None
+_slow_query_log_lock = threading.Lock()
+
+def get_slow_query_log() -> SlowQueryLog:
+    global _slow_query_log
+    with _slow_query_log_lock:
+        if _slow_query_log is None:
+            _slow_query_log = SlowQueryLog(
+                settings.SLOW_QUERY_LOG_PATH,
+                settings.SLOW_QUERY_THRESHOLD_MS,
+                sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+                max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                backup_count=settings.SLOW_QUERY_LOG_BACKUPS,
+                explain_timeout_ms=settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+            )
+        return _slow_query_log
+
+def set_slow_query_log(log: Optional[SlowQueryLog]):
+    # tests install their own log (file in a temporary directory, every entry explained)
+    global _slow_query_log
+    with _slow_query_log_lock:
+        _slow_query_log = log
+
+def close_slow_query_log():
+    global _slow_query_log
+    with _slow_query_log_lock:
+        if _slow_query_log is not None:
+            _slow_query_log.close()
+            _slow_query_log = None
+
+def log_if_slow(name: str, query, params, seconds: float, rows: int, explain: bool = True):
+    log = _slow_query_log
+    if log is None:
+        # created on the first slow statement, so the file only appears when needed
+        threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold_ms <= 0 or seconds * 1000 < threshold_ms:
+            return
+        log = get_slow_query_log()
+    if seconds >= log.threshold:
+        # prepared statements are logged (and explained) as the query they execute
+        query, params = source_query(query, params)
+        log.submit(name, query, params, seconds, rows, explain)
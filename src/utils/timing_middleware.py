@@ -0,0 +1,50 @@
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .metrics import RequestTimings, current_request, db_queries_per_request, http_request_duration
+
+class TimingMiddleware:
+    """
+    Times every HTTP request and the queries it runs (recorded by the instrumented
+    cursors of both connection pools, see query_timing).
+
+    Latency and query counts go to the /metrics histograms, labelled by route template
+    ("/analytics/dashboard", "/activities/{id}") rather than by raw path; the response
+    also carries a Server-Timing header (total and database time, query and row counts)
+    when `server_timing` is on. Plain ASGI rather than BaseHTTPMiddleware, so streamed
+    responses are not buffered.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_request.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", timings.server_timing(time.perf_counter() - start)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            # the router stores the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            http_request_duration.observe(time.perf_counter() - start, scope["method"], route_path, str(status))
+            db_queries_per_request.observe(timings.queries, scope["method"], route_path)
@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import OrderedDict
+import jwt
+from jwt.exceptions import PyJWTError
+
+class InvalidTokenError(Exception):
+    pass
+
+class TokenVerifier:
+    """
+    Decodes access tokens issued by the auth service in-process, using the shared
+    SECRET_KEY/ALGORITHM, and keeps a bounded LRU of token -> claims so repeated
+    requests with the same token skip the signature check until the token expires.
+    """
+
+    def __init__(self, secret_key: str, algorithm: str, cache_size: int = 1024):
+        self._secret_key = secret_key
+        self._algorithms = [algorithm]
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token: str) -> dict:
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(token)
+            if cached is not None:
+                claims, expires_at = cached
+                if expires_at > now:
+                    self._cache.move_to_end(token)
+                    self.hits += 1
+                    return claims
+                del self._cache[token]
+            self.misses += 1
+
+        try:
+            payload = jwt.decode(token, self._secret_key, algorithms=self._algorithms,
+                                 options={"require": ["exp"]})
+        except PyJWTError as decoding_error:
+            raise InvalidTokenError("Invalid or expired access token") from decoding_error
+
+        # same contract as the auth service /validate route
+        if payload.get("sub") is None or payload.get("kennel_id") is None:
+            raise InvalidTokenError("Token is missing user information")
+        claims = {"sub": payload["sub"], "user_id": payload.get("user_id"), "kennel_id": payload["kennel_id"]}
+
+        if self._cache_size > 0:
+            with self._lock:
+                self._cache[token] = (claims, float(payload["exp"]))
+                self._cache.move_to_end(token)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+        return claims
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
@@ -4,17 +4,20 @@ from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.testclient import TestClient
 from src.api.activity_controller import router as activity_router
 from src.repositories.activity_repository import activity_repository
+from src.repositories.async_activity_repository import async_activity_repository
 from src.models.activity import Activity, ActivityCreate, ActivityUpdate
 from src.models.common import ActivityQueryFilters
+from src.utils.pagination import Cursor
 from datetime import datetime
 
 
 
 @pytest.fixture(scope="function")
 def mock_repo(test_activity):
-    mock = Mock(spec=activity_repository)
+    mock = Mock(spec=async_activity_repository)
     mock_activity = [test_activity, test_activity]
     mock.get_all.return_value = mock_activity
+    mock.get_all_with_count.return_value = (mock_activity, 10)
     mock.create.return_value = 3
     mock.get_total_count.return_value = 10
     mock.delete.retrun_value = True
@@ -33,8 +36,8 @@ def test_app(mock_repo):
     async def fake_jwt_verify(request: Request):
         request.state.kennel_id = 1
 
-    from src.deps import get_activity_repo, verify_jwt
-    app.dependency_overrides[get_activity_repo] = override_repo
+    from src.deps import get_async_activity_repo, verify_jwt
+    app.dependency_overrides[get_async_activity_repo] = override_repo
     app.dependency_overrides[verify_jwt] = fake_jwt_verify
     app.include_router(activity_router, dependencies=[Depends(verify_jwt)])
 
@@ -46,8 +49,10 @@ def test_get_activities(test_app, mock_repo):
     response=client.get("/activities")
     assert response.status_code == 200
     assert len(response.json()["data"]) == 2
-    mock_repo.get_all.assert_called_once()
-    mock_repo.get_all.assert_called_with(1, ActivityQueryFilters(), 10, 0)
+    assert response.json()["total_count"] == 10
+    mock_repo.get_all_with_count.assert_called_once()
+    mock_repo.get_all_with_count.assert_called_with(1, ActivityQueryFilters(), 10, 0, cursor=None, include_total=True)
+    mock_repo.get_total_count.assert_not_called()
 
 def test_create_activity(test_app, mock_repo, test_activity_create):
     client = TestClient(test_app)
@@ -91,4 +96,157 @@ def test_delete_activity(test_app, mock_repo):
     response =  client.delete("/activities/2")
     assert response.status_code == 200
     mock_repo.delete.assert_called_once()
-    mock_repo.delete.assert_called_with(2)
\ No newline at end of file
+    mock_repo.delete.assert_called_with(2)
+
+
+def test_get_activities_cursor_mode(test_app, mock_repo, test_activity):
+    client = TestClient(test_app)
+
+    response = client.get("/activities?limit=1&cursor=")
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["data"]) == 1
+    assert body["offset"] is None
+    assert body["previous"] is None
+    assert "cursor=" in body["next"]
+    mock_repo.get_all_with_count.assert_called_with(1, ActivityQueryFilters(), 2, 0, cursor=None, include_total=True)
+
+def test_get_activities_with_cursor(test_app, mock_repo, test_activity):
+    client = TestClient(test_app)
+    cursor = Cursor(test_activity.timestamp, 5)
+
+    response = client.get(f"/activities?limit=2&cursor={cursor.encode()}")
+    assert response.status_code == 200
+    mock_repo.get_all_with_count.assert_called_with(1, ActivityQueryFilters(), 3, 0, cursor=cursor, include_total=True)
+
+@pytest.mark.parametrize("cursor", ["garbage", "WzFd"])
+def test_get_activities_invalid_cursor(test_app, mock_repo, cursor):
+    client = TestClient(test_app)
+    response = client.get(f"/activities?cursor={cursor}")
+    assert response.status_code == 400
+    mock_repo.get_all_with_count.assert_not_called()
+
+def test_get_activities_without_total(test_app, mock_repo, test_activity):
+    mock_repo.get_all_with_count.return_value = ([test_activity, test_activity, test_activity], None)
+    client = TestClient(test_app)
+
+    response = client.get("/activities?limit=2&include_total=false")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_count"] is None
+    assert len(body["data"]) == 2
+    assert "offset=2" in body["next"]
+    mock_repo.get_all_with_count.assert_called_with(1, ActivityQueryFilters(), 3, 0, cursor=None, include_total=False)
+
+def test_bulk_import_activities(test_app, mock_repo, test_activity_create):
+    client = TestClient(test_app)
+    body = "\n".join([test_activity_create.model_dump_json(), "{not json", test_activity_create.model_dump_json()])
+    mock_repo.bulk_create.side_effect = lambda kennel_id, rows: ([(rows[0][0], 21)], [(rows[1][0], "runner_id 7 does not belong to this kennel")])
+
+    response = client.post("/activities/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 1
+    assert result["ids"] == [21]
+    # parse errors and rows rejected by the repository are merged in row order
+    assert [e["row"] for e in result["errors"]] == [2, 3]
+    assert result["errors"][1]["error"] == "runner_id 7 does not belong to this kennel"
+    kennel_id, rows = mock_repo.bulk_create.call_args.args
+    assert kennel_id == 1
+    assert [row for row, _ in rows] == [1, 3]
+    assert rows[0][1] == test_activity_create
+
+def test_bulk_import_unsupported_content_type(test_app, mock_repo):
+    client = TestClient(test_app)
+    response = client.post("/activities/bulk", json=[])
+    assert response.status_code == 415
+    mock_repo.bulk_create.assert_not_called()
+
+def test_bulk_import_too_many_rows(test_app, mock_repo, test_activity_create, monkeypatch):
+    monkeypatch.setattr("src.api.activity_controller.settings.ACTIVITY_IMPORT_MAX_ROWS", 1)
+    client = TestClient(test_app)
+    body = "\n".join([test_activity_create.model_dump_json()] * 2)
+    response = client.post("/activities/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 413
+    mock_repo.bulk_create.assert_not_called()
+
+def test_bulk_import_invalid_rows_count_against_limit(test_app, mock_repo, monkeypatch):
+    monkeypatch.setattr("src.api.activity_controller.settings.ACTIVITY_IMPORT_MAX_ROWS", 2)
+    client = TestClient(test_app)
+    body = "\n".join(["{not json"] * 3)
+    response = client.post("/activities/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 413
+    mock_repo.bulk_create.assert_not_called()
+
+def test_bulk_import_body_too_large(test_app, mock_repo, test_activity_create, monkeypatch):
+    monkeypatch.setattr("src.api.activity_controller.settings.ACTIVITY_IMPORT_MAX_LINE_BYTES", 100)
+    client = TestClient(test_app)
+    line = test_activity_create.model_dump_json()
+    response = client.post("/activities/bulk", content=line, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Bulk import lines are limited to 100 bytes"}
+
+    monkeypatch.setattr("src.api.activity_controller.settings.ACTIVITY_IMPORT_MAX_BYTES", 10)
+    response = client.post("/activities/bulk", content=line, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Bulk import is limited to 10 bytes"}
+    mock_repo.bulk_create.assert_not_called()
+
+@pytest.fixture
+def export_repo():
+    # the export streams from the sync pool with the psycopg2 repository
+    return Mock(spec=activity_repository)
+
+@pytest.fixture
+def export_app(test_app, export_repo, monkeypatch):
+    pool = MagicMock()
+    from src.deps import get_db_pool
+    test_app.dependency_overrides[get_db_pool] = lambda: pool
+    monkeypatch.setattr("src.api.activity_controller.activity_repository", lambda conn: export_repo)
+    return test_app, pool
+
+def test_export_activities_ndjson(export_app, export_repo, test_activity):
+    app, pool = export_app
+    export_repo.iter_all.return_value = iter([test_activity, test_activity])
+    client = TestClient(app)
+
+    response = client.get("/activities/export", params={"sport_id": 1})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(response.text.splitlines()) == 2
+    kennel_id, filters, _ = export_repo.iter_all.call_args.args
+    assert (kennel_id, filters.sport_id) == (1, 1)
+    pool.connection.return_value.__exit__.assert_called_once()
+
+def test_export_activities_without_async_repo(export_app, export_repo, test_activity):
+    app, _ = export_app
+    from src.deps import get_async_activity_repo
+    def async_repo():
+        raise AssertionError("the export checked out an async pool connection")
+    app.dependency_overrides[get_async_activity_repo] = async_repo
+    export_repo.iter_all.return_value = iter([test_activity])
+
+    response = TestClient(app).get("/activities/export")
+    assert response.status_code == 200
+
+def test_export_activities_csv_empty(export_app, export_repo):
+    app, _ = export_app
+    export_repo.iter_all.return_value = iter([])
+    response = TestClient(app).get("/activities/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.startswith("id,timestamp")
+
+def test_export_activities_pool_busy(export_app):
+    from src.utils.db_pool import PoolTimeoutError
+    app, pool = export_app
+    pool.connection.side_effect = PoolTimeoutError()
+    response = TestClient(app).get("/activities/export")
+    assert response.status_code == 503
+
+def test_export_activities_invalid_format(export_app):
+    app, _ = export_app
+    response = TestClient(app).get("/activities/export", params={"format": "xlsx"})
+    assert response.status_code == 422
@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import Mock
+from fastapi import FastAPI, Request, Depends
+from fastapi.testclient import TestClient
+from src.api.analytics_controller import router as analytics_router
+from src.repositories.async_analytics_repository import async_analytics_repository
+from src.models.analytics import AnalyticSummary, SportCount, AnalyticsDashboard
+from src.models import Filter
+from src.utils.response_cache import ResponseCache
+from datetime import date, datetime
+
+@pytest.fixture
+def mock_repo():
+    mock = Mock(spec=async_analytics_repository)
+    mock.get_analytic_summary_per_dog.return_value = AnalyticSummary(
+        total_distance_km=10, total_duration_hours=1, avg_rating=8, avg_frequency_per_week=2, per_dog=[]
+    )
+    mock.get_sport_counts.return_value = [SportCount(activity_count=3, sport_name="Canicross", sport_type="dryland")]
+    mock.get_dashboard.return_value = AnalyticsDashboard(
+        summary=mock.get_analytic_summary_per_dog.return_value, weekly_stats=[],
+        sport_distribution=mock.get_sport_counts.return_value, weekly_distance=[], heatmap=[],
+    )
+    return mock
+
+@pytest.fixture
+def cache():
+    return ResponseCache(max_entries=10, ttl=60)
+
+@pytest.fixture
+def client(mock_repo, cache):
+    app = FastAPI()
+
+    async def fake_jwt_verify(request: Request):
+        request.state.kennel_id = int(request.headers.get("x-kennel", 1))
+
+    from src.deps import get_async_analytics_repo, get_analytics_cache, verify_jwt
+    app.dependency_overrides[get_async_analytics_repo] = lambda: mock_repo
+    app.dependency_overrides[get_analytics_cache] = lambda: cache
+    app.dependency_overrides[verify_jwt] = fake_jwt_verify
+    app.include_router(analytics_router, prefix="/analytics", dependencies=[Depends(verify_jwt)])
+    return TestClient(app)
+
+def test_summary_is_cached_per_kennel_and_filter(client, mock_repo):
+    for _ in range(2):
+        assert client.get("/analytics/summary?start_date=2025-04-01").status_code == 200
+    mock_repo.get_analytic_summary_per_dog.assert_called_once_with(Filter(start_date=date(2025, 4, 1)), 1)
+
+    client.get("/analytics/summary?start_date=2025-04-02")
+    client.get("/analytics/summary?start_date=2025-04-01", headers={"x-kennel": "2"})
+    assert mock_repo.get_analytic_summary_per_dog.call_count == 3
+
+def test_invalidated_kennel_is_recomputed(client, mock_repo, cache):
+    client.get("/analytics/activities/sport-distribution")
+    cache.invalidate(1)
+    response = client.get("/analytics/activities/sport-distribution")
+    assert response.json()[0]["activity_count"] == 3
+    assert mock_repo.get_sport_counts.call_count == 2
+
+def test_cache_stats(client):
+    client.get("/analytics/summary")
+    client.get("/analytics/summary")
+    stats = client.get("/analytics/cache/stats").json()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+def test_cache_stats_without_repository(client):
+    from src.deps import get_async_analytics_repo
+    def analytics_repo():
+        raise AssertionError("cache stats checked out an async pool connection")
+    client.app.dependency_overrides[get_async_analytics_repo] = analytics_repo
+    assert client.get("/analytics/cache/stats").status_code == 200
+
+def test_dashboard(client, mock_repo):
+    response = client.get("/analytics/dashboard?start_date=2025-04-01&ts=2025-04-07T00:00:00")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["summary"]["total_distance_km"] == 10
+    assert body["sport_distribution"][0]["sport_name"] == "Canicross"
+    mock_repo.get_dashboard.assert_called_once_with(Filter(start_date=date(2025, 4, 1)), 1, datetime(2025, 4, 7))
@@ -7,6 +7,7 @@ from src.api.dog_controller import router as dog_router
 from src.repositories.dog_repository import dog_repository
 from src.models.dog import Dog
 from src.models.kennel import Kennel
+from pydantic import TypeAdapter
 
 @pytest.fixture
 def mock_repo():
@@ -17,6 +18,8 @@ def mock_repo():
         date_of_birth=date(2024,1,1),
         kennel = Kennel(name='test_kennel')
     )]
+    # the list route sends the JSON Postgres built as is
+    mock.get_all_json.return_value = TypeAdapter(list[Dog]).dump_json(mock.get_all.return_value)
     return mock
 
 @pytest.fixture
@@ -50,7 +53,8 @@ def test_list_dogs_called(test_app, mock_repo):
     )
     assert response.status_code == 200
     assert Dog(**response.json()[0]) == expected_response
-    mock_repo.get_all.assert_called_once()
+    assert response.headers["content-type"] == "application/json"
+    mock_repo.get_all_json.assert_called_once_with(1)
 
 def test_create_dog(test_app, mock_repo):
     client = TestClient(test_app)
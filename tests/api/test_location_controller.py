@@ -7,6 +7,7 @@ from src.api.location_controller import router as location_router
 from src.repositories.location_repository import location_repository
 from src.models.location import Location
 from datetime import datetime
+from pydantic import TypeAdapter
 
 
 @pytest.fixture
@@ -17,6 +18,8 @@ def mock_repo():
         Location(id = 2, kennel_id =2, name='Mock Location 2'),
         Location(id = 3, kennel_id =2, name='Mock Location 3')
     ]
+    # the list route sends the JSON Postgres built as is
+    mock.get_all_json.return_value = TypeAdapter(list[Location]).dump_json(mock.get_all.return_value)
     mock.create.return_value = Location(id = 4, name = "Created New location")
     mock.update.return_value = True
 
@@ -51,9 +54,10 @@ def test_get_locations_called(test_app, mock_repo):
     assert response.status_code == 200
     assert len(response.json()) == 3
     assert Location(**response.json()[0]).name == "Mock Location"
-    mock_repo.get_all.assert_called_once()
+    assert response.content == mock_repo.get_all_json.return_value
+    mock_repo.get_all_json.assert_called_once()
     # search param is set to none
-    mock_repo.get_all.assert_called_with(2, None)
+    mock_repo.get_all_json.assert_called_with(2, None)
 
 
 def test_create_location(test_app, mock_repo):
@@ -7,6 +7,7 @@ from src.api.runner_controller import router as runner_router
 from src.repositories.runner_repository import runner_repository
 from src.models.runner import Runner
 from src.models.kennel import Kennel
+from pydantic import TypeAdapter
 
 @pytest.fixture
 def mock_repo():
@@ -15,6 +16,8 @@ def mock_repo():
         name='John',
         kennel = Kennel(name='test_kennel')
     )]
+    # the list route sends the JSON Postgres built as is
+    mock.get_all_json.return_value = TypeAdapter(list[Runner]).dump_json(mock.get_all.return_value)
     return mock
 
 @pytest.fixture
@@ -46,7 +49,7 @@ def test_list_runners_called(test_app, mock_repo):
     )
     assert response.status_code == 200
     assert Runner(**response.json()[0]) == expected_response
-    mock_repo.get_all.assert_called_once()
+    mock_repo.get_all_json.assert_called_once_with(1)
 
 def test_create_runner(test_app, mock_repo):
     client = TestClient(test_app)
@@ -1,14 +1,34 @@
 import pytest
-from src.repositories.activity_repository import activity_repository
+from src.repositories.activity_repository import activity_repository, ACTIVITY_HYDRATION_QUERY, DOG_WEEKLY_ROLLUP_AGGREGATES, DOG_WEEKLY_ROLLUP_COLUMNS
+from src.parsers.activity_parser import parse_activity_from_row
 from src.models.common import ActivityQueryFilters
+from src.models.activity import ActivityDogsCreate
 from datetime import date, timezone, datetime, timedelta
 from psycopg2.extras import RealDictCursor
+from src.utils.pagination import Cursor
+from src.utils.response_cache import ResponseCache, cache_key, set_response_cache
 
 @pytest.fixture
 def activity_repo(test_db_conn):
     print(test_db_conn)
     return activity_repository(test_db_conn)
 
+def rollup_rows(conn, query):
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(query)
+        # durations are float sums, their last digits depend on the order rows were added
+        return [{**row, "duration_hours": round(row["duration_hours"], 9)} for row in cur.fetchall()]
+
+def assert_rollup_matches_activities(conn):
+    stored = rollup_rows(conn, f"SELECT {DOG_WEEKLY_ROLLUP_COLUMNS} FROM dog_weekly_rollup ORDER BY dog_id, week_start")
+    expected = rollup_rows(conn, f"""
+        SELECT {DOG_WEEKLY_ROLLUP_AGGREGATES}
+        FROM activities a JOIN activity_dogs ad ON ad.activity_id = a.id
+        GROUP BY ad.dog_id, date_trunc('week', a.timestamp)
+        ORDER BY 1, 2
+    """)
+    assert stored == expected
+
 def test_get_by_id(activity_repo):
     activity = activity_repo.get_by_id(1)
     assert isinstance(activity.dogs, list)
@@ -41,6 +61,18 @@ def test_get_all(activity_repo):
     assert act2.weather.condition is None
     assert act2.comment_count == 2
     
+def test_get_all_matches_validated_rows(activity_repo, test_db_conn):
+    # activities are built without validation, they must equal the validated models
+    query = ACTIVITY_HYDRATION_QUERY.format(
+        page_query="SELECT id FROM activities WHERE kennel_id = 2", page_columns="", order="DESC")
+    with test_db_conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(query)
+        validated = [parse_activity_from_row(row) for row in cur.fetchall()]
+    activities = activity_repo.get_all(kennel_id=2, filters=ActivityQueryFilters(), limit=20, offset=0)
+    assert any(activity.laps for activity in activities)
+    assert activities == validated
+    assert [a.model_dump_json() for a in activities] == [a.model_dump_json() for a in validated]
+
 def test_get_all_default_pagination(activity_repo):
     activities = activity_repo.get_all(kennel_id=2, filters= ActivityQueryFilters() )
     assert isinstance(activities, list)
@@ -53,6 +85,65 @@ def test_get_all_with_pagination(activity_repo):
     assert activities[0].runner.id == 2
     assert len(activities[0].dogs) == 2
 
+def test_get_all_counts_are_not_multiplied_by_joins(activity_repo):
+    # activity 1 has 2 dogs, 3 laps and a single comment
+    activities = activity_repo.get_all(kennel_id=2, filters=ActivityQueryFilters(), limit=20)
+    act1 = next(activity for activity in activities if activity.id == 1)
+    assert act1.comment_count == 1
+    assert len(act1.dogs) == 2
+    assert [lap.lap_number for lap in act1.laps] == [1, 2, 3]
+
+def test_get_all_with_dog_filter(activity_repo):
+    activities = activity_repo.get_all(kennel_id=2, filters=ActivityQueryFilters(dog_id=2), limit=20)
+    assert {a.id for a in activities} == {1, 4, 5, 7, 10}
+    # the filter selects activities, all their dogs are still returned
+    act1 = next(activity for activity in activities if activity.id == 1)
+    assert len(act1.dogs) == 2
+
+def test_get_all_with_cursor_matches_offset_order(activity_repo):
+    expected = [a.id for a in activity_repo.get_all(kennel_id=2, filters=ActivityQueryFilters(), limit=20)]
+
+    seen = []
+    page = activity_repo.get_all(kennel_id=2, filters=ActivityQueryFilters(), limit=3, cursor=None)
+    while page:
+        seen.extend(a.id for a in page)
+        last = page[-1]
+        page = activity_repo.get_all(kennel_id=2, filters=ActivityQueryFilters(), limit=3,
+                                     cursor=Cursor(last.timestamp, last.id, "next"))
+    assert seen == expected
+
+def test_get_all_with_previous_cursor(activity_repo):
+    activities = activity_repo.get_all(kennel_id=2, filters=ActivityQueryFilters(), limit=20)
+    anchor = activities[5]
+    page = activity_repo.get_all(kennel_id=2, filters=ActivityQueryFilters(), limit=2,
+                                 cursor=Cursor(anchor.timestamp, anchor.id, "previous"))
+    assert [a.id for a in page] == [a.id for a in activities[3:5]]
+
+@pytest.mark.parametrize("filters,offset,expected_count", [
+    (ActivityQueryFilters(), 0, 8),
+    (ActivityQueryFilters(), 6, 8),
+    (ActivityQueryFilters(), 50, 8),
+    (ActivityQueryFilters(dog_id=2), 0, 5),
+    (ActivityQueryFilters(start_date="2030-01-01"), 0, 0),
+])
+def test_get_all_with_count(activity_repo, filters, offset, expected_count):
+    activities, total = activity_repo.get_all_with_count(kennel_id=2, filters=filters, limit=3, offset=offset)
+    assert total == expected_count
+    assert len(activities) == max(min(3, expected_count - offset), 0)
+
+def test_get_all_with_count_cursor_total_is_not_restricted(activity_repo):
+    first, total = activity_repo.get_all_with_count(kennel_id=2, filters=ActivityQueryFilters(), limit=3)
+    last = first[-1]
+    page, total_after = activity_repo.get_all_with_count(kennel_id=2, filters=ActivityQueryFilters(), limit=3,
+                                                         cursor=Cursor(last.timestamp, last.id, "next"))
+    assert total == total_after == 8
+    assert [a.id for a in page] == [a.id for a in activity_repo.get_all(2, ActivityQueryFilters(), limit=3, offset=3)]
+
+def test_get_all_with_count_skip_total(activity_repo):
+    activities, total = activity_repo.get_all_with_count(kennel_id=2, filters=ActivityQueryFilters(), limit=3, include_total=False)
+    assert total is None
+    assert len(activities) == 3
+
 def test_get_all_with_filters(activity_repo):
     filter = ActivityQueryFilters(
         start_date = "2025-03-01",
@@ -114,6 +205,35 @@ def test_create_activity(test_activity_create, activity_repo):
         assert weather[3] == 0.85
         assert weather[4] == "rainy"
 
+        # kennel_id is copied from the runner (runner 2 belongs to kennel 2)
+        cur.execute("""SELECT kennel_id FROM activities WHERE id = %s""", (id,))
+        assert cur.fetchone()[0] == 2
+
+def test_create_activity_without_laps_or_weather(test_activity_create, activity_repo):
+    activity = test_activity_create.model_copy(update={"workout": False, "laps": [], "weather": None})
+    id = activity_repo.create(activity)
+    try:
+        with activity_repo._connection.cursor() as cur:
+            cur.execute("""SELECT COUNT(*) FROM workout_laps WHERE activity_id = %s""", (id,))
+            assert cur.fetchone()[0] == 0
+            cur.execute("""SELECT COUNT(*) FROM weather_entries WHERE activity_id = %s""", (id,))
+            assert cur.fetchone()[0] == 0
+            cur.execute("""SELECT COUNT(*) FROM activity_dogs WHERE activity_id = %s""", (id,))
+            assert cur.fetchone()[0] == 2
+    finally:
+        activity_repo.delete(id)
+
+def test_create_activity_is_atomic(test_activity_create, activity_repo):
+    # unknown dog: the foreign key fails after the activity row was written in the same statement
+    activity = test_activity_create.model_copy(update={"dogs": [ActivityDogsCreate(dog_id=9999, rating=5)]})
+    with activity_repo._connection.cursor() as cur:
+        cur.execute("""SELECT COUNT(*) FROM activities""")
+        before = cur.fetchone()[0]
+    assert activity_repo.create(activity) is None
+    with activity_repo._connection.cursor() as cur:
+        cur.execute("""SELECT COUNT(*) FROM activities""")
+        assert cur.fetchone()[0] == before
+
 def test_delete_activity(activity_repo, test_activity):
     activity_repo.delete(test_activity.id)
     # checking activities table should be enough for now as the other two have foreign key on activity.id
@@ -137,6 +257,18 @@ def test_update_base_fields(activity_repo):
         assert result["location_id"] == 2
         assert result["speed"] == 12.0
 
+def test_update_runner_moves_kennel_id(activity_repo):
+    def kennel_of_activity():
+        with activity_repo._connection.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT kennel_id FROM activities WHERE id = 1")
+            return cur.fetchone()["kennel_id"]
+
+    activity_repo.update(1, {"runner_id": 1})
+    assert kennel_of_activity() == 1
+
+    activity_repo.update(1, {"runner_id": 2})
+    assert kennel_of_activity() == 2
+
 
 def test_update_laps(activity_repo):
     fields = {
@@ -245,3 +377,83 @@ def update_activity_remove_weather_entry(activity_repo):
         result = cur.fetchone()
         assert result is None
 
+
+def test_bulk_create(test_activity_create, activity_repo):
+    # kennel 2 owns runner 2, dogs 1 and 2 and location 3
+    valid = test_activity_create.model_copy(update={"location_id": 3})
+    no_laps = valid.model_copy(update={"workout": False, "laps": [], "weather": None})
+    foreign_runner = valid.model_copy(update={"runner_id": 1})
+    foreign_dog = valid.model_copy(update={"dogs": [ActivityDogsCreate(dog_id=3, rating=5)]})
+
+    created, errors = activity_repo.bulk_create(2, [(2, valid), (3, foreign_runner), (5, no_laps), (6, foreign_dog)])
+    try:
+        assert [row for row, _ in created] == [2, 5]
+        assert errors == [
+            (3, "runner_id 1 does not belong to this kennel"),
+            (6, "dog_id 3 does not belong to this kennel"),
+        ]
+        imported = activity_repo.get_by_id(created[0][1])
+        assert [lap.lap_time_delta for lap in imported.laps] == [lap.lap_time_delta for lap in valid.laps]
+        assert sorted(d.dog.id for d in imported.dogs) == [1, 2]
+        assert imported.weather.condition == "rainy"
+        with activity_repo._connection.cursor() as cur:
+            cur.execute("""SELECT kennel_id FROM activities WHERE id = ANY(%s)""", ([id for _, id in created],))
+            assert [row[0] for row in cur.fetchall()] == [2, 2]
+        assert_rollup_matches_activities(activity_repo._connection)
+    finally:
+        for _, id in created:
+            activity_repo.delete(id)
+
+def test_iter_all_streams_every_activity(activity_repo):
+    expected = [a.id for a in activity_repo.get_all(kennel_id=2, filters=ActivityQueryFilters(), limit=100)]
+    # itersize smaller than the result forces several round-trips on the server-side cursor
+    streamed = [a.id for a in activity_repo.iter_all(2, ActivityQueryFilters(), itersize=2)]
+    activity_repo._connection.rollback()
+    assert streamed == expected
+
+def test_iter_all_with_filters(activity_repo):
+    filters = ActivityQueryFilters(dog_id=2)
+    streamed = list(activity_repo.iter_all(2, filters, itersize=2))
+    activity_repo._connection.rollback()
+    assert len(streamed) == activity_repo.get_total_count(2, filters)
+    assert all(2 in [d.dog.id for d in a.dogs] for a in streamed)
+
+def test_dog_weekly_rollup_follows_writes(test_activity_create, activity_repo):
+    conn = activity_repo._connection
+    id = activity_repo.create(test_activity_create)
+    try:
+        assert_rollup_matches_activities(conn)
+
+        # moves the activity to another week and drops dog 2 from it
+        activity_repo.update(id, {
+            "timestamp": datetime(2025, 5, 20, 8, 0, tzinfo=timezone.utc),
+            "distance": 3.5,
+            "dogs": [{"dog_id": 1, "rating": 4}],
+        })
+        assert_rollup_matches_activities(conn)
+        with conn.cursor() as cur:
+            cur.execute("SELECT dog_id, sessions FROM dog_weekly_rollup WHERE week_start = '2025-05-19'")
+            assert cur.fetchall() == [(1, 1)]
+    finally:
+        activity_repo.delete(id)
+
+    assert_rollup_matches_activities(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM dog_weekly_rollup WHERE week_start = '2025-05-19'")
+        assert cur.fetchone()[0] == 0
+
+def test_writes_invalidate_cached_analytics(test_activity_create, activity_repo):
+    cache = ResponseCache()
+    set_response_cache(cache)
+    try:
+        cache.set(cache_key(1, "summary"), "kennel 1")
+        cache.set(cache_key(2, "summary"), "kennel 2")
+        id = activity_repo.create(test_activity_create) # dogs 1 and 2 belong to kennel 2
+        assert cache.get(cache_key(2, "summary")) is None
+        assert cache.get(cache_key(1, "summary")) == "kennel 1"
+
+        cache.set(cache_key(2, "summary"), "kennel 2")
+        activity_repo.delete(id)
+        assert cache.get(cache_key(2, "summary")) is None
+    finally:
+        set_response_cache(None)
@@ -90,4 +90,20 @@ def test_weekly_mileage(analytics_repo):
     assert len(weekly_distance) == 5
     assert all([entry.dog_id in (1, 2) for entry in weekly_distance])
     assert weekly_distance[-1].week_start == date(2025,4,28)
-    assert weekly_distance[0].weekly_distance_km == pytest.approx(22.4)
\ No newline at end of file
+    assert weekly_distance[0].weekly_distance_km == pytest.approx(22.4)
+@pytest.mark.parametrize("filters", [Filter(start_date='2025-04-01', end_date='2025-04-05'), Filter()])
+def test_dashboard_matches_individual_queries(analytics_repo, filters):
+    anchor = datetime(2025, 4, 7)
+    dashboard = analytics_repo.get_dashboard(filters, 2, anchor)
+
+    assert dashboard.summary == analytics_repo.get_analytic_summary_per_dog(filters, 2)
+    assert dashboard.weekly_stats == analytics_repo.get_weekly_stats(2, anchor)
+    assert dashboard.sport_distribution == analytics_repo.get_sport_counts(filters, 2)
+    assert dashboard.weekly_distance == analytics_repo.get_weekly_mileage(filters, 2)
+    assert dashboard.heatmap == analytics_repo.get_activity_heat_map(filters, 2)
+
+def test_dashboard_empty_window(analytics_repo):
+    dashboard = analytics_repo.get_dashboard(Filter(end_date='2023-12-01'), 2, datetime(2023, 12, 1))
+    assert dashboard.summary.per_dog == []
+    assert dashboard.sport_distribution == [] and dashboard.weekly_distance == [] and dashboard.heatmap == []
+    assert all(stats.total_distance_km == 0 for stats in dashboard.weekly_stats)
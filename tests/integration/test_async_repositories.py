@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from src.repositories.activity_repository import activity_repository
+from src.repositories.analytics_repository import analytics_repository
+from src.repositories.async_activity_repository import async_activity_repository
+from src.repositories.async_analytics_repository import async_analytics_repository
+from src.models.common import ActivityQueryFilters, Filter
+from src.models.activity import ActivityDogsCreate
+from src.utils.async_db_pool import create_async_pool
+from src.utils.pagination import Cursor
+from .test_activity_repository import assert_rollup_matches_activities
+
+def run(test):
+    """Runs test(conn) on a connection of a fresh async pool, the way a request would."""
+    async def main():
+        pool = create_async_pool()
+        await pool.open(wait=True)
+        try:
+            async with pool.connection() as conn:
+                return await test(conn)
+        finally:
+            await pool.close()
+    return asyncio.run(main())
+
+@pytest.mark.parametrize("filters,limit,offset,cursor", [
+    (ActivityQueryFilters(), 10, 0, None),
+    (ActivityQueryFilters(dog_id=2), 2, 1, None),
+    (ActivityQueryFilters(start_date=datetime(2025, 4, 2, tzinfo=timezone.utc)), 3, 0, None),
+    (ActivityQueryFilters(), 3, 0, Cursor(datetime(2025, 4, 3, tzinfo=timezone.utc), 5)),
+])
+def test_activity_reads_match_sync_repository(test_db_conn, filters, limit, offset, cursor):
+    sync_repo = activity_repository(test_db_conn)
+
+    async def reads(conn):
+        repo = async_activity_repository(conn)
+        return (
+            await repo.get_all_with_count(2, filters, limit, offset, cursor=cursor),
+            await repo.get_total_count(2, filters),
+            await repo.get_by_id(1),
+        )
+
+    page, total, activity = run(reads)
+    assert page == sync_repo.get_all_with_count(2, filters, limit, offset, cursor=cursor)
+    assert total == sync_repo.get_total_count(2, filters)
+    assert activity == sync_repo.get_by_id(1)
+
+def test_activity_writes(test_db_conn, test_activity_create):
+    async def writes(conn):
+        repo = async_activity_repository(conn)
+        id = await repo.create(test_activity_create)
+        try:
+            updated = await repo.update(id, {
+                "timestamp": datetime(2025, 5, 20, 8, 0, tzinfo=timezone.utc),
+                "dogs": [{"dog_id": 1, "rating": 4}],
+            })
+            return id, updated, await repo.get_by_id(id)
+        finally:
+            assert await repo.delete(id)
+
+    id, updated, activity = run(writes)
+    assert updated
+    assert activity.timestamp == datetime(2025, 5, 20, 8, 0, tzinfo=timezone.utc)
+    assert [d.dog.id for d in activity.dogs] == [1]
+    with test_db_conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM activities WHERE id = %s", (id,))
+        assert cur.fetchone()[0] == 0
+    assert_rollup_matches_activities(test_db_conn)
+
+def test_bulk_create(test_db_conn, test_activity_create):
+    valid = test_activity_create.model_copy(update={"location_id": 3})
+    foreign_dog = valid.model_copy(update={"dogs": [ActivityDogsCreate(dog_id=3, rating=5)]})
+
+    async def bulk(conn):
+        repo = async_activity_repository(conn)
+        created, errors = await repo.bulk_create(2, [(1, valid), (2, foreign_dog), (4, valid)])
+        try:
+            return created, errors, [await repo.get_by_id(id) for _, id in created]
+        finally:
+            for _, id in created:
+                await repo.delete(id)
+
+    created, errors, imported = run(bulk)
+    assert [row for row, _ in created] == [1, 4]
+    assert errors == [(2, "dog_id 3 does not belong to this kennel")]
+    assert [lap.lap_time_delta for lap in imported[0].laps] == [lap.lap_time_delta for lap in valid.laps]
+    assert imported[1].weather.condition == "rainy"
+    assert_rollup_matches_activities(test_db_conn)
+
+@pytest.mark.parametrize("filters", [
+    Filter(),
+    Filter(start_date='2025-04-02', end_date='2025-04-04'),
+])
+def test_analytics_match_sync_repository(test_db_conn, filters):
+    sync_repo = analytics_repository(test_db_conn)
+    anchor = datetime(2025, 4, 7)
+    start, end = datetime(2025, 4, 1), datetime(2025, 5, 1)
+
+    async def reads(conn):
+        repo = async_analytics_repository(conn)
+        return [
+            await repo.get_analytic_summary_per_dog(filters, 2),
+            await repo.get_weekly_stats(2, anchor),
+            await repo.get_weekly_mileage(filters, 2),
+            await repo.get_sport_counts(filters, 2),
+            await repo.get_activity_heat_map(filters, 2),
+            await repo.get_dog_running_per_day(start, end, 2),
+            await repo.get_dashboard(filters, 2, anchor),
+        ]
+
+    assert run(reads) == [
+        sync_repo.get_analytic_summary_per_dog(filters, 2),
+        sync_repo.get_weekly_stats(2, anchor),
+        sync_repo.get_weekly_mileage(filters, 2),
+        sync_repo.get_sport_counts(filters, 2),
+        sync_repo.get_activity_heat_map(filters, 2),
+        sync_repo.get_dog_running_per_day(start, end, 2),
+        sync_repo.get_dashboard(filters, 2, anchor),
+    ]
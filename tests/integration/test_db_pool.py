@@ -0,0 +1,139 @@
+import asyncio
+import pytest
+import threading
+import time
+from psycopg2 import extensions
+from src.config import settings
+from src.utils.db_pool import create_pool, ConnectionPool, PoolTimeoutError
+from src.utils.async_db_pool import create_async_pool, PoolTimeout
+
+def _dsn():
+    return settings.TEST_DATABASE_URL if settings.ENV == "test" else settings.DATABASE_URL
+
+@pytest.fixture
+def db_pool():
+    pool = create_pool()
+    yield pool
+    pool.close()
+
+@pytest.fixture
+def small_pool():
+    pool = ConnectionPool(_dsn(), min_size=1, max_size=2, timeout=0.2)
+    yield pool
+    pool.close()
+
+def test_connection_checkout_and_return(db_pool):
+    with db_pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+            assert cur.fetchone()[0] == 1
+        assert db_pool.stats()["in_use"] == 1
+
+    stats = db_pool.stats()
+    assert stats["in_use"] == 0
+    assert stats["checkouts"] == 1
+
+def test_uncommitted_transaction_is_rolled_back(db_pool):
+    with db_pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        assert conn.get_transaction_status() == extensions.TRANSACTION_STATUS_INTRANS
+
+    assert conn.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE
+
+def test_failed_query_does_not_leak_to_next_checkout(small_pool):
+    with pytest.raises(Exception):
+        with small_pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT * FROM table_that_does_not_exist")
+
+    with small_pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+            assert cur.fetchone()[0] == 1
+
+def test_checkout_timeout(small_pool):
+    first = small_pool.getconn()
+    second = small_pool.getconn()
+    with pytest.raises(PoolTimeoutError):
+        small_pool.getconn()
+
+    assert small_pool.stats()["timeouts"] == 1
+    small_pool.putconn(first)
+    small_pool.putconn(second)
+
+def test_idle_and_waiting_counts():
+    pool = ConnectionPool(_dsn(), min_size=1, max_size=2, timeout=5)
+    try:
+        # the connection opened with the pool is idle from the start
+        assert (pool.stats()["idle"], pool.stats()["in_use"]) == (1, 0)
+        first, second = pool.getconn(), pool.getconn()
+        assert (pool.stats()["idle"], pool.stats()["in_use"]) == (0, 2)
+
+        waiter = threading.Thread(target=lambda: pool.putconn(pool.getconn()))
+        waiter.start()
+        deadline = time.monotonic() + 2
+        while pool.stats()["waiting"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.stats()["waiting"] == 1
+        pool.putconn(first)
+        waiter.join()
+        pool.putconn(second)
+
+        # the pool keeps min_size connections between checkouts and closes the others
+        stats = pool.stats()
+        assert (stats["idle"], stats["in_use"], stats["waiting"], stats["timeouts"]) == (1, 0, 0, 0)
+    finally:
+        pool.close()
+
+def test_closed_connection_is_replaced(small_pool):
+    conn = small_pool.getconn()
+    conn.close()
+    small_pool.putconn(conn)
+
+    with small_pool.connection() as new_conn:
+        assert not new_conn.closed
+        assert new_conn is not conn
+    assert small_pool.stats()["discarded"] == 1
+
+def test_concurrent_checkouts_get_distinct_connections(small_pool):
+    barrier = threading.Barrier(2)
+    seen = []
+
+    def worker():
+        with small_pool.connection() as conn:
+            seen.append(id(conn))
+            barrier.wait(timeout=2)
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(seen)) == 2
+    assert small_pool.stats()["in_use"] == 0
+
+def test_invalid_pool_size():
+    with pytest.raises(ValueError):
+        ConnectionPool(_dsn(), min_size=5, max_size=2)
+
+def test_async_pool_times_out_when_exhausted(monkeypatch):
+    monkeypatch.setattr(settings, "DB_ASYNC_POOL_MAX_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.2)
+
+    async def exhaust():
+        pool = create_async_pool()
+        await pool.open(wait=True)
+        try:
+            async with pool.connection() as conn:
+                with pytest.raises(PoolTimeout):
+                    async with pool.connection():
+                        pass
+                # the held connection is still usable
+                cur = await conn.execute("SELECT 1")
+                return (await cur.fetchone())[0]
+        finally:
+            await pool.close()
+
+    assert asyncio.run(exhaust()) == 1
@@ -4,6 +4,7 @@ import pytest
 from src.repositories.dog_repository import dog_repository
 from datetime import date, timedelta
 from psycopg2.extras import RealDictCursor
+import json
 
 @pytest.fixture
 def dog_repo(test_db_conn):
@@ -57,6 +58,12 @@ def test_get_all_dogs_empty(dog_repo):
     dog_empty_list = dog_repo.get_all(100)
     assert len(dog_empty_list) == 0
 
+@pytest.mark.parametrize("kennel_id", [1, 2, 100])
+def test_get_all_json_matches_models(dog_repo, kennel_id):
+    dogs = json.loads(dog_repo.get_all_json(kennel_id))
+    expected = [dog.model_dump(mode="json") for dog in dog_repo.get_all(kennel_id)]
+    assert sorted(dogs, key=lambda dog: dog["id"]) == sorted(expected, key=lambda dog: dog["id"])
+
 # Not ideal as this means tests depend on each other but it prevents issues when running 
 # tests multiple times
 def test_delete_dog(dog_repo, test_kennel):
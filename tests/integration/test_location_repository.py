@@ -3,6 +3,7 @@ from psycopg2.errors import ForeignKeyViolation
 from src.repositories.location_repository import location_repository, DuplicateLocationError
 from src.models import Location, LocationUpdate, LocationWithUsage
 from datetime import datetime
+import json
 
 @pytest.fixture
 def location_repo(test_db_conn):
@@ -42,6 +43,11 @@ def test_get_all_with_search(location_repo, search, expected):
     assert locations[0].name == expected
     assert all([isinstance(location, Location) for location in locations])
 
+@pytest.mark.parametrize("search", [None, "LoO", "nowhere"])
+def test_get_all_json_matches_models(location_repo, search):
+    locations = json.loads(location_repo.get_all_json(kennel_id=1, search=search))
+    assert locations == [location.model_dump(mode="json") for location in location_repo.get_all(kennel_id=1, search=search)]
+
 def test_get_all_with_usage(location_repo):
     locations = location_repo.get_all_with_usage(kennel_id = 1)
     assert len(locations) == 2
@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime, timezone
+from psycopg2.extras import RealDictCursor
+from src.models.common import ActivityQueryFilters, Filter, WeightQueryFilter
+from src.repositories.activity_repository import activity_repository
+from src.repositories.analytics_repository import analytics_repository
+from src.repositories.async_activity_repository import async_activity_repository
+from src.repositories.weight_repository import weight_repository
+from src.utils.db import get_connection
+from src.utils.prepared_statements import StatementCache, execute_prepared, get_statement_cache, set_statement_cache
+from .test_async_repositories import run
+
+def use_statements(max_statements: int) -> StatementCache:
+    cache = StatementCache(max_statements)
+    set_statement_cache(cache)
+    return cache
+
+@pytest.fixture(autouse=True)
+def reset_statement_cache():
+    # the session connection has statements of the shared cache, it must keep tracking them
+    previous = get_statement_cache()
+    yield
+    set_statement_cache(previous)
+
+@pytest.fixture
+def conn():
+    # a fresh connection, nothing prepared on it yet
+    conn = get_connection()
+    yield conn
+    conn.close()
+
+def server_statements(conn) -> dict:
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("SELECT name, generic_plans, custom_plans FROM pg_prepared_statements")
+        rows = cur.fetchall()
+    conn.rollback()
+    return {row["name"]: row for row in rows}
+
+FILTERS = [
+    ActivityQueryFilters(),
+    ActivityQueryFilters(dog_id=2),
+    ActivityQueryFilters(workout=False, start_date="2025-04-02"),
+    ActivityQueryFilters(sport_id=1, runner_id=1, end_date="2025-04-03"),
+]
+
+def test_filter_combinations_share_one_statement(conn):
+    use_statements(0)
+    repo = activity_repository(conn)
+    expected = [repo.get_all_with_count(2, filters, 3, 0) for filters in FILTERS]
+    assert server_statements(conn) == {}
+
+    cache = use_statements(8)
+    assert [repo.get_all_with_count(2, filters, 3, 0) for filters in FILTERS] == expected
+    # page and total in one statement, prepared once
+    [page] = cache.prepared(conn)
+    plans = server_statements(conn)[page]
+    assert plans["generic_plans"] + plans["custom_plans"] == len(FILTERS)
+
+def test_plan_mode_is_chosen_per_execution(conn):
+    cache = use_statements(8)
+    query = "SELECT COUNT(*) FROM activities WHERE kennel_id = %s"
+    with conn.cursor() as cur:
+        for plan in ["generic", "generic", "custom"]:
+            execute_prepared(cur, query, (2,), plan=plan)
+            assert cur.fetchone()[0] > 0
+    [name] = cache.prepared(conn)
+    plans = server_statements(conn)[name]
+    assert (plans["generic_plans"], plans["custom_plans"]) == (2, 1)
+
+def test_plan_mode_is_set_back_after_execution(conn):
+    use_statements(8)
+    with conn.cursor() as cur:
+        for plan in ["generic", "custom", "auto"]:
+            execute_prepared(cur, "SELECT COUNT(*) FROM activities WHERE kennel_id = %s", (2,), plan=plan)
+            assert cur.fetchone()[0] > 0
+            # the rest of the transaction runs with the connection's own setting
+            with conn.cursor() as show:
+                show.execute("SHOW plan_cache_mode")
+                assert show.fetchone()[0] == "auto"
+    conn.rollback()
+
+def test_statements_are_bounded_per_connection(conn):
+    cache = use_statements(2)
+    weights = weight_repository(conn).get_all(2, WeightQueryFilter(dog_id=2))
+    activity_repository(conn).get_by_id(1)
+    analytics = analytics_repository(conn)
+    summary = analytics.get_analytic_summary_per_dog(Filter(), 2)
+
+    assert len(server_statements(conn)) == 2
+    assert cache.stats()["deallocations"] == 1
+    # the deallocated statement is prepared again when needed
+    assert weight_repository(conn).get_all(2, WeightQueryFilter(dog_id=2)) == weights
+    assert analytics.get_analytic_summary_per_dog(Filter(), 2) == summary
+    assert len(server_statements(conn)) == 2
+
+def test_dashboard_is_one_prepared_statement(conn):
+    cache = use_statements(8)
+    repo = analytics_repository(conn)
+    anchor = datetime(2025, 4, 9, tzinfo=timezone.utc)
+    first = repo.get_dashboard(Filter(start_date="2025-03-01"), 2, anchor)
+    assert repo.get_dashboard(Filter(start_date="2025-03-01"), 2, anchor) == first
+    assert len(cache.prepared(conn)) == 1
+
+def test_async_reads_use_prepared_statements():
+    async def read(conn):
+        repo = async_activity_repository(conn)
+        return [await repo.get_all_with_count(2, filters, 3, 0) for filters in FILTERS], cache.prepared(conn)
+
+    cache = use_statements(0)
+    expected, _ = run(read)
+    cache = use_statements(8)
+    pages, prepared = run(read)
+    assert pages == expected
+    assert len(prepared) == 1
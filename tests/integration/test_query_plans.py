@@ -0,0 +1,197 @@
+import pytest
+from contextlib import suppress
+from datetime import datetime, timezone
+from psycopg2.extras import RealDictCursor
+from src.utils.db import get_connection
+from src.repositories import (
+    activity_repository,
+    analytics_repository,
+    comment_repository,
+    dog_repository,
+    location_repository,
+    runner_repository,
+    weight_repository,
+)
+from src.models.common import ActivityQueryFilters, Filter, WeightQueryFilter
+
+# Tables that grow with every activity, every repository path below must reach them through an index.
+# dogs / runners / locations stay small per kennel, a hash join over them is fine.
+INDEXED_TABLES = {
+    "activities", "activity_dogs", "workout_laps", "activity_comments",
+    "weather_entries", "weight_entries", "images",
+}
+
+# Explicit ids far above the test fixtures so no sequence is consumed, everything is rolled back.
+BASE = 1_000_000
+KENNELS = 200
+SEED_KENNEL_INDEX = 7
+SEED_KENNEL = BASE + SEED_KENNEL_INDEX
+
+SEED_SQL = f"""
+    INSERT INTO kennels (id, name)
+    SELECT {BASE} + k, 'plan kennel ' || k FROM generate_series(1, {KENNELS}) k;
+
+    INSERT INTO users (id, username, password_hash, kennel_id)
+    SELECT {BASE} + k, 'plan' || k || '@plan.local', 'x', {BASE} + k FROM generate_series(1, {KENNELS}) k;
+
+    -- 2 runners, 3 dogs and 3 locations per kennel
+    INSERT INTO runners (id, name, kennel_id)
+    SELECT {BASE} + k * 2 + r, 'runner ' || r, {BASE} + k FROM generate_series(1, {KENNELS}) k, generate_series(0, 1) r;
+
+    INSERT INTO dogs (id, name, date_of_birth, breed, kennel_id)
+    SELECT {BASE} + k * 3 + d, 'dog ' || d, '2020-01-01', 'Husky', {BASE} + k
+    FROM generate_series(1, {KENNELS}) k, generate_series(0, 2) d;
+
+    INSERT INTO activity_locations (id, name, kennel_id, latitude, longitude)
+    SELECT {BASE} + k * 3 + l, 'loop ' || l, {BASE} + k, 53.5, -113.4
+    FROM generate_series(1, {KENNELS}) k, generate_series(0, 2) l;
+
+    -- 250 activities per kennel spread over ~2 years
+    INSERT INTO activities (id, runner_id, kennel_id, sport_id, timestamp, location_id, workout, speed, distance)
+    SELECT {BASE} + k * 250 + i,
+           {BASE} + k * 2 + i % 2,
+           {BASE} + k,
+           1 + i % 3,
+           TIMESTAMPTZ '2023-01-01' + (i * INTERVAL '3 days') + (k * INTERVAL '1 minute'),
+           {BASE} + k * 3 + i % 3,
+           i % 4 = 0,
+           15.0, 6.0
+    FROM generate_series(1, {KENNELS}) k, generate_series(0, 249) i;
+
+    INSERT INTO activity_dogs (id, activity_id, dog_id, rating)
+    SELECT {BASE} + (a.id - {BASE}) * 2 + d, a.id, {BASE} + ((a.id - {BASE}) / 250) * 3 + (a.id + d) % 3, 7
+    FROM activities a, generate_series(0, 1) d WHERE a.id > {BASE};
+
+    INSERT INTO workout_laps (id, activity_id, lap_number, lap_distance, lap_time, speed)
+    SELECT {BASE} + (a.id - {BASE}) * 5 + n, a.id, n + 1, 1.0, INTERVAL '3 minutes', 20.0
+    FROM activities a, generate_series(0, 4) n WHERE a.id > {BASE} AND a.workout;
+
+    INSERT INTO weather_entries (id, activity_id, temperature, humidity, condition)
+    SELECT a.id, a.id, 10.0, 0.5, 'Sunny' FROM activities a WHERE a.id > {BASE};
+
+    INSERT INTO activity_comments (id, activity_id, user_id, comment)
+    SELECT a.id, a.id, {BASE} + (a.id - {BASE}) / 250, 'nice' FROM activities a WHERE a.id > {BASE} AND a.id % 2 = 0;
+
+    INSERT INTO weight_entries (id, dog_id, date, weight)
+    SELECT {BASE} + (d.id - {BASE}) * 50 + w, d.id, DATE '2023-01-01' + w * 14, 20.0
+    FROM dogs d, generate_series(0, 49) w WHERE d.id > {BASE};
+
+    INSERT INTO images (id, image_path, dog_id, created_at)
+    SELECT {BASE} + (d.id - {BASE}) * 2 + i, 'dog.jpg', d.id, TIMESTAMP '2024-01-01' + i * INTERVAL '1 day'
+    FROM dogs d, generate_series(0, 1) i WHERE d.id > {BASE};
+
+    INSERT INTO images (id, image_path, runner_id, created_at)
+    SELECT {BASE} * 2 + (r.id - {BASE}) * 2 + i, 'runner.jpg', r.id, TIMESTAMP '2024-01-01' + i * INTERVAL '1 day'
+    FROM runners r, generate_series(0, 1) i WHERE r.id > {BASE};
+
+    ANALYZE kennels, users, runners, dogs, activity_locations, activities, activity_dogs,
+            workout_laps, weather_entries, activity_comments, weight_entries, images;
+"""
+
+class ExplainCursor(RealDictCursor):
+    """
+    Runs EXPLAIN for every statement instead of the statement itself and records the plan.
+    Prepared statements are set up for real, their EXECUTE is explained with the plan mode
+    it runs with (a generic plan must use the indexes as well).
+    """
+    plans: list
+
+    def execute(self, query, vars=None):
+        if query.startswith(("PREPARE ", "DEALLOCATE ")):
+            return super().execute(query, vars)
+        prefix = ""
+        if query.startswith("SET LOCAL plan_cache_mode"):
+            prefix, query = query.split("; ", 1)
+            prefix += "; "
+        super().execute(prefix + "EXPLAIN (FORMAT JSON) " + query, vars)
+        self.plans.append((query, super().fetchone()["QUERY PLAN"][0]["Plan"]))
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+class ExplainConnection:
+    def __init__(self, connection):
+        self._connection = connection
+        self.plans = []
+
+    def cursor(self, cursor_factory=None):
+        cur = self._connection.cursor(cursor_factory=ExplainCursor)
+        cur.plans = self.plans
+        return cur
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+@pytest.fixture(scope="module")
+def seeded_conn():
+    conn = get_connection()
+    with conn.cursor() as cur:
+        cur.execute(SEED_SQL)
+    yield conn
+    conn.rollback()
+    conn.close()
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in INDEXED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+def explain(seeded_conn, repository, call) -> list:
+    conn = ExplainConnection(seeded_conn)
+    # results are faked, parsing them may fail, only the plans matter
+    with suppress(Exception):
+        call(repository(conn))
+    assert conn.plans, "no statement was executed"
+    return conn.plans
+
+# the seed kennel's first dog and location (ids BASE + k * 3 + d)
+SEED_DOG = SEED_LOCATION = BASE + SEED_KENNEL_INDEX * 3
+FILTERED = ActivityQueryFilters(dog_id=SEED_DOG, start_date="2023-06-01", end_date="2023-09-01")
+WINDOW = Filter(start_date="2023-06-01", end_date="2023-09-01")
+
+def test_filters_match_seeded_rows(seeded_conn):
+    # plans for filters matching nothing say nothing about the selective ones
+    with seeded_conn.cursor() as cur:
+        cur.execute("""
+            SELECT
+                (SELECT count(*) FROM activity_dogs ad JOIN activities a ON a.id = ad.activity_id
+                 WHERE ad.dog_id = %(dog)s AND a.kennel_id = %(kennel)s
+                   AND a.timestamp >= '2023-06-01' AND a.timestamp < '2023-09-01'),
+                (SELECT count(*) FROM activities WHERE location_id = %(location)s AND kennel_id = %(kennel)s)
+        """, {"dog": SEED_DOG, "location": SEED_LOCATION, "kennel": SEED_KENNEL})
+        dog_activities, location_activities = cur.fetchone()
+    assert dog_activities > 0
+    assert location_activities > 0
+
+@pytest.mark.parametrize("repository,call", [
+    (activity_repository, lambda r: r.get_all(SEED_KENNEL, ActivityQueryFilters(), 10, 0)),
+    (activity_repository, lambda r: r.get_all(SEED_KENNEL, FILTERED, 10, 0)),
+    (activity_repository, lambda r: r.get_all(SEED_KENNEL, ActivityQueryFilters(location_id=SEED_LOCATION), 10, 0)),
+    (activity_repository, lambda r: r.get_all_with_count(SEED_KENNEL, ActivityQueryFilters(), 10, 0)),
+    (activity_repository, lambda r: r.get_total_count(SEED_KENNEL, FILTERED)),
+    (activity_repository, lambda r: r.get_by_id(BASE + 1234)),
+    (analytics_repository, lambda r: r.get_weekly_stats(SEED_KENNEL, datetime(2023, 6, 1, tzinfo=timezone.utc))),
+    (analytics_repository, lambda r: r.get_weekly_mileage(WINDOW, SEED_KENNEL)),
+    (analytics_repository, lambda r: r.get_dog_running_per_day(datetime(2023, 6, 1), datetime(2023, 7, 1), SEED_KENNEL)),
+    (analytics_repository, lambda r: r.get_analytic_summary_per_dog(WINDOW, SEED_KENNEL)),
+    (analytics_repository, lambda r: r.get_activity_heat_map(WINDOW, SEED_KENNEL)),
+    (analytics_repository, lambda r: r.get_sport_counts(WINDOW, SEED_KENNEL)),
+    (weight_repository, lambda r: r.get_all(SEED_KENNEL, WeightQueryFilter(start_date="2023-06-01"))),
+    (weight_repository, lambda r: r.get_latest(SEED_KENNEL)),
+    (dog_repository, lambda r: r.get_all(SEED_KENNEL)),
+    (runner_repository, lambda r: r.get_all(SEED_KENNEL)),
+    (comment_repository, lambda r: r.get_all(BASE + 1234)),
+    (location_repository, lambda r: r.get_all_with_usage(SEED_KENNEL)),
+])
+def test_repository_queries_use_indexes(seeded_conn, repository, call):
+    for query, plan in explain(seeded_conn, repository, call):
+        assert seq_scans(plan) == [], f"sequential scan in plan for:\n{query}"
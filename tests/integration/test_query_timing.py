@@ -0,0 +1,94 @@
+import asyncio
+import json
+import pytest
+from psycopg2.extras import RealDictCursor
+from src.models.common import ActivityQueryFilters
+from src.repositories.activity_repository import activity_repository
+from src.repositories.async_activity_repository import async_activity_repository
+from src.repositories.sport_repository import sport_repository
+from src.utils.async_db_pool import create_async_pool
+from src.utils.db_pool import create_pool
+from src.utils.metrics import RequestTimings, current_request, db_query_duration, db_query_rows
+from src.utils.slow_query_log import SlowQueryLog, set_slow_query_log
+
+def timed(read):
+    timings = RequestTimings()
+    token = current_request.set(timings)
+    try:
+        return read(), timings
+    finally:
+        current_request.reset(token)
+
+def test_pool_connections_time_every_cursor():
+    pool = create_pool()
+    try:
+        with pool.connection() as conn:
+            before = db_query_duration.count("sport_repository.get_all")
+            sports, timings = timed(lambda: sport_repository(conn).get_all())
+
+            # cursor_factory is kept, the rows are still dicts
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("SELECT 1 AS one")
+                assert cur.fetchone() == {"one": 1}
+    finally:
+        pool.close()
+
+    assert timings.queries == 1
+    assert timings.rows == len(sports)
+    assert timings.db_seconds > 0
+    assert db_query_duration.count("sport_repository.get_all") == before + 1
+
+def test_async_pool_connections_time_every_cursor():
+    async def main():
+        pool = create_async_pool()
+        await pool.open(wait=True)
+        try:
+            async with pool.connection() as conn:
+                timings = RequestTimings()
+                token = current_request.set(timings)
+                try:
+                    activities, total = await async_activity_repository(conn).get_all_with_count(2, ActivityQueryFilters(), 10, 0)
+                finally:
+                    current_request.reset(token)
+                return activities, timings
+        finally:
+            await pool.close()
+
+    before = db_query_rows.value("async_activity_repository.get_all_with_count")
+    activities, timings = asyncio.run(main())
+    assert timings.queries >= 1
+    assert db_query_rows.value("async_activity_repository.get_all_with_count") > before
+
+@pytest.fixture
+def slow_query_log(tmp_path):
+    # every statement is slow and explained
+    log = SlowQueryLog(str(tmp_path / "slow.log"), threshold_ms=0, sample_rate=1)
+    set_slow_query_log(log)
+    yield log
+    set_slow_query_log(None)
+    log.close()
+
+def test_slow_statements_are_logged_with_their_plan(slow_query_log, tmp_path):
+    pool = create_pool()
+    try:
+        with pool.connection() as conn:
+            activities = activity_repository(conn).get_all(2, ActivityQueryFilters(), 5, 0)
+            with conn.cursor() as cur:
+                cur.execute("UPDATE sports SET name = name WHERE id = %s", (-1,))
+    finally:
+        pool.close()
+    slow_query_log.flush()
+
+    entries = [json.loads(line) for line in (tmp_path / "slow.log").read_text().splitlines()]
+    # the page is a prepared statement, logged as the query it executes
+    read = next(entry for entry in entries
+                if entry["query"] == "activity_repository.get_all" and not entry["sql"].startswith("PREPARE"))
+    assert read["rows"] >= len(activities)
+    assert "EXECUTE" not in read["sql"]
+    assert "%s" in read["sql"] and read["params"]
+    assert read["plan_analyzed"] and "actual time" in read["plan"]
+
+    # writes only get the estimated plan, they are not executed again
+    write = next(entry for entry in entries if entry["sql"].startswith("UPDATE sports"))
+    assert write["params"] == ["int"]
+    assert not write["plan_analyzed"] and "actual time" not in write["plan"]
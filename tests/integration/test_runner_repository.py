@@ -3,6 +3,7 @@ from src.models.kennel import Kennel
 import pytest
 from src.repositories.runner_repository import runner_repository
 from datetime import date, timedelta
+import json
 
 @pytest.fixture
 def runner_repo(test_db_conn):
@@ -51,6 +52,12 @@ def test_get_all_runners_empty(runner_repo):
     runner_empty_list = runner_repo.get_all(100)
     assert len(runner_empty_list) == 0
 
+@pytest.mark.parametrize("kennel_id", [1, 2, 100])
+def test_get_all_json_matches_models(runner_repo, kennel_id):
+    runners = json.loads(runner_repo.get_all_json(kennel_id))
+    expected = [runner.model_dump(mode="json") for runner in runner_repo.get_all(kennel_id)]
+    assert sorted(runners, key=lambda runner: runner["id"]) == sorted(expected, key=lambda runner: runner["id"])
+
 def test_does_not_delete_if_wrong_kennel(runner_repo, test_kennel):
     runner = Runner(
         name = "Obelix",
@@ -4,6 +4,7 @@ from src.models.dog_weight import DogWeightEntry, DogWeightIn
 from src.models.common import WeightQueryFilter
 import pytest
 from src.repositories.weight_repository import weight_repository
+from src.utils.response_cache import ResponseCache, cache_key, set_response_cache
 from datetime import date, timedelta
 from datetime import datetime
 
@@ -107,4 +108,15 @@ def test_update_base_fields(weight_repo):
         cur.execute("SELECT weight, date FROM weight_entries WHERE id = 1")
         result = cur.fetchone()
         assert result[0] == 30.4
-        assert result[1] == date(2025, 6, 10)
\ No newline at end of file
+        assert result[1] == date(2025, 6, 10)
+
+def test_update_invalidates_cached_analytics(weight_repo):
+    cache = ResponseCache()
+    set_response_cache(cache)
+    try:
+        cache.set(cache_key(2, "summary"), "kennel 2")
+        # entry 1 belongs to dog 1 of kennel 2
+        assert weight_repo.update(1, {"weight": 21.0})
+        assert cache.get(cache_key(2, "summary")) is None
+    finally:
+        set_response_cache(None)
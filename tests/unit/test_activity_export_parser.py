@@ -0,0 +1,46 @@
+import csv
+import io
+import json
+import pytest
+from datetime import timedelta
+from src.models.activity import ActivityExportFormat
+from src.parsers.activity_export_parser import iter_activity_export, EXPORT_CSV_COLUMNS
+from src.parsers.activity_import_parser import parse_csv_record, parse_activity_import_record
+
+def export(activities, format, batch_size=1000) -> bytes:
+    return b"".join(iter_activity_export(iter(activities), format, batch_size))
+
+def test_ndjson_export(test_activity):
+    lines = export([test_activity, test_activity], ActivityExportFormat.ndjson).decode().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["runner"]["name"] == "Obelix"
+
+def test_csv_export_round_trips_through_import(test_activity):
+    rows = list(csv.DictReader(io.StringIO(export([test_activity], ActivityExportFormat.csv).decode())))
+    assert list(rows[0].keys()) == EXPORT_CSV_COLUMNS
+    assert rows[0]["dogs"] == "1:9;2:8"
+
+    imported = parse_activity_import_record(parse_csv_record(rows[0]))
+    assert imported.runner_id == 2
+    assert imported.sport_id == 1
+    assert imported.workout is True
+    assert [(d.dog_id, d.rating) for d in imported.dogs] == [(1, 9), (2, 8)]
+    assert [lap.lap_time_delta for lap in imported.laps] == [lap.lap_time_delta for lap in test_activity.laps]
+    assert imported.weather.condition == "rainy"
+
+def test_csv_export_empty():
+    assert export([], ActivityExportFormat.csv).decode().strip() == ",".join(EXPORT_CSV_COLUMNS)
+
+def test_parquet_export(test_activity):
+    pq = pytest.importorskip("pyarrow.parquet")
+    no_weather = test_activity.model_copy(update={"weather": None, "laps": []})
+
+    data = export([test_activity, no_weather, test_activity], ActivityExportFormat.parquet, batch_size=2)
+    parquet = pq.ParquetFile(io.BytesIO(data))
+
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read().to_pylist()
+    assert len(table) == 3
+    assert table[0]["laps"][1]["lap_time"] == timedelta(minutes=2, seconds=59)
+    assert table[1]["laps"] == [] and table[1]["temperature"] is None
+    assert [d["dog_id"] for d in table[2]["dogs"]] == [1, 2]
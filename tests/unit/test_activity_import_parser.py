@@ -0,0 +1,168 @@
+import asyncio
+import json
+import pytest
+from datetime import timedelta
+from pydantic import ValidationError
+from src.models.activity import ActivityCreate
+from src.parsers.activity_import_parser import parse_csv_record, iter_activity_import, aiter_lines, derive_import_fields, format_import_error, ImportTooLargeError
+
+async def _chunks(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+def collect(body: bytes, content_type: str, chunk_size: int = 7) -> list:
+    async def run():
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        return [row async for row in iter_activity_import(aiter_lines(_chunks(*chunks)), content_type)]
+    return asyncio.run(run())
+
+def ndjson_line(**overrides) -> str:
+    record = {
+        "timestamp": "2025-04-01T09:30:00Z", "runner_id": 2, "sport_id": 1, "location_id": 3,
+        "distance": 8.0, "speed": 20.3, "dogs": [{"dog_id": 1, "rating": 9}],
+    }
+    record.update(overrides)
+    return json.dumps(record)
+
+def test_aiter_lines_rejoins_chunks():
+    async def run():
+        return [line async for line in aiter_lines(_chunks(b"ab", b"c\r\nd", b"ef\n", b"gh"))]
+    assert asyncio.run(run()) == ["abc", "def", "gh"]
+
+def test_aiter_lines_limits():
+    async def run(*chunks, **limits):
+        return [line async for line in aiter_lines(_chunks(*chunks), **limits)]
+    # a line split over many chunks is measured as a whole
+    assert asyncio.run(run(b"abc", b"de\nf", max_line_bytes=5)) == ["abcde", "f"]
+    with pytest.raises(ImportTooLargeError):
+        asyncio.run(run(b"abc", b"def", b"\n", max_line_bytes=5))
+    with pytest.raises(ImportTooLargeError):
+        asyncio.run(run(b"ab\n", b"cd\n", b"ef\n", max_body_bytes=8))
+
+def test_iter_csv_import_quoted_newlines():
+    body = (
+        'timestamp,runner_id,sport_id,location_id,distance,speed,dogs,temperature,condition\n'
+        '2025-04-01T09:30:00Z,2,1,3,2,20,1:9,9.5,"rainy\n\nthen dry"\n'
+        '2025-04-02T09:30:00Z,2,1,3,5,20,1:9,9.5,"never closed\n'
+    ).encode()
+    rows = collect(body, "text/csv")
+
+    row, activity, error = rows[0]
+    assert (row, error) == (2, None)
+    assert activity.weather.condition == "rainy\n\nthen dry"
+    # the row keeps the number of the line it starts on
+    assert rows[1] == (5, None, "unterminated quoted field")
+
+def test_parse_csv_record():
+    record = parse_csv_record({
+        "timestamp": "2025-04-01T09:30:00Z", "runner_id": "2", "sport_id": "1", "location_id": "3",
+        "distance": "2", "workout": "true", "speed": "", "pace": "03:00",
+        "dogs": "1:9;2:", "laps": "1@02:51; 1@02:59", "temperature": "9.5", "humidity": "", "condition": "rainy",
+    })
+    assert record["workout"] is True
+    assert "speed" not in record
+    assert record["dogs"] == [{"dog_id": "1", "rating": "9"}, {"dog_id": "2", "rating": None}]
+    assert record["laps"] == [
+        {"lap_number": 1, "lap_distance": "1", "lap_time": "02:51"},
+        {"lap_number": 2, "lap_distance": "1", "lap_time": "02:59"},
+    ]
+    assert record["weather"] == {"temperature": "9.5", "condition": "rainy"}
+
+def test_iter_csv_import():
+    body = (
+        "timestamp,runner_id,sport_id,location_id,distance,workout,speed,dogs,laps,temperature\n"
+        "2025-04-01T09:30:00Z,2,1,3,2,true,20,1:9;2:8,1@02:51;1@02:59,9.5\n"
+        "2025-04-02T09:30:00Z,2,1,3,5,false,,1:9,,\n"
+    ).encode()
+    rows = collect(body, "text/csv")
+
+    row, activity, error = rows[0]
+    assert (row, error) == (2, None)
+    assert [d.dog_id for d in activity.dogs] == [1, 2]
+    assert activity.laps[1].lap_time_delta == timedelta(minutes=2, seconds=59)
+    assert activity.weather.temperature == 9.5
+
+    row, activity, error = rows[1]
+    assert row == 3 and activity is None
+    assert "speed" in error
+
+def test_iter_ndjson_import_reports_errors_per_line():
+    body = "\n".join([
+        ndjson_line(),
+        "{not json",
+        ndjson_line(workout=True),
+        "",
+        ndjson_line(dogs=[{"dog_id": 2, "rating": 11}]),
+        "[1, 2]",
+    ]).encode()
+    rows = collect(body, "application/x-ndjson")
+
+    assert [row for row, _, _ in rows] == [1, 2, 3, 5, 6]
+    assert rows[0][1] is not None and rows[0][2] is None
+    assert all(activity is None for _, activity, _ in rows[1:])
+    assert "Laps cannot be None" in rows[2][2]
+    assert rows[3][2].startswith("dogs.0.rating")
+
+def test_iter_import_reports_zero_laps_per_line():
+    # derived speeds and paces divide by these, they used to abort the whole import
+    body = "\n".join([
+        ndjson_line(laps=[{"lap_number": 1, "lap_distance": 0, "lap_time": "02:51"}]),
+        ndjson_line(laps=[{"lap_number": 1, "lap_distance": 1, "lap_time": "00:00"}]),
+        ndjson_line(laps=[{"lap_number": 1, "lap_distance": 1, "speed": 0}]),
+        ndjson_line(laps=[{"lap_number": 1, "lap_distance": 1, "lap_time": "02:51"}]),
+    ]).encode()
+    rows = collect(body, "application/x-ndjson")
+
+    assert [error for _, _, error in rows] == [
+        "laps.0.lap_distance: Input should be greater than 0",
+        "laps.0: Value error, Lap time must be greater than 0",
+        "laps.0.speed: Input should be greater than 0",
+        None,
+    ]
+    assert rows[3][1].laps[0].pace == "02:51"
+
+def test_derived_fields_match_validation():
+    laps = [
+        {"lap_number": 1, "lap_distance": "1", "lap_time": "02:51"},
+        {"lap_number": 2, "lap_distance": 1.2, "lap_time": "0:04:05"},
+        {"lap_number": 3, "lap_distance": 1, "lap_time": "03:00", "speed": 19.5},
+        {"lap_number": 4, "lap_distance": 1, "pace": "03:10"},
+        {"lap_number": 5, "lap_distance": -1, "lap_time": "03:00"},
+    ]
+    records = [
+        {"distance": 8.0, "speed": "20.3", "laps": laps},
+        {"distance": 8.0, "pace": "5:30"},
+        {"distance": 8.0, "speed": 12, "pace": "04:00"},
+        {"distance": 8.0, "speed": 0, "pace": None},
+        {"distance": 8.0, "pace": "bad"},
+        {"distance": 8.0, "speed": 9.1, "laps": "1@03:00"},
+    ]
+    base = {"timestamp": "2025-04-01T09:30:00Z", "runner_id": 2, "sport_id": 1, "location_id": 3, "dogs": []}
+    prefilled = [{**base, **json.loads(json.dumps(record))} for record in records]
+    derive_import_fields(prefilled)
+
+    assert prefilled[0]["pace"] == "02:57" and prefilled[1]["speed"] == 10.91
+    assert prefilled[0]["laps"][0]["lap_time_delta"] == timedelta(minutes=2, seconds=51)
+    # given, incomplete or unusable values are left to the validators
+    assert "lap_time_delta" not in prefilled[0]["laps"][2] and "speed" not in prefilled[0]["laps"][4]
+    assert prefilled[3]["pace"] is None and "speed" not in prefilled[4]
+    for record, filled in zip(records, prefilled):
+        try:
+            expected = ActivityCreate(**base, **record)
+        except ValidationError as error:
+            with pytest.raises(ValidationError) as raised:
+                ActivityCreate(**filled)
+            assert format_import_error(raised.value) == format_import_error(error)
+        else:
+            assert ActivityCreate(**filled) == expected
+
+def test_iter_import_validates_in_batches():
+    lines = [ndjson_line(speed=10.0 + row) for row in range(5)] + ['{"speed": "fast"}', ndjson_line(pace="5:00", speed=None)]
+    rows = collect("\n".join(lines).encode(), "application/x-ndjson")
+    batched = asyncio.run(_collect_batched("\n".join(lines).encode(), 2))
+    assert [row for row, _, _ in rows] == list(range(1, 8))
+    assert rows == batched
+    assert rows[4][1].pace == "04:17" and rows[5][2] is not None and rows[6][1].speed == 12.0
+
+async def _collect_batched(body: bytes, batch_size: int) -> list:
+    return [row async for row in iter_activity_import(aiter_lines(_chunks(body)), "application/x-ndjson", batch_size)]
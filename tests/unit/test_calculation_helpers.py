@@ -1,5 +1,6 @@
 from src.models import *
 import pytest
+import numpy as np
 from src.utils import calculation_helpers as ch
 from datetime import datetime, date
 
@@ -46,4 +47,25 @@ def test_wrong_type_speed():
                         ])
 def test_get_number_weeks(start_date, end_date, expected):
     weeks = ch.get_number_weeks(start_date, end_date)
-    assert weeks == expected
\ No newline at end of file
+    assert weeks == expected
+def test_batch_conversions_match_scalar():
+    times = ['02:51', '3:00', '0:05:30', '1:02:03', '59:59']
+    distances = [1.0, 0.8, 1.2, 12.5, 9.9]
+    seconds = ch.convert_str_times_to_seconds(times)
+    assert seconds.tolist() == [ch.convert_str_time_to_timedelta(t).total_seconds() for t in times]
+
+    speeds = ch.calculate_speeds_from_time_distance(distances, seconds)
+    assert speeds.tolist() == [ch.calculate_speed_from_time_distance(d, t) for d, t in zip(distances, times)]
+    assert ch.calculate_speeds_from_paces(seconds).tolist() == [ch.calculate_speed_from_pace(t) for t in times]
+    # includes a pace over an hour (0.9 km/h), whose hours the scalar version drops
+    speeds = [*speeds.tolist(), 0.9, 60.0, 3600.0]
+    assert ch.calculate_paces_from_speeds(speeds).tolist() == [ch.calculate_pace_from_speed(s) for s in speeds]
+
+def test_batch_conversions_missing_values():
+    assert np.isnan(ch.convert_str_times_to_seconds(['530', 'invalid', '5:3x', None, '1:2:3:4'])).all()
+    assert ch.to_float_array(['1.5', 2, None, 'x', True]).tolist()[:2] == [1.5, 2.0]
+    assert np.isnan(ch.to_float_array(['1.5', 2, None, 'x', True])[2:]).all()
+    assert np.isnan(ch.calculate_speeds_from_time_distance([1.0, 1.0], [0, np.nan])).all()
+    assert np.isnan(ch.calculate_speeds_from_paces([0, -330, np.nan])).all()
+    assert ch.calculate_paces_from_speeds([0, -5, np.nan, 12.0]).tolist() == [None, None, None, '05:00']
+    assert ch.format_lap_times([171, 7201.9, np.nan]) == ['02:51', '120:01', None]
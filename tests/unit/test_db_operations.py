@@ -0,0 +1,33 @@
+from src.utils.db_operations import COMMIT, ROLLBACK, Statement, run_operation
+from unittest.mock import MagicMock
+
+
+def insert(log):
+    try:
+        row = yield Statement("INSERT ...", fetch="one")
+        yield COMMIT
+        return row
+    except Exception as e:
+        log.append(str(e))
+        yield ROLLBACK
+        return None
+
+def test_run_operation_sends_step_results():
+    connection = MagicMock()
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.fetchone.return_value = {"id": 1}
+
+    assert run_operation(connection, insert([])) == {"id": 1}
+    cursor.execute.assert_called_once_with("INSERT ...", None)
+    connection.commit.assert_called_once()
+    connection.rollback.assert_not_called()
+
+def test_run_operation_raises_failed_step_in_the_operation():
+    connection = MagicMock()
+    connection.cursor.return_value.__enter__.return_value.execute.side_effect = RuntimeError("boom")
+    log = []
+
+    assert run_operation(connection, insert(log)) is None
+    assert log == ["boom"]
+    connection.commit.assert_not_called()
+    connection.rollback.assert_called_once()
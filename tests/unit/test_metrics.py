@@ -0,0 +1,121 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api.metrics_controller import router as metrics_router
+from src.utils.metrics import Counter, Gauge, Histogram, RequestTimings, current_request, query_name, record_query, db_query_duration, observe_pool
+from src.utils.timing_middleware import TimingMiddleware
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test.", labels=("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/a")
+
+    assert histogram.render() == [
+        "# HELP test_seconds Test.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_seconds_bucket{route="/a",le="1"} 3',
+        'test_seconds_bucket{route="/a",le="+Inf"} 4',
+        'test_seconds_sum{route="/a"} 3.65',
+        'test_seconds_count{route="/a"} 4',
+    ]
+    assert histogram.count("/a") == 4
+    assert histogram.total("/a") == pytest.approx(3.65)
+
+def test_counter_escapes_label_values():
+    counter = Counter("test_total", "Test.", labels=("query",))
+    counter.inc('say "hi"', amount=2)
+    assert counter.render()[-1] == 'test_total{query="say \\"hi\\""} 2'
+
+def test_gauge_reads_its_function_at_render():
+    gauge = Gauge("test_connections", "Test.", labels=("state",))
+    gauge.set(1, "idle")
+    assert gauge.render()[-1] == 'test_connections{state="idle"} 1'
+
+    values = {("idle",): 2}
+    gauge.set_function(lambda: values)
+    values[("idle",)] = 3
+    assert gauge.render() == ["# HELP test_connections Test.", "# TYPE test_connections gauge", 'test_connections{state="idle"} 3']
+    assert gauge.value("idle") == 3
+
+FAKE_REPOSITORY = """
+class fake_repository:
+    def get_things(self):
+        return self._fetch()
+
+    def _fetch(self):
+        return query_name()
+"""
+
+def test_query_name_is_the_public_repository_method():
+    # compiled as if it lived in src/repositories
+    namespace = {"__name__": "src.repositories.fake_repository", "query_name": query_name}
+    exec(FAKE_REPOSITORY, namespace)
+    repo = namespace["fake_repository"]()
+
+    assert repo.get_things() == "fake_repository.get_things"
+    assert repo._fetch() == "fake_repository._fetch"
+    assert query_name() == "other"
+
+def test_record_query_adds_to_the_current_request():
+    before = db_query_duration.count("test.query")
+    timings = RequestTimings()
+    token = current_request.set(timings)
+    try:
+        record_query("test.query", 0.002, 3)
+        record_query("test.query", 0.001, -1)
+    finally:
+        current_request.reset(token)
+
+    assert (timings.queries, timings.rows) == (2, 3)
+    assert timings.db_seconds == pytest.approx(0.003)
+    assert db_query_duration.count("test.query") == before + 2
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(TimingMiddleware)
+    app.include_router(metrics_router)
+
+    @app.get("/things/{id}")
+    def get_thing(id: int):
+        record_query("test.get_thing", 0.004, 1)
+        return {"id": id}
+
+    return TestClient(app)
+
+def test_server_timing_header(client):
+    response = client.get("/things/1")
+    assert response.status_code == 200
+    header = response.headers["server-timing"]
+    assert header.startswith("total;dur=")
+    assert 'db;dur=4.0;desc="1 queries, 1 rows"' in header
+
+def test_metrics_use_route_templates(client):
+    client.get("/things/1")
+    client.get("/things/2")
+    client.get("/nowhere")
+
+    body = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/things/{id}",status="200"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in body
+    assert 'db_queries_per_request_bucket{method="GET",route="/things/{id}",le="1"}' in body
+    assert 'db_query_rows_total{query="test.get_thing"}' in body
+    assert "/things/1" not in body
+
+def test_metrics_export_pool_gauges(client):
+    class FakePool:
+        def stats(self):
+            return {"in_use": 2, "idle": 1, "waiting": 3, "timeouts": 4}
+
+    observe_pool(FakePool())
+    try:
+        body = client.get("/metrics").text
+    finally:
+        observe_pool(None)
+
+    assert 'db_pool_connections{state="in_use"} 2' in body
+    assert 'db_pool_connections{state="idle"} 1' in body
+    assert "db_pool_waiting 3" in body
+    assert "db_pool_checkout_timeouts 4" in body
+    assert "db_pool_waiting 3" not in client.get("/metrics").text
@@ -471,3 +471,12 @@ def test_zero_previous_values():
     })
     assert model.trend_distance == Trend.up
     assert model.trend_rating is None
+
+def test_activity_models_complete_at_import():
+    # models constructed without validation (database reads) need their serializer built
+    import subprocess, sys
+    code = (
+        "from src.models.activity import Activity, ActivityCreate, ActivityUpdate\n"
+        "assert Activity.__pydantic_complete__ and ActivityCreate.__pydantic_complete__ and ActivityUpdate.__pydantic_complete__\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -1,5 +1,7 @@
-from src.utils.pagination import paginate_results
+from src.utils.pagination import paginate_results, Cursor
 import pytest
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
 from starlette.datastructures import QueryParams
 from starlette.datastructures import URL
 
@@ -58,3 +60,69 @@ def test_paginate_results_last_page(sample_items):
     assert response["previous"] == "http://testserver/activities?limit=2&offset=2"
 
 
+
+def test_cursor_round_trip():
+    cursor = Cursor(datetime(2025, 4, 2, 9, 0, tzinfo=timezone.utc), 7, "previous")
+    assert Cursor.decode(cursor.encode()) == cursor
+
+# the last ones are valid base64 JSON that isn't an object: [1], "x" and null
+@pytest.mark.parametrize("value", ["not-a-cursor", "", "eyJ0cyI6ICJ4In0", "WzFd", "Ingi", "bnVsbA"])
+def test_invalid_cursor(value):
+    with pytest.raises(ValueError):
+        Cursor.decode(value)
+
+@pytest.fixture
+def cursor_items():
+    return [
+        {"id": 5, "timestamp": datetime(2025, 4, 5, tzinfo=timezone.utc)},
+        {"id": 4, "timestamp": datetime(2025, 4, 4, tzinfo=timezone.utc)},
+        {"id": 3, "timestamp": datetime(2025, 4, 3, tzinfo=timezone.utc)},
+    ]
+
+def _cursor_from(url: str) -> Cursor:
+    return Cursor.decode(parse_qs(urlsplit(url).query)["cursor"][0])
+
+def test_paginate_cursor_first_page(cursor_items):
+    request = MockRequest("http://testserver/activities", "limit=2&cursor=")
+    response = paginate_results(cursor_items, 5, request, 2, None, None)
+
+    assert response["offset"] is None
+    assert response["data"] == cursor_items[:2]
+    assert response["previous"] is None
+    assert _cursor_from(response["next"]) == Cursor(cursor_items[1]["timestamp"], 4, "next")
+
+def test_paginate_cursor_last_page(cursor_items):
+    request = MockRequest("http://testserver/activities", "limit=3&cursor=abc")
+    cursor = Cursor(datetime(2025, 4, 6, tzinfo=timezone.utc), 6, "next")
+    response = paginate_results(cursor_items, 5, request, 3, None, cursor)
+
+    assert response["data"] == cursor_items
+    assert response["next"] is None
+    assert _cursor_from(response["previous"]) == Cursor(cursor_items[0]["timestamp"], 5, "previous")
+
+def test_paginate_cursor_backwards(cursor_items):
+    request = MockRequest("http://testserver/activities", "limit=2&cursor=abc")
+    cursor = Cursor(datetime(2025, 4, 2, tzinfo=timezone.utc), 2, "previous")
+    response = paginate_results(cursor_items, 5, request, 2, None, cursor)
+
+    # extra row is the newest one when moving backwards
+    assert response["data"] == cursor_items[1:]
+    assert _cursor_from(response["previous"]) == Cursor(cursor_items[1]["timestamp"], 4, "previous")
+    assert _cursor_from(response["next"]) == Cursor(cursor_items[2]["timestamp"], 3, "next")
+
+def test_paginate_cursor_empty_page():
+    request = MockRequest("http://testserver/activities", "limit=2&cursor=")
+    response = paginate_results([], 0, request, 2, None, None)
+    assert response["data"] == []
+    assert response["next"] is None
+    assert response["previous"] is None
+
+def test_paginate_results_without_total(sample_items):
+    request = MockRequest("http://testserver/activities", "limit=1&offset=0&include_total=false")
+    response = paginate_results(sample_items, None, request, 1, 0)
+    assert response["total_count"] is None
+    assert response["data"] == sample_items[:1]
+    assert response["next"] == "http://testserver/activities?limit=1&offset=1&include_total=false"
+
+    response = paginate_results(sample_items[:1], None, request, 1, 0)
+    assert response["next"] is None
@@ -1,13 +1,16 @@
-from src.parsers.dog_parser import parse_dog_from_row
-from src.parsers.runner_parser import parse_runner_from_row
-from src.parsers.activity_parser import parse_activity_from_row
-from src.parsers.weight_parser import parse_weight_from_row
+from src.parsers.dog_parser import parse_dog_from_row, parse_dog_from_record
+from src.parsers.runner_parser import parse_runner_from_row, parse_runner_from_record
+from src.parsers.activity_parser import parse_activity_from_row, parse_activity_from_record, parse_activities_from_records
+from src.parsers.weight_parser import parse_weight_from_row, parse_weight_from_record
 from src.parsers.analytic_parser import parse_weekly_stats, parse_dog_calendar, parse_summary_from_rows
+from src.parsers.construct import construct
 from src.models import Dog, DogWeightEntry
 from src.models.analytics.weekly_stats import WeeklyStats, Trend
 from src.models.analytics.dog_calendar_day import DogCalendarDay
-from datetime import date, timedelta, datetime
+from datetime import date, timedelta, datetime, timezone
+from collections import namedtuple
 from pydantic import ValidationError
+import copy
 import pytest
 
 
@@ -354,4 +357,71 @@ def test_parse_summary_from_rows():
     assert summary.per_dog[0].avg_frequency_per_week==1.5
     assert summary.per_dog[0].avg_rating == 8
     assert summary.time_since_last_training == delta_days
-    
\ No newline at end of file
+
+def as_record(row: dict):
+    """row as the named tuple a NamedTupleCursor would return"""
+    return namedtuple("Record", row)(**row)
+
+@pytest.fixture()
+def stored_activity_row(default_activity_row):
+    # typed like the hydration query returns it: dogs and laps are json, lap times in seconds
+    row = {**default_activity_row, "timestamp": datetime(2025, 4, 1, 9, 30, tzinfo=timezone.utc),
+           "temperature": 12.5, "humidity": 0.5, "condition": "Cloudy", "speed": 20}
+    row["laps"] = [{**lap, "lap_time": float((lap["lap_number"] + 1) * 60 + 50 + lap["lap_number"]), "speed": None}
+                   for lap in row["laps"]]
+    return row
+
+def test_activity_record_parser_matches_validated_parser(stored_activity_row):
+    activity = parse_activity_from_record(as_record(copy.deepcopy(stored_activity_row)))
+    validated = parse_activity_from_row(copy.deepcopy(stored_activity_row))
+    assert activity == validated
+    assert activity.model_dump_json() == validated.model_dump_json()
+    assert activity.pace == validated.pace == "03:00"
+    assert activity.laps[0].lap_time == "02:51" and activity.laps[0].speed == validated.laps[0].speed
+
+def test_activity_record_parser_without_weather_or_laps(stored_activity_row):
+    stored_activity_row.update(temperature=None, humidity=None, condition=None, laps=None, workout=False, speed=None)
+    activity = parse_activity_from_record(as_record(stored_activity_row))
+    assert activity.weather is None and activity.laps == []
+    assert activity.speed == 0 and activity.pace is None
+    assert activity == parse_activity_from_row(copy.deepcopy(stored_activity_row))
+
+def test_activities_parsed_together_match_validated_parser(stored_activity_row):
+    rows = []
+    for number, speed in enumerate([20, None, 7.3]):
+        row = copy.deepcopy(stored_activity_row)
+        row.update(id=number, speed=speed)
+        # a stored lap speed is kept, a missing one derived from time and distance
+        row["laps"][0]["speed"] = 14.2 if number else None
+        rows.append(row)
+    rows[2]["laps"] = None
+    rows[2]["workout"] = False
+
+    activities = parse_activities_from_records([as_record(copy.deepcopy(row)) for row in rows])
+    assert activities == [parse_activity_from_row(row) for row in rows]
+    assert [activity.pace for activity in activities] == ["03:00", None, "08:13"]
+    assert [len(activity.laps) for activity in activities] == [3, 3, 0]
+    assert activities[1].laps[0].speed == 14.2 and activities[1].laps[0].pace == "04:13"
+
+def test_record_parsers_match_validated_parsers():
+    dog = {'id': 1, 'name': 'Fido', 'breed': 'labrador', 'color': None, 'date_of_birth': date(2024, 1, 1),
+           'kennel_id': 1, 'kennel_name': 'test_kennel', 'image_url': 'fido.jpg'}
+    assert parse_dog_from_record(as_record(dog)) == parse_dog_from_row(dog)
+
+    runner = {'id': 2, 'name': 'John', 'kennel_id': 1, 'kennel_name': 'test_kennel', 'image_url': None}
+    assert parse_runner_from_record(as_record(runner)) == parse_runner_from_row(runner)
+
+    weight = {'id': 1, 'date': date(2025, 1, 1), 'dog_id': 1, 'name': 'Fido', 'breed': 'labrador',
+              'date_of_birth': date(2024, 1, 1), 'kennel_name': 'test_kennel', 'weight': 40.3}
+    entry = parse_weight_from_record(as_record(weight))
+    assert entry == parse_weight_from_row(weight)
+    assert entry.age == 1
+
+def test_construct_fills_defaults_in_field_order():
+    dog = construct(Dog, name="Balto", breed="Husky", date_of_birth=date(2021, 5, 14))
+
+    assert dog == Dog(name="Balto", breed="Husky", date_of_birth=date(2021, 5, 14))
+    assert list(dog.__dict__) == list(Dog.model_fields)
+    assert dog.model_fields_set == {"name", "breed", "date_of_birth"}
+    dog.name = "Shadow"
+    assert dog.model_dump()["name"] == "Shadow"
@@ -0,0 +1,75 @@
+import pytest
+from src.utils.prepared_statements import StatementCache, positional, prepared_statement, source_query
+
+def test_positional_repeats_named_values():
+    query, values = positional("SELECT %(a)s, %(b)s, %(a)s, 'x%%'", {"a": 1, "b": 2})
+    assert query == "SELECT %s, %s, %s, 'x%%'"
+    assert values == [1, 2, 1]
+    assert positional("SELECT %s", (1,)) == ("SELECT %s", [1])
+    assert positional("SELECT 1", None) == ("SELECT 1", [])
+
+def test_prepared_statement_numbers_parameters():
+    statement = prepared_statement("SELECT * FROM dogs WHERE id = %s AND name LIKE 'a%%' AND kennel_id = %s;", "generic")
+    assert statement.name.startswith("stmt_")
+    assert statement.prepare == f"PREPARE {statement.name} AS SELECT * FROM dogs WHERE id = $1 AND name LIKE 'a%' AND kennel_id = $2"
+    assert statement.execute == f"SET LOCAL plan_cache_mode = force_generic_plan; EXECUTE {statement.name}(%s, %s)"
+    assert statement.reset == "SET LOCAL plan_cache_mode = DEFAULT"
+    # auto leaves the connection's plan_cache_mode alone, nothing to set back
+    assert prepared_statement(statement.query).execute == f"EXECUTE {statement.name}(%s, %s)"
+    assert prepared_statement(statement.query).reset is None
+    # the name only depends on the query
+    assert prepared_statement(statement.query, "custom").name == statement.name
+    assert prepared_statement("SELECT 1").execute.endswith(f"EXECUTE {prepared_statement('SELECT 1').name}")
+    with pytest.raises(KeyError):
+        prepared_statement("SELECT 2", "never")
+
+def test_source_query_unwraps_executions():
+    statement = prepared_statement("SELECT * FROM runners WHERE id = %s")
+    assert source_query(statement.execute, [3]) == ("SELECT * FROM runners WHERE id = %s", [3])
+    assert source_query(statement.execute.encode(), [3])[0] == statement.query
+    generic = prepared_statement(statement.query, "generic")
+    assert source_query(generic.execute, [3]) == (statement.query, [3])
+    assert source_query("SELECT 1", None) == ("SELECT 1", None)
+
+class Connection:
+    pass
+
+def run_setup(cache, connection, query):
+    return list(cache.setup(connection, prepared_statement(query)))
+
+def test_statement_cache_prepares_once_per_connection():
+    cache = StatementCache(max_statements=2)
+    first, second = Connection(), Connection()
+    statement = prepared_statement("SELECT %s")
+
+    assert run_setup(cache, first, "SELECT %s") == [statement.prepare]
+    assert run_setup(cache, first, "SELECT %s") == []
+    assert run_setup(cache, second, "SELECT %s") == [statement.prepare]
+    assert cache.stats() == {"connections": 2, "prepared": 2, "prepares": 2, "deallocations": 0}
+
+def test_statement_cache_deallocates_least_recently_used():
+    cache = StatementCache(max_statements=2)
+    conn = Connection()
+    a, b, c = (prepared_statement(f"SELECT {n}") for n in "abc")
+    run_setup(cache, conn, a.query)
+    run_setup(cache, conn, b.query)
+    run_setup(cache, conn, a.query)
+
+    assert run_setup(cache, conn, c.query) == [f"DEALLOCATE {b.name}", c.prepare]
+    assert cache.prepared(conn) == [a.name, c.name]
+    assert cache.stats()["deallocations"] == 1
+
+def test_statement_cache_records_only_successful_statements():
+    cache = StatementCache()
+    conn = Connection()
+    setup = cache.setup(conn, prepared_statement("SELECT 'failing'"))
+    next(setup)  # the PREPARE raised, the iterator is not resumed
+    assert cache.prepared(conn) == []
+    assert len(run_setup(cache, conn, "SELECT 'failing'")) == 1
+
+def test_statement_cache_forgets_closed_connections():
+    cache = StatementCache()
+    conn = Connection()
+    run_setup(cache, conn, "SELECT 1")
+    del conn
+    assert cache.stats()["connections"] == 0
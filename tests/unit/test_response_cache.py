@@ -0,0 +1,62 @@
+import pytest
+import time
+from datetime import date
+from src.models import Filter
+from src.utils.response_cache import ResponseCache, cache_key, normalize_params
+
+@pytest.fixture
+def cache():
+    return ResponseCache(max_entries=2, ttl=60)
+
+def test_normalize_params_ignores_unset_values():
+    assert normalize_params(Filter()) == normalize_params(Filter(start_date=None)) == ()
+    assert normalize_params(Filter(end_date=date(2025, 4, 5)), ts=None) == (("end_date", "2025-04-05"),)
+    assert cache_key(1, "summary", {"b": 1, "a": 2}) == cache_key(1, "summary", a=2, b=1)
+
+def test_get_or_compute_counts_hits_and_misses(cache):
+    calls = []
+    key = cache_key(1, "summary", Filter())
+    for _ in range(3):
+        assert cache.get_or_compute(key, lambda: calls.append(1) or "value") == "value"
+    assert len(calls) == 1
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (2, 1)
+
+def test_entries_expire(cache, monkeypatch):
+    key = cache_key(1, "summary")
+    cache.set(key, "value")
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert cache.get(key) is None
+    assert cache.stats()["expirations"] == 1
+
+def test_least_recently_used_entry_is_evicted(cache):
+    first, second, third = (cache_key(1, route) for route in ("a", "b", "c"))
+    cache.set(first, 1)
+    cache.set(second, 2)
+    cache.get(first)
+    cache.set(third, 3)
+    assert cache.get(second) is None
+    assert cache.get(first) == 1 and cache.get(third) == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_invalidate_only_drops_the_kennel(cache):
+    cache.set(cache_key(1, "summary"), "kennel 1")
+    cache.set(cache_key(2, "summary"), "kennel 2")
+    cache.invalidate(1)
+    assert cache.get(cache_key(1, "summary")) is None
+    assert cache.get(cache_key(2, "summary")) == "kennel 2"
+
+def test_result_computed_across_an_invalidation_is_not_stored(cache):
+    key = cache_key(1, "summary")
+
+    def compute():
+        cache.invalidate(1)  # a write commits while the query runs
+        return "stale"
+
+    assert cache.get_or_compute(key, compute) == "stale"
+    assert cache.get(key) is None
+
+def test_disabled_cache_never_stores():
+    cache = ResponseCache(max_entries=0)
+    cache.set(cache_key(1, "summary"), "value")
+    assert cache.get(cache_key(1, "summary")) is None
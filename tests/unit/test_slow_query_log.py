@@ -0,0 +1,67 @@
+import json
+import pytest
+from datetime import date
+from src.utils.slow_query_log import SlowQueryLog, explain_mode, normalize_sql, params_shape
+
+def test_normalize_sql_hides_literals():
+    sql = """
+        SELECT a.id, t1.name -- activity and runner
+        FROM activities a JOIN runners t1 ON t1.id = a.runner_id
+        WHERE a.kennel_id = 2 AND a.timestamp >= '2025-04-01'::timestamptz AND a.distance > 1.5
+    """
+    assert normalize_sql(sql) == (
+        "SELECT a.id, t1.name FROM activities a JOIN runners t1 ON t1.id = a.runner_id "
+        "WHERE a.kennel_id = ? AND a.timestamp >= ?::timestamptz AND a.distance > ?"
+    )
+    assert normalize_sql(b"SELECT 'it''s' FROM dogs WHERE id = %s") == "SELECT ? FROM dogs WHERE id = %s"
+
+def test_params_shape_keeps_types_only():
+    assert params_shape((2, "Milou", [1, 2, 3], None)) == ["int", "str", "list[3]", "NoneType"]
+    assert params_shape({"kennel_id": 2, "since": date(2025, 4, 1)}) == {"kennel_id": "int", "since": "date"}
+    assert params_shape(None) is None
+
+@pytest.mark.parametrize("sql,mode", [
+    ("SELECT * FROM dogs WHERE id = %s", "analyze"),
+    ("  WITH weeks AS (SELECT 1) SELECT * FROM weeks;", "analyze"),
+    ("SELECT 'DELETE' FROM dogs", "analyze"),
+    ("WITH moved AS (DELETE FROM dogs RETURNING id) SELECT * FROM moved", "plan"),
+    ("SELECT * FROM dogs FOR UPDATE", "plan"),
+    ("UPDATE dogs SET name = %s WHERE id = %s", "plan"),
+    ("COPY activities FROM STDIN WITH CSV", None),
+    ("SELECT 1; SELECT 2", None),
+    ("", None),
+])
+def test_explain_mode(sql, mode):
+    assert explain_mode(sql) == mode
+
+def read_entries(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_entries_are_written_without_plan_when_not_sampled(tmp_path):
+    path = tmp_path / "logs" / "slow.log"
+    log = SlowQueryLog(str(path), threshold_ms=100, sample_rate=0, connect=lambda: pytest.fail("no EXPLAIN expected"))
+    try:
+        log.submit("dog_repository.get_by_id", "SELECT * FROM dogs WHERE id = %s", (1,), 0.25, 1)
+        log.flush()
+    finally:
+        log.close()
+
+    [entry] = read_entries(path)
+    assert entry["query"] == "dog_repository.get_by_id"
+    assert entry["duration_ms"] == 250
+    assert entry["params"] == ["int"]
+    assert "plan" not in entry
+    assert log.stats() == {"logged": 1, "explained": 0, "dropped": 0}
+
+def test_log_file_rotates(tmp_path):
+    path = tmp_path / "slow.log"
+    log = SlowQueryLog(str(path), threshold_ms=100, sample_rate=0, max_bytes=500, backup_count=2)
+    try:
+        for _ in range(10):
+            log.submit("dog_repository.get_all", "SELECT * FROM dogs", None, 0.2, 3)
+        log.flush()
+    finally:
+        log.close()
+
+    assert path.exists() and (tmp_path / "slow.log.1").exists()
+    assert not (tmp_path / "slow.log.3").exists()
@@ -0,0 +1,104 @@
+import pytest
+import jwt
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+from fastapi import FastAPI, Depends, Request
+from fastapi.testclient import TestClient
+from src.utils.token_verifier import TokenVerifier, InvalidTokenError
+from src import deps
+from src.config import settings
+
+SECRET = "unit-test-secret-key-with-enough-bytes"
+ALGORITHM = "HS256"
+
+def make_token(expires_in: timedelta = timedelta(minutes=5), secret: str = SECRET, **claims):
+    payload = {"sub": "john@domain.com", "user_id": 1, "kennel_id": 2}
+    payload.update(claims)
+    payload["exp"] = datetime.now(timezone.utc) + expires_in
+    return jwt.encode(payload, secret, algorithm=ALGORITHM)
+
+@pytest.fixture
+def verifier():
+    return TokenVerifier(SECRET, ALGORITHM, cache_size=2)
+
+def test_verify_valid_token(verifier):
+    claims = verifier.verify(make_token())
+    assert claims == {"sub": "john@domain.com", "user_id": 1, "kennel_id": 2}
+
+def test_verify_uses_cache(verifier):
+    token = make_token()
+    verifier.verify(token)
+    verifier.verify(token)
+    assert verifier.misses == 1
+    assert verifier.hits == 1
+
+@pytest.mark.parametrize("token", [
+    make_token(expires_in=timedelta(minutes=-1)),
+    make_token(secret="another-secret-key-with-enough-bytes"),
+    make_token(kennel_id=None),
+    "not-a-jwt",
+])
+def test_verify_invalid_token(verifier, token):
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(token)
+
+def test_cached_token_is_not_served_after_expiry(verifier, monkeypatch):
+    token = make_token()
+    verifier.verify(token)
+
+    def expired_decode(*args, **kwargs):
+        raise jwt.ExpiredSignatureError()
+
+    monkeypatch.setattr("src.utils.token_verifier.time.time", lambda: datetime.now(timezone.utc).timestamp() + 600)
+    monkeypatch.setattr("src.utils.token_verifier.jwt.decode", expired_decode)
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(token)
+    assert verifier.hits == 0
+
+def test_cache_is_bounded(verifier):
+    tokens = [make_token(user_id=i) for i in range(3)]
+    for token in tokens:
+        verifier.verify(token)
+    assert len(verifier._cache) == 2
+    assert tokens[0] not in verifier._cache
+
+@pytest.fixture
+def jwt_app(monkeypatch, verifier):
+    monkeypatch.setattr(deps, "_token_verifier", verifier)
+    monkeypatch.setattr(settings, "JWT_LOCAL_VERIFY", True)
+    monkeypatch.setattr(settings, "JWT_REMOTE_FALLBACK", False)
+
+    app = FastAPI()
+
+    @app.get("/protected", dependencies=[Depends(deps.verify_jwt)])
+    def protected(request: Request):
+        return {"kennel_id": request.state.kennel_id, "user_id": request.state.user_id}
+
+    return app
+
+def test_verify_jwt_local(jwt_app, monkeypatch):
+    remote = AsyncMock()
+    monkeypatch.setattr(deps, "validate_token_remote", remote)
+    client = TestClient(jwt_app)
+    response = client.get("/protected", headers={"Authorization": f"Bearer {make_token()}"})
+    assert response.status_code == 200
+    assert response.json() == {"kennel_id": 2, "user_id": 1}
+    remote.assert_not_called()
+
+def test_verify_jwt_invalid_without_fallback(jwt_app, monkeypatch):
+    remote = AsyncMock()
+    monkeypatch.setattr(deps, "validate_token_remote", remote)
+    client = TestClient(jwt_app)
+    response = client.get("/protected", headers={"Authorization": "Bearer not-a-jwt"})
+    assert response.status_code == 401
+    remote.assert_not_called()
+
+def test_verify_jwt_remote_fallback(jwt_app, monkeypatch):
+    remote = AsyncMock(return_value={"sub": "john@domain.com", "user_id": 3, "kennel_id": 4})
+    monkeypatch.setattr(deps, "validate_token_remote", remote)
+    monkeypatch.setattr(settings, "JWT_REMOTE_FALLBACK", True)
+    client = TestClient(jwt_app)
+    response = client.get("/protected", headers={"Authorization": "Bearer not-a-jwt"})
+    assert response.status_code == 200
+    assert response.json() == {"kennel_id": 4, "user_id": 3}
+    remote.assert_awaited_once_with("not-a-jwt")
@@ -1,4 +1,4 @@
-from src.utils.db import build_conditions, build_time_window_clause
+from src.utils.db import build_conditions, build_normalized_conditions, build_time_window_clause
 import pytest
 from src.models import WeightQueryFilter, ActivityQueryFilters, Filter
 from datetime import date
@@ -39,7 +39,7 @@ def test_build_conditions_with_activity_filter(activity_query_filter):
     assert "a.sport_id = %s" in clause
     assert "a.runner_id = %s" in clause
     assert "a.workout = %s" in clause
-    assert "l.id = %s" in clause
+    assert "a.location_id = %s" in clause
     assert values == [
         2,
         1,
@@ -61,3 +61,20 @@ def test_build_time_window_filter():
         date(2025,1,2),
         date(2025,1,31)
     ]
+
+def test_build_normalized_conditions_keeps_every_filter(activity_query_filter):
+    clause, values = build_normalized_conditions(activity_query_filter)
+    empty_clause, empty_values = build_normalized_conditions(ActivityQueryFilters())
+    # same statement text whichever filters are set, unset ones are NULL
+    assert clause == empty_clause
+    assert "(%s::boolean IS NULL OR a.workout = %s)" in clause
+    assert "a.timestamp <= COALESCE(%s::date, 'infinity'::date)" in clause
+    assert values == [2, 2, 1, 1, False, False, 1, 1, 3, 3, date(2025, 1, 1), date(2025, 1, 30)]
+    assert empty_values == [None] * 12
+
+def test_build_normalized_conditions_with_weight_filter(weight_query_filter):
+    clause, values = build_normalized_conditions(weight_query_filter)
+    assert clause.startswith("(%s::int IS NULL OR w.dog_id = %s)")
+    assert values == [2, 2, date(2025, 1, 1), date(2025, 1, 30)]
+    # build_conditions ignores a zero id
+    assert build_normalized_conditions(WeightQueryFilter(dog_id=0))[1] == [None] * 4